@@ -0,0 +1,16 @@
+"""Benchmarks for C-Star, run with airspeed velocity (asv).
+
+From the `asv_bench` directory, run e.g. `asv run` to benchmark the current
+branch, or `asv continuous main HEAD` to compare two commits.
+
+Modules cover the orchestration hot paths:
+
+- `imports`: `import cstar` in a fresh interpreter
+- `blueprint`: `ROMSSimulation.from_blueprint`
+- `datasets`: `exists_locally` over many tiles and large files
+- `hashing`: `_get_sha256_hash` throughput
+- `runtime_settings`: `ROMSRuntimeSettings.from_file`/`to_file`
+- `state`: `Simulation.persist`/`restore` time and state size
+- `partition`: `ROMSInputDataset.partition` on synthetic grids
+- `scheduler`: job status polling against fake `sacct`/`qstat` commands
+"""
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+from cstar.roms import ROMSSimulation
+
+
+def write_blueprint(directory: Path, n_datasets: int) -> Path:
+    """Write a ROMS blueprint with `n_datasets` local input datasets to `directory`.
+
+    The input datasets are empty NetCDF files, as loading a blueprint only
+    inspects their location and type.
+    """
+    input_dir = directory / "input_datasets"
+    code_dir = directory / "additional_code"
+    input_dir.mkdir()
+    code_dir.mkdir()
+
+    def dataset(name: str) -> dict:
+        path = input_dir / f"{name}.nc"
+        path.touch()
+        return {"location": str(path)}
+
+    n_forcing = max(n_datasets - 3, 0)
+    blueprint = {
+        "name": "benchmark",
+        "valid_start_date": "2012-01-01 12:00:00",
+        "valid_end_date": "2012-12-31 12:00:00",
+        "codebase": {
+            "source_repo": "https://github.com/CWorthy-ocean/ucla-roms.git",
+            "checkout_target": "main",
+        },
+        "runtime_code": {"location": str(code_dir), "files": ["roms.in"]},
+        "compile_time_code": {"location": str(code_dir), "files": ["cppdefs.opt"]},
+        "discretization": {"n_procs_x": 2, "n_procs_y": 2, "time_step": 60},
+        "model_grid": dataset("roms_grd"),
+        "initial_conditions": dataset("roms_ini"),
+        "tidal_forcing": dataset("roms_tides"),
+        "surface_forcing": [dataset(f"roms_frc_{i}") for i in range(n_forcing // 2)],
+        "boundary_forcing": [
+            dataset(f"roms_bry_{i}") for i in range(n_forcing - n_forcing // 2)
+        ],
+    }
+
+    blueprint_path = directory / "blueprint.yaml"
+    with open(blueprint_path, "w") as f:
+        yaml.safe_dump(blueprint, f)
+    return blueprint_path
+
+
+class BlueprintLoad:
+    """Time and memory of `ROMSSimulation.from_blueprint` for large blueprints."""
+
+    params = [10, 100, 1000]
+    param_names = ["n_datasets"]
+
+    def setup(self, n_datasets):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmpdir.name)
+        self.blueprint = write_blueprint(self.directory, n_datasets)
+
+    def teardown(self, n_datasets):
+        self._tmpdir.cleanup()
+
+    def time_from_blueprint(self, n_datasets):
+        ROMSSimulation.from_blueprint(
+            blueprint=str(self.blueprint), directory=self.directory / "sim"
+        )
+
+    def peakmem_from_blueprint(self, n_datasets):
+        ROMSSimulation.from_blueprint(
+            blueprint=str(self.blueprint), directory=self.directory / "sim"
+        )
+
+    def track_filesystem_probes(self, n_datasets):
+        """Number of `stat` calls made, a proxy for load time on slow filesystems."""
+        with mock.patch("os.stat", wraps=os.stat) as mock_stat:
+            sim = ROMSSimulation.from_blueprint(
+                blueprint=str(self.blueprint), directory=self.directory / "sim"
+            )
+            sim.tree()
+        return mock_stat.call_count
+
+    track_filesystem_probes.unit = "calls"  # type: ignore[attr-defined]
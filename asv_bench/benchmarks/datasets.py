@@ -0,0 +1,73 @@
+import os
+import tempfile
+from pathlib import Path
+
+from cstar.roms.input_dataset import ROMSModelGrid
+
+
+class ExistsLocally:
+    """Time of `exists_locally` on a dataset partitioned into many tiles."""
+
+    params = [1, 128, 1024]
+    param_names = ["n_tiles"]
+
+    def setup(self, n_tiles):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        directory = Path(self._tmpdir.name)
+        source = directory / "roms_grd.nc"
+        source.touch()
+
+        self.dataset = ROMSModelGrid(location=str(source))
+        self.dataset.get(directory / "input_datasets")
+
+        ndigits = len(str(n_tiles))
+        tiles = []
+        for i in range(n_tiles):
+            tile = directory / f"roms_grd.{i:0{ndigits}d}.nc"
+            tile.write_bytes(b"\0" * 1024)
+            tiles.append(tile)
+        self.dataset._update_partitioning_attribute(
+            parted_files=tiles, new_np_xi=n_tiles, new_np_eta=1
+        )
+        self.tiles = tiles
+
+    def teardown(self, n_tiles):
+        self._tmpdir.cleanup()
+
+    def time_exists_locally(self, n_tiles):
+        self.dataset.exists_locally
+
+    def time_exists_locally_after_touch(self, n_tiles):
+        """Modification times differ from those recorded, forcing a hash check."""
+        for tile in self.tiles:
+            os.utime(tile)
+        self.dataset.exists_locally
+
+
+class ExistsLocallyLargeFile:
+    """Time of `exists_locally` on a single large file."""
+
+    params = [1, 256]
+    param_names = ["size_mb"]
+    number = 1
+
+    def setup(self, size_mb):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        directory = Path(self._tmpdir.name)
+        self.source = directory / "roms_grd.nc"
+        with open(self.source, "wb") as f:
+            f.truncate(size_mb * 1024 * 1024)
+
+        self.dataset = ROMSModelGrid(location=str(self.source))
+        self.dataset.get(directory / "input_datasets")
+
+    def teardown(self, size_mb):
+        self._tmpdir.cleanup()
+
+    def time_exists_locally(self, size_mb):
+        self.dataset.exists_locally
+
+    def time_exists_locally_after_touch(self, size_mb):
+        """Modification time differs from that recorded, forcing a hash check."""
+        os.utime(self.source)
+        self.dataset.exists_locally
@@ -0,0 +1,26 @@
+import os
+import tempfile
+from pathlib import Path
+
+from cstar.base.utils import _get_sha256_hash
+
+
+class Sha256Hash:
+    """Throughput of `_get_sha256_hash` on files of increasing size."""
+
+    params = [1, 64, 512]
+    param_names = ["size_mb"]
+    number = 1
+
+    def setup(self, size_mb):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmpdir.name) / "data.bin"
+        with open(self.path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+    def teardown(self, size_mb):
+        self._tmpdir.cleanup()
+
+    def time_get_sha256_hash(self, size_mb):
+        _get_sha256_hash(self.path)
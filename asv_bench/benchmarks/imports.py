@@ -0,0 +1,8 @@
+class Import:
+    """Time taken to import C-Star in a fresh interpreter."""
+
+    def timeraw_import_cstar(self):
+        return "import cstar"
+
+    def timeraw_import_cstar_roms(self):
+        return "import cstar.roms"
@@ -0,0 +1,51 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+from cstar.roms.input_dataset import ROMSModelGrid
+
+
+def write_grid(path: Path, n: int) -> None:
+    """Write a synthetic ROMS grid with `n` x `n` interior points to `path`."""
+    rho = ("eta_rho", "xi_rho")
+    shape = (n + 2, n + 2)
+    ds = xr.Dataset(
+        {
+            "h": (rho, np.random.rand(*shape)),
+            "mask_rho": (rho, np.ones(shape)),
+            "lat_rho": (rho, np.random.rand(*shape)),
+            "lon_rho": (rho, np.random.rand(*shape)),
+            "angle": (rho, np.zeros(shape)),
+            "mask_u": (("eta_rho", "xi_u"), np.ones((n + 2, n + 1))),
+            "mask_v": (("eta_v", "xi_rho"), np.ones((n + 1, n + 2))),
+        }
+    )
+    ds.to_netcdf(path)
+
+
+class Partition:
+    """Time of `ROMSInputDataset.partition` on synthetic NetCDF grids."""
+
+    params = ([128, 512], [(2, 2), (8, 8)])
+    param_names = ["n_points", "tiles"]
+    number = 1
+
+    def setup(self, n_points, tiles):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        directory = Path(self._tmpdir.name)
+        source = directory / "roms_grd.nc"
+        write_grid(source, n_points)
+
+        self.dataset = ROMSModelGrid(location=str(source))
+        self.dataset.get(directory / "input_datasets")
+
+    def teardown(self, n_points, tiles):
+        self._tmpdir.cleanup()
+
+    def time_partition(self, n_points, tiles):
+        np_xi, np_eta = tiles
+        self.dataset.partition(
+            np_xi=np_xi, np_eta=np_eta, overwrite_existing_files=True
+        )
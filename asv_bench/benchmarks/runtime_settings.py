@@ -0,0 +1,32 @@
+import tempfile
+from pathlib import Path
+
+import cstar
+from cstar.roms import ROMSRuntimeSettings, runtime_settings
+
+EXAMPLE_IN_FILE = (
+    Path(cstar.__file__).parent
+    / "tests/unit_tests/roms/fixtures/example_runtime_settings.in"
+)
+
+
+class RuntimeSettingsIO:
+    """Time of reading and writing ROMS `.in` files."""
+
+    def setup(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.out_file = Path(self._tmpdir.name) / "roms.in"
+        self.settings = ROMSRuntimeSettings.from_file(EXAMPLE_IN_FILE)
+
+    def teardown(self):
+        self._tmpdir.cleanup()
+
+    def time_from_file(self):
+        runtime_settings._FROM_FILE_CACHE.clear()
+        ROMSRuntimeSettings.from_file(EXAMPLE_IN_FILE)
+
+    def time_from_file_cached(self):
+        ROMSRuntimeSettings.from_file(EXAMPLE_IN_FILE)
+
+    def time_to_file(self):
+        self.settings.to_file(self.out_file)
@@ -0,0 +1,71 @@
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from cstar.execution.scheduler_job import PBSJob, SlurmJob
+from cstar.system.scheduler import PBSQueue, PBSScheduler, SlurmQOS, SlurmScheduler
+
+FAKE_SACCT = """#!/bin/sh
+echo "   RUNNING"
+"""
+
+FAKE_QSTAT = f"""#!/bin/sh
+cat <<'END'
+{json.dumps({"Jobs": {"12345.server": {"job_state": "R"}}})}
+END
+"""
+
+
+class SchedulerStatus:
+    """Time of polling a job's status against fake `sacct` and `qstat` commands.
+
+    The fake commands return immediately, so this measures C-Star's own overhead
+    (process creation, output capture and parsing) per poll.
+    """
+
+    params = ["slurm", "pbs"]
+    param_names = ["scheduler"]
+
+    def setup(self, scheduler):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        directory = Path(self._tmpdir.name)
+        for name, script in [("sacct", FAKE_SACCT), ("qstat", FAKE_QSTAT)]:
+            command = directory / name
+            command.write_text(script)
+            command.chmod(command.stat().st_mode | stat.S_IEXEC)
+        self._original_path = os.environ["PATH"]
+        os.environ["PATH"] = f"{directory}{os.pathsep}{self._original_path}"
+
+        job_params = {
+            "commands": "echo Hello, World",
+            "account_key": "benchmark",
+            "cpus": 4,
+            "nodes": 1,
+            "cpus_per_node": 4,
+            "walltime": "01:00:00",
+            "script_path": directory / "job.sh",
+        }
+        if scheduler == "slurm":
+            queue = SlurmQOS(
+                name="regular", max_walltime_method=lambda *args: "12:00:00"
+            )
+            self.job = SlurmJob(
+                scheduler=SlurmScheduler(queues=[queue], primary_queue_name="regular"),
+                **job_params,
+            )
+        else:
+            queue = PBSQueue(name="regular", max_walltime="12:00:00")
+            self.job = PBSJob(
+                scheduler=PBSScheduler(queues=[queue], primary_queue_name="regular"),
+                **job_params,
+            )
+        self.job._id = 12345
+
+    def teardown(self, scheduler):
+        os.environ["PATH"] = self._original_path
+        self._tmpdir.cleanup()
+
+    def time_status(self, scheduler):
+        self.job.status
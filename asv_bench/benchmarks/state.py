@@ -0,0 +1,44 @@
+import tempfile
+from pathlib import Path
+
+from cstar.roms import ROMSSimulation
+from cstar.simulation import STATE_FILE_NAME
+
+from .blueprint import write_blueprint
+
+
+class PersistRestore:
+    """Time and on-disk size of `Simulation.persist` and `Simulation.restore`."""
+
+    params = [10, 100, 1000]
+    param_names = ["n_datasets"]
+
+    def setup(self, n_datasets):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        directory = Path(self._tmpdir.name)
+        blueprint = write_blueprint(directory, n_datasets)
+        self.sim = ROMSSimulation.from_blueprint(
+            blueprint=str(blueprint), directory=directory / "sim"
+        )
+        self.sim.directory.mkdir()
+        self.sim.persist()
+
+    def teardown(self, n_datasets):
+        self._tmpdir.cleanup()
+
+    def time_persist_unchanged(self, n_datasets):
+        self.sim.persist()
+
+    def time_persist_changed(self, n_datasets):
+        self.sim.end_date = self.sim.end_date.replace(minute=1)
+        self.sim.persist()
+
+    def time_restore(self, n_datasets):
+        """Restore, then decode every attribute."""
+        restored = ROMSSimulation.restore(self.sim.directory)
+        restored.__getstate__()
+
+    def track_state_size(self, n_datasets):
+        return (self.sim.directory / STATE_FILE_NAME).stat().st_size
+
+    track_state_size.unit = "bytes"  # type: ignore[attr-defined]
@@ -1,13 +1,18 @@
 import shutil
 import tempfile
 from pathlib import Path
+from typing import ClassVar
 
 from cstar.base.datasource import DataSource
 from cstar.base.gitutils import _clone_and_checkout
 from cstar.base.log import LoggingMixin
+from cstar.base.staging import CODE_STAGING_METHODS, StagingMethod, stage_file
+from cstar.base.state_store import register_state_type
+from cstar.base.tracing import traced
 from cstar.base.utils import _get_sha256_hash, _list_to_concise_str
 
 
+@register_state_type("AdditionalCode")
 class AdditionalCode(LoggingMixin):
     """Additional code contributing to a model simulation.
 
@@ -29,6 +34,9 @@ class AdditionalCode(LoggingMixin):
         to the additional code files
     working_path: Path, default None
         The local path to the additional code. Set when `get()` method is called.
+    staging_methods: tuple of StagingMethod
+        The ways of copying files to `local_dir` when `get()` is called, in order of
+        preference. Defaults to a reflink (copy-on-write clone), then a full copy.
 
     Methods:
     --------
@@ -42,6 +50,7 @@ class AdditionalCode(LoggingMixin):
     """
 
     files: list[str]
+    staging_methods: ClassVar[tuple[StagingMethod, ...]] = CODE_STAGING_METHODS
 
     def __init__(
         self,
@@ -116,6 +125,17 @@ class AdditionalCode(LoggingMixin):
             repr_str += f"\nState: <{info_str}>"
         return repr_str
 
+    def __copy__(self) -> "AdditionalCode":
+        """Return a copy of this AdditionalCode sharing its (immutable) source, but
+        with independent file list and local state.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update({k: v for k, v in self.__dict__.items() if k != "_log"})
+        new.files = None if self.files is None else list(self.files)
+        if self._local_file_hash_cache is not None:
+            new._local_file_hash_cache = dict(self._local_file_hash_cache)
+        return new
+
     @property
     def checkout_target(self) -> str | None:
         return self._checkout_target
@@ -139,6 +159,7 @@ class AdditionalCode(LoggingMixin):
 
         return True
 
+    @traced(category="code")
     def get(self, local_dir: str | Path) -> None:
         """Copy the required AdditionalCode files to `local_dir`
 
@@ -204,10 +225,13 @@ class AdditionalCode(LoggingMixin):
                     f"• Copying {src_file_path.relative_to(source_dir)} to {tgt_file_path.parent}"
                 )
                 if src_file_path.exists():
-                    shutil.copy(src_file_path, tgt_file_path)
-                    self._local_file_hash_cache[tgt_file_path] = _get_sha256_hash(
-                        tgt_file_path
+                    staged = stage_file(
+                        src_file_path,
+                        tgt_file_path,
+                        methods=self.staging_methods,
+                        overwrite=True,
                     )
+                    self._local_file_hash_cache[tgt_file_path] = staged.file_hash
 
                 else:
                     raise FileNotFoundError(f"Error: {src_file_path} does not exist.")
@@ -0,0 +1,445 @@
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from cstar.base.log import get_logger
+from cstar.base.tracing import span
+
+log = get_logger(__name__)
+
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+"""Maximum amount of each output stream kept in memory per command (the tail is
+kept)."""
+
+_READ_SIZE = 64 * 1024
+"""Number of characters read at a time from the output of captured commands."""
+
+DEFAULT_MAX_WORKERS = 8
+"""Number of threads used by `CommandRunner.submit` and `CommandRunner.run_many`."""
+
+
+@dataclass
+class CommandResult:
+    """The outcome of a command executed by a `CommandRunner`.
+
+    Attributes
+    ----------
+    cmd: str
+        The command that was executed
+    returncode: int
+        The exit code of the final attempt (-1 if it timed out)
+    stdout: str
+        The captured standard output. For streamed commands this also contains
+        standard error. Only the last `max_output_bytes` are kept.
+    stderr: str
+        The captured standard error, of which only the last `max_output_bytes`
+        are kept (empty for streamed commands)
+    duration: float
+        The total wall-clock time in seconds, including retries
+    attempts: int
+        The number of times the command was run
+    timed_out: bool
+        True if the final attempt was stopped after exceeding its timeout
+    truncated: bool
+        True if earlier output was discarded to respect `max_output_bytes`
+    """
+
+    cmd: str
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0
+    attempts: int = 1
+    timed_out: bool = False
+    truncated: bool = False
+
+    @property
+    def succeeded(self) -> bool:
+        """True if the command completed with a return code of zero."""
+        return (self.returncode == 0) and (not self.timed_out)
+
+
+@dataclass
+class CommandStats:
+    """Aggregated timing metrics for all runs of one program (e.g. `sacct`).
+
+    Attributes
+    ----------
+    calls: int
+        The number of `CommandRunner.run` calls
+    attempts: int
+        The total number of attempts, including retries
+    failures: int
+        The number of calls whose final attempt failed or timed out
+    timeouts: int
+        The number of attempts that exceeded their timeout
+    total_seconds: float
+        The total wall-clock time spent in these calls
+    max_seconds: float
+        The duration of the slowest call
+    """
+
+    calls: int = 0
+    attempts: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        """The mean duration of a call."""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class _OutputBuffer:
+    """Keeps the tail of a stream of text (lines or chunks), up to a maximum number
+    of bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self._parts: deque[str] = deque()
+        self._nbytes = 0
+
+    def append(self, text: str) -> None:
+        self._parts.append(text)
+        self._nbytes += len(text)
+        while self._nbytes > self.max_bytes:
+            self.truncated = True
+            excess = self._nbytes - self.max_bytes
+            oldest = self._parts[0]
+            if len(oldest) <= excess:
+                self._parts.popleft()
+                self._nbytes -= len(oldest)
+            else:
+                self._parts[0] = oldest[excess:]
+                self._nbytes -= excess
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+class CommandRunner:
+    """Executes shell commands with timeouts, retries, streaming and metrics.
+
+    Short commands (e.g. scheduler queries) have their output captured, and
+    returned once they complete. Long-running, verbose commands (e.g. `make`)
+    can instead be streamed: each line of output is written to the log as it
+    arrives. Either way, only the last `max_output_bytes` of each output stream
+    are kept in memory, and a command that times out is killed together with
+    any processes it started.
+
+    Attributes
+    ----------
+    metrics: dict of str to CommandStats
+        Aggregated timing metrics, keyed by program name
+
+    Methods
+    -------
+    run(cmd, cwd, env, timeout, retries, backoff, stream, ...)
+        Run a command, blocking until it completes
+    run_async(cmd, ...)
+        Coroutine running a command without blocking the event loop
+    submit(cmd, ...)
+        Run a command in a thread pool, returning a Future
+    run_many(cmds, ...)
+        Run several commands concurrently, returning results in order
+    reset_metrics()
+        Discard all aggregated metrics
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    ):
+        """Initialize a CommandRunner.
+
+        Parameters
+        ----------
+        max_workers: int, optional
+            The number of threads used to run commands concurrently
+        max_output_bytes: int, optional
+            The default limit on each output stream kept in memory per command
+        """
+        self.max_workers = max_workers
+        self.max_output_bytes = max_output_bytes
+        self._executor: ThreadPoolExecutor | None = None
+        self._metrics: dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_workers={self.max_workers}, "
+            f"max_output_bytes={self.max_output_bytes})"
+        )
+
+    @property
+    def metrics(self) -> dict[str, CommandStats]:
+        """A snapshot of the aggregated metrics, keyed by program name."""
+        with self._lock:
+            return {k: CommandStats(**vars(v)) for k, v in self._metrics.items()}
+
+    def reset_metrics(self) -> None:
+        """Discard all aggregated metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+    def run(
+        self,
+        cmd: str,
+        cwd: str | Path | None = None,
+        env: dict[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int = 0,
+        backoff: float = 1.0,
+        stream: bool = False,
+        stream_level: int = logging.DEBUG,
+        max_output_bytes: int | None = None,
+    ) -> CommandResult:
+        """Run a shell command, blocking until it completes.
+
+        Parameters
+        ----------
+        cmd: str
+            The command to execute
+        cwd: str or Path, optional
+            The working directory. Defaults to the current working directory.
+        env: dict, optional
+            Environment variables for the command. Defaults to the current ones.
+        timeout: float, optional
+            Seconds after which an attempt is stopped. No limit by default.
+        retries: int, optional, default 0
+            How many more times to run the command if it fails or times out
+        backoff: float, optional, default 1.0
+            Seconds to wait before the first retry, doubling for each further one
+        stream: bool, optional, default False
+            If True, write output to the log line by line as it is produced, and
+            keep only the tail in memory. Standard error is merged into the output.
+        stream_level: int, optional, default logging.DEBUG
+            The log level at which streamed lines are written
+        max_output_bytes: int, optional
+            Limit on each output stream kept in memory. Defaults to the runner's
+            `max_output_bytes`.
+
+        Returns
+        -------
+        CommandResult
+            The outcome of the final attempt. Failures are not raised, and should
+            be checked with `CommandResult.succeeded`.
+        """
+        program = cmd.split(maxsplit=1)[0] if cmd.strip() else "cmd"
+        kwargs: dict[str, Any] = {}
+        if cwd:
+            kwargs["cwd"] = cwd
+        if env:
+            kwargs["env"] = env
+
+        max_output_bytes = max_output_bytes or self.max_output_bytes
+        start = time.perf_counter()
+        timeouts = 0
+        with span(program, category="subprocess", cmd=cmd) as s:
+            for attempt in range(1, retries + 2):
+                if stream:
+                    result = self._run_streaming(
+                        cmd,
+                        timeout=timeout,
+                        stream_level=stream_level,
+                        max_output_bytes=max_output_bytes,
+                        **kwargs,
+                    )
+                else:
+                    result = self._run_captured(
+                        cmd,
+                        timeout=timeout,
+                        max_output_bytes=max_output_bytes,
+                        **kwargs,
+                    )
+                result.attempts = attempt
+                timeouts += result.timed_out
+
+                if result.succeeded or attempt > retries:
+                    break
+                delay = backoff * 2 ** (attempt - 1)
+                log.debug(
+                    f"Command `{cmd}` "
+                    + ("timed out" if result.timed_out else "failed")
+                    + f" (attempt {attempt}/{retries + 1}), retrying in {delay:g}s"
+                )
+                time.sleep(delay)
+
+            result.duration = time.perf_counter() - start
+            s.set(returncode=result.returncode, attempts=result.attempts)
+            if result.timed_out:
+                s.set(timed_out=True)
+
+        with self._lock:
+            stats = self._metrics.setdefault(program, CommandStats())
+            stats.calls += 1
+            stats.attempts += result.attempts
+            stats.failures += not result.succeeded
+            stats.timeouts += timeouts
+            stats.total_seconds += result.duration
+            stats.max_seconds = max(stats.max_seconds, result.duration)
+        return result
+
+    @staticmethod
+    def _run_captured(
+        cmd: str, timeout: float | None, max_output_bytes: int, **kwargs
+    ) -> CommandResult:
+        stdout = _OutputBuffer(max_output_bytes)
+        stderr = _OutputBuffer(max_output_bytes)
+        process = subprocess.Popen(
+            cmd,
+            shell=True,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+            **kwargs,
+        )
+        assert (process.stdout is not None) and (process.stderr is not None)
+        # Both pipes are drained at once, so that neither fills up and blocks
+        stderr_reader = threading.Thread(
+            target=_read_chunks, args=(process.stderr, stderr), daemon=True
+        )
+        with _kill_on_timeout(process, timeout) as timed_out:
+            stderr_reader.start()
+            _read_chunks(process.stdout, stdout)
+            stderr_reader.join()
+            returncode = process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+        return CommandResult(
+            cmd=cmd,
+            returncode=-1 if timed_out.is_set() else returncode,
+            stdout=stdout.getvalue().strip(),
+            stderr=stderr.getvalue(),
+            timed_out=timed_out.is_set(),
+            truncated=stdout.truncated or stderr.truncated,
+        )
+
+    @staticmethod
+    def _run_streaming(
+        cmd: str,
+        timeout: float | None,
+        stream_level: int,
+        max_output_bytes: int,
+        **kwargs,
+    ) -> CommandResult:
+        output = _OutputBuffer(max_output_bytes)
+        process = subprocess.Popen(
+            cmd,
+            shell=True,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            **kwargs,
+        )
+        assert process.stdout is not None
+        with _kill_on_timeout(process, timeout) as timed_out:
+            for line in process.stdout:
+                output.append(line)
+                log.log(stream_level, line.rstrip("\n"))
+            returncode = process.wait()
+        process.stdout.close()
+
+        return CommandResult(
+            cmd=cmd,
+            returncode=-1 if timed_out.is_set() else returncode,
+            stdout=output.getvalue().strip(),
+            timed_out=timed_out.is_set(),
+            truncated=output.truncated,
+        )
+
+    async def run_async(self, cmd: str, **kwargs) -> CommandResult:
+        """Run a command without blocking the event loop.
+
+        Accepts the same arguments as `run`, which is executed in a worker thread.
+        """
+        return await asyncio.to_thread(self.run, cmd, **kwargs)
+
+    def submit(self, cmd: str, **kwargs) -> "Future[CommandResult]":
+        """Run a command in the runner's thread pool.
+
+        Accepts the same arguments as `run`.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the `CommandResult`
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cstar-cmd"
+                )
+            executor = self._executor
+        return executor.submit(self.run, cmd, **kwargs)
+
+    def run_many(self, cmds: Iterable[str], **kwargs) -> list[CommandResult]:
+        """Run several commands concurrently, blocking until all complete.
+
+        Accepts the same keyword arguments as `run`, applied to every command.
+
+        Returns
+        -------
+        list of CommandResult
+            The results, in the order of `cmds`
+        """
+        futures = [self.submit(cmd, **kwargs) for cmd in cmds]
+        return [f.result() for f in futures]
+
+
+@contextmanager
+def _kill_on_timeout(
+    process: "subprocess.Popen[str]", timeout: float | None
+) -> Iterator[threading.Event]:
+    """Kill `process`, and every process in its session, once `timeout` seconds
+    have passed, unless the block has exited by then.
+
+    Yields an event set if the process was killed.
+    """
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout is not None else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    try:
+        yield timed_out
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+
+def _read_chunks(pipe: IO[str], output: _OutputBuffer) -> None:
+    """Read `pipe` until it is closed, keeping the tail of its output."""
+    for chunk in iter(lambda: pipe.read(_READ_SIZE), ""):
+        output.append(chunk)
+
+
+runner = CommandRunner()
+"""The command runner used throughout C-Star."""
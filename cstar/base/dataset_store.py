@@ -0,0 +1,452 @@
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import pooch
+
+from cstar.base.download import RangeDownloader
+from cstar.base.log import LoggingMixin
+from cstar.base.staging import (
+    DATASET_STAGING_METHODS,
+    StagedFile,
+    StagingMethod,
+    stage_file,
+)
+from cstar.base.tracing import span
+from cstar.base.utils import _format_size, _parse_size
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+DATASET_STORE_ENV_VAR = "CSTAR_DATASET_STORE"
+"""Environment variable holding the root directory of the machine-wide dataset store."""
+
+DATASET_STORE_QUOTA_ENV_VAR = "CSTAR_DATASET_STORE_QUOTA"
+"""Environment variable holding the size limit of the dataset store, e.g. "500G"."""
+
+
+@dataclass(frozen=True)
+class StoreReport:
+    """A summary of the contents and usage of a `DatasetStore`.
+
+    Attributes
+    ----------
+    objects: int
+        The number of files in the store
+    stored_bytes: int
+        The disk space used by the files in the store
+    links: int
+        The number of live links from simulation directories into the store
+    linked_bytes: int
+        The space that linked files would occupy if each were a separate copy
+    saved_bytes: int
+        The disk space saved by sharing linked files rather than copying them
+    reused_bytes: int
+        The volume of data served from the store instead of being downloaded again
+    """
+
+    objects: int
+    stored_bytes: int
+    links: int
+    linked_bytes: int
+    saved_bytes: int
+    reused_bytes: int
+
+    def __str__(self) -> str:
+        return (
+            "Dataset store\n"
+            "-------------\n"
+            f"Files stored: {self.objects} ({_format_size(self.stored_bytes)})\n"
+            f"Links from simulations: {self.links} "
+            f"({_format_size(self.linked_bytes)})\n"
+            f"Disk space saved: {_format_size(self.saved_bytes)}\n"
+            f"Downloads avoided: {_format_size(self.reused_bytes)}"
+        )
+
+
+class DatasetStore(LoggingMixin):
+    """A machine-wide, content-addressed store of input dataset files.
+
+    Remote files are downloaded into the store once, under their SHA-256 checksum,
+    and made available to each simulation directory by linking (see
+    `cstar.base.staging`). Concurrent fetches of the same file, from any number
+    of processes, are serialized with a file lock so that only one downloads it.
+
+    A SQLite catalogue records when each file was last used and which simulation
+    files link to it. If a quota is set, the least recently used files that are no
+    longer linked from any simulation are evicted to stay within it.
+
+    Attributes
+    ----------
+    root: Path
+        The directory holding the store
+    quota_bytes: int or None
+        The size the store is kept under by eviction, if any
+
+    Methods
+    -------
+    fetch(url, file_hash, downloader)
+        Ensure the file with `file_hash` is in the store, downloading it if needed
+    link(file_hash, target, methods)
+        Make a stored file available at `target`
+    get(url, file_hash, target, methods)
+        Fetch a file into the store, then link it to `target`
+    evict(quota_bytes, keep)
+        Remove unused files until the store is within its quota
+    report()
+        Summarize the contents of the store and the space saved
+    """
+
+    def __init__(self, root: str | Path, quota_bytes: int | str | None = None):
+        """Initialize a DatasetStore rooted at `root`.
+
+        Parameters
+        ----------
+        root: str or Path
+            The directory holding the store. It is created when first used.
+        quota_bytes: int or str, optional
+            The maximum size of the store, as bytes or a string such as "500G".
+            No limit by default.
+        """
+        self.root = Path(root).expanduser().resolve()
+        self.quota_bytes = None if quota_bytes is None else _parse_size(quota_bytes)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(root={self.root!r}, "
+            f"quota_bytes={self.quota_bytes!r})"
+        )
+
+    def __contains__(self, file_hash: str) -> bool:
+        return self.object_path(file_hash).is_file()
+
+    def object_path(self, file_hash: str) -> Path:
+        """The path at which the file with checksum `file_hash` is stored."""
+        file_hash = file_hash.lower()
+        return self.root / "objects" / file_hash[:2] / file_hash
+
+    @property
+    def _catalog_path(self) -> Path:
+        return self.root / "catalog.sqlite"
+
+    def _connect(self) -> sqlite3.Connection:
+        self.root.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._catalog_path, timeout=60)
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "hash TEXT PRIMARY KEY, size INTEGER, source TEXT, "
+                "created REAL, last_used REAL, fetches INTEGER)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                "path TEXT PRIMARY KEY, hash TEXT, method TEXT)"
+            )
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    @contextmanager
+    def _lock(self, file_hash: str, blocking: bool = True) -> Iterator[bool]:
+        """Hold an exclusive, inter-process lock on one stored file.
+
+        Yields True if the lock was acquired (always, if `blocking`).
+        """
+        lock_path = self.object_path(file_hash).with_suffix(".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            if fcntl is None:  # pragma: no cover
+                yield True
+                return
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file.fileno(), flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def fetch(
+        self,
+        url: str,
+        file_hash: str,
+        downloader: Callable | None = None,
+    ) -> Path:
+        """Ensure the file with checksum `file_hash` is in the store.
+
+        If it is not already stored, it is downloaded from `url` and verified.
+        Other processes fetching the same file wait for the download to finish
+        rather than repeating it.
+
+        Parameters
+        ----------
+        url: str
+            The location from which to download the file if it is not stored
+        file_hash: str
+            The SHA-256 checksum of the file
+        downloader: callable, optional
+            A `pooch` downloader. Defaults to a `RangeDownloader`.
+
+        Returns
+        -------
+        Path
+            The path of the file in the store
+        """
+        path = self.object_path(file_hash)
+        with self._lock(file_hash):
+            downloaded = not path.is_file()
+            if downloaded:
+                with span("download", category="dataset", source=url) as s:
+                    self.log.info(f"⬇️ Downloading {url} to the dataset store")
+                    if downloader is None:
+                        # Verified as it downloads, and resumed if interrupted:
+                        RangeDownloader(known_hash=file_hash).download(url, path)
+                    else:
+                        fetched = pooch.retrieve(
+                            url,
+                            known_hash=f"sha256:{file_hash.lower()}",
+                            fname=f"{path.name}.partial",
+                            path=path.parent,
+                            downloader=downloader,
+                        )
+                        os.replace(fetched, path)
+                    # Stored files are shared by every simulation linking to them:
+                    path.chmod(0o444)
+                    s.add_bytes(path.stat().st_size)
+            else:
+                self.log.info(f"⏭️ {url} found in the dataset store ({path.name})")
+
+            now = time.time()
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT INTO objects VALUES (?, ?, ?, ?, ?, 0) "
+                    "ON CONFLICT(hash) DO NOTHING",
+                    (path.name, path.stat().st_size, url, now, now),
+                )
+                connection.execute(
+                    "UPDATE objects SET last_used = ?, fetches = fetches + 1 "
+                    "WHERE hash = ?",
+                    (now, path.name),
+                )
+
+        if downloaded and (self.quota_bytes is not None):
+            self.evict(keep=[file_hash])
+        return path
+
+    def link(
+        self,
+        file_hash: str,
+        target: str | Path,
+        methods: Sequence[StagingMethod] = DATASET_STAGING_METHODS,
+    ) -> StagedFile:
+        """Make the stored file with checksum `file_hash` available at `target`.
+
+        Parameters
+        ----------
+        file_hash: str
+            The SHA-256 checksum of a file in the store
+        target: str or Path
+            The path at which to make it available
+        methods: sequence of StagingMethod, optional
+            The staging methods to try, in order of preference
+
+        Returns
+        -------
+        StagedFile
+            Describes how the file was made available
+        """
+        target = Path(target).absolute()
+        staged = stage_file(
+            self.object_path(file_hash),
+            target,
+            methods=methods,
+            file_hash=file_hash.lower(),
+        )
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO links VALUES (?, ?, ?)",
+                (str(target), file_hash.lower(), staged.method.value),
+            )
+        return staged
+
+    def get(
+        self,
+        url: str,
+        file_hash: str,
+        target: str | Path,
+        methods: Sequence[StagingMethod] = DATASET_STAGING_METHODS,
+        downloader: Callable | None = None,
+    ) -> StagedFile:
+        """Fetch a file into the store (if needed), then link it to `target`.
+
+        Parameters
+        ----------
+        url: str
+            The location from which to download the file if it is not stored
+        file_hash: str
+            The SHA-256 checksum of the file
+        target: str or Path
+            The path at which to make the file available
+        methods: sequence of StagingMethod, optional
+            The staging methods to try, in order of preference
+        downloader: callable, optional
+            A `pooch` downloader. Defaults to a `RangeDownloader`.
+
+        Returns
+        -------
+        StagedFile
+            Describes how the file was made available
+        """
+        self.fetch(url, file_hash, downloader=downloader)
+        return self.link(file_hash, target, methods=methods)
+
+    def _live_links(self, connection: sqlite3.Connection) -> dict[str, list[str]]:
+        """Return the methods of the links still pointing at each stored file,
+        removing catalogue entries for links that have since been deleted.
+        """
+        live: dict[str, list[str]] = {}
+        dead = []
+        for path, file_hash, method in connection.execute(
+            "SELECT path, hash, method FROM links"
+        ):
+            target, stored = Path(path), self.object_path(file_hash)
+            if method in (StagingMethod.SYMLINK.value, StagingMethod.HARDLINK.value):
+                is_live = (
+                    target.exists() and stored.exists() and target.samefile(stored)
+                )
+            else:
+                is_live = target.is_file()
+            if is_live:
+                live.setdefault(file_hash, []).append(method)
+            else:
+                dead.append((path,))
+        connection.executemany("DELETE FROM links WHERE path = ?", dead)
+        return live
+
+    def evict(
+        self, quota_bytes: int | str | None = None, keep: Iterable[str] = ()
+    ) -> list[str]:
+        """Remove the least recently used files until the store fits its quota.
+
+        Files still linked (by hard or symbolic link) from a simulation directory
+        are never evicted: removing them would either break the link or free no
+        space. Files being fetched by another process are skipped.
+
+        Parameters
+        ----------
+        quota_bytes: int or str, optional
+            The size to shrink the store to. Defaults to `quota_bytes`.
+        keep: iterable of str, optional
+            Checksums of files that must not be evicted
+
+        Returns
+        -------
+        list of str
+            The checksums of the evicted files
+        """
+        quota = self.quota_bytes if quota_bytes is None else _parse_size(quota_bytes)
+        if quota is None:
+            raise ValueError("No quota given, and this DatasetStore has no quota set")
+        keep = {h.lower() for h in keep}
+
+        evicted: list[str] = []
+        with closing(self._connect()) as connection, connection:
+            live = self._live_links(connection)
+            rows = connection.execute(
+                "SELECT hash, size FROM objects ORDER BY last_used"
+            ).fetchall()
+            total = sum(size for _, size in rows)
+            for file_hash, size in rows:
+                if total <= quota:
+                    break
+                shared = {StagingMethod.SYMLINK.value, StagingMethod.HARDLINK.value}
+                if file_hash in keep or shared.intersection(live.get(file_hash, [])):
+                    continue
+                with self._lock(file_hash, blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    self.object_path(file_hash).unlink(missing_ok=True)
+                    connection.execute(
+                        "DELETE FROM objects WHERE hash = ?", (file_hash,)
+                    )
+                    connection.execute("DELETE FROM links WHERE hash = ?", (file_hash,))
+                total -= size
+                evicted.append(file_hash)
+
+        if evicted:
+            self.log.info(
+                f"🧹 Evicted {len(evicted)} file(s) from the dataset store to stay "
+                f"within {_format_size(quota)}"
+            )
+        elif total > quota:
+            self.log.warning(
+                f"The dataset store ({_format_size(total)}) exceeds its quota of "
+                f"{_format_size(quota)}, but all remaining files are in use"
+            )
+        return evicted
+
+    def report(self) -> StoreReport:
+        """Summarize the contents of the store and the space saved by sharing.
+
+        Returns
+        -------
+        StoreReport
+            The number and size of stored files, the links to them, and the disk
+            space and downloads saved
+        """
+        with closing(self._connect()) as connection, connection:
+            live = self._live_links(connection)
+            rows = connection.execute(
+                "SELECT hash, size, fetches FROM objects"
+            ).fetchall()
+
+        sharing = {m.value for m in StagingMethod} - {StagingMethod.COPY.value}
+        n_shared = {
+            file_hash: sum(m in sharing for m in methods)
+            for file_hash, methods in live.items()
+        }
+        return StoreReport(
+            objects=len(rows),
+            stored_bytes=sum(size for _, size, _ in rows),
+            links=sum(len(methods) for methods in live.values()),
+            linked_bytes=sum(size * n_shared.get(h, 0) for h, size, _ in rows),
+            saved_bytes=sum(
+                size * max(n_shared.get(h, 0) - 1, 0) for h, size, _ in rows
+            ),
+            reused_bytes=sum(size * max(fetches - 1, 0) for _, size, fetches in rows),
+        )
+
+
+_default_stores: dict[tuple[str, str | None], DatasetStore] = {}
+
+
+def get_dataset_store() -> DatasetStore | None:
+    """Return the machine-wide dataset store, if one is configured.
+
+    The store is enabled by setting the `CSTAR_DATASET_STORE` environment variable
+    (e.g. in `~/.cstar.env`) to its root directory, and optionally
+    `CSTAR_DATASET_STORE_QUOTA` to its maximum size (e.g. "500G").
+
+    Returns
+    -------
+    DatasetStore or None
+        The configured store, or None if `CSTAR_DATASET_STORE` is not set
+    """
+    root = os.environ.get(DATASET_STORE_ENV_VAR)
+    if not root:
+        return None
+    quota = os.environ.get(DATASET_STORE_QUOTA_ENV_VAR) or None
+    key = (root, quota)
+    if key not in _default_stores:
+        _default_stores[key] = DatasetStore(root, quota_bytes=quota)
+    return _default_stores[key]
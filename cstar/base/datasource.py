@@ -1,7 +1,11 @@
+from collections.abc import Callable
 from pathlib import Path
 from urllib.parse import urlparse
 
+from cstar.base.state_store import register_state_type
 
+
+@register_state_type("DataSource")
 class DataSource:
     """Holds information on various types of data sources used by C-Star.
 
@@ -18,6 +22,18 @@ class DataSource:
        Typically describes file type (e.g. "netcdf") but can also be "repository"
     basename: str (read-only)
        The basename of self.location, typically the file name
+
+    Methods:
+    --------
+    invalidate()
+       Discard the cached location and source types
+
+    Notes:
+    ------
+    `location_type` and `source_type` require inspecting the filesystem. They are
+    therefore resolved on first access and cached, as a DataSource is typically
+    queried many times (e.g. while loading and setting up a blueprint). Call
+    `invalidate()` if the object at `location` may have changed since.
     """
 
     def __init__(self, location: str | Path, file_hash: str | None = None):
@@ -35,6 +51,8 @@ class DataSource:
         """
         self._location = str(location)
         self._file_hash = file_hash
+        self._resolved: dict[str, str] = {}
+        self._resolved_location: str | None = None
 
     @property
     def location(self) -> str:
@@ -44,13 +62,49 @@ class DataSource:
     def file_hash(self) -> str | None:
         return self._file_hash
 
+    def invalidate(self) -> None:
+        """Discard the cached `location_type` and `source_type`, so that they are
+        resolved again (inspecting the filesystem) on their next access.
+        """
+        self._resolved = {}
+        self._resolved_location = self._location
+
+    def _get_resolved(self, name: str, resolver: Callable[[], str]) -> str:
+        """Return the cached value of `name`, calling `resolver` to set it if absent.
+
+        Caches resolved for a different location (or missing, in instances
+        unpickled from earlier versions of C-Star) are discarded first. Errors
+        raised by `resolver` are not cached.
+        """
+        if self.__dict__.get("_resolved_location") != self._location:
+            self.invalidate()
+        if name not in self._resolved:
+            self._resolved[name] = resolver()
+        return self._resolved[name]
+
+    def _is_url(self) -> bool:
+        urlparsed_location = urlparse(self.location)
+        return all([urlparsed_location.scheme, urlparsed_location.netloc])
+
     @property
     def location_type(self) -> str:
         """Get the location type (e.g. "path" or "url") from the "location"
         attribute.
+
+        The result is cached after the first successful call (see `invalidate`).
         """
-        urlparsed_location = urlparse(self.location)
-        if all([urlparsed_location.scheme, urlparsed_location.netloc]):
+        return self._get_resolved("location_type", self._resolve_location_type)
+
+    @property
+    def source_type(self) -> str:
+        """Get the source type (e.g. "netcdf") from the "location" attribute.
+
+        The result is cached after the first successful call (see `invalidate`).
+        """
+        return self._get_resolved("source_type", self._resolve_source_type)
+
+    def _resolve_location_type(self) -> str:
+        if self._is_url():
             return "url"
         elif Path(self.location).expanduser().exists():
             return "path"
@@ -59,15 +113,16 @@ class DataSource:
                 f"{self.location} is not a recognised URL or local path pointing to an existing file or directory"
             )
 
-    @property
-    def source_type(self) -> str:
-        """Get the source type (e.g. "netcdf") from the "location" attribute."""
+    def _resolve_source_type(self) -> str:
         loc = Path(self.location).expanduser()
+        # Only local directories need probing; (loc / ".git") can only be a
+        # directory if loc is one:
+        is_dir = (not self._is_url()) and loc.is_dir()
 
-        if (loc.suffix.lower() == ".git") or ((loc / ".git").is_dir()):
+        if (loc.suffix.lower() == ".git") or (is_dir and (loc / ".git").is_dir()):
             # TODO: a remote repository might not have a .git suffix, more advanced handling needed
             return "repository"
-        elif loc.is_dir():
+        elif is_dir:
             return "directory"
         elif loc.suffix.lower() in {".yaml", ".yml"}:
             return "yaml"
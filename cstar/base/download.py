@@ -0,0 +1,493 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from cstar.base.log import get_logger
+from cstar.base.tracing import span
+
+log = get_logger(__name__)
+
+DOWNLOAD_TIMEOUT = 120
+"""Seconds after which a stalled download from a remote source is abandoned."""
+
+DEFAULT_CHUNK_SIZE = 64 * 1024**2
+"""Size in bytes of each range requested by `RangeDownloader`."""
+
+DEFAULT_MAX_WORKERS = 4
+"""Number of ranges `RangeDownloader` downloads at the same time."""
+
+DEFAULT_MAX_BUFFER_BYTES = 256 * 1024**2
+"""Bytes of chunks received out of order that `RangeDownloader` holds in memory
+until they can be hashed."""
+
+_READ_SIZE = 1024**2
+"""Size in bytes of the blocks read from responses and partial files."""
+
+
+class RangeDownloader:
+    """A `pooch` downloader fetching files as parallel, resumable HTTP range requests.
+
+    Files are split into chunks of `chunk_size` bytes, which are requested
+    concurrently and written in place into a partial file next to the output
+    file. The chunks completed so far are recorded alongside it, so a download
+    interrupted by a dropped connection (or a killed process) resumes where it
+    stopped instead of starting again. Each chunk is retried `retries` times before
+    the download is abandoned.
+
+    The SHA-256 checksum is computed as the download proceeds. The earliest chunk
+    not yet hashed is hashed as its bytes arrive, and later chunks are held in
+    memory (up to `max_buffer_bytes`) until those before them are done. Only
+    chunks that did not fit in memory, or that were downloaded before a resumed
+    download was interrupted, are read back from disk to hash them.
+
+    Servers that do not accept range requests, or do not report the size of the
+    file, are downloaded as a single stream.
+
+    Attributes
+    ----------
+    chunk_size: int
+        Size in bytes of each range requested
+    max_workers: int
+        Number of ranges downloaded at the same time
+    timeout: float
+        Seconds after which a stalled request is abandoned
+    retries: int
+        Number of times a failed chunk is requested again
+    backoff: float
+        Seconds to wait before the first retry, doubling with each further retry
+    max_buffer_bytes: int
+        Bytes of chunks received out of order held in memory until they can be
+        hashed
+    known_hash: str or None
+        The expected SHA-256 checksum. If set, a download that does not match it
+        is discarded and a `ValueError` is raised.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        retries: int = 3,
+        backoff: float = 1.0,
+        max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES,
+        known_hash: str | None = None,
+    ):
+        """Initialize a RangeDownloader.
+
+        Parameters
+        ----------
+        chunk_size: int, optional
+            Size in bytes of each range requested. Defaults to 64 MiB.
+        max_workers: int, optional
+            Number of ranges downloaded at the same time. Defaults to 4.
+        timeout: float, optional
+            Seconds after which a stalled request is abandoned
+        retries: int, optional, default 3
+            Number of times a failed chunk is requested again
+        backoff: float, optional, default 1.0
+            Seconds to wait before the first retry, doubling with each retry
+        max_buffer_bytes: int, optional
+            Bytes of chunks received out of order held in memory until they can
+            be hashed. Defaults to 256 MiB.
+        known_hash: str, optional
+            The expected SHA-256 checksum of the file, optionally prefixed with
+            "sha256:"
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, not {chunk_size}")
+        self.chunk_size = chunk_size
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_buffer_bytes = max_buffer_bytes
+        self.known_hash = (
+            known_hash.lower().removeprefix("sha256:") if known_hash else None
+        )
+        self._local = threading.local()
+
+    def __call__(
+        self,
+        url: str,
+        output_file: str | Path,
+        pooch: Any = None,
+        check_only: bool = False,
+    ) -> bool | None:
+        """Download `url` to `output_file`, following the `pooch` downloader API.
+
+        Parameters
+        ----------
+        url: str
+            The URL of the file
+        output_file: str or Path
+            The path at which to write the file
+        pooch: pooch.Pooch, optional
+            The `Pooch` instance calling the downloader (unused)
+        check_only: bool, optional, default False
+            If True, only check whether `url` is available, without downloading
+
+        Returns
+        -------
+        bool or None
+            Whether `url` is available if `check_only` is True, otherwise None
+        """
+        if check_only:
+            try:
+                response = self._session.head(
+                    url, allow_redirects=True, timeout=self.timeout
+                )
+            except requests.RequestException:
+                return False
+            return response.ok
+        self.download(url, output_file)
+        return None
+
+    @property
+    def _session(self) -> requests.Session:
+        """A `requests.Session` for the current thread (sessions are not shared)."""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def download(self, url: str, output_file: str | Path) -> str:
+        """Download `url` to `output_file`, resuming any earlier partial download.
+
+        Parameters
+        ----------
+        url: str
+            The URL of the file
+        output_file: str or Path
+            The path at which to write the file. It is only created once the
+            download is complete (and verified, if `known_hash` is set).
+
+        Returns
+        -------
+        str
+            The SHA-256 checksum of the downloaded file
+
+        Raises
+        ------
+        ValueError
+            If the checksum does not match `known_hash`
+        requests.RequestException
+            If a chunk could not be downloaded after `retries` further attempts
+        """
+        output_file = Path(output_file)
+        response = self._session.head(url, allow_redirects=True, timeout=self.timeout)
+        response.raise_for_status()
+        size = response.headers.get("Content-Length")
+        accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+        with span("download", category="io", source=url) as s:
+            if accepts_ranges and (size is not None):
+                partial = _PartialDownload(
+                    output_file,
+                    url=url,
+                    size=int(size),
+                    chunk_size=self.chunk_size,
+                    validator=response.headers.get("ETag")
+                    or response.headers.get("Last-Modified"),
+                )
+                file_hash = self._download_chunks(url, partial)
+            else:
+                log.debug(f"{url} does not support range requests, streaming it")
+                partial = _PartialDownload(output_file, url=url)
+                file_hash = self._download_stream(url, partial)
+            s.add_bytes(partial.path.stat().st_size)
+
+        if (self.known_hash is not None) and (file_hash != self.known_hash):
+            partial.discard()
+            raise ValueError(
+                f"SHA256 hash of downloaded file ({file_hash}) does not match the "
+                f"known hash ({self.known_hash}) for {url}. The file may have been "
+                "corrupted or changed at the source."
+            )
+        partial.complete()
+        return file_hash
+
+    def _download_chunks(self, url: str, partial: "_PartialDownload") -> str:
+        """Download the missing chunks of `partial` in parallel, hashing in order."""
+        n_chunks = partial.n_chunks
+        pending = [i for i in range(n_chunks) if i not in partial.done]
+        if len(pending) < n_chunks:
+            log.info(
+                f"Resuming download of {url} "
+                f"({n_chunks - len(pending)}/{n_chunks} chunks already downloaded)"
+            )
+        hasher = _OrderedHasher(partial, max_buffer_bytes=self.max_buffer_bytes)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: dict[Future, int] = {
+                executor.submit(self._fetch_chunk, url, partial, i, hasher): i
+                for i in pending
+            }
+            not_done = set(futures)
+            while not_done:
+                finished, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                failed = [f for f in finished if f.exception() is not None]
+                partial.done.update(futures[f] for f in finished if f not in failed)
+                partial.save()
+                if failed:
+                    for f in not_done:
+                        f.cancel()
+                    raise failed[0].exception()  # type: ignore[misc]
+
+        return hasher.hexdigest()
+
+    def _fetch_chunk(
+        self,
+        url: str,
+        partial: "_PartialDownload",
+        index: int,
+        hasher: "_OrderedHasher",
+    ) -> None:
+        """Download one chunk into place in the partial file, retrying on failure."""
+        start, end = partial.chunk_range(index)
+        for attempt in range(self.retries + 1):
+            hasher.start(index)
+            try:
+                response = self._session.get(
+                    url,
+                    headers={"Range": f"bytes={start}-{end - 1}"},
+                    stream=True,
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise requests.RequestException(
+                        f"Server ignored the range request for {url}"
+                    )
+                with open(partial.path, "r+b") as f:
+                    f.seek(start)
+                    written = 0
+                    for block in response.iter_content(_READ_SIZE):
+                        written += f.write(block)
+                        hasher.update(index, block)
+                if written != end - start:
+                    raise requests.RequestException(
+                        f"Received {written} of {end - start} bytes "
+                        f"of chunk {index} of {url}"
+                    )
+                hasher.finish(index)
+                return
+            except requests.RequestException as e:
+                hasher.abort(index)
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2**attempt)
+                log.debug(f"Chunk {index} of {url} failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+
+    def _download_stream(self, url: str, partial: "_PartialDownload") -> str:
+        """Download the whole file as a single stream, hashing as it arrives."""
+        hasher = hashlib.sha256()
+        with self._session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(partial.path, "wb") as f:
+                for block in response.iter_content(_READ_SIZE):
+                    hasher.update(block)
+                    f.write(block)
+        return hasher.hexdigest()
+
+
+class _PartialDownload:
+    """A partially downloaded file and a record of which of its chunks are complete.
+
+    Both are kept beside the output file, under names derived from the URL, so that
+    a later download of the same URL to the same directory can resume. The record
+    is discarded if the size or validator (ETag or Last-Modified) of the remote
+    file changed in the meantime.
+    """
+
+    def __init__(
+        self,
+        output_file: Path,
+        url: str,
+        size: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        validator: str | None = None,
+    ):
+        self.output_file = output_file
+        key = hashlib.sha256(url.encode()).hexdigest()[:16]
+        name = f".{url.rstrip('/').rsplit('/', 1)[-1]}.{key}"
+        self.path = output_file.parent / f"{name}.part"
+        self.state_path = output_file.parent / f"{name}.part.json"
+        self.size = size
+        self.chunk_size = chunk_size
+        self._header = {
+            "url": url,
+            "size": size,
+            "chunk_size": chunk_size,
+            "validator": validator,
+        }
+        self.done: set[int] = set()
+
+        if size is None:
+            return
+        if self.path.is_file() and self.state_path.is_file():
+            try:
+                state = json.loads(self.state_path.read_text())
+            except ValueError:
+                state = {}
+            if {k: state.get(k) for k in self._header} == self._header:
+                self.done = set(state.get("done", []))
+            else:
+                log.info(f"{url} changed since it was partly downloaded, restarting")
+        if not self.done:
+            with open(self.path, "wb") as f:
+                f.truncate(size)
+
+    @property
+    def n_chunks(self) -> int:
+        assert self.size is not None
+        return -(-self.size // self.chunk_size)
+
+    def chunk_range(self, index: int) -> tuple[int, int]:
+        """The byte range [start, end) of chunk `index`."""
+        assert self.size is not None
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.size)
+
+    def save(self) -> None:
+        """Record the completed chunks, atomically."""
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({**self._header, "done": sorted(self.done)}))
+        os.replace(tmp, self.state_path)
+
+    def complete(self) -> None:
+        """Move the finished file into place and forget the record."""
+        os.replace(self.path, self.output_file)
+        self.state_path.unlink(missing_ok=True)
+
+    def discard(self) -> None:
+        """Delete the partial file and its record."""
+        self.path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+
+
+class _OrderedHasher:
+    """Computes the SHA-256 checksum of a file whose chunks arrive in any order.
+
+    Bytes of the earliest chunk not yet hashed are hashed as they arrive. Those of
+    later chunks are held in memory, up to `max_buffer_bytes` in total, until
+    every chunk before them is done; chunks that do not fit, and chunks completed
+    before a resumed download started, are read back from the partial file.
+
+    Each attempt at a chunk calls `start`, then `update` with each block received,
+    and finally `finish` on success or `abort` on failure. These may be called
+    from several threads at once.
+    """
+
+    def __init__(self, partial: "_PartialDownload", max_buffer_bytes: int):
+        self.partial = partial
+        self.max_buffer_bytes = max_buffer_bytes
+        self._hasher = hashlib.sha256()
+        self._lock = threading.Lock()
+        self._next = 0  # Chunks before this one have been hashed
+        self._finished = set(partial.done)
+        # Blocks held for chunks in progress or finished, None if they did not fit
+        self._buffers: dict[int, list[bytes] | None] = {}
+        self._buffered_bytes = 0
+        self._live: int | None = None  # The chunk being hashed as it arrives
+        self._checkpoint = self._hasher.copy()  # The state before `_live` began
+        with self._lock:
+            self._advance()
+
+    def start(self, index: int) -> None:
+        with self._lock:
+            self._buffers[index] = []
+            if index == self._next:
+                self._go_live(index)
+
+    def update(self, index: int, block: bytes) -> None:
+        with self._lock:
+            if index == self._live:
+                self._hasher.update(block)
+                return
+            blocks = self._buffers.get(index)
+            if blocks is None:
+                return
+            if self._buffered_bytes + len(block) <= self.max_buffer_bytes:
+                blocks.append(block)
+                self._buffered_bytes += len(block)
+            else:
+                self._release(index)
+                self._buffers[index] = None
+
+    def finish(self, index: int) -> None:
+        with self._lock:
+            self._finished.add(index)
+            self._advance()
+
+    def abort(self, index: int) -> None:
+        with self._lock:
+            if index == self._live:
+                self._hasher = self._checkpoint.copy()
+                self._live = None
+            self._release(index)
+            self._buffers.pop(index, None)
+
+    def hexdigest(self) -> str:
+        with self._lock:
+            if self._next != self.partial.n_chunks:
+                raise RuntimeError(
+                    f"Chunk {self._next} of {self.partial.path} was never completed"
+                )
+            return self._hasher.hexdigest()
+
+    def _go_live(self, index: int) -> None:
+        """Hash the blocks held for chunk `index`, and any more as they arrive."""
+        self._checkpoint = self._hasher.copy()
+        self._live = index
+        for block in self._buffers.get(index) or []:
+            self._hasher.update(block)
+        self._release(index)
+
+    def _release(self, index: int) -> None:
+        blocks = self._buffers.get(index)
+        if blocks:
+            self._buffered_bytes -= sum(len(block) for block in blocks)
+            self._buffers[index] = []
+
+    def _advance(self) -> None:
+        """Hash the finished chunks following those already hashed."""
+        while self._next in self._finished:
+            index = self._next
+            if index == self._live:
+                self._live = None
+            else:
+                blocks = self._buffers.get(index)
+                if blocks is None:
+                    start, end = self.partial.chunk_range(index)
+                    _hash_range(self._hasher, self.partial.path, start, end)
+                else:
+                    for block in blocks:
+                        self._hasher.update(block)
+                    self._release(index)
+            self._buffers.pop(index, None)
+            self._next += 1
+
+        index = self._next
+        if index in self._buffers and self._buffers[index] is not None:
+            self._go_live(index)
+
+
+def _hash_range(hasher: "hashlib._Hash", path: Path, start: int, end: int) -> None:
+    """Update `hasher` with bytes [start, end) of the file at `path`."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(_READ_SIZE, remaining))
+            if not block:
+                raise OSError(f"{path} ended before byte {end}")
+            hasher.update(block)
+            remaining -= len(block)
@@ -18,3 +18,12 @@ class SimulationError(CstarError):
         """Initialize SimulationError with a message."""
         super().__init__(message)
         self.message = message
+
+
+class CommandTimeoutError(CstarError, RuntimeError):
+    """Exception raised when a command is still running after its timeout."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize CommandTimeoutError with a message."""
+        super().__init__(message)
+        self.message = message
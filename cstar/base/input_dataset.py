@@ -1,15 +1,17 @@
 import datetime as dt
 from abc import ABC
 from pathlib import Path
-from typing import TYPE_CHECKING
-from urllib.parse import urljoin
+from typing import TYPE_CHECKING, ClassVar
 
 import dateutil.parser
-import pooch
 
+from cstar.base.dataset_store import get_dataset_store
 from cstar.base.datasource import DataSource
+from cstar.base.download import RangeDownloader
 from cstar.base.log import LoggingMixin
-from cstar.base.utils import _get_sha256_hash
+from cstar.base.staging import DATASET_STAGING_METHODS, StagingMethod, stage_file
+from cstar.base.tracing import span
+from cstar.base.utils import _get_cached_sha256_hash, _get_sha256_hash
 
 if TYPE_CHECKING:
     import logging
@@ -27,6 +29,10 @@ class InputDataset(ABC, LoggingMixin):
         The 256 bit SHA sum associated with a (remote) file for verifying downloads
     working_path: Path or list of Paths, default None
         The path(s) where the input dataset is being worked with locally, set when `get()` is called.
+    staging_methods: tuple of StagingMethod
+        The ways of making a local source available in `local_dir` when `get()` is
+        called, in order of preference. Defaults to reflink, hard link, symbolic link,
+        then copy.
 
     Methods:
     --------
@@ -34,6 +40,8 @@ class InputDataset(ABC, LoggingMixin):
         Fetch the file containing this input dataset and save it to `local_dir`
     """
 
+    staging_methods: ClassVar[tuple[StagingMethod, ...]] = DATASET_STAGING_METHODS
+
     def __init__(
         self,
         location: str,
@@ -83,6 +91,18 @@ class InputDataset(ABC, LoggingMixin):
     def validate(self):
         pass
 
+    def __copy__(self) -> "InputDataset":
+        """Return a copy of this InputDataset sharing its (immutable) source, but
+        with independent local state.
+        """
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update({k: v for k, v in self.__dict__.items() if k != "_log"})
+        if isinstance(self.working_path, list):
+            new.working_path = list(self.working_path)
+        new._local_file_hash_cache = dict(self._local_file_hash_cache or {})
+        new._local_file_stat_cache = dict(self._local_file_stat_cache or {})
+        return new
+
     @property
     def exists_locally(self) -> bool:
         """Check if this InputDataset exists on the local filesystem.
@@ -241,8 +261,12 @@ class InputDataset(ABC, LoggingMixin):
         """Make the file containing this input dataset available in `local_dir`
 
         If InputDataset.source.location_type is...
-           - ...a local path: create a symbolic link to the file in `local_dir`.
-           - ...a URL: fetch the file to `local_dir` using Pooch
+           - ...a local path: stage the file in `local_dir` using the first of
+             `staging_methods` (reflink, hard link, symbolic link or copy) that the
+             filesystem supports.
+           - ...a URL: fetch the file to `local_dir` using Pooch. If a machine-wide
+             dataset store is configured (see `cstar.base.dataset_store`), the file
+             is downloaded into the store once and linked into `local_dir`.
 
         This method updates the `InputDataset.working_path` attribute with the new location,
         and caches file metadata and checksum values.
@@ -259,29 +283,41 @@ class InputDataset(ABC, LoggingMixin):
             self.log.info(f"⏭️ {self.working_path} already exists, skipping.")
             return
 
-        computed_file_hash = self._symlink_or_download_from_source(
-            source_location=self.source.location,
-            location_type=self.source.location_type,
-            expected_file_hash=self.source.file_hash,
-            target_path=target_path,
-            logger=self.log,
-        )
+        with span(
+            "fetch",
+            category="dataset",
+            dataset=self.__class__.__name__,
+            source=self.source.location,
+        ) as s:
+            computed_file_hash = self._stage_or_download_from_source(
+                source_location=self.source.location,
+                location_type=self.source.location_type,
+                expected_file_hash=self.source.file_hash,
+                target_path=target_path,
+                logger=self.log,
+                staging_methods=self.staging_methods,
+            )
 
-        self.working_path = target_path
-        self._local_file_hash_cache.update({target_path: computed_file_hash})  # 27
-        self._local_file_stat_cache.update({target_path: target_path.stat()})
+            self.working_path = target_path
+            self._local_file_hash_cache.update({target_path: computed_file_hash})  # 27
+            target_stat = target_path.stat()
+            self._local_file_stat_cache.update({target_path: target_stat})
+            if self.source.location_type == "url":
+                s.add_bytes(target_stat.st_size)
 
     @staticmethod
-    def _symlink_or_download_from_source(
+    def _stage_or_download_from_source(
         source_location: str | Path,
         location_type: str,
         expected_file_hash: str | None,
         target_path: Path,
         logger: "logging.Logger",
+        staging_methods: tuple[StagingMethod, ...] = DATASET_STAGING_METHODS,
     ) -> str:
         if location_type == "path":
             source_location = Path(source_location).expanduser().resolve()
-            computed_file_hash = _get_sha256_hash(source_location)
+            # Memoized, so a source shared by many simulations is only hashed once:
+            computed_file_hash = _get_cached_sha256_hash(source_location)
             if (expected_file_hash is not None) and (
                 expected_file_hash != computed_file_hash
             ):
@@ -293,20 +329,40 @@ class InputDataset(ABC, LoggingMixin):
                     "update the file_hash entry or remove it."
                 )
 
-            target_path.symlink_to(source_location)
+            staged = stage_file(
+                source_location,
+                target_path,
+                methods=staging_methods,
+                file_hash=computed_file_hash,
+            )
+            logger.debug(
+                f"Staged {source_location} at {target_path} by {staged.method}"
+            )
 
         elif location_type == "url":
-            if expected_file_hash is not None:
-                downloader = pooch.HTTPDownloader(timeout=120)
-                to_fetch = pooch.create(
-                    path=target_path.parent,
-                    # urllib equivalent to Path.parent:
-                    base_url=urljoin(str(source_location), "."),
-                    registry={target_path.name: expected_file_hash},
+            if (expected_file_hash is not None) and (
+                (store := get_dataset_store()) is not None
+            ):
+                # Download once per machine, then link into `target_path`:
+                store.get(
+                    str(source_location),
+                    expected_file_hash,
+                    target_path,
+                    methods=staging_methods,
                 )
+                computed_file_hash = expected_file_hash
 
-                to_fetch.fetch(target_path.name, downloader=downloader)
-                # No need to compute hash as Pooch does this internaly:
+            elif expected_file_hash is not None:
+                already_fetched = target_path.exists() and (
+                    _get_cached_sha256_hash(target_path)
+                    == expected_file_hash.lower().removeprefix("sha256:")
+                )
+                if not already_fetched:
+                    # Verified as it downloads, so the file is not read again:
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    RangeDownloader(known_hash=expected_file_hash).download(
+                        str(source_location), target_path
+                    )
                 computed_file_hash = expected_file_hash
 
             else:
@@ -0,0 +1,238 @@
+import errno
+import shutil
+import sys
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from cstar.base.log import get_logger
+from cstar.base.tracing import span
+from cstar.base.utils import _get_cached_sha256_hash
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+log = get_logger(__name__)
+
+
+class StagingMethod(Enum):
+    """Ways of making a local file available at another path.
+
+    Attributes
+    ----------
+    REFLINK : StagingMethod
+        A copy-on-write clone sharing the data blocks of the source (Btrfs, XFS, ...)
+    HARDLINK : StagingMethod
+        A second directory entry for the source file
+    SYMLINK : StagingMethod
+        A symbolic link pointing to the source file
+    COPY : StagingMethod
+        A full, independent copy of the source file
+    """
+
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+    SYMLINK = "symlink"
+    COPY = "copy"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+DATASET_STAGING_METHODS: tuple[StagingMethod, ...] = (
+    StagingMethod.REFLINK,
+    StagingMethod.HARDLINK,
+    StagingMethod.SYMLINK,
+    StagingMethod.COPY,
+)
+"""The order in which staging methods are tried for input datasets.
+
+Input data is only ever read, so sharing the source's data blocks is safe.
+"""
+
+CODE_STAGING_METHODS: tuple[StagingMethod, ...] = (
+    StagingMethod.REFLINK,
+    StagingMethod.COPY,
+)
+"""The order in which staging methods are tried for additional code.
+
+Code files may be edited in place after staging, so they must never be linked to
+their source.
+"""
+
+_FALLBACK_ERRNOS = frozenset(
+    {
+        errno.EXDEV,
+        errno.EPERM,
+        errno.EACCES,
+        errno.EOPNOTSUPP,
+        errno.ENOTSUP,
+        errno.ENOSYS,
+        errno.ENOTTY,
+        errno.EINVAL,
+        errno.EMLINK,
+    }
+)
+"""Errors on which staging falls back to the next method, rather than failing."""
+
+_FICLONE = 0x40049409
+"""The Linux `ioctl` request cloning one file into another (see ioctl_ficlone(2))."""
+
+_unsupported: set[tuple[StagingMethod, int, int]] = set()
+"""(method, source device, target device) combinations known not to work."""
+_unsupported_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StagedFile:
+    """A file made available at a new path by `stage_file`.
+
+    Attributes
+    ----------
+    path: Path
+        The path at which the file was staged
+    method: StagingMethod
+        The method used to stage it
+    file_hash: str
+        The SHA-256 checksum of the staged file (carried over from the source)
+    bytes_copied: int
+        The number of bytes physically copied (zero unless `method` is COPY)
+    """
+
+    path: Path
+    method: StagingMethod
+    file_hash: str
+    bytes_copied: int = 0
+
+
+def _reflink(source: Path, target: Path) -> None:
+    if (fcntl is None) or (not sys.platform.startswith("linux")):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(target, "xb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    shutil.copymode(source, target)
+
+
+def _hardlink(source: Path, target: Path) -> None:
+    target.hardlink_to(source)
+
+
+def _symlink(source: Path, target: Path) -> None:
+    target.symlink_to(source)
+
+
+def _copy(source: Path, target: Path) -> None:
+    shutil.copy(source, target)
+
+
+_STAGERS: dict[StagingMethod, Callable[[Path, Path], None]] = {
+    StagingMethod.REFLINK: _reflink,
+    StagingMethod.HARDLINK: _hardlink,
+    StagingMethod.SYMLINK: _symlink,
+    StagingMethod.COPY: _copy,
+}
+
+
+def stage_file(
+    source: str | Path,
+    target: str | Path,
+    methods: Sequence[StagingMethod] = DATASET_STAGING_METHODS,
+    file_hash: str | None = None,
+    overwrite: bool = False,
+) -> StagedFile:
+    """Make a local file available at `target` with as little I/O as possible.
+
+    Each method in `methods` is tried in turn, skipping any that cannot work
+    between the two filesystems (reflinks and hard links require both paths to be
+    on the same device). Methods that fail because the filesystem does not support
+    them are remembered, so later calls go straight to one that works.
+
+    The checksum of the staged file is that of the source, which is only computed
+    if not provided, and then at most once per process for an unchanged file.
+
+    Parameters
+    ----------
+    source: str or Path
+        The existing file to stage
+    target: str or Path
+        The path at which to make the file available. Its parent must exist.
+    methods: sequence of StagingMethod, optional
+        The methods to try, in order of preference. Defaults to
+        `DATASET_STAGING_METHODS`.
+    file_hash: str, optional
+        The known SHA-256 checksum of `source`
+    overwrite: bool, optional, default False
+        If True, replace any existing file at `target`
+
+    Returns
+    -------
+    StagedFile
+        Describes the staged file, including the method used and its checksum
+
+    Raises
+    ------
+    FileNotFoundError
+        If `source` is not an existing file
+    FileExistsError
+        If `target` exists and `overwrite` is False
+    RuntimeError
+        If none of `methods` could be used
+    """
+    source = Path(source).expanduser().resolve()
+    target = Path(target)
+    if not source.is_file():
+        raise FileNotFoundError(f"Cannot stage {source}: it is not a file")
+
+    if target.exists() or target.is_symlink():
+        if not overwrite:
+            raise FileExistsError(f"Cannot stage {source}: {target} already exists")
+        target.unlink()
+
+    if file_hash is None:
+        file_hash = _get_cached_sha256_hash(source)
+
+    source_stat = source.stat()
+    target_dev = target.parent.stat().st_dev
+
+    with span("stage", category="io", source=str(source)) as s:
+        for method in methods:
+            key = (method, source_stat.st_dev, target_dev)
+            if key in _unsupported:
+                continue
+            if (
+                method in (StagingMethod.REFLINK, StagingMethod.HARDLINK)
+                and source_stat.st_dev != target_dev
+            ):
+                continue
+
+            try:
+                _STAGERS[method](source, target)
+            except OSError as e:
+                if e.errno not in _FALLBACK_ERRNOS:
+                    raise
+                log.debug(f"Could not stage {source} by {method} ({e}), falling back")
+                if target.exists() or target.is_symlink():
+                    target.unlink()
+                if e.errno != errno.EMLINK:  # A limit of the file, not the filesystem
+                    with _unsupported_lock:
+                        _unsupported.add(key)
+                continue
+
+            bytes_copied = source_stat.st_size if method is StagingMethod.COPY else 0
+            s.set(method=method.value)
+            s.add_bytes(bytes_copied)
+            return StagedFile(
+                path=target,
+                method=method,
+                file_hash=file_hash,
+                bytes_copied=bytes_copied,
+            )
+
+    raise RuntimeError(
+        f"Could not stage {source} at {target} using any of: "
+        + ", ".join(str(m) for m in methods)
+    )
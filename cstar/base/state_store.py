@@ -0,0 +1,480 @@
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import sqlite3
+from collections.abc import Callable, Iterable
+from contextlib import closing
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from types import FunctionType
+from typing import Any, TypeVar
+
+from cstar.base.log import get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+STATE_SCHEMA_VERSION = 2
+"""Version of the on-disk layout written by `StateStore`.
+
+Increment this whenever the tables or the field encodings change. Stores written
+with a newer schema than the running C-Star understands are refused rather than
+misread.
+
+History
+-------
+1. Plain data as JSON, other objects pickled
+2. C-Star components as versioned, tagged JSON (pickles are only read)
+"""
+
+_STATE_TYPES: dict[str, tuple[type, int, Callable | None]] = {}
+_STATE_NAMES: dict[type, str] = {}
+
+_STATE_TYPE_PACKAGES = ("cstar.roms", "cstar.marbl")
+"""Packages which, once imported, have registered every C-Star state type."""
+
+
+class StateSchemaError(RuntimeError):
+    """Raised when a state store was written with an unsupported schema version."""
+
+
+def register_state_type(
+    name: str, version: int = 1, upgrade: Callable[[dict, int], dict] | None = None
+) -> Callable[[type[T]], type[T]]:
+    """Class decorator registering a C-Star class under a stable name in state stores.
+
+    Instances of registered classes are stored under `name` rather than their
+    module and class name, so they can be restored after the class is renamed or
+    moved. Unregistered C-Star classes are stored under "module:qualname".
+
+    Parameters
+    ----------
+    name: str
+        The name under which instances are stored. It must never change.
+    version: int, optional, default 1
+        The version of the stored state. Increment it whenever the attributes
+        of the class change, and handle older versions in `upgrade`.
+    upgrade: callable, optional
+        Called with the stored state and its version when restoring state stored
+        by an older version, returning the state to restore
+    """
+
+    def register(cls: type[T]) -> type[T]:
+        registered = _STATE_TYPES.get(name)
+        if (registered is not None) and (registered[0] is not cls):
+            raise ValueError(f"State type '{name}' is already registered")
+        _STATE_TYPES[name] = (cls, version, upgrade)
+        _STATE_NAMES[cls] = name
+        return cls
+
+    return register
+
+
+def state_type_name(cls: type) -> str:
+    """The name under which instances of `cls` are stored by a `StateStore`.
+
+    Parameters
+    ----------
+    cls: type
+        A C-Star class
+
+    Returns
+    -------
+    str
+        The name registered with `register_state_type`, or "module:qualname"
+    """
+    return _STATE_NAMES.get(cls) or f"{cls.__module__}:{cls.__qualname__}"
+
+
+def resolve_state_type(name: str) -> type[Any]:
+    """Find the class stored under `name` by a `StateStore`.
+
+    Parameters
+    ----------
+    name: str
+        A name registered with `register_state_type`, or a "module:qualname"
+        identifier
+
+    Returns
+    -------
+    type
+        The class
+
+    Raises
+    ------
+    StateSchemaError
+        If no C-Star class is known by that name
+    """
+    if ":" in name:
+        return _import_qualified(name)
+    if name not in _STATE_TYPES:
+        for package in _STATE_TYPE_PACKAGES:
+            importlib.import_module(package)
+    if name not in _STATE_TYPES:
+        raise StateSchemaError(f"Unknown C-Star state type '{name}'")
+    return _STATE_TYPES[name][0]
+
+
+def _import_qualified(name: str) -> Any:
+    """Import a C-Star class or function from its "module:qualname" identifier."""
+    module_name, _, qualname = name.partition(":")
+    if not (_is_cstar_module(module_name) and qualname):
+        raise StateSchemaError(f"Unknown C-Star state type '{name}'")
+    obj: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _is_cstar_module(module_name: str) -> bool:
+    return module_name.split(".")[0] == "cstar"
+
+
+def _to_json_compatible(value: Any, memo: dict[int, tuple[int, Any]]) -> Any:
+    """Convert a value to a JSON-compatible structure, tagging non-native types.
+
+    Supports None, bool, int, float, str, `datetime`, `Path`, `os.stat_result`,
+    enumerations, module-level C-Star functions and instances of other C-Star
+    classes, and (nested) lists, tuples, sets and dicts of these. C-Star objects are
+    stored as the (versioned) state returned by their `__getstate__`, or their
+    `__dict__`, and functions by name. Raises a TypeError for anything else.
+
+    `memo` maps the `id` of each C-Star object already converted to its index (and
+    the object itself, to keep its `id` from being reused), so that an object
+    referred to more than once (including by itself) is only stored once.
+    """
+    if isinstance(value, Enum):
+        return {"__enum__": state_type_name(type(value)), "value": value.value}
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, Path):
+        return {"__path__": str(value)}
+    if isinstance(value, os.stat_result):
+        fields = {k: getattr(value, k) for k in dir(value) if k.startswith("st_")}
+        return {"__stat__": [list(value), fields]}
+    if isinstance(value, list):
+        return [_to_json_compatible(v, memo) for v in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json_compatible(v, memo) for v in value]}
+    if isinstance(value, set | frozenset):
+        items = [_to_json_compatible(v, memo) for v in value]
+        # Sorted so that equal sets are always encoded identically
+        items.sort(key=lambda v: json.dumps(v, sort_keys=True))
+        return {"__set__": items}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _to_json_compatible(v, memo) for k, v in value.items()}
+        return {
+            "__items__": [
+                [_to_json_compatible(k, memo), _to_json_compatible(v, memo)]
+                for k, v in value.items()
+            ]
+        }
+    if isinstance(value, FunctionType):
+        if _is_cstar_module(value.__module__) and "<" not in value.__qualname__:
+            return {"__function__": f"{value.__module__}:{value.__qualname__}"}
+    elif _is_cstar_module(type(value).__module__) and hasattr(value, "__dict__"):
+        if id(value) in memo:
+            return {"__ref__": memo[id(value)][0]}
+        index = len(memo)
+        memo[id(value)] = (index, value)
+
+        cls = type(value)
+        getstate = getattr(value, "__getstate__", None)
+        state = getstate() if getstate is not None else vars(value)
+        if state is None:
+            state = {}
+        if not isinstance(state, dict):
+            raise TypeError(f"{cls.__name__} state is not a dict")
+        name = state_type_name(cls)
+        return {
+            "__object__": name,
+            "id": index,
+            "version": _STATE_TYPES[name][1] if name in _STATE_TYPES else 1,
+            "state": {k: _to_json_compatible(v, memo) for k, v in state.items()},
+        }
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _from_json_compatible(value: Any, memo: dict[int, Any]) -> Any:
+    """Reverse the conversion applied by `_to_json_compatible`.
+
+    `memo` maps the index of each C-Star object restored so far to the object.
+    """
+    if isinstance(value, list):
+        return [_from_json_compatible(v, memo) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    if len(value) == 1:
+        tag, tagged = next(iter(value.items()))
+        if tag == "__datetime__":
+            return datetime.fromisoformat(tagged)
+        if tag == "__path__":
+            return Path(tagged)
+        if tag == "__tuple__":
+            return tuple(_from_json_compatible(v, memo) for v in tagged)
+        if tag == "__set__":
+            return {_from_json_compatible(v, memo) for v in tagged}
+        if tag == "__items__":
+            return {
+                _from_json_compatible(k, memo): _from_json_compatible(v, memo)
+                for k, v in tagged
+            }
+        if tag == "__stat__":
+            sequence, fields = tagged
+            return os.stat_result(sequence, fields)
+        if tag == "__function__":
+            return _import_qualified(tagged)
+        if tag == "__ref__":
+            return memo[tagged]
+    elif value.keys() == {"__enum__", "value"}:
+        return resolve_state_type(value["__enum__"])(value["value"])
+    elif value.keys() == {"__object__", "id", "version", "state"}:
+        return _restore_object(value, memo)
+    return {k: _from_json_compatible(v, memo) for k, v in value.items()}
+
+
+def _restore_object(stored: dict, memo: dict[int, Any]) -> Any:
+    """Recreate a C-Star object converted by `_to_json_compatible`."""
+    name, version = stored["__object__"], stored["version"]
+    cls: Any = resolve_state_type(name)
+    current_version, upgrade = (
+        _STATE_TYPES[name][1:] if name in _STATE_TYPES else (1, None)
+    )
+    if version > current_version:
+        raise StateSchemaError(
+            f"{name} state version {version} is newer than the version "
+            f"{current_version} supported by this version of C-Star"
+        )
+
+    # Created before its state is restored, so references back to it resolve:
+    obj = cls.__new__(cls)
+    memo[stored["id"]] = obj
+    state = {k: _from_json_compatible(v, memo) for k, v in stored["state"].items()}
+    if (version < current_version) and (upgrade is not None):
+        state = upgrade(state, version)
+    if hasattr(obj, "__setstate__"):
+        obj.__setstate__(state)
+    else:
+        obj.__dict__.update(state)
+    return obj
+
+
+def encode_value(value: Any) -> tuple[str, bytes]:
+    """Encode a single attribute value for storage.
+
+    Values are stored as JSON. Plain data (strings, numbers, dates, paths and
+    containers thereof) is stored as is; C-Star components (codebases, datasets,
+    execution handlers, ...) are stored as their attributes, tagged with a stable
+    type name and version (see `register_state_type`), so that they can be
+    restored by later versions of C-Star.
+
+    Parameters
+    ----------
+    value: Any
+        The value to encode
+
+    Returns
+    -------
+    encoding: str
+        Always "json"
+    payload: bytes
+        The encoded value
+
+    Raises
+    ------
+    TypeError
+        If the value is, or contains, an object that cannot be stored as JSON
+    """
+    return "json", json.dumps(
+        _to_json_compatible(value, memo={}), separators=(",", ":")
+    ).encode()
+
+
+def decode_value(encoding: str, payload: bytes) -> Any:
+    """Decode a value previously encoded with `encode_value`.
+
+    The "pickle" encoding, used for components by stores with schema version 1,
+    is still read so that such stores can be restored.
+    """
+    if encoding == "json":
+        return _from_json_compatible(json.loads(payload), memo={})
+    elif encoding == "pickle":
+        return pickle.loads(payload)
+    raise ValueError(f"Unknown state encoding '{encoding}'")
+
+
+class StateStore:
+    """A compact, schema-versioned, incrementally updated store of object state.
+
+    The state of an object (typically a `Simulation`) is kept as one row per
+    attribute in a single SQLite file. Each row carries a digest of its encoded
+    payload, so that repeated writes only touch attributes that have changed.
+    All writes happen inside a single transaction and are therefore atomic.
+
+    Digests are computed from the encoded payloads, so every attribute written is
+    still encoded each time; the saving is in the I/O. Encodings are deterministic
+    (sets are sorted), so an unchanged attribute always has the same digest.
+    Callers can avoid encoding attributes known to be unchanged by passing them
+    as `skip`.
+
+    Attributes
+    ----------
+    path: Path
+        The location of the SQLite file backing this store
+
+    Methods
+    -------
+    write(state, object_type, skip)
+        Write the changed entries of `state` to the store
+    read()
+        Read the stored object type and the (still encoded) attribute payloads
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize a StateStore backed by the file at `path`.
+
+        Parameters
+        ----------
+        path: str or Path
+            The location of the SQLite file. It is created on the first write.
+        """
+        self.path = Path(path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    @property
+    def exists(self) -> bool:
+        """True if a state store has previously been written at `path`."""
+        return self.path.is_file()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fields ("
+                "name TEXT PRIMARY KEY, position INTEGER, encoding TEXT, "
+                "digest TEXT, payload BLOB)"
+            )
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _check_schema_version(self, connection: sqlite3.Connection) -> None:
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if row is not None and int(row[0]) > STATE_SCHEMA_VERSION:
+            raise StateSchemaError(
+                f"The state store at {self.path} was written with schema version "
+                f"{row[0]}, but this version of C-Star only supports versions up to "
+                f"{STATE_SCHEMA_VERSION}. Please update C-Star to restore it."
+            )
+
+    def write(
+        self,
+        state: dict[str, Any],
+        object_type: str,
+        skip: Iterable[str] = (),
+    ) -> int:
+        """Write the entries of `state` that differ from those already stored.
+
+        Parameters
+        ----------
+        state: dict
+            Mapping of attribute names to values, e.g. an object's `__dict__`
+        object_type: str
+            The name of the object's class, as returned by `state_type_name`
+        skip: iterable of str, optional
+            Names of stored attributes that are known to be unchanged and
+            therefore neither rewritten nor removed (e.g. attributes that have
+            not yet been loaded after a lazy restore)
+
+        Returns
+        -------
+        n_written: int
+            The number of attributes whose stored value was updated
+        """
+        skip = set(skip)
+        from cstar import __version__
+
+        # The connection's own context manager commits, but does not close it
+        with closing(self._connect()) as connection, connection:
+            self._check_schema_version(connection)
+            stored_digests = dict(
+                connection.execute("SELECT name, digest FROM fields").fetchall()
+            )
+            updates = []
+            for position, (name, value) in enumerate(state.items()):
+                try:
+                    encoding, payload = encode_value(value)
+                except TypeError as e:
+                    raise TypeError(f"Cannot store attribute '{name}': {e}") from e
+                digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+                if stored_digests.get(name) != digest:
+                    updates.append((name, position, encoding, digest, payload))
+
+            connection.executemany(
+                "INSERT OR REPLACE INTO fields VALUES (?, ?, ?, ?, ?)", updates
+            )
+            removed = set(stored_digests) - set(state) - skip
+            connection.executemany(
+                "DELETE FROM fields WHERE name = ?", [(name,) for name in removed]
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [
+                    ("schema_version", str(STATE_SCHEMA_VERSION)),
+                    ("cstar_version", __version__),
+                    ("object_type", object_type),
+                ],
+            )
+
+        log.debug(f"Wrote {len(updates)} changed field(s) to {self.path}")
+        return len(updates)
+
+    def read(self) -> tuple[str, dict[str, tuple[str, bytes]]]:
+        """Read the stored object type and encoded attribute payloads.
+
+        Payloads are returned undecoded, in their original attribute order, so that
+        callers can decode them lazily with `decode_value`.
+
+        Returns
+        -------
+        object_type: str
+            The name of the object's class recorded by `write`
+        fields: dict
+            Mapping of attribute names to `(encoding, payload)` tuples
+
+        Raises
+        ------
+        FileNotFoundError
+            If no state store exists at `path`
+        StateSchemaError
+            If the store was written with a newer, unsupported schema version
+        """
+        if not self.exists:
+            raise FileNotFoundError(f"No C-Star state store found at {self.path}")
+
+        with closing(self._connect()) as connection, connection:
+            self._check_schema_version(connection)
+            meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+            rows = connection.execute(
+                "SELECT name, encoding, payload FROM fields ORDER BY position"
+            ).fetchall()
+
+        return meta.get("object_type", ""), {
+            name: (encoding, payload) for name, encoding, payload in rows
+        }
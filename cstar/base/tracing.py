@@ -0,0 +1,335 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, TypeVar
+
+from cstar.base.log import get_logger
+
+log = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_MAX_SPANS = 100_000
+"""Maximum number of finished spans kept by a `Tracer`; older spans are dropped."""
+
+
+class Span:
+    """A single timed operation, possibly nested inside another span.
+
+    Attributes
+    ----------
+    name: str
+        A short name for the operation, e.g. "partition" or "make"
+    category: str
+        A coarse grouping of operations, e.g. "stage", "dataset" or "subprocess"
+    span_id: int
+        A process-unique identifier of this span
+    parent_id: int or None
+        The `span_id` of the enclosing span, if any
+    start: float
+        The wall-clock start time, in seconds since the epoch
+    duration: float or None
+        The elapsed time in seconds, or None while the span is still open
+    bytes: int
+        The number of bytes read, written or transferred by the operation
+    attributes: dict
+        Any further (JSON-serializable) details of the operation
+    thread_id: int
+        The identifier of the thread in which the span was opened
+    """
+
+    __slots__ = (
+        "name",
+        "category",
+        "span_id",
+        "parent_id",
+        "start",
+        "duration",
+        "bytes",
+        "attributes",
+        "thread_id",
+        "_t0",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        span_id: int,
+        parent_id: int | None,
+        attributes: dict[str, Any],
+    ):
+        self.name = name
+        self.category = category
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.bytes = 0
+        self.duration: float | None = None
+        self.thread_id = threading.get_ident()
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r}, "
+            f"category={self.category!r}, duration={self.duration!r}, "
+            f"bytes={self.bytes!r})"
+        )
+
+    def set(self, **attributes: Any) -> None:
+        """Add or update attributes of this span."""
+        self.attributes.update(attributes)
+
+    def add_bytes(self, n: int) -> None:
+        """Add `n` to the number of bytes moved by this span."""
+        self.bytes += n
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return this span as a JSON-serializable dictionary."""
+        return {
+            "name": self.name,
+            "category": self.category,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "bytes": self.bytes,
+            "thread_id": self.thread_id,
+            "attributes": self.attributes,
+        }
+
+
+class _NullSpan:
+    """Stand-in for `Span` while tracing is disabled; every operation is a no-op."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_bytes(self, n: int) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Records nested, timed spans and exports them for offline analysis.
+
+    Spans are opened with the `span` context manager (or the `traced` decorator)
+    and nest automatically: a span opened while another is active in the same
+    thread (or asyncio task) records it as its parent. Finished spans are kept in
+    memory, up to `max_spans`, until exported or cleared.
+
+    Attributes
+    ----------
+    enabled: bool
+        Whether spans are currently recorded
+    spans: list of Span
+        The finished spans, in order of completion
+
+    Methods
+    -------
+    span(name, category, **attributes)
+        Context manager timing the enclosed block
+    traced(name, category)
+        Decorator timing each call of a function
+    clear()
+        Discard all finished spans
+    export_jsonl(path)
+        Write finished spans to a JSON-lines file
+    export_chrome_trace(path)
+        Write finished spans to a Chrome trace (`chrome://tracing`, Perfetto) file
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = DEFAULT_MAX_SPANS):
+        """Initialize a Tracer.
+
+        Parameters
+        ----------
+        enabled: bool, optional, default True
+            Whether to record spans
+        max_spans: int, optional
+            The maximum number of finished spans to keep in memory
+        """
+        self.enabled = enabled
+        self._finished: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._current: ContextVar[Span | None] = ContextVar(
+            f"cstar_span_{id(self)}", default=None
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(enabled={self.enabled})"
+
+    @property
+    def spans(self) -> list[Span]:
+        """The finished spans, in order of completion."""
+        with self._lock:
+            return list(self._finished)
+
+    @property
+    def current_span(self) -> Span | None:
+        """The innermost open span in the current context, if any."""
+        return self._current.get()
+
+    @contextmanager
+    def span(
+        self, name: str, category: str = "cstar", **attributes: Any
+    ) -> Iterator[Span | _NullSpan]:
+        """Time the enclosed block as a span.
+
+        Parameters
+        ----------
+        name: str
+            A short name for the operation
+        category: str, optional, default "cstar"
+            A coarse grouping of operations
+        **attributes
+            Further (JSON-serializable) details to record with the span
+
+        Yields
+        ------
+        Span
+            The open span, on which bytes and further attributes can be recorded.
+            If an exception escapes the block, its type is recorded as the
+            "error" attribute.
+
+        Examples
+        --------
+        >>> with tracer.span("fetch", category="dataset", url=url) as s:
+        ...     s.add_bytes(download(url))
+        """
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        parent = self._current.get()
+        span = Span(
+            name=name,
+            category=category,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._t0
+            self._current.reset(token)
+            with self._lock:
+                self._finished.append(span)
+
+    def traced(
+        self, name: str | None = None, category: str = "cstar"
+    ) -> Callable[[F], F]:
+        """Decorator that times each call of the decorated function as a span.
+
+        Parameters
+        ----------
+        name: str, optional
+            The span name. Defaults to the function's qualified name.
+        category: str, optional, default "cstar"
+            A coarse grouping of operations
+        """
+
+        def decorator(func: F) -> F:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, category=category):
+                    return func(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def clear(self) -> None:
+        """Discard all finished spans."""
+        with self._lock:
+            self._finished.clear()
+
+    def export_jsonl(self, path: str | Path) -> Path:
+        """Write all finished spans to a JSON-lines file, one span per line.
+
+        Parameters
+        ----------
+        path: str or Path
+            The file to write
+
+        Returns
+        -------
+        Path
+            The path of the written file
+        """
+        path = Path(path)
+        spans = self.spans
+        with open(path, "w") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        log.debug(f"Wrote {len(spans)} spans to {path}")
+        return path
+
+    def export_chrome_trace(self, path: str | Path) -> Path:
+        """Write all finished spans to a file in the Chrome trace event format.
+
+        The file can be opened with `chrome://tracing` or https://ui.perfetto.dev.
+        Each span becomes a "complete" event, with its bytes and attributes as
+        arguments.
+
+        Parameters
+        ----------
+        path: str or Path
+            The file to write
+
+        Returns
+        -------
+        Path
+            The path of the written file
+        """
+        path = Path(path)
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": (span.duration or 0.0) * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {"bytes": span.bytes, **span.attributes},
+            }
+            for span in self.spans
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        log.debug(f"Wrote {len(events)} spans to {path}")
+        return path
+
+
+tracer = Tracer(
+    enabled=os.environ.get("CSTAR_TRACE", "1").strip().lower()
+    not in {"0", "false", "no", "off", ""}
+)
+"""The tracer used throughout C-Star. Set `CSTAR_TRACE=0` (or "false", "no", "off")
+to disable it."""
+
+span = tracer.span
+traced = tracer.traced
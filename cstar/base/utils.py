@@ -1,10 +1,11 @@
-import functools
 import hashlib
-import subprocess
-from os import PathLike
+import re
 from pathlib import Path
 
+from cstar.base.command import runner
+from cstar.base.exceptions import CommandTimeoutError
 from cstar.base.log import get_logger
+from cstar.base.tracing import span
 
 log = get_logger(__name__)
 
@@ -29,14 +30,93 @@ def _get_sha256_hash(file_path: str | Path) -> str:
         )
 
     sha256_hash = hashlib.sha256()
-    with file_path.open("rb") as file:
+    with (
+        span("sha256", category="hash", path=str(file_path)) as s,
+        file_path.open("rb") as file,
+    ):
         for chunk in iter(lambda: file.read(4096), b""):
             sha256_hash.update(chunk)
+            s.add_bytes(len(chunk))
 
     file_hash = sha256_hash.hexdigest()
     return file_hash
 
 
+_SHA256_HASH_CACHE_SIZE = 4096
+_sha256_hash_cache: dict[tuple[int, int, int, int], str] = {}
+"""Checksums computed by `_get_cached_sha256_hash`, keyed on (device, inode, size,
+modification time)."""
+
+
+def _get_cached_sha256_hash(file_path: str | Path) -> str:
+    """Calculate the 256-bit SHA checksum of a file, reusing any earlier result.
+
+    Checksums are memoized for the lifetime of the process, keyed on the device,
+    inode, size and modification time of the file. A file that is unchanged since
+    it was last hashed (including any hard link to it) is therefore only read once,
+    e.g. when many simulations are set up from the same shared data.
+
+    Parameters
+    ----------
+    file_path: Path
+       Path to the file whose checksum is to be calculated
+
+    Returns
+    -------
+    file_hash: str
+       The SHA-256 checksum of the file at file_path
+    """
+    file_path = Path(file_path).resolve()
+    if not file_path.is_file():
+        # Let the uncached function raise its usual error
+        return _get_sha256_hash(file_path)
+
+    st = file_path.stat()
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    file_hash = _sha256_hash_cache.get(key)
+    if file_hash is None:
+        file_hash = _get_sha256_hash(file_path)
+        if len(_sha256_hash_cache) >= _SHA256_HASH_CACHE_SIZE:
+            # Evict the oldest entry
+            del _sha256_hash_cache[next(iter(_sha256_hash_cache))]
+        _sha256_hash_cache[key] = file_hash
+    return file_hash
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def _parse_size(size: str | int) -> int:
+    """Convert a size such as "500G" or "1.5T" (binary units) to a number of bytes.
+
+    Parameters
+    ----------
+    size: str or int
+        A number of bytes, optionally followed by one of K, M, G or T (and an
+        optional "B" or "iB")
+
+    Returns
+    -------
+    int
+        The number of bytes
+    """
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)(?:I?B)?\s*", size.upper())
+    if match is None:
+        raise ValueError(f"Cannot interpret {size!r} as a size, e.g. '500G'")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def _format_size(nbytes: int) -> str:
+    value = float(nbytes)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
 def _replace_text_in_file(file_path: str | Path, old_text: str, new_text: str) -> bool:
     """Find and replace a string in a text file.
 
@@ -191,9 +271,15 @@ def _run_cmd(
     msg_post: str | None = None,
     msg_err: str | None = None,
     raise_on_error: bool = False,
+    timeout: float | None = None,
+    retries: int = 0,
+    stream: bool = False,
 ) -> str:
     """Execute a subprocess using default configuration, blocking until it completes.
 
+    Commands are executed by the shared `cstar.base.command.runner`, which records
+    per-command timing metrics.
+
     Parameters:
     -----------
     cmd (str):
@@ -210,7 +296,16 @@ def _run_cmd(
         An overridden message logged when a command returns a non-zero code. Logs
         will automatically append the stderr output of the command.
     raise_on_error (bool, default = False):
-        If True, raises a RuntimeError if the command returns a non-zero code.
+        If True, raises a RuntimeError if the command returns a non-zero code (or a
+        CommandTimeoutError, a subclass of RuntimeError, if it times out).
+    timeout (float | None, default = None):
+        Seconds after which the command is stopped and treated as failed.
+    retries (int, default = 0):
+        How many more times to run the command, with exponential back-off, if it
+        fails or times out. Only use this for commands that are safe to repeat.
+    stream (bool, default = False):
+        If True, log output line by line (at DEBUG level) as it is produced, and
+        only keep its tail in memory. Use this for long, verbose commands (e.g. make).
 
     Returns:
     -------
@@ -232,38 +327,28 @@ def _run_cmd(
          Command `python return_nonzero.py` failed. STDERR: <stderror of foo.py>
     """
     log.debug(msg_pre or f"Running command: {cmd}")
-    stdout: str = ""
-
-    fn = functools.partial(
-        subprocess.run,
-        cmd,
-        shell=True,
-        text=True,
-        capture_output=True,
-    )
-
-    kwargs: dict[str, str | PathLike | dict[str, str]] = {}
-    if cwd:
-        kwargs["cwd"] = cwd
-    if env:
-        kwargs["env"] = env
 
-    result: subprocess.CompletedProcess[str] = fn(**kwargs)
-    stdout = str(result.stdout).strip() if result.stdout is not None else ""
-
-    if result.returncode != 0:
-        rc_out = f"Return Code: `{result.returncode}`."
-        stderr_out = f"STDERR:\n{result.stderr.strip()}"
+    result = runner.run(
+        cmd, cwd=cwd, env=env, timeout=timeout, retries=retries, stream=stream
+    )
 
+    if not result.succeeded:
         if not msg_err:
             msg_err = f"Command `{cmd}` failed."
 
-        msg = f"{msg_err} {rc_out} {stderr_out}"
+        if result.timed_out:
+            msg = f"{msg_err} Timed out after {timeout} seconds."
+        else:
+            msg = f"{msg_err} Return Code: `{result.returncode}`."
+        if stream:
+            msg += f" OUTPUT:\n{result.stdout}"
+        else:
+            msg += f" STDERR:\n{result.stderr.strip()}"
 
         if raise_on_error:
-            raise RuntimeError(msg)
+            raise CommandTimeoutError(msg) if result.timed_out else RuntimeError(msg)
 
         log.error(msg)
 
     log.debug(msg_post or "Command completed successfully.")
-    return stdout
+    return result.stdout
@@ -5,10 +5,13 @@ from enum import Enum, auto
 from pathlib import Path
 
 from cstar.base.log import LoggingMixin
+from cstar.base.state_store import register_state_type
+from cstar.execution.progress import Progress, ProgressMonitor
 
 STATUS_RECHECK_SECONDS = 30
 
 
+@register_state_type("ExecutionStatus")
 class ExecutionStatus(Enum):
     """Enum representing possible states of a process to be executed.
 
@@ -48,6 +51,12 @@ class ExecutionStatus(Enum):
         return self.name.lower()  # Convert enum name to lowercase for display
 
 
+FINISHED_STATUSES = frozenset(
+    {ExecutionStatus.COMPLETED, ExecutionStatus.CANCELLED, ExecutionStatus.FAILED}
+)
+"""Statuses of tasks that have ended and will not change again."""
+
+
 class ExecutionHandler(ABC, LoggingMixin):
     """Abstract base class for managing the execution of a task or process.
 
@@ -60,6 +69,10 @@ class ExecutionHandler(ABC, LoggingMixin):
     status : ExecutionStatus
         Represents the current status of the task (e.g., RUNNING, COMPLETED).
         This is an abstract property that must be implemented by subclasses.
+    progress_monitor : ProgressMonitor, optional
+        Parses the task's output file to report its progress, if set
+    progress : Progress, optional
+        The progress of the task, as of its latest output
 
     Methods
     -------
@@ -67,6 +80,8 @@ class ExecutionHandler(ABC, LoggingMixin):
         Stream live updates from the task's output file for a specified duration.
     """
 
+    progress_monitor: ProgressMonitor | None = None
+
     @property
     @abstractmethod
     def status(self) -> ExecutionStatus:
@@ -101,6 +116,35 @@ class ExecutionHandler(ABC, LoggingMixin):
         """
         pass
 
+    def cancel(self) -> None:
+        """Cancel the task.
+
+        Subclasses able to cancel their tasks override this method.
+
+        Raises
+        ------
+        NotImplementedError
+            If the task cannot be cancelled
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot cancel its task")
+
+    @property
+    def progress(self) -> Progress | None:
+        """The progress of the task, parsed from its output file.
+
+        Only the output written since the progress was last checked is parsed,
+        so this is cheap to check often, for many tasks.
+
+        Returns
+        -------
+        Progress or None
+            The latest step, percentage complete, rate of progress and ETA of
+            the task, or None if it has no `progress_monitor`.
+        """
+        if self.progress_monitor is None:
+            return None
+        return self.progress_monitor.update(self.output_file)
+
     def updates(self, seconds: float = 10, confirm_indefinite: bool = True):
         """Stream live updates from the task's output file.
 
@@ -1,10 +1,15 @@
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import IO
 
+from cstar.base.state_store import register_state_type
 from cstar.execution.handler import ExecutionHandler, ExecutionStatus
+from cstar.execution.local_queue import LocalJobQueue, get_local_queue
 
 
+@register_state_type("LocalProcess")
 class LocalProcess(ExecutionHandler):
     """Execution handler for managing and monitoring local subprocesses.
 
@@ -21,6 +26,10 @@ class LocalProcess(ExecutionHandler):
     output_file : Path
         The file where the subprocess's standard output and error will
         be written.
+    cores : int or None
+        The number of cores the subprocess uses. If set, `start()` submits
+        the subprocess to a `LocalJobQueue`, which starts it once that many
+        cores are free.
     status : ExecutionStatus
         The current status of the subprocess, represented as an
         `ExecutionStatus` enum value.
@@ -28,7 +37,8 @@ class LocalProcess(ExecutionHandler):
     Methods
     -------
     start()
-        Start the subprocess using the specified command.
+        Start the subprocess using the specified command, or queue it until
+        enough cores are free.
     cancel()
         Cancel the running subprocess.
     updates(seconds=10)
@@ -41,6 +51,8 @@ class LocalProcess(ExecutionHandler):
         commands: str,
         output_file: str | Path | None = None,
         run_path: str | Path | None = None,
+        cores: int | None = None,
+        queue: LocalJobQueue | None = None,
     ):
         """Initialize a `LocalProcess` instance.
 
@@ -55,6 +67,14 @@ class LocalProcess(ExecutionHandler):
         run_path : str or Path, optional
             The directory from which the subprocess will be executed.
             Defaults to the current working directory.
+        cores : int, optional
+            The number of cores the subprocess uses (e.g. the number of MPI
+            ranks). If set, the subprocess is queued until that many cores are
+            free. If not set, it is started immediately by `start()`.
+        queue : LocalJobQueue, optional
+            The queue to submit the subprocess to if `cores` is set. Defaults
+            to the queue shared by all local runs in this session (see
+            `cstar.execution.local_queue.get_local_queue`).
         """
         self.commands = commands
         self.run_path = Path(run_path) if run_path is not None else Path.cwd()
@@ -65,9 +85,12 @@ class LocalProcess(ExecutionHandler):
             Path(output_file) if output_file is not None else output_file
         )
 
-        self._output_file_handle = None
-        self._process = None
-        self._returncode = None
+        self.cores = cores
+        self._queue = queue
+
+        self._output_file_handle: IO | None = None
+        self._process: subprocess.Popen | None = None
+        self._returncode: int | None = None
         self._cancelled = False
 
     def __str__(self) -> str:
@@ -76,6 +99,8 @@ class LocalProcess(ExecutionHandler):
         base_str += f"\nCommands: {self.commands}"
         base_str += f"\nRun path: {self.run_path}"
         base_str += f"\nOutput file: {self.output_file}"
+        if self.cores is not None:
+            base_str += f"\nCores: {self.cores}"
         base_str += f"\nStatus: {self.status}"
 
         return base_str
@@ -85,12 +110,22 @@ class LocalProcess(ExecutionHandler):
         repr_str += f"\ncommands = {self.commands!r},"
         repr_str += f"\noutput_file = {self.output_file!r},"
         repr_str += f"\nrun_path = {self.run_path!r}"
+        if self.cores is not None:
+            repr_str += f",\ncores = {self.cores!r}"
         repr_str += "\n)"
 
         repr_str += f"\nState: <status = {self.status!r}>"
 
         return repr_str
 
+    def __getstate__(self) -> dict:
+        """Return the state of this process, without the queue it was submitted to
+        (which holds threads and locks).
+        """
+        state = self.__dict__.copy()
+        state["_queue"] = None
+        return state
+
     def start(self):
         """Start the local process.
 
@@ -98,6 +133,9 @@ class LocalProcess(ExecutionHandler):
         initialization. The command runs in a subprocess, with its standard
         output and error directed to the output file.
 
+        If `cores` is set, the subprocess is instead submitted to a
+        `LocalJobQueue`, and its status is `PENDING` until the queue starts it.
+
         Notes
         -----
         - The output file is opened and actively written to during execution.
@@ -108,6 +146,15 @@ class LocalProcess(ExecutionHandler):
         --------
         cancel : Terminates the running subprocess.
         """
+        if self.cores is not None:
+            if self._queue is None:
+                self._queue = get_local_queue()
+            self._queue.submit(self)
+        else:
+            self._launch()
+
+    def _launch(self) -> None:
+        """Start the subprocess immediately."""
         # Open the output file to write to
         self._output_file_handle = open(self.output_file, "w")
         local_process = subprocess.Popen(
@@ -142,11 +189,14 @@ class LocalProcess(ExecutionHandler):
         ExecutionStatus
             The current status of the process. Possible values include:
             - `ExecutionStatus.UNSUBMITTED`: The task has not been started.
+            - `ExecutionStatus.PENDING`: The task is queued, waiting for cores.
             - `ExecutionStatus.RUNNING`: The task is currently executing.
             - `ExecutionStatus.COMPLETED`: The task finished successfully.
             - `ExecutionStatus.FAILED`: The task finished unsuccessfully.
             - `ExecutionStatus.CANCELLED`: The task was cancelled using LocalProcess.cancel()
         """
+        if self._is_queued:
+            return ExecutionStatus.PENDING
         if self._process is not None:
             if self._process.poll() is None:
                 return ExecutionStatus.RUNNING
@@ -164,6 +214,16 @@ class LocalProcess(ExecutionHandler):
             case _:
                 return ExecutionStatus.FAILED
 
+    @property
+    def _is_queued(self) -> bool:
+        """Whether the process is waiting in a `LocalJobQueue`."""
+        return (self._queue is not None) and (self in self._queue.queued)
+
+    @property
+    def _is_active(self) -> bool:
+        """Whether the subprocess has started and not yet finished."""
+        return (self._process is not None) and (self._process.poll() is None)
+
     def _drop_process(self) -> None:
         """Un-sets private attributes associated with a completed subprocess.
 
@@ -193,10 +253,11 @@ class LocalProcess(ExecutionHandler):
     def cancel(self):
         """Cancel the local process.
 
-        This method terminates the subprocess if it is currently running.
-        A graceful shutdown is attempted using `terminate` (SIGTERM). If the
-        subprocess does not terminate within a timeout period, it is forcefully
-        killed using `kill` (SIGKILL).
+        This method terminates the subprocess if it is currently running,
+        or removes it from its queue if it has not yet started. A graceful
+        shutdown is attempted using `terminate` (SIGTERM). If the subprocess
+        does not terminate within a timeout period, it is forcefully killed
+        using `kill` (SIGKILL).
 
         Notes
         -----
@@ -209,6 +270,9 @@ class LocalProcess(ExecutionHandler):
         --------
         wait : Wait for the local process to finish
         """
+        if (self._queue is not None) and self._queue.remove(self):
+            self._cancelled = True
+            return
         if self._process and self.status == ExecutionStatus.RUNNING:
             try:
                 self._process.terminate()  # Send SIGTERM to allow graceful shutdown
@@ -228,12 +292,16 @@ class LocalProcess(ExecutionHandler):
     def wait(self):
         """Wait for the local process to finish.
 
+        If the process is queued, this waits for it to start, then to finish.
+
         See Also
         --------
         cancel : end the current process
         """
+        while self._is_queued:
+            time.sleep(self._queue.dispatch_interval)  # type: ignore[union-attr]
         if self.status == ExecutionStatus.RUNNING:
-            self._process.wait()
+            self._process.wait()  # type: ignore[union-attr]
         else:
             self.log.info(
                 f"Cannot wait for process with execution status '{self.status}'"
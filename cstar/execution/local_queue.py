@@ -0,0 +1,278 @@
+import atexit
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
+from cstar.base.log import LoggingMixin
+
+if TYPE_CHECKING:
+    from cstar.execution.local_process import LocalProcess
+
+LOCAL_CORES_ENV_VAR = "CSTAR_LOCAL_CORES"
+"""Environment variable setting the number of cores available to local runs."""
+
+DISPATCH_INTERVAL = 1.0
+"""Seconds between checks for finished processes while others are queued."""
+
+
+class LocalJobQueue(LoggingMixin):
+    """A queue admitting local processes only when enough cores are free for them.
+
+    Processes submitted with a number of `cores` are started as soon as that
+    many of the queue's `max_cores` are not in use by processes it started
+    earlier, and wait in the queue (with status `PENDING`) until then. Queued
+    processes are started in submission order: while the first of them waits
+    for cores, later ones wait too, even if they would fit, so that a large run
+    is not held back indefinitely by a stream of small ones.
+
+    A process needing more cores than the queue has is started on its own,
+    once nothing else is running.
+
+    While processes are queued, a background thread checks for finished
+    processes every `dispatch_interval` seconds and starts queued ones in
+    their place. Processes still queued when Python exits never start: they are
+    cancelled, with a warning.
+
+    Attributes
+    ----------
+    max_cores: int
+        The number of cores shared by processes started from the queue
+    dispatch_interval: float
+        Seconds between checks for finished processes while others are queued
+    queued: list of LocalProcess
+        The processes waiting for cores, in submission order
+    running: list of LocalProcess
+        The processes started by the queue that have not yet finished
+    used_cores: int
+        The number of cores used by running processes
+    free_cores: int
+        The number of cores available to queued processes
+    """
+
+    def __init__(
+        self,
+        max_cores: int | None = None,
+        dispatch_interval: float = DISPATCH_INTERVAL,
+    ):
+        """Initialize a LocalJobQueue.
+
+        Parameters
+        ----------
+        max_cores: int, optional
+            The number of cores shared by processes started from the queue.
+            Defaults to the number of cores on this machine.
+        dispatch_interval: float, optional, default 1.0
+            Seconds between checks for finished processes while others are queued
+        """
+        if max_cores is None:
+            max_cores = os.cpu_count() or 1
+        if max_cores < 1:
+            raise ValueError(f"max_cores must be positive, not {max_cores}")
+        self.max_cores = max_cores
+        self.dispatch_interval = dispatch_interval
+
+        self._queued: list[LocalProcess] = []
+        self._running: list[LocalProcess] = []
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._dispatcher: threading.Thread | None = None
+        _queues.add(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_cores={self.max_cores!r}, "
+            f"dispatch_interval={self.dispatch_interval!r})"
+            f"\nState: <queued = {len(self._queued)}, running = {len(self._running)}, "
+            f"used_cores = {self.used_cores}>"
+        )
+
+    @property
+    def queued(self) -> list["LocalProcess"]:
+        with self._lock:
+            return list(self._queued)
+
+    @property
+    def running(self) -> list["LocalProcess"]:
+        with self._lock:
+            self._reap()
+            return list(self._running)
+
+    @property
+    def used_cores(self) -> int:
+        with self._lock:
+            self._reap()
+            return sum(_cores(p) for p in self._running)
+
+    @property
+    def free_cores(self) -> int:
+        return max(self.max_cores - self.used_cores, 0)
+
+    def submit(self, process: "LocalProcess") -> None:
+        """Queue `process`, starting it straight away if enough cores are free.
+
+        Parameters
+        ----------
+        process: LocalProcess
+            The process to run. Its `cores` attribute sets the number of cores
+            it needs (one, if unset).
+        """
+        cores = _cores(process)
+        if cores > self.max_cores:
+            self.log.warning(
+                f"Process needs {cores} cores, but only {self.max_cores} are "
+                "available for local runs. It will run once no others are running."
+            )
+        with self._lock:
+            if (process in self._queued) or (process in self._running):
+                raise RuntimeError("Process has already been submitted to the queue")
+            self._queued.append(process)
+            self.dispatch()
+            if process in self._queued:
+                self.log.info(
+                    f"Process queued until {cores} cores are free "
+                    f"({self.free_cores}/{self.max_cores} free, "
+                    f"{len(self._queued)} processes queued)"
+                )
+                self._ensure_dispatcher()
+
+    def remove(self, process: "LocalProcess") -> bool:
+        """Remove `process` from the queue, if it has not yet started.
+
+        Parameters
+        ----------
+        process: LocalProcess
+            The process to remove
+
+        Returns
+        -------
+        bool
+            Whether the process was queued
+        """
+        with self._lock:
+            if process in self._queued:
+                self._queued.remove(process)
+                self._wakeup.set()
+                return True
+            return False
+
+    def dispatch(self) -> list["LocalProcess"]:
+        """Start queued processes, in submission order, until one does not fit in
+        the free cores.
+
+        Returns
+        -------
+        list of LocalProcess
+            The processes started
+        """
+        started = []
+        with self._lock:
+            self._reap()
+            free = self.max_cores - sum(_cores(p) for p in self._running)
+            for process in list(self._queued):
+                cores = _cores(process)
+                oversized = (cores > self.max_cores) and not self._running
+                if (cores > free) and not oversized:
+                    # Hold the free cores for it, rather than starting later ones
+                    break
+                self._queued.remove(process)
+                try:
+                    process._launch()
+                except OSError as e:
+                    self.log.error(f"Failed to start queued process: {e}")
+                    process._returncode = -1
+                    continue
+                self._running.append(process)
+                started.append(process)
+                free -= cores
+        return started
+
+    def cancel_queued(self) -> list["LocalProcess"]:
+        """Cancel every process that is still queued.
+
+        Returns
+        -------
+        list of LocalProcess
+            The processes cancelled
+        """
+        with self._lock:
+            cancelled = list(self._queued)
+            for process in cancelled:
+                process.cancel()
+        return cancelled
+
+    def _reap(self) -> None:
+        """Forget running processes that have finished, freeing their cores."""
+        self._running = [p for p in self._running if p._is_active]
+
+    def _ensure_dispatcher(self) -> None:
+        """Start the background thread dispatching queued processes, if needed."""
+        if (self._dispatcher is not None) and self._dispatcher.is_alive():
+            return
+        self._wakeup.clear()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop, name="cstar-local-queue", daemon=True
+        )
+        self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.dispatch_interval)
+            self._wakeup.clear()
+            with self._lock:
+                self.dispatch()
+                if not self._queued:
+                    self._dispatcher = None
+                    return
+
+
+def _cores(process: "LocalProcess") -> int:
+    return process.cores if process.cores is not None else 1
+
+
+_queues: "weakref.WeakSet[LocalJobQueue]" = weakref.WeakSet()
+_default_queues: dict[int, LocalJobQueue] = {}
+
+
+@atexit.register
+def _cancel_queued_at_exit() -> None:
+    """Cancel the processes still queued as Python exits, as none will start them."""
+    for queue in list(_queues):
+        cancelled = queue.cancel_queued()
+        if cancelled:
+            queue.log.warning(
+                f"{len(cancelled)} queued local runs never started, and were "
+                "cancelled as Python exited"
+            )
+
+
+def get_local_queue() -> LocalJobQueue:
+    """Return the queue shared by local runs started from this Python session.
+
+    The number of cores it shares is set by the `CSTAR_LOCAL_CORES` environment
+    variable (e.g. in `~/.cstar.env`), and defaults to the number of cores on
+    this machine.
+
+    Returns
+    -------
+    LocalJobQueue
+        The shared queue
+
+    Raises
+    ------
+    ValueError
+        If `CSTAR_LOCAL_CORES` is not a positive whole number
+    """
+    setting = os.environ.get(LOCAL_CORES_ENV_VAR, "").strip()
+    if not setting:
+        max_cores = os.cpu_count() or 1
+    elif setting.isdigit() and int(setting) > 0:
+        max_cores = int(setting)
+    else:
+        raise ValueError(
+            f"{LOCAL_CORES_ENV_VAR} must be a positive whole number of cores, "
+            f"not {setting!r}"
+        )
+    if max_cores not in _default_queues:
+        _default_queues[max_cores] = LocalJobQueue(max_cores=max_cores)
+    return _default_queues[max_cores]
@@ -0,0 +1,221 @@
+import re
+import shlex
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar
+
+
+@dataclass(frozen=True)
+class StagedDataset:
+    """A partitioned dataset whose tiles are staged to node-local storage.
+
+    ROMS is given the path of the dataset (e.g. `/data/grid.nc`), from which each
+    rank derives the name of its own tile (`/data/grid.<rank>.nc`).
+
+    Attributes
+    ----------
+    source: Path
+        The path of the dataset given to ROMS
+    n_tiles: int
+        The number of tiles, one per rank
+    ndigits: int
+        The number of digits of the (zero-padded) rank in the tile names
+    """
+
+    source: Path
+    n_tiles: int
+    ndigits: int
+
+    @classmethod
+    def from_tiles(cls, source: Path, tiles: list[Path]) -> "StagedDataset":
+        """Describe the tiles of `source` among a list of partitioned files.
+
+        Parameters
+        ----------
+        source: Path
+            The path of the dataset given to ROMS, e.g. `/data/grid.nc`
+        tiles: list of Path
+            Partitioned files, among which are the tiles of `source`, e.g.
+            `/data/grid.00.nc`, `/data/grid.01.nc`, ...
+
+        Returns
+        -------
+        StagedDataset
+            The staged dataset
+
+        Raises
+        ------
+        ValueError
+            If the tiles of `source` are not numbered consistently from 0
+        """
+        pattern = re.compile(rf"{re.escape(source.stem)}\.(\d+)\.nc")
+        indices = [
+            m.group(1)
+            for tile in tiles
+            if (tile.parent == source.parent) and (m := pattern.fullmatch(tile.name))
+        ]
+        widths = {len(i) for i in indices}
+        if (
+            (not indices)
+            or (len(widths) != 1)
+            or (sorted(int(i) for i in indices) != list(range(len(indices))))
+        ):
+            raise ValueError(
+                f"Cannot stage {source}: its tiles are not numbered consistently "
+                "from 0 (found "
+                + (", ".join(sorted(indices)) if indices else "none")
+                + ")"
+            )
+        return cls(source=source, n_tiles=len(indices), ndigits=widths.pop())
+
+    @property
+    def tile_format(self) -> str:
+        """A `printf` format for the path of a tile, given its rank."""
+        return str(self.source.parent / f"{self.source.stem}.%0{self.ndigits}d.nc")
+
+
+@dataclass(frozen=True)
+class NodeLocalStaging:
+    """Staging of partitioned inputs to node-local storage within a scheduler job.
+
+    At start-up, and each time it reads forcing, every rank of a large ROMS run
+    opens its own tile of every input dataset. On a shared parallel filesystem,
+    thousands of ranks doing so at once overwhelm its metadata servers. With
+    staging, the job script instead:
+
+    1. copies, on every node at once, the tiles read by that node's ranks to a
+       directory on node-local storage (an SSD, a RAM disk, or a burst buffer),
+    2. writes the runtime settings file, from a template in which input and output
+       paths point to that directory (see `PLACEHOLDER`),
+    3. runs the commands, with ROMS reading and writing node-local files only,
+    4. copies the outputs back to the run directory, on every node at once, and
+       deletes the node-local directory, whether or not the commands succeeded.
+
+    Ranks are assumed to be placed on nodes in blocks of `ranks_per_node` (the
+    default for both SLURM and PBS). If the number of ranks per node is not known
+    when the script is written, every node receives every tile.
+
+    Attributes
+    ----------
+    datasets: tuple of StagedDataset
+        The partitioned datasets to stage
+    runtime_settings_template: Path
+        The runtime settings file in which node-local paths start with `PLACEHOLDER`
+    runtime_settings_file: Path
+        The runtime settings file written from the template by the job, with which
+        the commands should run
+    local_dir: str
+        The node-local directory in which to stage files, e.g. "/tmp", "$TMPDIR",
+        or "$DW_JOB_STRIPED". Environment variables are expanded by the job.
+    """
+
+    PLACEHOLDER: ClassVar[str] = "@CSTAR_NODE_LOCAL_DIR@"
+    """Stands for the node-local staging directory in the runtime settings template."""
+
+    OUTPUT_SUBDIR: ClassVar[str] = "output"
+    """The subdirectory of the staging directory in which outputs are written."""
+
+    datasets: tuple[StagedDataset, ...]
+    runtime_settings_template: Path
+    runtime_settings_file: Path
+    local_dir: str = "/tmp"
+
+    def wrap(
+        self,
+        commands: str,
+        run_path: Path,
+        job_name: str,
+        per_node_launcher: str,
+        node_id_var: str,
+        ranks_per_node: int | None = None,
+    ) -> str:
+        """Return job script commands running `commands` with inputs staged.
+
+        Parameters
+        ----------
+        commands: str
+            The commands to run once inputs are staged
+        run_path: Path
+            The directory in which the job runs, to which outputs are copied back
+        job_name: str
+            The name of the job, used to name the staging directory
+        per_node_launcher: str
+            A command running its arguments once on every node of the job
+        node_id_var: str
+            The environment variable holding the index of the node, as set by
+            `per_node_launcher`
+        ranks_per_node: int, optional
+            The number of consecutive ranks placed on each node
+
+        Returns
+        -------
+        str
+            The commands, preceded by staging in and followed by staging out
+        """
+        staging_dir = (
+            f"{self.local_dir}/cstar_{re.sub(r'[^A-Za-z0-9_.-]', '_', job_name)}"
+        )
+        stage_in = run_path / ".cstar_stage_in.sh"
+        stage_out = run_path / ".cstar_stage_out.sh"
+        lines = [
+            "# Stage partitioned inputs to node-local storage",
+            f'export CSTAR_NODE_LOCAL_DIR="{staging_dir}"',
+            f"cat > {shlex.quote(str(stage_in))} << 'CSTAR_EOF'",
+            self._stage_in_script(node_id_var, ranks_per_node),
+            "CSTAR_EOF",
+            f"cat > {shlex.quote(str(stage_out))} << 'CSTAR_EOF'",
+            self._stage_out_script(run_path),
+            "CSTAR_EOF",
+            f"{per_node_launcher} bash {shlex.quote(str(stage_in))} || exit 1",
+            f'sed "s|{self.PLACEHOLDER}|$CSTAR_NODE_LOCAL_DIR|g" '
+            f"{shlex.quote(str(self.runtime_settings_template))} "
+            f"> {shlex.quote(str(self.runtime_settings_file))}",
+            "",
+            # In a subshell, so that outputs are staged back even if it exits
+            "(",
+            commands,
+            ")",
+            "cstar_exit_status=$?",
+            "",
+            "# Copy outputs back from every node at once",
+            f"{per_node_launcher} bash {shlex.quote(str(stage_out))}",
+            "exit $cstar_exit_status",
+        ]
+        return "\n".join(lines)
+
+    def _stage_in_script(self, node_id_var: str, ranks_per_node: int | None) -> str:
+        """A script copying the tiles read by one node's ranks to that node."""
+        n_ranks = max((d.n_tiles for d in self.datasets), default=0)
+        lines = [
+            "set -e",
+            f'mkdir -p "$CSTAR_NODE_LOCAL_DIR/{self.OUTPUT_SUBDIR}"',
+        ]
+        if n_ranks == 0:
+            return "\n".join(lines)
+        if ranks_per_node is None:
+            lines += ["first=0", f"last={n_ranks - 1}"]
+        else:
+            lines += [
+                f"first=$(( ${{{node_id_var}:-0}} * {ranks_per_node} ))",
+                f"last=$(( first + {ranks_per_node} - 1 ))",
+                f"[ $last -lt {n_ranks} ] || last={n_ranks - 1}",
+            ]
+        lines.append("for ((rank = first; rank <= last; rank++)); do")
+        for dataset in self.datasets:
+            lines.append(
+                f'    cp "$(printf {shlex.quote(dataset.tile_format)} $rank)" '
+                '"$CSTAR_NODE_LOCAL_DIR/"'
+            )
+        lines.append("done")
+        return "\n".join(lines)
+
+    def _stage_out_script(self, run_path: Path) -> str:
+        """A script copying one node's outputs back and clearing its staging area."""
+        return "\n".join(
+            [
+                f'outputs=("$CSTAR_NODE_LOCAL_DIR/{self.OUTPUT_SUBDIR}"/*)',
+                f'[ -e "${{outputs[0]}}" ] && cp -p "${{outputs[@]}}" '
+                f"{shlex.quote(str(run_path))}/",
+                'rm -rf "$CSTAR_NODE_LOCAL_DIR"',
+            ]
+        )
@@ -0,0 +1,439 @@
+import shlex
+from dataclasses import dataclass
+from math import ceil
+from pathlib import Path
+
+from cstar.base.state_store import register_state_type
+from cstar.execution.handler import ExecutionHandler, ExecutionStatus
+from cstar.execution.scheduler_job import PBSJob, SlurmJob
+from cstar.system.manager import cstar_sysmgr
+from cstar.system.scheduler import PBSScheduler, Scheduler, SlurmScheduler
+
+
+@register_state_type("PackedMember")
+@dataclass(frozen=True)
+class PackedMember:
+    """One MPI run inside a `PackedJob`.
+
+    Attributes
+    ----------
+    name: str
+        A name for the run, unique within the job, used to name its output file
+    cpus: int
+        The number of MPI ranks the run uses
+    command: str
+        The executable and its arguments, e.g. "roms my_sim.in". The MPI launcher
+        (`mpi_exec_prefix -n N`) and the options binding the run to its share of the
+        job's nodes and cores are added by the job.
+    run_path: Path
+        The directory in which the run is executed
+    """
+
+    name: str
+    cpus: int
+    command: str
+    run_path: Path
+
+    @property
+    def output_file(self) -> Path:
+        """The file in which the run's STDOUT and STDERR are written."""
+        return self.run_path / f"{self.name}.out"
+
+    @property
+    def exit_code_file(self) -> Path:
+        """The file in which the run's exit code is written when it ends."""
+        return self.run_path / f".{self.name}.exitcode"
+
+
+@register_state_type("MemberPlacement")
+@dataclass(frozen=True)
+class MemberPlacement:
+    """Where a `PackedMember` runs within the nodes of a `PackedJob`.
+
+    Attributes
+    ----------
+    member: PackedMember
+        The run placed
+    first_node: int
+        The index of the first node (within the job's allocation) the run uses
+    nodes: int
+        The number of consecutive nodes the run uses
+    first_core: int
+        The first core the run uses on its node. Runs spanning several nodes use
+        those nodes exclusively, starting at core 0.
+    """
+
+    member: PackedMember
+    first_node: int
+    nodes: int
+    first_core: int
+
+    @property
+    def cpus_per_node(self) -> int:
+        """The number of ranks of the run placed on each of its nodes."""
+        return ceil(self.member.cpus / self.nodes)
+
+
+def pack_members(
+    members: list[PackedMember], cpus_per_node: int
+) -> list[MemberPlacement]:
+    """Assign runs to nodes so that as few nodes as possible are needed.
+
+    Runs needing no more than a node are packed first-fit, largest first, onto
+    shared nodes, each on its own range of cores. Larger runs are given as many
+    whole nodes as they need.
+
+    Parameters
+    ----------
+    members: list of PackedMember
+        The runs to place
+    cpus_per_node: int
+        The number of cores on each node
+
+    Returns
+    -------
+    list of MemberPlacement
+        The placement of each run, in the order of `members`
+    """
+    free: list[int] = []  # The number of unused cores on each node
+    placements: dict[str, MemberPlacement] = {}
+    for member in sorted(members, key=lambda m: m.cpus, reverse=True):
+        if member.cpus > cpus_per_node:
+            nodes = ceil(member.cpus / cpus_per_node)
+            placements[member.name] = MemberPlacement(member, len(free), nodes, 0)
+            free.extend([0] * nodes)
+            continue
+        node = next((i for i, f in enumerate(free) if f >= member.cpus), len(free))
+        if node == len(free):
+            free.append(cpus_per_node)
+        placements[member.name] = MemberPlacement(
+            member, node, 1, cpus_per_node - free[node]
+        )
+        free[node] -= member.cpus
+    return [placements[m.name] for m in members]
+
+
+@register_state_type("PackedJob")
+class PackedJob(ExecutionHandler):
+    """Several MPI runs executed concurrently within a single scheduler job.
+
+    On systems billing whole nodes, runs needing a fraction of a node each waste
+    most of the cores paid for. A `PackedJob` packs such runs onto as few nodes as
+    possible (see `pack_members`) and submits a single `SlurmJob` or `PBSJob` whose
+    script launches them all in the background, each bound to its own nodes and
+    cores, and waits for them to finish.
+
+    Each run writes its output to its own file in its `run_path`, and its exit
+    code to a hidden file beside it, from which the status of each run is
+    reported separately (see `member_status` and `handlers`).
+
+    Attributes
+    ----------
+    members: list of PackedMember
+        The runs executed in the job
+    placements: list of MemberPlacement
+        Where each run is executed within the job's nodes
+    job: SlurmJob or PBSJob
+        The scheduler job executing the runs
+    handlers: dict of str to PackedMemberHandler
+        An execution handler tracking each run, by name
+    status: ExecutionStatus
+        The status of the scheduler job as a whole
+    member_status: dict of str to ExecutionStatus
+        The status of each run, by name
+    output_file: Path
+        The scheduler job's output file
+    script: str
+        The job script submitted to the scheduler
+    """
+
+    def __init__(
+        self,
+        members: list[PackedMember],
+        account_key: str,
+        cpus_per_node: int | None = None,
+        mpi_exec_prefix: str | None = None,
+        script_path: str | Path | None = None,
+        run_path: str | Path | None = None,
+        job_name: str | None = None,
+        output_file: str | Path | None = None,
+        queue_name: str | None = None,
+        send_email: bool | None = True,
+        walltime: str | None = None,
+        scheduler: Scheduler | None = None,
+    ):
+        """Initialize a PackedJob.
+
+        Parameters
+        ----------
+        members: list of PackedMember
+            The runs to execute in the job
+        account_key: str
+            The account key to associate with the job for resource tracking.
+        cpus_per_node: int, optional
+            The number of cores on each node. Defaults to the scheduler's maximum
+            number of CPUs per node.
+        mpi_exec_prefix: str, optional
+            The command launching each MPI run. Defaults to the system's.
+        script_path, run_path, job_name, output_file, queue_name, send_email, walltime:
+            As for `create_scheduler_job`.
+        scheduler: Scheduler, optional
+            The scheduler to submit the job to. Defaults to the system's.
+
+        Raises
+        ------
+        ValueError
+            If there are no members, or their names are not unique
+        OSError
+            If `cpus_per_node` is not set and cannot be determined from the
+            scheduler
+        TypeError
+            If the scheduler is not SLURM or PBS
+        """
+        if not members:
+            raise ValueError("A PackedJob needs at least one member")
+        names = [m.name for m in members]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Members of a PackedJob need unique names, not {names}")
+
+        scheduler = scheduler if scheduler is not None else cstar_sysmgr.scheduler
+        job_type: type[SlurmJob] | type[PBSJob]
+        if isinstance(scheduler, SlurmScheduler):
+            job_type = SlurmJob
+        elif isinstance(scheduler, PBSScheduler):
+            job_type = PBSJob
+        else:
+            raise TypeError(f"Unsupported scheduler type: {type(scheduler).__name__}")
+
+        if cpus_per_node is None:
+            cpus_per_node = scheduler.global_max_cpus_per_node
+        if cpus_per_node is None:
+            raise OSError(
+                "C-Star is unable to determine your system's CPUs per node "
+                "automatically, and cannot pack runs onto nodes. "
+                "Provide 'cpus_per_node' and try again."
+            )
+
+        self.members = list(members)
+        self.placements = pack_members(self.members, cpus_per_node)
+        self._mpi_exec_prefix = (
+            mpi_exec_prefix
+            if mpi_exec_prefix is not None
+            else cstar_sysmgr.environment.mpi_exec_prefix
+        )
+
+        n_nodes = max(p.first_node + p.nodes for p in self.placements)
+        used_per_node = [0] * n_nodes
+        for p in self.placements:
+            for node in range(p.first_node, p.first_node + p.nodes):
+                used_per_node[node] += p.cpus_per_node
+
+        self.job: SlurmJob | PBSJob = job_type(
+            scheduler=scheduler,
+            commands=self._commands(scheduler),
+            account_key=account_key,
+            cpus=sum(m.cpus for m in self.members),
+            nodes=n_nodes,
+            cpus_per_node=max(used_per_node),
+            script_path=script_path,
+            run_path=run_path,
+            job_name=job_name,
+            output_file=output_file,
+            queue_name=queue_name,
+            send_email=send_email,
+            walltime=walltime,
+        )
+        self.handlers = {m.name: PackedMemberHandler(self, m) for m in self.members}
+
+    def __str__(self) -> str:
+        base_str = self.__class__.__name__ + "\n"
+        base_str += "-" * (len(base_str) - 1)
+        base_str += f"\nScheduler job: {self.job.__class__.__name__}"
+        base_str += f"\nJob name: {self.job.job_name}"
+        base_str += f"\nNodes: {self.job.nodes}"
+        base_str += "\nMembers:"
+        for p in self.placements:
+            base_str += (
+                f"\n    {p.member.name}: {p.member.cpus} CPUs on node(s) "
+                f"{p.first_node}-{p.first_node + p.nodes - 1}"
+            )
+        return base_str
+
+    def __repr__(self) -> str:
+        repr_str = f"{self.__class__.__name__}("
+        repr_str += f"\nmembers = {self.members!r},"
+        repr_str += f"\naccount_key = {self.job.account_key!r},"
+        repr_str += f"\njob_name = {self.job.job_name!r}"
+        repr_str += "\n)"
+        return repr_str
+
+    def _launch_command(self, placement: MemberPlacement, scheduler: Scheduler) -> str:
+        """The command launching one run, bound to its share of the job."""
+        member = placement.member
+        if isinstance(scheduler, SlurmScheduler):
+            # --exact restricts each job step to the cores it requests, so
+            # concurrent steps on a node do not share cores
+            options = f"--exact --ntasks={member.cpus} --cpu-bind=cores"
+            if scheduler.requires_task_distribution:
+                options += (
+                    f" --nodes={placement.nodes} --relative={placement.first_node}"
+                )
+            return f"{self._mpi_exec_prefix} {options} {member.command}"
+
+        if placement.nodes == 1:
+            hosts = f"${{CSTAR_NODES[{placement.first_node}]}}"
+            first = placement.first_core
+            cores = ":".join(str(c) for c in range(first, first + member.cpus))
+            binding = f"list:{cores}"
+        else:
+            hosts = (
+                f'$(IFS=,; echo "${{CSTAR_NODES[*]:'
+                f'{placement.first_node}:{placement.nodes}}}")'
+            )
+            binding = "core"
+        return (
+            f"{self._mpi_exec_prefix} -n {member.cpus} "
+            f"--ppn {placement.cpus_per_node} --hosts {hosts} "
+            f"--cpu-bind {binding} {member.command}"
+        )
+
+    def _commands(self, scheduler: Scheduler) -> str:
+        """The body of the job script, launching every run and awaiting them."""
+        lines = [f"# {len(self.members)} runs packed onto this job's nodes"]
+        if isinstance(scheduler, PBSScheduler):
+            lines.append(
+                "mapfile -t CSTAR_NODES < <(awk '!seen[$0]++' \"$PBS_NODEFILE\")"
+            )
+        for p in self.placements:
+            member = p.member
+            lines.append(
+                f"(cd {shlex.quote(str(member.run_path))} && "
+                f"{self._launch_command(p, scheduler)} "
+                f"> {shlex.quote(str(member.output_file))} 2>&1; "
+                f"echo $? > {shlex.quote(str(member.exit_code_file))}) &"
+            )
+        lines.append("wait")
+        lines.append("cstar_exit_status=0")
+        for member in self.members:
+            lines.append(
+                f'[ "$(cat {shlex.quote(str(member.exit_code_file))})" = 0 ] '
+                "|| cstar_exit_status=1"
+            )
+        lines.append("exit $cstar_exit_status")
+        return "\n".join(lines)
+
+    @property
+    def script(self) -> str:
+        """The job script submitted to the scheduler."""
+        return self.job.script
+
+    @property
+    def output_file(self) -> Path:
+        """The scheduler job's output file (each run has its own, too)."""
+        return self.job.output_file
+
+    @property
+    def id(self) -> int | None:
+        """The ID assigned to the job by the scheduler, if it has been submitted."""
+        return self.job.id
+
+    @property
+    def status(self) -> ExecutionStatus:
+        """The status of the scheduler job as a whole."""
+        return self.job.status
+
+    @property
+    def member_status(self) -> dict[str, ExecutionStatus]:
+        """The status of each run in the job, by name.
+
+        Runs report the job's status until they end, after which they are
+        `COMPLETED` or `FAILED` according to their own exit code. Runs that did
+        not end before the job did are `CANCELLED` or `FAILED`, as the job was.
+        """
+        job_status = self.status
+        return {m.name: self._member_status(m, job_status) for m in self.members}
+
+    def _member_status(
+        self, member: PackedMember, job_status: ExecutionStatus
+    ) -> ExecutionStatus:
+        if (job_status != ExecutionStatus.UNSUBMITTED) and (
+            member.exit_code_file.exists()
+        ):
+            exit_code = member.exit_code_file.read_text().strip()
+            return (
+                ExecutionStatus.COMPLETED
+                if exit_code == "0"
+                else ExecutionStatus.FAILED
+            )
+        if job_status == ExecutionStatus.ENDING:
+            return ExecutionStatus.RUNNING
+        if job_status == ExecutionStatus.COMPLETED:
+            return ExecutionStatus.UNKNOWN
+        return job_status
+
+    def submit(self) -> int | None:
+        """Submit the job to the scheduler.
+
+        The exit codes of any earlier submission are removed first.
+
+        Returns
+        -------
+        int or None
+            The ID assigned to the job by the scheduler
+        """
+        for member in self.members:
+            member.exit_code_file.unlink(missing_ok=True)
+        return self.job.submit()
+
+    def cancel(self) -> None:
+        """Cancel the job, and with it every run in it."""
+        self.job.cancel()
+
+
+@register_state_type("PackedMemberHandler")
+class PackedMemberHandler(ExecutionHandler):
+    """Tracks one run inside a `PackedJob`.
+
+    Attributes
+    ----------
+    packed_job: PackedJob
+        The job in which the run is executed
+    member: PackedMember
+        The run tracked
+    status: ExecutionStatus
+        The status of the run (see `PackedJob.member_status`)
+    output_file: Path
+        The run's own output file
+    """
+
+    def __init__(self, packed_job: PackedJob, member: PackedMember):
+        self.packed_job = packed_job
+        self.member = member
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(member = {self.member.name!r}, "
+            f"job_name = {self.packed_job.job.job_name!r})"
+            f"\nState: <status = {self.status!r}>"
+        )
+
+    @property
+    def status(self) -> ExecutionStatus:
+        """The status of the run (see `PackedJob.member_status`)."""
+        return self.packed_job._member_status(self.member, self.packed_job.status)
+
+    @property
+    def output_file(self) -> Path:
+        """The run's own output file."""
+        return self.member.output_file
+
+    def cancel(self) -> None:
+        """Cancel the packed job this run belongs to, and with it every run in it.
+
+        Runs cannot be cancelled individually.
+        """
+        self.log.warning(
+            f"Cancelling packed job {self.packed_job.job.job_name}, "
+            f"including all {len(self.packed_job.members)} runs in it"
+        )
+        self.packed_job.cancel()
@@ -0,0 +1,243 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+
+class OutputFollower:
+    """Incrementally reads the lines appended to an output file.
+
+    Each call to `read_lines` reads only what was written since the previous
+    call, so following the output of many long runs stays cheap however large
+    their output files grow. A line is only returned once it is complete (i.e.
+    ends with a newline).
+
+    Attributes
+    ----------
+    offset: int
+        The position in the file up to which lines have been read
+    """
+
+    def __init__(self):
+        """Initialize an OutputFollower, reading from the start of the file."""
+        self.offset = 0
+
+    def read_lines(self, path: Path) -> list[str]:
+        """Return the complete lines written to `path` since the last call.
+
+        If the file is shorter than when it was last read (e.g. it was
+        overwritten by a new run), it is read again from the start.
+
+        Parameters
+        ----------
+        path: Path
+            The file to read
+
+        Returns
+        -------
+        list of str
+            The new lines, without their line endings. Empty if the file does
+            not exist yet.
+        """
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, 2)
+                if f.tell() < self.offset:
+                    self.offset = 0
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return data[:end].decode(errors="replace").splitlines()
+
+
+@dataclass(frozen=True)
+class ProgressRecord:
+    """The state of a run, as reported by one line of its output.
+
+    Attributes
+    ----------
+    step: int
+        The model time step
+    model_time: float, optional
+        The model time, in days
+    diagnostics: dict of str to float
+        Other diagnostics reported with the step, e.g. the kinetic energy
+    """
+
+    step: int
+    model_time: float | None = None
+    diagnostics: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Progress:
+    """The progress of a run towards its final time step.
+
+    Attributes
+    ----------
+    step: int, optional
+        The latest model time step reported, if any
+    total_steps: int, optional
+        The number of time steps the run will take, if known
+    model_time: float, optional
+        The latest model time reported, in days
+    diagnostics: dict of str to float
+        The latest diagnostics reported, e.g. the kinetic energy
+    steps_per_second: float, optional
+        The recent rate of progress, once it can be measured
+    """
+
+    step: int | None = None
+    total_steps: int | None = None
+    model_time: float | None = None
+    diagnostics: dict[str, float] = field(default_factory=dict)
+    steps_per_second: float | None = None
+
+    @property
+    def percent_complete(self) -> float | None:
+        """The percentage of time steps completed, if the total is known."""
+        if (self.step is None) or not self.total_steps:
+            return None
+        return min(100.0, 100.0 * self.step / self.total_steps)
+
+    @property
+    def seconds_per_step(self) -> float | None:
+        """The recent wall-clock time taken by each time step."""
+        if not self.steps_per_second:
+            return None
+        return 1 / self.steps_per_second
+
+    @property
+    def eta(self) -> timedelta | None:
+        """The estimated wall-clock time until the final time step."""
+        if (
+            (self.step is None)
+            or (self.total_steps is None)
+            or (self.seconds_per_step is None)
+        ):
+            return None
+        remaining = max(0, self.total_steps - self.step)
+        return timedelta(seconds=round(remaining * self.seconds_per_step))
+
+    def __str__(self) -> str:
+        if self.step is None:
+            return "No progress reported yet"
+        parts = [
+            f"Step {self.step}"
+            + (f"/{self.total_steps}" if self.total_steps is not None else "")
+        ]
+        if self.percent_complete is not None:
+            parts[0] += f" ({self.percent_complete:.1f}%)"
+        if self.model_time is not None:
+            parts.append(f"day {self.model_time:.3f}")
+        if self.steps_per_second is not None:
+            parts.append(f"{self.steps_per_second:.3g} steps/s")
+        if self.eta is not None:
+            parts.append(f"ETA {self.eta}")
+        return ", ".join(parts)
+
+
+class ProgressMonitor(ABC):
+    """Tracks the progress of a run by incrementally parsing its output.
+
+    Subclasses implement `parse_line` for the output format of a model. The rate
+    of progress is measured from the wall-clock times at which `update` first
+    saw each new step, over the last `window` updates that saw one.
+
+    Attributes
+    ----------
+    total_steps: int, optional
+        The number of time steps the run will take, if known
+    window: int
+        The number of updates over which the rate of progress is measured
+    """
+
+    def __init__(self, total_steps: int | None = None, window: int = 10):
+        """Initialize a ProgressMonitor.
+
+        Parameters
+        ----------
+        total_steps: int, optional
+            The number of time steps the run will take, from which the
+            percentage complete and ETA are estimated
+        window: int, optional, default = 10
+            The number of updates over which the rate of progress is measured
+        """
+        self.total_steps = total_steps
+        self.window = window
+        self._follower = OutputFollower()
+        self._latest: ProgressRecord | None = None
+        self._samples: deque[tuple[float, int]] = deque(maxlen=window)
+
+    @abstractmethod
+    def parse_line(self, line: str) -> ProgressRecord | None:
+        """Parse one line of output.
+
+        Parameters
+        ----------
+        line: str
+            A line of the run's output
+
+        Returns
+        -------
+        ProgressRecord or None
+            The state of the run, if the line reports one
+        """
+        pass
+
+    def update(self, output_file: Path) -> Progress:
+        """Parse the output written since the last update.
+
+        Parameters
+        ----------
+        output_file: Path
+            The file to which the run writes its output
+
+        Returns
+        -------
+        Progress
+            The progress of the run as of its latest output
+        """
+        for line in self._follower.read_lines(output_file):
+            record = self.parse_line(line)
+            if record is not None:
+                self._latest = record
+
+        if self._latest is not None:
+            step = self._latest.step
+            if self._samples and (step < self._samples[-1][1]):
+                # The run started over, so earlier rates no longer apply
+                self._samples.clear()
+            if (not self._samples) or (self._samples[-1][1] != step):
+                self._samples.append((time.time(), step))
+        return self.progress
+
+    @property
+    def progress(self) -> Progress:
+        """The progress of the run as of the last update."""
+        if self._latest is None:
+            return Progress(total_steps=self.total_steps)
+        return Progress(
+            step=self._latest.step,
+            total_steps=self.total_steps,
+            model_time=self._latest.model_time,
+            diagnostics=self._latest.diagnostics,
+            steps_per_second=self._rate(),
+        )
+
+    def _rate(self) -> float | None:
+        """The number of steps per second over the recent updates."""
+        if len(self._samples) < 2:
+            return None
+        (t0, step0), (t1, step1) = self._samples[0], self._samples[-1]
+        if (t1 <= t0) or (step1 <= step0):
+            return None
+        rate = (step1 - step0) / (t1 - t0)
+        return rate if math.isfinite(rate) else None
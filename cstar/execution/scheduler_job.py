@@ -5,9 +5,12 @@ from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from math import ceil
 from pathlib import Path
+from typing import ClassVar
 
+from cstar.base.state_store import register_state_type
 from cstar.base.utils import _run_cmd
 from cstar.execution.handler import ExecutionHandler, ExecutionStatus
+from cstar.execution.node_staging import NodeLocalStaging
 from cstar.system.manager import cstar_sysmgr
 from cstar.system.scheduler import (
     PBSScheduler,
@@ -18,6 +21,16 @@ from cstar.system.scheduler import (
     SlurmScheduler,
 )
 
+SCHEDULER_QUERY_TIMEOUT = 60
+"""Seconds after which a scheduler query or cancellation is considered to have failed."""
+
+SCHEDULER_QUERY_RETRIES = 2
+"""How many more times to try a failed job status query.
+
+Only read-only queries are retried: a failed submission may still have queued the
+job, and a failed cancellation is usually not transient.
+"""
+
 
 def create_scheduler_job(
     commands: str,
@@ -32,6 +45,7 @@ def create_scheduler_job(
     queue_name: str | None = None,
     send_email: bool | None = True,
     walltime: str | None = None,
+    node_local_staging: NodeLocalStaging | None = None,
 ) -> "SchedulerJob":
     """Create a scheduler job for either SLURM or PBS based on the system's active
     scheduler.
@@ -67,6 +81,9 @@ def create_scheduler_job(
         Whether to send email notifications about job status. Defaults to True.
     walltime : str, optional
         The maximum walltime for the job, in the format "HH:MM:SS". Defaults to the queue's maximum.
+    node_local_staging : NodeLocalStaging, optional
+        If set, partitioned inputs are staged to node-local storage before the
+        commands run, and outputs are staged back afterwards.
 
     Returns
     -------
@@ -104,6 +121,7 @@ def create_scheduler_job(
         queue_name=queue_name,
         send_email=send_email,
         walltime=walltime,
+        node_local_staging=node_local_staging,
     )
 
 
@@ -152,6 +170,8 @@ class SchedulerJob(ExecutionHandler, ABC):
         A representation of the current status of the job, e.g. RUNNING or CANCELLED
     script: str
         The job script to be submitted to the scheduler.
+    node_local_staging : NodeLocalStaging or None
+        How partitioned inputs are staged to node-local storage, if they are.
 
     Methods
     -------
@@ -163,6 +183,12 @@ class SchedulerJob(ExecutionHandler, ABC):
         Stream live updates from the job's output file for the specified duration.
     """
 
+    per_node_launcher: ClassVar[str]
+    """A command running its arguments once on every node of the job."""
+
+    node_id_var: ClassVar[str]
+    """The environment variable holding the node index in `per_node_launcher`."""
+
     def __init__(
         self,
         scheduler: "Scheduler",
@@ -178,6 +204,7 @@ class SchedulerJob(ExecutionHandler, ABC):
         queue_name: str | None = None,
         send_email: bool | None = True,
         walltime: str | None = None,
+        node_local_staging: NodeLocalStaging | None = None,
     ):
         """Initialize a SchedulerJob instance.
 
@@ -217,6 +244,9 @@ class SchedulerJob(ExecutionHandler, ABC):
         walltime : str, optional
             The maximum walltime for the job, in the format "HH:MM:SS". If not provided,
             it defaults to the queue's maximum walltime.
+        node_local_staging : NodeLocalStaging, optional
+            If set, partitioned inputs are staged to node-local storage before the
+            commands run, and outputs are staged back afterwards.
 
         Raises
         ------
@@ -336,6 +366,7 @@ class SchedulerJob(ExecutionHandler, ABC):
 
         self._account_key = account_key
         self._id: int | None = None
+        self.node_local_staging = node_local_staging
 
     @property
     def output_file(self) -> Path:
@@ -401,6 +432,24 @@ class SchedulerJob(ExecutionHandler, ABC):
         """The commands to execute within the job script."""
         return self._commands
 
+    @property
+    def _script_body(self) -> str:
+        """The commands of the job script, including any node-local staging."""
+        if self.node_local_staging is None:
+            return self.commands
+        return self.node_local_staging.wrap(
+            self.commands,
+            run_path=self.run_path,
+            job_name=self.job_name,
+            per_node_launcher=self.per_node_launcher,
+            node_id_var=self.node_id_var,
+            ranks_per_node=(
+                self.cpus_per_node
+                if self.scheduler.requires_task_distribution
+                else None
+            ),
+        )
+
     @property
     def id(self) -> int | None:
         """Retrieve the unique job ID assigned by the scheduler.
@@ -511,6 +560,7 @@ class SchedulerJob(ExecutionHandler, ABC):
         return n_nodes_to_request, cores_to_request_per_node
 
 
+@register_state_type("SlurmJob")
 class SlurmJob(SchedulerJob):
     """Represents a job submitted to the SLURM scheduler.
 
@@ -562,6 +612,12 @@ class SlurmJob(SchedulerJob):
         Cancel the job using the SLURM `scancel` command.
     """
 
+    per_node_launcher: ClassVar[str] = (
+        'srun --nodes="$SLURM_JOB_NUM_NODES" --ntasks="$SLURM_JOB_NUM_NODES" '
+        "--ntasks-per-node=1"
+    )
+    node_id_var: ClassVar[str] = "SLURM_NODEID"
+
     @property
     def status(self) -> ExecutionStatus:
         """Retrieve the current status of the job from the SLURM scheduler.
@@ -590,7 +646,13 @@ class SlurmJob(SchedulerJob):
         else:
             sacct_cmd = f"sacct -j {self.id} --format=State%20 --noheader"
             msg_err = f"Failed to retrieve job status using {sacct_cmd}."
-            stdout = _run_cmd(sacct_cmd, msg_err=msg_err, raise_on_error=True)
+            stdout = _run_cmd(
+                sacct_cmd,
+                msg_err=msg_err,
+                raise_on_error=True,
+                timeout=SCHEDULER_QUERY_TIMEOUT,
+                retries=SCHEDULER_QUERY_RETRIES,
+            )
 
         # Map sacct states to ExecutionStatus enum
         sacct_status_map = {
@@ -599,6 +661,12 @@ class SlurmJob(SchedulerJob):
             "COMPLETED": ExecutionStatus.COMPLETED,
             "CANCELLED": ExecutionStatus.CANCELLED,
             "FAILED": ExecutionStatus.FAILED,
+            # Jobs ended by the system rather than by their own commands
+            "NODE_FAIL": ExecutionStatus.FAILED,
+            "BOOT_FAIL": ExecutionStatus.FAILED,
+            "PREEMPTED": ExecutionStatus.FAILED,
+            "TIMEOUT": ExecutionStatus.FAILED,
+            "OUT_OF_MEMORY": ExecutionStatus.FAILED,
         }
         for state, status in sacct_status_map.items():
             if state in stdout:
@@ -641,7 +709,7 @@ class SlurmJob(SchedulerJob):
             scheduler_script += f"\n#SBATCH {key} {value}"
 
         # Add roms command to scheduler script
-        scheduler_script += f"\n\n{self.commands}"
+        scheduler_script += f"\n\n{self._script_body}"
         return scheduler_script
 
     def submit(self) -> int | None:
@@ -713,9 +781,11 @@ class SlurmJob(SchedulerJob):
             raise_on_error=True,
             msg_post=f"Job {self.id} cancelled",
             msg_err="Non-zero exit code when cancelling job.",
+            timeout=SCHEDULER_QUERY_TIMEOUT,
         )
 
 
+@register_state_type("PBSJob")
 class PBSJob(SchedulerJob):
     """Represents a job submitted to the PBS (Portable Batch System) scheduler.
 
@@ -767,6 +837,11 @@ class PBSJob(SchedulerJob):
         Cancel the job using the PBS `qdel` command.
     """
 
+    per_node_launcher: ClassVar[str] = (
+        'mpiexec -n "$(sort -u "$PBS_NODEFILE" | wc -l)" --ppn 1'
+    )
+    node_id_var: ClassVar[str] = "PALS_NODEID"
+
     @property
     def script(self) -> str:
         """Generate the PBS-specific job script to be submitted to the scheduler.
@@ -796,7 +871,7 @@ class PBSJob(SchedulerJob):
             scheduler_script += f"\n#PBS {key} {value}"
         scheduler_script += "\ncd ${PBS_O_WORKDIR}"
 
-        scheduler_script += f"\n\n{self.commands}"
+        scheduler_script += f"\n\n{self._script_body}"
         return scheduler_script
 
     @property
@@ -829,7 +904,13 @@ class PBSJob(SchedulerJob):
 
         qstat_cmd = f"qstat -x -f -F json {self.id}"
         msg_err = f"Failed to retrieve job status using {qstat_cmd}."
-        stdout = _run_cmd(qstat_cmd, raise_on_error=True, msg_err=msg_err)
+        stdout = _run_cmd(
+            qstat_cmd,
+            raise_on_error=True,
+            msg_err=msg_err,
+            timeout=SCHEDULER_QUERY_TIMEOUT,
+            retries=SCHEDULER_QUERY_RETRIES,
+        )
 
         # Parse the JSON output
         try:
@@ -926,4 +1007,5 @@ class PBSJob(SchedulerJob):
             msg_err="Non-zero exit code when cancelling job.",
             msg_post=f"Job {self.id} cancelled",
             raise_on_error=True,
+            timeout=SCHEDULER_QUERY_TIMEOUT,
         )
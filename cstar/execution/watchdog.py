@@ -0,0 +1,305 @@
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from cstar.base.log import LoggingMixin
+from cstar.base.state_store import register_state_type
+from cstar.execution.handler import (
+    FINISHED_STATUSES,
+    ExecutionHandler,
+    ExecutionStatus,
+)
+from cstar.execution.packed_job import PackedMemberHandler
+from cstar.execution.progress import OutputFollower
+
+
+@register_state_type("FailureSignature")
+@dataclass(frozen=True)
+class FailureSignature:
+    """A pattern in a run's output showing that the run has failed.
+
+    Attributes
+    ----------
+    name: str
+        A short description of the failure, e.g. "CFL violation"
+    pattern: str
+        A regular expression matching output lines reporting the failure
+    """
+
+    name: str
+    pattern: str
+
+    def matches(self, line: str) -> bool:
+        """Whether `line` reports this failure."""
+        return re.search(self.pattern, line) is not None
+
+
+@register_state_type("WatchdogRules")
+@dataclass(frozen=True)
+class WatchdogRules:
+    """The conditions under which a `Watchdog` cancels a run.
+
+    Attributes
+    ----------
+    signatures: tuple of FailureSignature
+        Patterns in the output showing that the run has failed (e.g. blown up)
+    stall_seconds: float, optional
+        The number of seconds after which a running task that has made no
+        progress is considered hung. Progress is measured in time steps if the
+        handler has a `progress_monitor`, and in lines of output otherwise.
+        Stalls are not detected if None.
+    nonfinite_diagnostics: bool
+        Whether to cancel a run reporting NaN or infinite diagnostics (see
+        `Progress.diagnostics`)
+    """
+
+    signatures: tuple[FailureSignature, ...] = ()
+    stall_seconds: float | None = 1800.0
+    nonfinite_diagnostics: bool = True
+
+
+@dataclass(frozen=True)
+class WatchdogDiagnostic:
+    """The reason for which a `Watchdog` cancelled (or, in a packed job, flagged) a
+    run.
+
+    Attributes
+    ----------
+    reason: str
+        The rule the run broke, e.g. the name of a `FailureSignature`
+    detail: str
+        The evidence, e.g. the line of output matching the signature
+    time: datetime
+        When the run was cancelled
+    """
+
+    reason: str
+    detail: str
+    time: datetime
+
+    def __str__(self) -> str:
+        return f"{self.reason}: {self.detail}"
+
+
+class Watchdog(LoggingMixin):
+    """Cancels a run as soon as it fails or hangs, rather than at its walltime.
+
+    A run that blows up or hangs in MPI keeps its allocation until it reaches
+    its walltime, as schedulers only know whether its processes are alive. The
+    watchdog periodically checks a running task against a set of rules, and
+    cancels it as soon as:
+
+    - a line of its output matches a `FailureSignature`,
+    - it reports non-finite diagnostics, or
+    - it has made no progress for longer than `stall_seconds`.
+
+    The reason is kept in `diagnostic` and written next to the output file (see
+    `diagnostic_file`), so that it remains available after the session ends.
+    Output is read incrementally, so checking often is cheap.
+
+    Runs in a `PackedJob` cannot be cancelled on their own, and cancelling the
+    job would also end every other run in it, so a run of a packed job breaking
+    a rule is only reported, in the same way, and left to end by itself.
+
+    Attributes
+    ----------
+    handler: ExecutionHandler
+        The handler of the run to watch
+    rules: WatchdogRules
+        The conditions under which to cancel the run
+    diagnostic: WatchdogDiagnostic or None
+        The reason the run was cancelled, once it has been
+
+    Methods
+    -------
+    check()
+        Check the run once, cancelling it if it broke a rule.
+    watch(interval=60)
+        Check the run periodically until it finishes or is cancelled.
+    start(interval=60)
+        Watch the run in a background thread.
+    stop()
+        Stop watching the run in the background.
+    """
+
+    def __init__(self, handler: ExecutionHandler, rules: WatchdogRules):
+        """Initialize a Watchdog.
+
+        Parameters
+        ----------
+        handler: ExecutionHandler
+            The handler of the run to watch
+        rules: WatchdogRules
+            The conditions under which to cancel the run
+        """
+        self.handler = handler
+        self.rules = rules
+        self.diagnostic: WatchdogDiagnostic | None = None
+        self._follower = OutputFollower()
+        self._last_step: int | None = None
+        self._last_progress_time: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(handler = {self.handler!r}, "
+            f"rules = {self.rules!r})"
+            f"\nState: <diagnostic = {self.diagnostic!r}>"
+        )
+
+    @property
+    def diagnostic_file(self) -> Path:
+        """The file to which the reason for cancelling the run is written."""
+        output_file = self.handler.output_file
+        return output_file.parent / f"{output_file.stem}.watchdog"
+
+    def check(self) -> WatchdogDiagnostic | None:
+        """Check the run once, cancelling it if it broke a rule.
+
+        Only running tasks are checked: the stall timer starts with the first
+        check during which the task is running.
+
+        Returns
+        -------
+        WatchdogDiagnostic or None
+            The reason the run was cancelled, if it has been
+        """
+        if self.diagnostic is not None:
+            return self.diagnostic
+        if self.handler.status != ExecutionStatus.RUNNING:
+            return None
+
+        now = time.time()
+        lines = self._follower.read_lines(self.handler.output_file)
+        diagnostic = self._match_signatures(lines)
+        if diagnostic is None:
+            diagnostic = self._check_progress(bool(lines), now)
+        if diagnostic is not None:
+            self._trip(diagnostic)
+        return diagnostic
+
+    def watch(self, interval: float = 60) -> WatchdogDiagnostic | None:
+        """Check the run periodically until it finishes or is cancelled.
+
+        Parameters
+        ----------
+        interval: float, optional, default = 60
+            The number of seconds between checks
+
+        Returns
+        -------
+        WatchdogDiagnostic or None
+            The reason the run was cancelled, if the watchdog cancelled it
+        """
+        while not self._stop.is_set():
+            if (self.check() is not None) or (self.handler.status in FINISHED_STATUSES):
+                break
+            self._stop.wait(interval)
+        return self.diagnostic
+
+    def start(self, interval: float = 60) -> None:
+        """Watch the run in a background thread (see `watch`).
+
+        Parameters
+        ----------
+        interval: float, optional, default = 60
+            The number of seconds between checks
+        """
+        if (self._thread is not None) and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.watch, args=(interval,), name="cstar-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the run in the background."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _match_signatures(self, lines: list[str]) -> WatchdogDiagnostic | None:
+        """Look for a failure signature among new lines of output."""
+        for line in lines:
+            for signature in self.rules.signatures:
+                if signature.matches(line):
+                    return self._diagnose(signature.name, line.strip())
+        return None
+
+    def _check_progress(
+        self, new_output: bool, now: float
+    ) -> WatchdogDiagnostic | None:
+        """Look for non-finite diagnostics, or a stall since the last progress."""
+        progress = self.handler.progress
+        if (progress is not None) and (progress.step is not None):
+            if self.rules.nonfinite_diagnostics:
+                nonfinite = [
+                    name
+                    for name, value in progress.diagnostics.items()
+                    if not math.isfinite(value)
+                ]
+                if nonfinite:
+                    return self._diagnose(
+                        "non-finite diagnostics",
+                        f"{', '.join(nonfinite)} at step {progress.step}",
+                    )
+            advanced = progress.step != self._last_step
+            self._last_step = progress.step
+        else:
+            advanced = new_output
+
+        if advanced or (self._last_progress_time is None):
+            self._last_progress_time = now
+        elif (self.rules.stall_seconds is not None) and (
+            now - self._last_progress_time > self.rules.stall_seconds
+        ):
+            since = (
+                f"step {self._last_step}"
+                if self._last_step is not None
+                else "its last output"
+            )
+            return self._diagnose(
+                "stalled",
+                f"no progress for {now - self._last_progress_time:.0f} seconds "
+                f"since {since}",
+            )
+        return None
+
+    def _diagnose(self, reason: str, detail: str) -> WatchdogDiagnostic:
+        return WatchdogDiagnostic(reason=reason, detail=detail, time=datetime.now())
+
+    def _trip(self, diagnostic: WatchdogDiagnostic) -> None:
+        """Record why the run is being cancelled, then cancel it (unless it is part
+        of a packed job).
+        """
+        self.diagnostic = diagnostic
+        name = self.handler.output_file.stem
+        packed = isinstance(self.handler, PackedMemberHandler)
+        if packed:
+            self.log.error(
+                f"{name} broke a watchdog rule ({diagnostic}), but is not cancelled: "
+                "cancelling it would cancel every run in its packed job"
+            )
+        else:
+            self.log.error(f"Cancelling {name}: {diagnostic}")
+        try:
+            self.diagnostic_file.write_text(
+                f"{diagnostic.time.isoformat()} "
+                f"{'flagged' if packed else 'cancelled'} by C-Star watchdog\n"
+                f"{diagnostic}\n"
+            )
+        except OSError as e:
+            self.log.warning(f"Could not write {self.diagnostic_file}: {e}")
+        if packed:
+            return
+        try:
+            self.handler.cancel()
+        except (RuntimeError, NotImplementedError) as e:
+            self.log.error(f"Could not cancel {self.handler.output_file.stem}: {e}")
@@ -2,10 +2,13 @@ from pathlib import Path
 
 from cstar.base import ExternalCodeBase
 from cstar.base.gitutils import _clone_and_checkout
+from cstar.base.state_store import register_state_type
+from cstar.base.tracing import traced
 from cstar.base.utils import _run_cmd
 from cstar.system.manager import cstar_sysmgr
 
 
+@register_state_type("MARBLExternalCodeBase")
 class MARBLExternalCodeBase(ExternalCodeBase):
     """An implementation of the ExternalCodeBase class for the Marine Biogeochemistry
     Library.
@@ -31,6 +34,7 @@ class MARBLExternalCodeBase(ExternalCodeBase):
     def expected_env_var(self) -> str:
         return "MARBL_ROOT"
 
+    @traced(category="code")
     def get(self, target: str | Path) -> None:
         """Clone MARBL code to local machine, set environment, compile libraries.
 
@@ -61,4 +65,5 @@ class MARBLExternalCodeBase(ExternalCodeBase):
             msg_post=f"MARBL successfully installed at {target}",
             msg_err="Error when compiling MARBL.",
             raise_on_error=True,
+            stream=True,
         )
@@ -1,6 +1,8 @@
 from cstar.base.discretization import Discretization
+from cstar.base.state_store import register_state_type
 
 
+@register_state_type("ROMSDiscretization")
 class ROMSDiscretization(Discretization):
     """An implementation of the Discretization class for ROMS.
 
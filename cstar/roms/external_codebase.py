@@ -2,10 +2,13 @@ from pathlib import Path
 
 from cstar.base.external_codebase import ExternalCodeBase
 from cstar.base.gitutils import _clone_and_checkout
+from cstar.base.state_store import register_state_type
+from cstar.base.tracing import traced
 from cstar.base.utils import _run_cmd
 from cstar.system.manager import cstar_sysmgr
 
 
+@register_state_type("ROMSExternalCodeBase")
 class ROMSExternalCodeBase(ExternalCodeBase):
     """An implementation of the ExternalCodeBase class for the UCLA Regional Ocean
     Modeling System.
@@ -31,6 +34,7 @@ class ROMSExternalCodeBase(ExternalCodeBase):
     def expected_env_var(self) -> str:
         return "ROMS_ROOT"
 
+    @traced(category="code")
     def get(self, target: str | Path) -> None:
         """Clone ROMS code to local machine, set environment, compile libraries.
 
@@ -69,6 +73,7 @@ class ROMSExternalCodeBase(ExternalCodeBase):
             msg_pre="Compiling NHMG library...",
             msg_err="Error when compiling ROMS' NHMG library.",
             raise_on_error=True,
+            stream=True,
         )
         _run_cmd(
             f"make COMPILER={cstar_sysmgr.environment.compiler}",
@@ -77,4 +82,5 @@ class ROMSExternalCodeBase(ExternalCodeBase):
             msg_post=f"UCLA-ROMS is installed at {target}",
             msg_err="Error when compiling Tools-Roms.",
             raise_on_error=True,
+            stream=True,
         )
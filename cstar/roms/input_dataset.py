@@ -1,24 +1,194 @@
+import bisect
 import datetime as dt
+import os
+import re
 import shutil
 import tempfile
 from abc import ABC
+from array import array
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Any
+from typing import Any, cast, overload
 
 import requests
 import roms_tools
+import xarray as xr
 import yaml
 
 from cstar.base.input_dataset import InputDataset
+from cstar.base.state_store import register_state_type
+from cstar.base.tracing import span
 from cstar.base.utils import _get_sha256_hash, _list_to_concise_str
+from cstar.roms.tiling import (
+    DEFAULT_MAX_MEMORY,
+    TileIndexers,
+    partition_netcdf,
+    repartition_netcdf,
+    tile_indexers,
+    tile_paths,
+    write_tile,
+)
+
+_TILE_PATTERN = re.compile(r"^(?P<stem>.*)\.(?P<tile>\d+)\.nc$")
+"""Matches partitioned file names of the form `<stem>.<tile>.nc`."""
+
+
+@register_state_type("TileIndex")
+class TileIndex:
+    """A compact, sequence-like index of partitioned files and their metadata.
+
+    Rather than holding one `Path` (and `os.stat_result`) per file, runs of files
+    named `<stem>.<tile>.nc` with consecutive tile numbers are stored as a single
+    (stem, first tile, tile count, number of digits) group, and `Path` objects are
+    only built when indexed. File sizes, modification times and inodes are packed
+    into arrays, so that beyond its hash, each file adds only a few dozen bytes to
+    the footprint (and pickled size) of the index.
+
+    Files not following the `<stem>.<tile>.nc` convention are stored as
+    single-file groups.
+
+    Parameters
+    ----------
+    files : iterable of Path
+        Paths to the partitioned files, in order.
+
+    Methods
+    -------
+    record_metadata(i, stat_result, file_hash)
+        Store the size, modification time, inode and hash of the `i`th file
+    metadata_matches(i)
+        Check the `i`th file on disk against its recorded metadata
+    """
+
+    __slots__ = (
+        "_stems",
+        "_first_tiles",
+        "_ndigits",
+        "_offsets",
+        "_sizes",
+        "_mtimes_ns",
+        "_inodes",
+        "_hashes",
+    )
+
+    def __init__(self, files: Iterable[Path]):
+        self._stems: list[str] = []
+        self._first_tiles = array("q")
+        self._ndigits = array("b")  # 0 denotes a single, non-tile-numbered file
+        self._offsets = array("q", [0])
+
+        for f in files:
+            fstr = str(f)
+            match = _TILE_PATTERN.match(fstr)
+            if match is not None and self._stems:
+                stem, tile_str = match["stem"], match["tile"]
+                next_tile = self._first_tiles[-1] + self._offsets[-1]
+                next_tile -= self._offsets[-2]
+                if (
+                    stem == self._stems[-1]
+                    and len(tile_str) == self._ndigits[-1]
+                    and int(tile_str) == next_tile
+                ):
+                    self._offsets[-1] += 1
+                    continue
+            if match is not None:
+                self._stems.append(match["stem"])
+                self._first_tiles.append(int(match["tile"]))
+                self._ndigits.append(len(match["tile"]))
+            else:
+                self._stems.append(fstr)
+                self._first_tiles.append(0)
+                self._ndigits.append(0)
+            self._offsets.append(self._offsets[-1] + 1)
+
+        n_files = self._offsets[-1]
+        self._sizes = array("q", bytes(8 * n_files))
+        self._mtimes_ns = array("q", bytes(8 * n_files))
+        self._inodes = array("Q", bytes(8 * n_files))
+        self._hashes: list[str | None] = [None] * n_files
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    def _path(self, i: int) -> Path:
+        group = bisect.bisect_right(self._offsets, i) - 1
+        if self._ndigits[group] == 0:
+            return Path(self._stems[group])
+        tile = self._first_tiles[group] + i - self._offsets[group]
+        return Path(f"{self._stems[group]}.{tile:0{self._ndigits[group]}d}.nc")
+
+    @overload
+    def __getitem__(self, i: int) -> Path: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[Path]: ...
+
+    def __getitem__(self, i: int | slice) -> Path | list[Path]:
+        if isinstance(i, slice):
+            return [self._path(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        return self._path(i)
+
+    def __iter__(self) -> Iterator[Path]:
+        for i in range(len(self)):
+            yield self._path(i)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({_list_to_concise_str([str(f) for f in self])})"
+        )
+
+    def record_metadata(
+        self, i: int, stat_result: os.stat_result, file_hash: str | None = None
+    ) -> None:
+        """Store the size, modification time, inode and (optionally) the SHA-256
+        hash of the `i`th file.
+        """
+        self._sizes[i] = int(stat_result.st_size)
+        self._mtimes_ns[i] = int(stat_result.st_mtime_ns)
+        self._inodes[i] = int(stat_result.st_ino)
+        self._hashes[i] = file_hash
+
+    @property
+    def nbytes(self) -> int:
+        """The total recorded size of all files, in bytes."""
+        return sum(self._sizes)
+
+    def file_hash(self, i: int) -> str | None:
+        """The SHA-256 hash recorded for the `i`th file, if any."""
+        return self._hashes[i]
+
+    def metadata_matches(self, i: int) -> bool:
+        """Check whether the `i`th file exists and matches its recorded metadata.
+
+        As with `InputDataset.exists_locally`, the size is compared first, and a
+        mismatched modification time falls back to a comparison of hashes.
+        """
+        path = self._path(i)
+        if not path.exists():
+            return False
+        current_stats = path.stat()
+        if current_stats.st_size != self._sizes[i]:
+            return False
+        if current_stats.st_mtime_ns != self._mtimes_ns[i]:
+            recorded_hash = self._hashes[i]
+            return (recorded_hash is not None) and (
+                _get_sha256_hash(path.resolve()) == recorded_hash
+            )
+        return True
 
 
+@register_state_type("ROMSPartitioning")
 class ROMSPartitioning:
     """Describes a partitioning of a ROMS input dataset into a grid of subdomains.
 
     This object stores the number of partitions along the xi and eta dimensions,
-    along with the list of corresponding file paths. It supports indexing and
-    length queries like a sequence.
+    along with a compact index of the corresponding file paths and their
+    metadata (see `TileIndex`). It supports indexing and length queries like a
+    sequence.
 
     Parameters
     ----------
@@ -39,20 +209,165 @@ class ROMSPartitioning:
         Number of eta-direction partitions.
     files : list of Path
         Paths to the partitioned files.
+    tiles : TileIndex
+        The index of partitioned files and their metadata.
+    sources : list of Path or None
+        For a virtual partitioning (see `ROMSPartitioning.virtual`), the global
+        files from which the tiles are generated on demand.
     """
 
-    def __init__(self, np_xi: int, np_eta: int, files: list[Path]):
+    __slots__ = ("np_xi", "np_eta", "tiles", "sources", "_indexers", "_source_stats")
+
+    def __init__(self, np_xi: int, np_eta: int, files: Iterable[Path]):
         self.np_xi = np_xi
         self.np_eta = np_eta
-        self.files = files
-        self._local_file_hash_cache: dict = {}
-        self._local_file_stat_cache: dict = {}
+        self.tiles = TileIndex(files)
+        self.sources: list[Path] | None = None
+        self._indexers: list[list[TileIndexers]] = []
+        self._source_stats: list[tuple[int, int] | None] = []
+
+    @classmethod
+    def virtual(
+        cls, np_xi: int, np_eta: int, sources: Iterable[Path]
+    ) -> "ROMSPartitioning":
+        """Describe a partitioning of `sources` without writing any tiles.
+
+        Only the dimensions of each source are read, to record the slices forming
+        each tile. The tiles themselves are written by `materialize`, when needed.
+
+        Parameters
+        ----------
+        np_xi : int
+            Number of partitions along the xi axis.
+        np_eta : int
+            Number of partitions along the eta axis.
+        sources : iterable of Path
+            The global NetCDF files to partition.
+
+        Returns
+        -------
+        ROMSPartitioning
+            A partitioning whose files are named as `roms_tools.partition_netcdf`
+            would name them, but do not yet exist.
+        """
+        sources = [Path(s) for s in sources]
+        n_tiles = np_xi * np_eta
+        partitioning = cls(
+            np_xi=np_xi,
+            np_eta=np_eta,
+            files=[f for s in sources for f in tile_paths(s, n_tiles)],
+        )
+        partitioning.sources = sources
+        for source in sources:
+            with xr.open_dataset(source, decode_timedelta=False) as ds:
+                sizes = dict(ds.sizes)
+            partitioning._indexers.append(tile_indexers(sizes, np_xi, np_eta))
+        partitioning._source_stats = [None] * len(sources)
+        return partitioning
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(np_xi={self.np_xi}, np_eta={self.np_eta}, files={_list_to_concise_str(self.files, pad=43)})"
+        virtual_str = "virtual=True, " if self.is_virtual else ""
+        return f"{self.__class__.__name__}(np_xi={self.np_xi}, np_eta={self.np_eta}, {virtual_str}files={_list_to_concise_str([str(f) for f in self.tiles], pad=43)})"
 
     def __len__(self):
-        return len(self.files)
+        return len(self.tiles)
+
+    def __getitem__(self, i):
+        return self.tiles[i]
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self.tiles)
+
+    @property
+    def files(self) -> list[Path]:
+        """Paths to the partitioned files (built on access)."""
+        return list(self.tiles)
+
+    def record_metadata(self) -> None:
+        """Record the size, modification time, inode and SHA-256 hash of each
+        partitioned file, for later verification by `exists_locally`.
+        """
+        for i, path in enumerate(self.tiles):
+            self.tiles.record_metadata(i, path.stat(), _get_sha256_hash(path.resolve()))
+
+    @property
+    def is_virtual(self) -> bool:
+        """True if the tiles are generated on demand from `sources`."""
+        return self.sources is not None
+
+    def stale_tiles(self) -> list[int]:
+        """Indices of the tiles of a virtual partitioning that must be (re)written.
+
+        A tile is stale if it is missing, does not match the metadata recorded when
+        it was written, or its source has changed since.
+        """
+        if self.sources is None:
+            return []
+        n_tiles = self.np_xi * self.np_eta
+        stale: list[int] = []
+        for s, source in enumerate(self.sources):
+            source_stat = source.stat()
+            source_changed = self._source_stats[s] != (
+                source_stat.st_size,
+                source_stat.st_mtime_ns,
+            )
+            stale.extend(
+                i
+                for i in range(s * n_tiles, (s + 1) * n_tiles)
+                if source_changed or not self.tiles.metadata_matches(i)
+            )
+        return stale
+
+    def materialize(self) -> list[Path]:
+        """Write any missing or out-of-date tiles of a virtual partitioning.
+
+        Each tile is read directly from its source, one variable at a time, so no
+        global file is ever loaded and unchanged tiles are not rewritten.
+
+        Returns
+        -------
+        list of Path
+            The tiles that were written
+        """
+        stale = self.stale_tiles()
+        if (self.sources is None) or (not stale):
+            return []
+
+        n_tiles = self.np_xi * self.np_eta
+        written = []
+        with span(
+            "materialize",
+            category="dataset",
+            np_xi=self.np_xi,
+            np_eta=self.np_eta,
+            tiles=len(stale),
+        ) as s:
+            for i in stale:
+                source = self.sources[i // n_tiles]
+                path = write_tile(
+                    source, self.tiles[i], self._indexers[i // n_tiles][i % n_tiles]
+                )
+                self.tiles.record_metadata(i, path.stat())
+                s.add_bytes(path.stat().st_size)
+                written.append(path)
+            for n, source in enumerate(self.sources):
+                source_stat = source.stat()
+                self._source_stats[n] = (source_stat.st_size, source_stat.st_mtime_ns)
+        return written
+
+    @property
+    def exists_locally(self) -> bool:
+        """True if every partitioned file exists and matches its recorded metadata."""
+        return all(self.tiles.metadata_matches(i) for i in range(len(self.tiles)))
+
+    @property
+    def local_hash(self) -> dict[Path, str]:
+        """Mapping of partitioned file paths to their recorded SHA-256 hashes."""
+        return {
+            path: file_hash
+            for i, path in enumerate(self.tiles)
+            if (file_hash := self.tiles.file_hash(i)) is not None
+        }
 
 
 class ROMSInputDataset(InputDataset, ABC):
@@ -97,6 +412,33 @@ class ROMSInputDataset(InputDataset, ABC):
             return (self.source_np_xi, self.source_np_eta)
         return None
 
+    @property
+    def _working_path_is_partitioning(self) -> bool:
+        """True if `working_path` is the set of files tracked by `partitioning`, as
+        is the case when fetched from a partitioned source.
+        """
+        return (
+            (self.partitioning is not None)
+            and isinstance(self.working_path, list)
+            and (len(self.working_path) == len(self.partitioning))
+            and (len(self.working_path) > 0)
+            and (self.working_path[0] == self.partitioning[0])
+        )
+
+    @property
+    def exists_locally(self) -> bool:
+        if self._working_path_is_partitioning:
+            assert self.partitioning is not None
+            return self.partitioning.exists_locally
+        return super().exists_locally
+
+    @property
+    def local_hash(self) -> dict | None:
+        if self._working_path_is_partitioning:
+            assert self.partitioning is not None
+            return self.partitioning.local_hash
+        return super().local_hash
+
     def to_dict(self) -> dict:
         input_dataset_dict = super().to_dict()
         if self.source_partitioning is not None:
@@ -123,7 +465,12 @@ class ROMSInputDataset(InputDataset, ABC):
         return repr_str
 
     def partition(
-        self, np_xi: int, np_eta: int, overwrite_existing_files: bool = False
+        self,
+        np_xi: int,
+        np_eta: int,
+        overwrite_existing_files: bool = False,
+        virtual: bool = False,
+        max_memory: int | str | None = None,
     ):
         """Partition a netCDF dataset into tiles to run ROMS in parallel.
 
@@ -131,6 +478,10 @@ class ROMSInputDataset(InputDataset, ABC):
         roms-tools' partition_netcdf method to create multiple, smaller
         netCDF files, each of which corresponds to a processor used by ROMS.
 
+        If `virtual` is True, no files are written: only the slices of the source
+        forming each tile are recorded, and the tiles are written directly from
+        the source by `ROMSPartitioning.materialize()` when ROMS is launched.
+
         Parameters:
         -----------
         np_xi (int):
@@ -140,12 +491,23 @@ class ROMSInputDataset(InputDataset, ABC):
         overwrite_existing_files (bool, optional):
            If `True` and this `ROMSInputDataset` has already been partitioned,
            the existing files will be overwritten
+        virtual (bool, optional):
+           If `True`, defer writing the partitioned files until they are needed
+        max_memory (int or str, optional):
+           If set, partition with C-Star's streaming partitioner, holding at most
+           this much data (e.g. "512M") in memory at once, rather than with
+           roms-tools, which loads each variable in full
 
         Notes:
         ------
         - This method will only work on ROMSInputDataset instances corresponding
            to locally available files, i.e. ROMSInputDataset.get() has been called.
         - This method sets the ROMSInputDataset.partitioning attribute
+        - If the files were fetched from a partitioned source with a different
+           arrangement, they are repartitioned tile-to-tile and replaced, without
+           reconstructing the global file. As the fetched tiles are replaced, this
+           requires `overwrite_existing_files`, and as there is no global file to
+           write tiles from later, they are repartitioned even if `virtual` is set.
         """
 
         # Helper functions
@@ -204,12 +566,46 @@ class ROMSInputDataset(InputDataset, ABC):
 
             for idfile in files:
                 self.log.info(f"Partitioning {idfile} into ({np_xi},{np_eta})")
+                if max_memory is not None:
+                    result = partition_netcdf(
+                        idfile, np_xi=np_xi, np_eta=np_eta, max_memory=max_memory
+                    )
+                    new_parted_files.extend(result.files)
+                    continue
                 new_parted_files.extend(
                     roms_tools.partition_netcdf(idfile, np_xi=np_xi, np_eta=np_eta)
                 )
 
             return [f.resolve() for f in new_parted_files]
 
+        def repartition_files(files: list[Path]) -> list[Path]:
+            """Helper function that repartitions the tiles fetched from a
+            partitioned source directly, without reconstructing the global file.
+            """
+            assert self.partitioning is not None
+            match = _TILE_PATTERN.match(files[0].name)
+            stem = match["stem"] if match else files[0].stem
+            local_dir = files[0].parent
+            self.log.info(
+                f"Repartitioning {stem} from ({self.partitioning.np_xi},"
+                f"{self.partitioning.np_eta}) into ({np_xi},{np_eta})"
+            )
+
+            # New tiles may share names with the old, so write them elsewhere first
+            with tempfile.TemporaryDirectory(dir=local_dir) as tmpdir:
+                result = repartition_netcdf(
+                    files,
+                    source_np_xi=self.partitioning.np_xi,
+                    source_np_eta=self.partitioning.np_eta,
+                    np_xi=np_xi,
+                    np_eta=np_eta,
+                    output=Path(tmpdir) / f"{stem}.nc",
+                    max_memory=max_memory or DEFAULT_MAX_MEMORY,
+                )
+                for f in files:
+                    f.unlink()
+                return [f.replace(local_dir / f.name) for f in result.files]
+
         def backup_existing_partitioned_files(files: list[Path]):
             """Helper function to move existing parted files to a tmp dir while
             attempting to create new ones.
@@ -236,6 +632,41 @@ class ROMSInputDataset(InputDataset, ABC):
 
         id_files_to_partition = get_files_to_partition()
         existing_files = self.partitioning.files if self.partitioning else None
+
+        if self._working_path_is_partitioning:
+            # Fetched from a partitioned source: there is no global file to use
+            if virtual:
+                self.log.warning(
+                    f"{self.__class__.__name__} was fetched from a partitioned "
+                    "source, so there is no global file to partition virtually. "
+                    "Repartitioning its tiles now instead."
+                )
+            with span(
+                "repartition",
+                category="dataset",
+                dataset=self.__class__.__name__,
+                np_xi=np_xi,
+                np_eta=np_eta,
+            ) as s:
+                new_files = repartition_files(id_files_to_partition)
+                self._update_partitioning_attribute(
+                    parted_files=new_files, new_np_xi=np_xi, new_np_eta=np_eta
+                )
+                self.working_path = new_files
+                s.add_bytes(cast(ROMSPartitioning, self.partitioning).tiles.nbytes)
+            return
+
+        if virtual:
+            self.log.info(
+                f"Recording virtual partitioning of {self.__class__.__name__} "
+                f"into ({np_xi},{np_eta})"
+            )
+            for f in existing_files or []:
+                f.unlink(missing_ok=True)
+            self.partitioning = ROMSPartitioning.virtual(
+                np_xi=np_xi, np_eta=np_eta, sources=id_files_to_partition
+            )
+            return
         tempdir_obj, backupdir, partitioning_succeeded = None, None, False
 
         try:
@@ -244,10 +675,18 @@ class ROMSInputDataset(InputDataset, ABC):
                     existing_files
                 )
 
-            new_files = partition_files(id_files_to_partition)
-            self._update_partitioning_attribute(
-                parted_files=new_files, new_np_xi=np_xi, new_np_eta=np_eta
-            )
+            with span(
+                "partition",
+                category="dataset",
+                dataset=self.__class__.__name__,
+                np_xi=np_xi,
+                np_eta=np_eta,
+            ) as s:
+                new_files = partition_files(id_files_to_partition)
+                self._update_partitioning_attribute(
+                    parted_files=new_files, new_np_xi=np_xi, new_np_eta=np_eta
+                )
+                s.add_bytes(cast(ROMSPartitioning, self.partitioning).tiles.nbytes)
             partitioning_succeeded = True
         finally:
             if (existing_files) and (not partitioning_succeeded) and (backupdir):
@@ -288,13 +727,30 @@ class ROMSInputDataset(InputDataset, ABC):
             return
 
         if self.source.source_type == "yaml":
-            self._get_from_yaml(local_dir=local_dir)
+            with span(
+                "generate",
+                category="dataset",
+                dataset=self.__class__.__name__,
+                source=self.source.location,
+            ) as s:
+                self._get_from_yaml(local_dir=local_dir)
+                s.add_bytes(
+                    sum(st.st_size for st in self._local_file_stat_cache.values())
+                )
         elif self.source_partitioning is not None:
-            self._get_from_partitioned_source(
-                local_dir=local_dir,
-                source_np_xi=self.source_partitioning[0],
-                source_np_eta=self.source_partitioning[1],
-            )
+            with span(
+                "fetch",
+                category="dataset",
+                dataset=self.__class__.__name__,
+                source=self.source.location,
+            ) as s:
+                self._get_from_partitioned_source(
+                    local_dir=local_dir,
+                    source_np_xi=self.source_partitioning[0],
+                    source_np_eta=self.source_partitioning[1],
+                )
+                if self.source.location_type == "url":
+                    s.add_bytes(cast(ROMSPartitioning, self.partitioning).tiles.nbytes)
         else:
             super().get(local_dir=local_dir)
 
@@ -311,12 +767,13 @@ class ROMSInputDataset(InputDataset, ABC):
             source = self.source.location.replace(old_suffix, new_suffix)
             source_basename = self.source.basename.replace(old_suffix, new_suffix)
 
-            self._symlink_or_download_from_source(
+            self._stage_or_download_from_source(
                 source_location=source,
                 location_type=self.source.location_type,
                 expected_file_hash=None,
                 target_path=local_dir / source_basename,
                 logger=self.log,
+                staging_methods=self.staging_methods,
             )
 
             parted_files.append(local_dir / source_basename)
@@ -324,10 +781,8 @@ class ROMSInputDataset(InputDataset, ABC):
         self._update_partitioning_attribute(
             new_np_xi=source_np_xi, new_np_eta=source_np_eta, parted_files=parted_files
         )
+        # File metadata is tracked by self.partitioning (see `exists_locally`)
         self.working_path = parted_files
-        assert self.partitioning is not None
-        self._local_file_stat_cache.update(self.partitioning._local_file_stat_cache)
-        self._local_file_hash_cache.update(self.partitioning._local_file_hash_cache)
 
     def _get_from_yaml(self, local_dir: str | Path) -> None:
         """Handle the special case where the input dataset source is a `roms-tools`
@@ -426,13 +881,7 @@ class ROMSInputDataset(InputDataset, ABC):
         self.partitioning = ROMSPartitioning(
             np_xi=new_np_xi, np_eta=new_np_eta, files=parted_files
         )
-
-        self.partitioning._local_file_hash_cache = {
-            path: _get_sha256_hash(path.resolve()) for path in parted_files
-        }  # 27
-        self.partitioning._local_file_stat_cache = {
-            path: path.stat() for path in parted_files
-        }
+        self.partitioning.record_metadata()
 
     @property
     def path_for_roms(self) -> list[Path]:
@@ -447,7 +896,7 @@ class ROMSInputDataset(InputDataset, ABC):
         if self.partitioning is not None:
             ndigits = len(str(self.partitioning.np_xi * self.partitioning.np_eta))
             zero_str = "." + "0" * ndigits + ".nc"
-            zero_files = [f for f in self.partitioning.files if zero_str in str(f)]
+            zero_files = [f for f in self.partitioning if zero_str in str(f)]
             return [Path(str(f).replace(zero_str, ".nc")) for f in zero_files]
 
         raise FileNotFoundError(
@@ -457,12 +906,14 @@ class ROMSInputDataset(InputDataset, ABC):
         )
 
 
+@register_state_type("ROMSModelGrid")
 class ROMSModelGrid(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for model grid files."""
 
     pass
 
 
+@register_state_type("ROMSInitialConditions")
 class ROMSInitialConditions(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for model initial condition
     files.
@@ -471,12 +922,14 @@ class ROMSInitialConditions(ROMSInputDataset):
     pass
 
 
+@register_state_type("ROMSTidalForcing")
 class ROMSTidalForcing(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for model tidal forcing files."""
 
     pass
 
 
+@register_state_type("ROMSBoundaryForcing")
 class ROMSBoundaryForcing(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for model boundary condition
     files.
@@ -485,6 +938,7 @@ class ROMSBoundaryForcing(ROMSInputDataset):
     pass
 
 
+@register_state_type("ROMSSurfaceForcing")
 class ROMSSurfaceForcing(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for model surface forcing
     files.
@@ -493,12 +947,14 @@ class ROMSSurfaceForcing(ROMSInputDataset):
     pass
 
 
+@register_state_type("ROMSRiverForcing")
 class ROMSRiverForcing(ROMSInputDataset):
     """An implementation of the ROMSInputDataset class for river forcing files."""
 
     pass
 
 
+@register_state_type("ROMSForcingCorrections")
 class ROMSForcingCorrections(ROMSInputDataset):
     """ROMS forcing correction file, such as SW correction or restoring fields.
 
@@ -0,0 +1,339 @@
+import bisect
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import ClassVar
+
+from cstar.base.log import LoggingMixin
+
+DATE_FORMAT = "%Y%m%d%H%M%S"
+
+
+@dataclass(frozen=True)
+class OutputFile:
+    """A file written by ROMS, identified from its name.
+
+    ROMS names its outputs `<prefix>_<stream>.<YYYYMMDDHHMMSS>[.<tile>].nc`, where
+    the date is that of the first record in the file and the tile, if present, is
+    the rank that wrote it.
+
+    Attributes
+    ----------
+    path: Path
+        The path of the file
+    prefix: str
+        The root name of the outputs, e.g. the simulation name
+    stream: str
+        The output stream, e.g. "rst", "his" or "bgc"
+    date: datetime
+        The date of the first record in the file
+    tile: int or None
+        The rank that wrote the file, if it is one tile of a partitioned output
+    """
+
+    NAME_PATTERN: ClassVar[re.Pattern] = re.compile(
+        r"(?P<prefix>.+)_(?P<stream>[^_.]+)\.(?P<date>\d{14})(?:\.(?P<tile>\d+))?\.nc"
+    )
+    """The names of ROMS output files."""
+
+    path: Path
+    prefix: str
+    stream: str
+    date: datetime
+    tile: int | None = None
+
+    @classmethod
+    def from_path(cls, path: Path) -> "OutputFile | None":
+        """Identify a ROMS output file from its name.
+
+        Parameters
+        ----------
+        path: Path
+            The path of the file
+
+        Returns
+        -------
+        OutputFile or None
+            The output file, or None if the name is not that of a ROMS output
+        """
+        match = cls.NAME_PATTERN.fullmatch(path.name)
+        if match is None:
+            return None
+        try:
+            date = datetime.strptime(match["date"], DATE_FORMAT)
+        except ValueError:
+            return None
+        return cls(
+            path=path,
+            prefix=match["prefix"],
+            stream=match["stream"],
+            date=date,
+            tile=None if match["tile"] is None else int(match["tile"]),
+        )
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether this file is one tile of a partitioned output."""
+        return self.tile is not None
+
+
+class OutputCatalog(LoggingMixin):
+    """An index of the files ROMS wrote to an output directory.
+
+    Files are indexed by stream, date and partition, so that the outputs of a
+    stream at, before or after a given date are found by bisection rather than
+    by listing directories that may hold tens of thousands of files. The output
+    directory and its `PARTITIONED` subdirectory (see `ROMSSimulation.post_run`)
+    are only listed by `refresh()`.
+
+    The catalogue is saved in the output directory (see `CATALOG_FILE`), so that
+    it is listed once however many times it is queried.
+
+    Attributes
+    ----------
+    directory: Path
+        The output directory
+    streams: list of str
+        The output streams found, e.g. ["his", "rst"]
+
+    Methods
+    -------
+    load(directory)
+        Load the saved catalogue of a directory, listing it if there is none.
+    refresh()
+        List the output directory again.
+    update()
+        List the output directory again, and save the catalogue.
+    save()
+        Save the catalogue in the output directory.
+    dates(stream)
+        The dates of the outputs of a stream.
+    files(stream, date, partitioned=False)
+        The outputs of a stream starting at a given date.
+    time_range(stream, date)
+        The dates covered by the outputs of a stream starting at a given date.
+    between(stream, start=None, end=None)
+        The dates of the outputs of a stream within a range.
+    nearest(stream, date)
+        The date of the outputs of a stream nearest to a given date.
+    """
+
+    CATALOG_FILE: ClassVar[str] = ".cstar_output_catalog.json"
+    """The name of the file in which the catalogue is saved."""
+
+    PARTITIONED_SUBDIR: ClassVar[str] = "PARTITIONED"
+    """The subdirectory to which `post_run` moves joined tiles."""
+
+    def __init__(self, directory: str | Path):
+        """Initialize an empty OutputCatalog.
+
+        Parameters
+        ----------
+        directory: str or Path
+            The output directory
+        """
+        self.directory = Path(directory)
+        self._files: dict[str, dict[datetime, list[OutputFile]]] = {}
+        self._dates: dict[str, list[datetime]] = {}
+
+    def __repr__(self) -> str:
+        n_files = sum(
+            len(files) for stream in self._files.values() for files in stream.values()
+        )
+        return (
+            f"{self.__class__.__name__}(directory = {self.directory!r})"
+            f"\nState: <streams = {self.streams!r}, files = {n_files}>"
+        )
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "OutputCatalog":
+        """Load the saved catalogue of a directory, listing it if there is none.
+
+        Parameters
+        ----------
+        directory: str or Path
+            The output directory
+
+        Returns
+        -------
+        OutputCatalog
+            The catalogue
+        """
+        catalog = cls(directory)
+        catalog_file = catalog.directory / cls.CATALOG_FILE
+        try:
+            paths = json.loads(catalog_file.read_text())["files"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            catalog.update()
+            return catalog
+        for path in paths:
+            catalog._add(catalog.directory / path)
+        return catalog
+
+    @property
+    def streams(self) -> list[str]:
+        """The output streams found, e.g. ["his", "rst"]."""
+        return sorted(self._files)
+
+    def refresh(self) -> None:
+        """List the output directory again, replacing the files indexed."""
+        self._files = {}
+        self._dates = {}
+        for directory in (
+            self.directory,
+            self.directory / self.PARTITIONED_SUBDIR,
+        ):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            self._add(Path(entry.path))
+            except FileNotFoundError:
+                continue
+
+    def update(self) -> None:
+        """List the output directory again, and save the catalogue if it exists."""
+        self.refresh()
+        if self.directory.is_dir():
+            self.save()
+
+    def save(self) -> None:
+        """Save the catalogue in the output directory."""
+        paths = sorted(
+            str(f.path.relative_to(self.directory))
+            for stream in self._files.values()
+            for files in stream.values()
+            for f in files
+        )
+        (self.directory / self.CATALOG_FILE).write_text(
+            json.dumps({"files": paths}, indent=0)
+        )
+
+    def dates(self, stream: str) -> list[datetime]:
+        """The dates of the outputs of a stream, in order.
+
+        Parameters
+        ----------
+        stream: str
+            The output stream, e.g. "rst"
+
+        Returns
+        -------
+        list of datetime
+            The dates of the first records of the stream's files
+        """
+        return list(self._dates.get(stream, []))
+
+    def files(
+        self, stream: str, date: datetime, partitioned: bool = False
+    ) -> list[OutputFile]:
+        """The outputs of a stream starting at a given date.
+
+        Parameters
+        ----------
+        stream: str
+            The output stream, e.g. "rst"
+        date: datetime
+            The date of the first record in the files
+        partitioned: bool, optional, default = False
+            Whether to return the tiles of partitioned outputs rather than
+            joined outputs
+
+        Returns
+        -------
+        list of OutputFile
+            The files, ordered by tile if partitioned
+        """
+        files = self._files.get(stream, {}).get(date, [])
+        return sorted(
+            (f for f in files if f.partitioned == partitioned),
+            key=lambda f: (f.prefix, f.tile or 0),
+        )
+
+    def time_range(
+        self, stream: str, date: datetime
+    ) -> tuple[datetime, datetime | None]:
+        """The dates covered by the outputs of a stream starting at a given date.
+
+        Parameters
+        ----------
+        stream: str
+            The output stream, e.g. "his"
+        date: datetime
+            The date of the first record in the files
+
+        Returns
+        -------
+        tuple of datetime
+            The date of their first record, and the date of the first record of
+            the next files of the stream (None if they are the last)
+        """
+        dates = self._dates.get(stream, [])
+        i = bisect.bisect_right(dates, date)
+        return date, (dates[i] if i < len(dates) else None)
+
+    def between(
+        self,
+        stream: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[datetime]:
+        """The dates of the outputs of a stream within a range.
+
+        Parameters
+        ----------
+        stream: str
+            The output stream, e.g. "rst"
+        start: datetime, optional
+            The earliest date to include
+        end: datetime, optional
+            The latest date to include
+
+        Returns
+        -------
+        list of datetime
+            The dates within the range, in order
+        """
+        dates = self._dates.get(stream, [])
+        lo = 0 if start is None else bisect.bisect_left(dates, start)
+        hi = len(dates) if end is None else bisect.bisect_right(dates, end)
+        return dates[lo:hi]
+
+    def nearest(self, stream: str, date: datetime) -> datetime | None:
+        """The date of the outputs of a stream nearest to a given date.
+
+        Parameters
+        ----------
+        stream: str
+            The output stream, e.g. "rst"
+        date: datetime
+            The date sought
+
+        Returns
+        -------
+        datetime or None
+            The nearest date (the earlier one, if two are equally near), or None
+            if the stream has no outputs
+        """
+        dates = self._dates.get(stream, [])
+        if not dates:
+            return None
+        i = bisect.bisect_left(dates, date)
+        candidates = dates[max(0, i - 1) : i + 1]
+        return min(candidates, key=lambda d: abs(d - date))
+
+    def _add(self, path: Path) -> None:
+        """Index one file, if it is a ROMS output."""
+        output_file = OutputFile.from_path(path)
+        if output_file is None:
+            return
+        stream = self._files.setdefault(output_file.stream, {})
+        if output_file.date not in stream:
+            stream[output_file.date] = []
+            bisect.insort(
+                self._dates.setdefault(output_file.stream, []), output_file.date
+            )
+        stream[output_file.date].append(output_file)
@@ -0,0 +1,81 @@
+import math
+from typing import ClassVar
+
+from cstar.execution.progress import ProgressMonitor, ProgressRecord
+
+
+class ROMSProgressMonitor(ProgressMonitor):
+    """Tracks the progress of a ROMS run from the diagnostics in its output.
+
+    Every few time steps, ROMS writes a line of diagnostics under a header
+    naming them, e.g.::
+
+         STEP  time[DAYS]  KINETIC_ENRG  BAROTR_KE  MAX_ADV_CFL  MAX_VERT_CFL
+            1  0.00347222  5.501183E-03  2.96E-03   2.70E-01     1.50E-01
+
+    Columns are identified from the latest header, so that diagnostics are
+    reported under their own names whichever ROMS configuration wrote them.
+    Values too large for their field (written as asterisks by Fortran) are
+    reported as NaN.
+    """
+
+    STEP_COLUMN: ClassVar[str] = "STEP"
+    """The first column of the header naming the diagnostics."""
+
+    def __init__(self, total_steps: int | None = None, window: int = 10):
+        """Initialize a ROMSProgressMonitor.
+
+        Parameters
+        ----------
+        total_steps: int, optional
+            The number of time steps the run will take (see
+            `ROMSSimulation._n_time_steps`)
+        window: int, optional, default = 10
+            The number of updates over which the rate of progress is measured
+        """
+        super().__init__(total_steps=total_steps, window=window)
+        self._columns: list[str] = []
+
+    def parse_line(self, line: str) -> ProgressRecord | None:
+        """Parse a line of ROMS diagnostics, or the header naming them.
+
+        Parameters
+        ----------
+        line: str
+            A line of ROMS output
+
+        Returns
+        -------
+        ProgressRecord or None
+            The step, model time and diagnostics, if the line reports them
+        """
+        tokens = line.split()
+        if not tokens:
+            return None
+        if tokens[0] == self.STEP_COLUMN:
+            self._columns = tokens
+            return None
+        if len(tokens) < len(self._columns) or not self._columns:
+            return None
+
+        try:
+            step = int(tokens[0])
+            values = [_to_float(t) for t in tokens[1 : len(self._columns)]]
+        except ValueError:
+            return None
+
+        model_time = None
+        diagnostics = {}
+        for name, value in zip(self._columns[1:], values):
+            if name.lower().startswith("time"):
+                model_time = value
+            else:
+                diagnostics[name] = value
+        return ProgressRecord(step=step, model_time=model_time, diagnostics=diagnostics)
+
+
+def _to_float(token: str) -> float:
+    """Convert a Fortran-formatted number, which may have overflowed its field."""
+    if set(token) == {"*"}:
+        return math.nan
+    return float(token.replace("D", "E").replace("d", "e"))
@@ -1,9 +1,16 @@
 import abc
+import functools
+import hashlib
+import threading
 import types
+import typing
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
 from pathlib import Path
 from typing import (
     Any,
     ClassVar,
+    NamedTuple,
     Self,
     get_args,
     get_origin,
@@ -71,6 +78,90 @@ def _get_alias(field_name: str) -> str:
     return CUSTOM_ALIAS_LOOKUP.get(field_name, field_name)
 
 
+def _parse_fortran_float(value: str) -> float:
+    """Parse a float, allowing Fortran-style exponents (e.g. 5.0D0)."""
+    return float(value.upper().replace("D", "E"))
+
+
+class _FieldPlan(NamedTuple):
+    """Precomputed instructions for parsing a single field of a section."""
+
+    name: str
+    kind: str
+    """One of "scalar", "joined_str" (all entries joined) or "list" (remaining
+    entries)."""
+    converter: Callable[[str], Any]
+    """Converts a single entry (or list item) to the expected type."""
+
+
+class _SectionSchema(NamedTuple):
+    """Parsing and serialization plan for a `ROMSRuntimeSettingsSection` subclass."""
+
+    key_order: tuple[str, ...]
+    fields: tuple[_FieldPlan, ...]
+    header: str
+    """The serialized section header, e.g. `time_stepping: ntimes dt ndtfast ninfo`"""
+    single_entry_adapter: TypeAdapter | None
+    """For single-entry sections, a TypeAdapter for the annotation of the entry."""
+
+
+def _strip_optional(annotation: Any) -> Any:
+    """Return `X` for an annotation `X | None`, otherwise the annotation itself."""
+    if get_origin(annotation) in (types.UnionType, typing.Union):
+        annotation_args = get_args(annotation)
+        if type(None) in annotation_args and len(annotation_args) == 2:
+            return [t for t in annotation_args if t is not type(None)][0]
+    return annotation
+
+
+@functools.cache
+def _compile_section_schema(
+    section_cls: type["ROMSRuntimeSettingsSection"],
+) -> _SectionSchema:
+    """Resolve the type annotations of a section class into a `_SectionSchema`.
+
+    Resolving annotations (`get_origin`/`get_args`) is comparatively slow, so this
+    is done once per class rather than each time a section is parsed or
+    serialized.
+    """
+    key_order = tuple(section_cls.__pydantic_fields__.keys())
+
+    field_plans = []
+    for key in key_order:
+        expected_type = _strip_optional(section_cls.__pydantic_fields__[key].annotation)
+
+        if get_origin(expected_type) is list:
+            field_plans.append(_FieldPlan(key, "list", get_args(expected_type)[0]))
+            break  # assume list field consumes the rest
+        elif expected_type is float:
+            field_plans.append(_FieldPlan(key, "scalar", _parse_fortran_float))
+        elif (expected_type is str) and (len(key_order) == 1):
+            field_plans.append(_FieldPlan(key, "joined_str", str))
+        else:
+            field_plans.append(_FieldPlan(key, "scalar", expected_type))
+
+    # single entry sections use the one and only field as the section name
+    # multi-value sections use their alias
+    is_single_entry = issubclass(section_cls, SingleEntryROMSRuntimeSettingsSection)
+    if is_single_entry and key_order:
+        section_name = key_order[0]
+    else:
+        section_name = _get_alias(section_cls.__name__)
+
+    single_entry_adapter = None
+    if is_single_entry and key_order:
+        annotation = section_cls.__pydantic_fields__[key_order[0]].annotation
+        assert annotation is not None
+        single_entry_adapter = TypeAdapter(annotation)
+
+    return _SectionSchema(
+        key_order=key_order,
+        fields=tuple(field_plans),
+        header=f"{section_name}: {' '.join(key_order)}\n",
+        single_entry_adapter=single_entry_adapter,
+    )
+
+
 class ROMSRuntimeSettingsSection(BaseModel, abc.ABC):
     """Base class containing common serialization/deserialization methods used by
     subsections of the ROMS runtime input file.
@@ -162,32 +253,20 @@ class ROMSRuntimeSettingsSection(BaseModel, abc.ABC):
         time_stepping: ntimes dt ndtfast ninfo
              1    2    3    4
         """
-        # Make a dictionary out of the pydantic attributes:
-        data = {k: getattr(self, k) for k in self.key_order}
+        schema = _compile_section_schema(type(self))
 
-        section_values = []
-
-        # for each non-None k/v, format and join the values
-        for value in [x for x in data.values() if x is not None]:
-            section_values.append(self._format_and_join_values(value))
+        # for each non-None value, format and join the values
+        section_values = [
+            self._format_and_join_values(value)
+            for value in (getattr(self, k) for k in schema.key_order)
+            if value is not None
+        ]
 
         # combine all the values in this section into a single string
         section_values_as_single_str = self._intervalue_delimiter.join(section_values)
 
-        # single entry sections use the one and only field as the section name
-        # multi-value sections use their alias
-        if isinstance(self, SingleEntryROMSRuntimeSettingsSection):
-            section_name = list(self.__pydantic_fields__.keys())[0]
-        else:
-            section_name = _get_alias(type(self).__name__)
-
         # Build the serialized string
-        section_header = f"{section_name}: {' '.join(data.keys())}\n"
-        serialized = ""
-        serialized += section_header
-        serialized += f"    {section_values_as_single_str}\n"
-        serialized += "\n"
-        return serialized
+        return f"{schema.header}    {section_values_as_single_str}\n\n"
 
     @classmethod
     def from_lines(cls, lines: list[str]) -> Self:
@@ -216,46 +295,26 @@ class ROMSRuntimeSettingsSection(BaseModel, abc.ABC):
         if not lines:
             raise ValueError("Received empty input.")
 
-        annotations = cls.__annotations__
-        kwargs = {}
+        schema = _compile_section_schema(cls)
+        kwargs: dict[str, Any] = {}
 
         # Decide how to flatten the section based on multi_line flag
         flat = lines if cls.multi_line else lines[0].split()
 
-        i = 0  # index of the entry
-        key_order = list(cls.__pydantic_fields__.keys())
-        for key in key_order:
-            annotation = annotations[key]
-            annotation_origin = get_origin(annotation)
-
-            # if, e.g. Optional[list[Path]] we just want list[Path]
-            if annotation_origin is types.UnionType:
-                annotation_args = get_args(annotation)
-                if (
-                    type(None) in annotation_args and len(annotation_args) == 2
-                ):  # then Optional
-                    expected_type = [t for t in annotation_args if t is not None][0]
-                else:
-                    expected_type = annotation
+        for i, field_plan in enumerate(schema.fields):
+            if field_plan.kind == "list":
+                values = lines if cls.multi_line else flat[i:]
+                kwargs[field_plan.name] = [field_plan.converter(v) for v in values]
+            elif field_plan.kind == "joined_str":
+                kwargs[field_plan.name] = " ".join(flat)
             else:
-                expected_type = annotation
-
-            if get_origin(expected_type) is not list:
                 # This doesn't reformat e.g. 5.0D0 -> 5.0
-                if expected_type is float:
-                    kwargs[key] = expected_type(flat[i].upper().replace("D", "E"))
-                elif (expected_type is str) and (len(key_order) == 1):
-                    kwargs[key] = " ".join(flat)
-                else:
-                    kwargs[key] = expected_type(flat[i])
-                i += 1
-            # Handle list[...] types
-            else:
-                item_type = get_args(expected_type)[0]
-                values = lines if cls.multi_line else flat[i:]
-                kwargs[key] = [item_type(v) for v in values]
-                break  # assume list field consumes the rest
+                kwargs[field_plan.name] = field_plan.converter(flat[i])
 
+        if len(kwargs) == len(schema.key_order):
+            # Every value has already been converted to its annotated type, so
+            # pydantic validation can be skipped
+            return cls.model_construct(**kwargs)
         return cls(**kwargs)
 
 
@@ -285,15 +344,21 @@ class SingleEntryROMSRuntimeSettingsSection(ROMSRuntimeSettingsSection):
         if data in [None, [], ""]:
             return None
 
+        # Already-constructed sections need no further checks
+        if isinstance(data, cls):
+            return handler(data)
+
         # If the data passed in is a single value that matches the annotation, initialize the class as if it had been
         # called with the appropriate Class(key=value) syntax
-        field_name, annotation = list(cls.__annotations__.items())[0]
+        schema = _compile_section_schema(cls)
+        field_name = schema.key_order[0]
+        assert schema.single_entry_adapter is not None
 
         try:
             # TypeAdapter allows you to check annotations or annotated classes against arbitrary objects.
             # Here, we use strict=True because we only want to allow this shortcut syntax if the type
             # matches exactly; we don't allow coercion.
-            TypeAdapter(annotation).validate_python(data, strict=True)
+            schema.single_entry_adapter.validate_python(data, strict=True)
             return handler({field_name: data})
 
         except ValidationError:
@@ -442,6 +507,13 @@ class MYBakMixing(ROMSRuntimeSettingsSection):
     q2nu4: float
 
 
+_FROM_FILE_CACHE: OrderedDict[tuple[type, str], "ROMSRuntimeSettings"] = OrderedDict()
+"""Least-recently-used cache of settings parsed by `ROMSRuntimeSettings.from_file`,
+keyed by class and file hash."""
+_FROM_FILE_CACHE_SIZE = 128
+_FROM_FILE_CACHE_LOCK = threading.Lock()
+
+
 class ROMSRuntimeSettings(BaseModel):
     title: Title
     time_stepping: TimeStepping
@@ -555,6 +627,13 @@ class ROMSRuntimeSettings(BaseModel):
         with filepath.open() as f:
             lines = list(f)
 
+        return ROMSRuntimeSettings._parse_raw_sections(lines)
+
+    @staticmethod
+    def _parse_raw_sections(lines: Iterable[str]) -> dict[str, list[str]]:
+        """Parse the lines of a roms.in file into a dictionary of sections (see
+        `_load_raw_sections`).
+        """
         sections = {}
         current_section = None
         section_lines: list[str] = []
@@ -592,6 +671,10 @@ class ROMSRuntimeSettings(BaseModel):
         translates that dictionary into a ROMSRuntimeSettings instance with properly
         formatted attributes.
 
+        Parsed settings are cached, keyed by the SHA-256 hash of the file contents,
+        so reading an unchanged (or identical) file again returns a copy of the
+        cached instance without re-parsing.
+
         Parameters
         ----------
         - filepath (Path or str):
@@ -602,8 +685,34 @@ class ROMSRuntimeSettings(BaseModel):
         - `ROMSRuntimeSettings.to_file()`: writes a ROMSRuntimeSettings instance to a
            ROMS-compatible `.in` file
         """
-        # Read file
-        sections = cls._load_raw_sections(filepath)
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"File {filepath} does not exist.")
+
+        contents = filepath.read_bytes()
+        cache_key = (cls, hashlib.sha256(contents).hexdigest())
+        with _FROM_FILE_CACHE_LOCK:
+            cached_settings = _FROM_FILE_CACHE.get(cache_key)
+            if cached_settings is not None:
+                _FROM_FILE_CACHE.move_to_end(cache_key)
+
+        if cached_settings is None:
+            cached_settings = cls._from_raw_sections(
+                cls._parse_raw_sections(contents.decode().splitlines())
+            )
+            with _FROM_FILE_CACHE_LOCK:
+                _FROM_FILE_CACHE[cache_key] = cached_settings
+                while len(_FROM_FILE_CACHE) > _FROM_FILE_CACHE_SIZE:
+                    _FROM_FILE_CACHE.popitem(last=False)
+
+        # Return a copy, so that modifying it does not affect the cached instance
+        return cached_settings.model_copy(deep=True)
+
+    @classmethod
+    def _from_raw_sections(cls, sections: dict[str, list[str]]) -> Self:
+        """Create a ROMSRuntimeSettings instance from the output of
+        `_parse_raw_sections`.
+        """
         required_fields = {"title", "time_stepping", "bottom_drag", "output_root_name"}
         missing_required_fields = required_fields - sections.keys()
         if missing_required_fields:
@@ -804,7 +913,7 @@ class ROMSRuntimeSettings(BaseModel):
             section = getattr(self, field_name)
             if section is None:
                 continue
-            output += section.model_dump()
+            output += section.default_serializer()
 
         return output
 
@@ -1,9 +1,15 @@
+import copy
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
 from datetime import datetime
 from itertools import chain
 from pathlib import Path
 from typing import Any, Optional, cast
 
+import netCDF4
 import requests
+import xarray as xr
 import yaml
 
 import cstar.roms.runtime_settings
@@ -11,13 +17,22 @@ from cstar import Simulation
 from cstar.base.additional_code import AdditionalCode
 from cstar.base.datasource import DataSource
 from cstar.base.external_codebase import ExternalCodeBase
+from cstar.base.state_store import register_state_type
+from cstar.base.tracing import traced
 from cstar.base.utils import (
     _dict_to_tree,
+    _format_size,
     _get_sha256_hash,
     _run_cmd,
 )
-from cstar.execution.handler import ExecutionHandler, ExecutionStatus
+from cstar.execution.handler import (
+    FINISHED_STATUSES,
+    ExecutionHandler,
+    ExecutionStatus,
+)
 from cstar.execution.local_process import LocalProcess
+from cstar.execution.node_staging import NodeLocalStaging, StagedDataset
+from cstar.execution.packed_job import PackedJob, PackedMember
 from cstar.execution.scheduler_job import create_scheduler_job
 from cstar.marbl.external_codebase import MARBLExternalCodeBase
 from cstar.roms.discretization import ROMSDiscretization
@@ -32,10 +47,21 @@ from cstar.roms.input_dataset import (
     ROMSSurfaceForcing,
     ROMSTidalForcing,
 )
+from cstar.roms.output_catalog import OutputCatalog
+from cstar.roms.progress import ROMSProgressMonitor
 from cstar.roms.runtime_settings import ROMSRuntimeSettings
+from cstar.roms.tiling import (
+    JoinResult,
+    NetCDFCompression,
+    extract_tiles,
+    join_netcdf,
+)
+from cstar.roms.watchdog import ROMS_WATCHDOG_RULES
+from cstar.roms.zarr_export import export_zarr
 from cstar.system.manager import cstar_sysmgr
 
 
+@register_state_type("ROMSSimulation")
 class ROMSSimulation(Simulation):
     """A specialized `Simulation` subclass for configuring and running ROMS (Regional
     Ocean Modeling System) simulations.
@@ -93,6 +119,11 @@ class ROMSSimulation(Simulation):
         List of all external codebases in use (e.g., ROMS, MARBL).
     is_setup : bool
         True if all required components have been retrieved and configured locally.
+    output_catalog : OutputCatalog
+        An index of the files ROMS wrote to the output directory.
+    watchdog_rules : WatchdogRules
+        The conditions under which `watch()` cancels a run, by default on ROMS
+        blow-ups, CFL violations, NaN diagnostics, MPI aborts and stalls.
 
 
     Methods
@@ -109,6 +140,8 @@ class ROMSSimulation(Simulation):
         Processes model outputs after execution.
     restart(new_end_date)
         Creates a new ROMS simulation instance from a restart file.
+    update_runtime_settings(**sections)
+        Persistently overrides sections of `roms_runtime_settings`.
 
     See Also
     --------
@@ -118,6 +151,27 @@ class ROMSSimulation(Simulation):
     discretization: ROMSDiscretization
     runtime_code: AdditionalCode
 
+    _transient_attributes = Simulation._transient_attributes | {
+        "_runtime_settings_cache",
+        "_in_file_hash_memo",
+        "_output_catalog_cache",
+    }
+
+    _runtime_settings_cache: tuple[tuple, ROMSRuntimeSettings] | None = None
+    """The runtime settings last built by `roms_runtime_settings`, with the
+    fingerprint of the configuration they were built from."""
+
+    _in_file_hash_memo: tuple[tuple[Path, int, int], str] | None = None
+    """The SHA-256 hash of the `.in` file, keyed by its path, size and mtime."""
+
+    _runtime_settings_overrides: dict[str, Any] | None = None
+    """Sections set via `update_runtime_settings`, applied on every rebuild."""
+
+    _output_catalog_cache: OutputCatalog | None = None
+    """The catalogue of the output directory last loaded by `output_catalog`."""
+
+    watchdog_rules = ROMS_WATCHDOG_RULES
+
     def __init__(
         self,
         name: str,
@@ -309,21 +363,21 @@ class ROMSSimulation(Simulation):
             )
 
     def _check_inputdataset_partitioning(self) -> None:
-        """If a ROMSInputDataset's source is already partitioned, confirm that the
-        partitioning matches the processor distribution of the simulation and raise a
-        ValueError if not.
+        """If a ROMSInputDataset's source is already partitioned differently to the
+        processor distribution of the simulation, log that its files will be
+        repartitioned (tile-to-tile) by `pre_run()`.
         """
         for inp in self.input_datasets:
             if inp.source_partitioning:
                 if (inp.source_np_xi != self.discretization.n_procs_x) or (
                     inp.source_np_eta != self.discretization.n_procs_y
                 ):
-                    raise ValueError(
-                        f"Cannot instantiate ROMSSimulation with "
-                        f"n_procs_x={self.discretization.n_procs_x}, "
-                        f"n_procs_y={self.discretization.n_procs_y} "
-                        "when {inp.__class__.__name__} has partitioning "
-                        f"({inp.source_np_xi},{inp.source_np_eta}) at source."
+                    self.log.info(
+                        f"{inp.__class__.__name__} has partitioning "
+                        f"({inp.source_np_xi},{inp.source_np_eta}) at source, and "
+                        "will be repartitioned to "
+                        f"({self.discretization.n_procs_x},"
+                        f"{self.discretization.n_procs_y}) by pre_run()"
                     )
 
     def _check_inputdataset_dates(self) -> None:
@@ -577,6 +631,46 @@ class ROMSSimulation(Simulation):
         run_length_seconds = int((self.end_date - self.start_date).total_seconds())
         return run_length_seconds // self.discretization.time_step
 
+    def _runtime_settings_fingerprint(self) -> tuple | None:
+        """Summarize everything `roms_runtime_settings` is derived from.
+
+        The `.in` file is only re-hashed if its size or modification time has
+        changed. Input datasets and their partitioning are compared by identity, as
+        `ROMSInputDataset.partition()` always attaches a new `ROMSPartitioning`.
+
+        Returns
+        -------
+        tuple or None
+            A hashable fingerprint of the runtime settings inputs, or None if the
+            `.in` file cannot be found (in which case nothing is cached).
+        """
+        in_file = cast(Path, self.runtime_code.working_path) / self._in_file
+        try:
+            stat = in_file.stat()
+        except OSError:
+            return None
+
+        stat_key = (in_file, stat.st_size, stat.st_mtime_ns)
+        if self._in_file_hash_memo is None or self._in_file_hash_memo[0] != stat_key:
+            self._in_file_hash_memo = (stat_key, _get_sha256_hash(in_file.resolve()))
+
+        return (
+            in_file,
+            self._in_file_hash_memo[1],
+            tuple(self.runtime_code.files),
+            self.discretization.time_step,
+            self.start_date,
+            self.end_date,
+            self.model_grid,
+            self.initial_conditions,
+            self.tidal_forcing,
+            self.river_forcing,
+            tuple(self.surface_forcing),
+            tuple(self.boundary_forcing),
+            tuple(self.forcing_corrections),
+            tuple(ds.partitioning for ds in self.input_datasets),
+        )
+
     @property
     def roms_runtime_settings(self) -> ROMSRuntimeSettings:
         """Generate and return a ROMSRuntimeSettings object for the simulation.
@@ -587,6 +681,12 @@ class ROMSSimulation(Simulation):
         steps, grid path, initial conditions, forcing datasets, and optionally, MARBL
         input files.
 
+        The result is cached, and only rebuilt once the contents of the `.in` file,
+        the time step, the dates, the input datasets or their partitioning change.
+        Changes made directly to the returned object therefore persist between
+        accesses until the next rebuild; use `update_runtime_settings()` to make
+        changes that also survive rebuilds.
+
         Returns
         -------
         ROMSRuntimeSettings
@@ -605,6 +705,10 @@ class ROMSSimulation(Simulation):
           `self.model_grid`, `self.initial_conditions`, and all forcing datasets.
         - If MARBL configuration files are present in `runtime_code.files`, their paths
           are also included.
+
+        See Also
+        --------
+        update_runtime_settings : Persistently override sections of the settings.
         """
         if self.runtime_code.working_path is None:
             raise ValueError(
@@ -613,10 +717,19 @@ class ROMSSimulation(Simulation):
                 + "ROMSSimulation.runtime_code.get() and try again."
             )
 
+        fingerprint = self._runtime_settings_fingerprint()
+        cached = self._runtime_settings_cache
+        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
         simulation_runtime_settings = ROMSRuntimeSettings.from_file(
             self.runtime_code.working_path / self._in_file
         )
 
+        # Apply any user overrides before the values set by the simulation itself
+        for section_name, section in (self._runtime_settings_overrides or {}).items():
+            setattr(simulation_runtime_settings, section_name, copy.deepcopy(section))
+
         # Modify each relevant section in the runtime settings object based on blueprint values
         simulation_runtime_settings.time_stepping.dt = self.discretization.time_step
         simulation_runtime_settings.time_stepping.ntimes = self._n_time_steps
@@ -656,8 +769,48 @@ class ROMSSimulation(Simulation):
         else:
             simulation_runtime_settings.marbl_biogeochemistry = None
 
+        if fingerprint is not None:
+            self._runtime_settings_cache = (fingerprint, simulation_runtime_settings)
         return simulation_runtime_settings
 
+    def update_runtime_settings(self, **sections: Any) -> None:
+        """Persistently override sections of the runtime settings.
+
+        Overrides are kept with the simulation (including by `persist()` and
+        `restart()`) and are re-applied whenever `roms_runtime_settings` is rebuilt.
+        Values derived from the simulation itself (time step, number of time steps,
+        grid, initial conditions, forcing and MARBL files) always take precedence.
+
+        Parameters
+        ----------
+        **sections
+            Runtime settings section names mapped to their new values, e.g.
+            `output_root_name=OutputRootName("my_run")`. A value of None removes an
+            optional section.
+
+        Raises
+        ------
+        ValueError
+            If any keyword is not a section of `ROMSRuntimeSettings`.
+
+        Examples
+        --------
+        >>> from cstar.roms.runtime_settings import Rho0
+        >>> simulation.update_runtime_settings(rho0=Rho0(1025.0))
+        """
+        unknown = set(sections) - set(ROMSRuntimeSettings.model_fields)
+        if unknown:
+            raise ValueError(
+                f"Unknown runtime settings section(s): {', '.join(sorted(unknown))}"
+            )
+
+        # Replace rather than mutate, as restarted simulations share this dict
+        self._runtime_settings_overrides = {
+            **(self._runtime_settings_overrides or {}),
+            **{name: copy.deepcopy(section) for name, section in sections.items()},
+        }
+        self._runtime_settings_cache = None
+
     @property
     def input_datasets(self) -> list:
         """Retrieves all input datasets associated with this ROMS simulation.
@@ -1025,6 +1178,7 @@ class ROMSSimulation(Simulation):
         print_dict["ROMS"] = simulation_tree_dict
         return f"{self.directory}\n{_dict_to_tree(print_dict)}"
 
+    @traced(category="stage")
     def setup(
         self,
     ) -> None:
@@ -1155,6 +1309,7 @@ class ROMSSimulation(Simulation):
                     return False
         return True
 
+    @traced(category="stage")
     def build(self, rebuild: bool = False) -> None:
         """Compile the ROMS executable from source code.
 
@@ -1229,6 +1384,7 @@ class ROMSSimulation(Simulation):
                 cwd=build_dir,
                 msg_err="Error when compiling ROMS.",
                 raise_on_error=True,
+                stream=True,
             )
 
         _run_cmd(
@@ -1238,6 +1394,7 @@ class ROMSSimulation(Simulation):
             msg_post=f"UCLA-ROMS compiled at {build_dir}",
             msg_err="Error when compiling ROMS.",
             raise_on_error=True,
+            stream=True,
         )
 
         self.exe_path = exe_path
@@ -1245,7 +1402,10 @@ class ROMSSimulation(Simulation):
 
         self.persist()
 
-    def pre_run(self, overwrite_existing_files=False) -> None:
+    @traced(category="stage")
+    def pre_run(
+        self, overwrite_existing_files=False, virtual=False, max_memory=None
+    ) -> None:
         """Perform pre-processing steps needed to run the ROMS simulation.
 
         This method partitions any required input datasets according to
@@ -1257,6 +1417,13 @@ class ROMSSimulation(Simulation):
         ----------
         overwrite_existing_files (bool, default False)
             If True, any existing partitioned files will be overwritten
+        virtual (bool, default False)
+            If True, only record how each dataset is to be partitioned. The
+            partitioned files are then written directly from the source files by
+            `run()`, and only rewritten there if their source has changed.
+        max_memory (int or str, optional)
+            If set, bound the data held in memory while partitioning each dataset
+            (e.g. "512M"), reading it one variable and one slab at a time
 
         Raises
         ------
@@ -1285,16 +1452,150 @@ class ROMSSimulation(Simulation):
                     np_xi=self.discretization.n_procs_x,
                     np_eta=self.discretization.n_procs_y,
                     overwrite_existing_files=overwrite_existing_files,
+                    virtual=virtual,
+                    max_memory=max_memory,
                 )
 
         self.persist()
 
+    def _prepare_run(self) -> tuple[Path, Path]:
+        """Check this simulation can run, and write the files needed to run it.
+
+        Returns
+        -------
+        run_path: Path
+            The directory in which to run ROMS
+        runtime_settings_file: Path
+            The `.in` file with which to run ROMS
+
+        Raises
+        ------
+        ValueError
+            If the ROMS executable path or the number of processors is not set
+        FileNotFoundError
+            If there is no local copy of the runtime code
+        """
+        if self.exe_path is None:
+            raise ValueError(
+                "C-STAR: ROMSSimulation.exe_path is None; unable to find ROMS executable."
+                "\nRun Simulation.build() first. "
+                "\n If you have already run Simulation.build(), either run it again or "
+                " add the executable path manually using Simulation.exe_path='YOUR/PATH'."
+            )
+
+        if self.discretization.n_procs_tot is None:
+            raise ValueError(
+                "Unable to calculate node distribution for this Simulation. "
+                "Simulation.n_procs_tot is not set"
+            )
+
+        if self.runtime_code.working_path is None:
+            raise FileNotFoundError(
+                "Local copy of ROMSSimulation.runtime_code does not exist. "
+                "Call ROMSSimulation.setup() or ROMSSimulation.runtime_code.get() "
+                "and try again"
+            )
+
+        # we run ROMS in the output dir
+        run_path = self.directory / "output"
+
+        # Write the partitioned files of any virtually partitioned datasets:
+        for inp in self.input_datasets:
+            if (inp.partitioning is not None) and inp.partitioning.is_virtual:
+                if written := inp.partitioning.materialize():
+                    self.log.info(
+                        f"Wrote {len(written)} partitioned files for "
+                        f"{inp.__class__.__name__}"
+                    )
+
+        final_runtime_settings_file = (
+            self.runtime_code.working_path.resolve() / f"{self.name}.in"
+        )
+        self.roms_runtime_settings.to_file(final_runtime_settings_file)
+        run_path.mkdir(parents=True, exist_ok=True)
+        return run_path, final_runtime_settings_file
+
+    def _node_local_staging(
+        self, local_dir: str, runtime_settings_file: Path
+    ) -> NodeLocalStaging:
+        """Prepare the staging of this simulation's partitioned inputs to `local_dir`.
+
+        Writes a runtime settings template beside `runtime_settings_file`, in which
+        the paths of partitioned inputs, and the output root name, point to the
+        node-local staging directory.
+
+        Parameters
+        ----------
+        local_dir : str
+            The node-local directory in which to stage files
+        runtime_settings_file : Path
+            The runtime settings file ROMS would otherwise run with
+
+        Returns
+        -------
+        NodeLocalStaging
+            The staging to perform in the scheduler job
+
+        Raises
+        ------
+        ValueError
+            If two partitioned inputs have the same file name
+        """
+        local_root = Path(NodeLocalStaging.PLACEHOLDER)
+        datasets = []
+        local_paths: dict[Path, Path] = {}
+        for inp in self.input_datasets:
+            if inp.partitioning is None:
+                continue
+            for source in inp.path_for_roms:
+                if any(p.name == source.name for p in local_paths):
+                    raise ValueError(
+                        f"Cannot stage inputs to node-local storage: more than one "
+                        f"input is named {source.name}"
+                    )
+                datasets.append(
+                    StagedDataset.from_tiles(source, list(inp.partitioning))
+                )
+                local_paths[source] = local_root / source.name
+
+        settings = copy.deepcopy(self.roms_runtime_settings)
+        if settings.grid is not None:
+            settings.grid.grid = local_paths.get(settings.grid.grid, settings.grid.grid)
+        if settings.initial.ininame is not None:
+            settings.initial.ininame = local_paths.get(
+                settings.initial.ininame, settings.initial.ininame
+            )
+        if settings.forcing.filenames is not None:
+            settings.forcing.filenames = [
+                local_paths.get(f, f) for f in settings.forcing.filenames
+            ]
+        settings.output_root_name.output_root_name = str(
+            local_root
+            / NodeLocalStaging.OUTPUT_SUBDIR
+            / settings.output_root_name.output_root_name
+        )
+
+        template = runtime_settings_file.with_name(
+            f"{self.name}.node_local.in.template"
+        )
+        settings.to_file(template)
+        return NodeLocalStaging(
+            datasets=tuple(datasets),
+            runtime_settings_template=template,
+            runtime_settings_file=runtime_settings_file.with_name(
+                f"{self.name}.node_local.in"
+            ),
+            local_dir=local_dir,
+        )
+
+    @traced(category="stage")
     def run(
         self,
         account_key: str | None = None,
         walltime: str | None = None,
         queue_name: str | None = None,
         job_name: str | None = None,
+        node_local_dir: str | None = None,
     ) -> "ExecutionHandler":
         """Execute the ROMS simulation.
 
@@ -1315,12 +1616,19 @@ class ROMSSimulation(Simulation):
         job_name : str, optional
             The name of the job submitted to the scheduler, which also sets
             the output file name `job_name.out`.
+        node_local_dir : str, optional
+            A directory on node-local storage (e.g. "/tmp", "$TMPDIR", or a burst
+            buffer such as "$DW_JOB_STRIPED"). If set, the scheduler job copies
+            each node's partitioned input files there before ROMS starts, runs
+            ROMS on those copies, and copies its outputs back once it ends (see
+            `NodeLocalStaging`). Only used with a job scheduler.
 
         Returns
         -------
         ExecutionHandler
             An execution handler object tracking the simulation's execution
-            status, logs, and completion.
+            status, logs, and completion. Its `progress` reports the latest
+            time step, percentage complete and ETA, parsed from ROMS' output.
 
         Raises
         ------
@@ -1335,7 +1643,8 @@ class ROMSSimulation(Simulation):
         - If a job scheduler is available, this method generates a job script and
           submits it using the appropriate scheduler command.
         - If no scheduler is available, ROMS runs as a local process using
-          MPI (`mpiexec` or equivalent).
+          MPI (`mpiexec` or equivalent). It is queued until `n_procs_tot` cores
+          are free from other local runs (see `LocalJobQueue`).
         - The number of time steps is computed based on `start_date` and `end_date`
           if they are set; otherwise, a default of 1 time step is used.
 
@@ -1356,40 +1665,25 @@ class ROMSSimulation(Simulation):
         pre_run : Prepares the input data before running.
         post_run : Handles output processing after execution.
         """
-        if self.exe_path is None:
-            raise ValueError(
-                "C-STAR: ROMSSimulation.exe_path is None; unable to find ROMS executable."
-                "\nRun Simulation.build() first. "
-                "\n If you have already run Simulation.build(), either run it again or "
-                " add the executable path manually using Simulation.exe_path='YOUR/PATH'."
-            )
-
-        if self.discretization.n_procs_tot is None:
-            raise ValueError(
-                "Unable to calculate node distribution for this Simulation. "
-                "Simulation.n_procs_tot is not set"
-            )
-
-        if self.runtime_code.working_path is None:
-            raise FileNotFoundError(
-                "Local copy of ROMSSimulation.runtime_code does not exist. "
-                "Call ROMSSimulation.setup() or ROMSSimulation.runtime_code.get() "
-                "and try again"
-            )
+        run_path, final_runtime_settings_file = self._prepare_run()
 
         if (queue_name is None) and (cstar_sysmgr.scheduler is not None):
             queue_name = cstar_sysmgr.scheduler.primary_queue_name
         if (walltime is None) and (cstar_sysmgr.scheduler is not None):
             walltime = cstar_sysmgr.scheduler.get_queue(queue_name).max_walltime
 
-        # we run ROMS in the output dir
-        run_path = self.directory / "output"
-
-        final_runtime_settings_file = (
-            self.runtime_code.working_path.resolve() / f"{self.name}.in"
-        )
-        self.roms_runtime_settings.to_file(final_runtime_settings_file)
-        run_path.mkdir(parents=True, exist_ok=True)
+        staging = None
+        if node_local_dir is not None:
+            if cstar_sysmgr.scheduler is None:
+                self.log.warning(
+                    "Node-local staging is only used in scheduler jobs; "
+                    "running without it"
+                )
+            else:
+                staging = self._node_local_staging(
+                    node_local_dir, final_runtime_settings_file
+                )
+                final_runtime_settings_file = staging.runtime_settings_file
 
         ## 2: RUN ROMS
 
@@ -1412,40 +1706,251 @@ class ROMSSimulation(Simulation):
                 run_path=run_path,
                 queue_name=queue_name,
                 walltime=walltime,
+                node_local_staging=staging,
             )
 
             job_instance.submit()
+            job_instance.progress_monitor = ROMSProgressMonitor(self._n_time_steps)
             self._execution_handler = job_instance
             self.persist()
             return job_instance
 
         else:  # cstar_sysmgr.scheduler is None
-            romsprocess = LocalProcess(commands=roms_exec_cmd, run_path=run_path)
+            romsprocess = LocalProcess(
+                commands=roms_exec_cmd,
+                run_path=run_path,
+                cores=self.discretization.n_procs_tot,
+            )
+            romsprocess.progress_monitor = ROMSProgressMonitor(self._n_time_steps)
             self._execution_handler = romsprocess
             self.persist()
             romsprocess.start()
             return romsprocess
 
-    def post_run(self) -> None:
+    @classmethod
+    def run_packed(
+        cls,
+        simulations: list["ROMSSimulation"],
+        account_key: str,
+        walltime: str | None = None,
+        queue_name: str | None = None,
+        job_name: str | None = None,
+        cpus_per_node: int | None = None,
+    ) -> PackedJob:
+        """Execute several ROMS simulations concurrently in one scheduler job.
+
+        The simulations are packed onto as few nodes as possible, each bound to
+        its own cores, and submitted as a single job (see `PackedJob`). This
+        avoids paying for mostly idle nodes when running several small
+        simulations on systems that bill whole nodes.
+
+        Each simulation writes its output to `<name>.out` in its own output
+        directory, and tracks its own status: its execution handler is set to a
+        `PackedMemberHandler`, so that `post_run()` can be called on each
+        simulation as it completes.
+
+        Parameters
+        ----------
+        simulations : list of ROMSSimulation
+            The simulations to run. They must have unique names.
+        account_key : str
+            The user's account key on the system.
+        walltime : str, optional
+            The maximum allowed execution time for the job in HH:MM:SS format.
+            Defaults to the queue's max walltime. It must cover the longest
+            simulation.
+        queue_name : str, optional
+            The name of the scheduler queue to submit the job to. Defaults to the
+            system's primary queue.
+        job_name : str, optional
+            The name of the job submitted to the scheduler.
+        cpus_per_node : int, optional
+            The number of cores on each node. Defaults to the system's.
+
+        Returns
+        -------
+        PackedJob
+            The submitted job, reporting the status of each simulation in it.
+
+        Raises
+        ------
+        ValueError
+            If no job scheduler is available.
+
+        See Also
+        --------
+        run : Executes a single simulation.
+        """
+        if cstar_sysmgr.scheduler is None:
+            raise ValueError(
+                "ROMSSimulation.run_packed() requires a job scheduler. "
+                "Use ROMSSimulation.run() to run simulations locally."
+            )
+        if queue_name is None:
+            queue_name = cstar_sysmgr.scheduler.primary_queue_name
+        if walltime is None:
+            walltime = cstar_sysmgr.scheduler.get_queue(queue_name).max_walltime
+
+        members = []
+        for sim in simulations:
+            run_path, runtime_settings_file = sim._prepare_run()
+            members.append(
+                PackedMember(
+                    name=sim.name,
+                    cpus=sim.discretization.n_procs_tot,  # type: ignore[arg-type]
+                    command=f"{sim.exe_path} {runtime_settings_file}",
+                    run_path=run_path,
+                )
+            )
+
+        packed_job = PackedJob(
+            members=members,
+            account_key=account_key,
+            cpus_per_node=cpus_per_node,
+            run_path=simulations[0].directory,
+            job_name=job_name,
+            queue_name=queue_name,
+            walltime=walltime,
+        )
+        packed_job.submit()
+        for sim in simulations:
+            handler = packed_job.handlers[sim.name]
+            handler.progress_monitor = ROMSProgressMonitor(sim._n_time_steps)
+            sim._execution_handler = handler
+            sim.persist()
+        return packed_job
+
+    def run_resilient(
+        self,
+        account_key: str | None = None,
+        walltime: str | None = None,
+        queue_name: str | None = None,
+        job_name: str | None = None,
+        max_retries: int = 3,
+        poll_interval: float = 60,
+    ) -> "ROMSSimulation":
+        """Run the simulation to its end date, resuming from restarts on failure.
+
+        The simulation is run (see `run()`) and waited on. If the run fails, e.g.
+        because a node failed or the job was preempted, the simulation is
+        continued from the latest valid restart file in its output directory
+        (see `restart()`), and resubmitted. This is repeated until a run
+        completes or `max_retries` resubmissions have been made. If no valid
+        restart file was written before the failure, the failed run is
+        resubmitted from its start.
+
+        Runs that are cancelled (e.g. by a `Watchdog`, after blowing up) are not
+        resubmitted, as they would most likely fail again.
+
+        This method blocks until the final run has ended.
+
+        Parameters
+        ----------
+        account_key : str, optional
+            The user's account key on the system, required with a job scheduler.
+        walltime : str, optional
+            The maximum allowed execution time of each run, in HH:MM:SS format.
+        queue_name : str, optional
+            The name of the scheduler queue to which runs are submitted.
+        job_name : str, optional
+            The name of the jobs submitted to the scheduler.
+        max_retries : int, optional, default = 3
+            The maximum number of times a failed run is resubmitted.
+        poll_interval : float, optional, default = 60
+            The number of seconds between checks of the status of each run.
+
+        Returns
+        -------
+        ROMSSimulation
+            The simulation of the final run: this simulation if its first run
+            ended without failing, or the continuation from the last restart used.
+            Its execution handler reports whether the final run completed.
+
+        See Also
+        --------
+        run : Executes the simulation once.
+        restart : Continues the simulation from a restart file.
+        """
+        sim = self
+        retries = 0
+        while True:
+            handler = sim.run(
+                account_key=account_key,
+                walltime=walltime,
+                queue_name=queue_name,
+                job_name=job_name,
+            )
+            while (status := handler.status) not in FINISHED_STATUSES:
+                time.sleep(poll_interval)
+            if status != ExecutionStatus.FAILED:
+                return sim
+
+            if retries >= max_retries:
+                self.log.error(
+                    f"Run of {sim.name} failed again, after {retries} "
+                    f"resubmissions. See {handler.output_file} for its output"
+                )
+                return sim
+            retries += 1
+
+            restart_date = sim._latest_valid_restart()
+            if restart_date is None:
+                self.log.warning(
+                    f"Run of {sim.name} failed before writing a valid restart "
+                    f"file. Resubmitting it from {sim.start_date} "
+                    f"(retry {retries}/{max_retries})"
+                )
+                continue
+
+            self.log.warning(
+                f"Run of {sim.name} failed. Resubmitting it from its restart at "
+                f"{restart_date} (retry {retries}/{max_retries})"
+            )
+            sim = sim.restart(new_end_date=sim.end_date, restart_date=restart_date)
+            sim.setup()
+            sim.build()
+            sim.pre_run()
+
+    @traced(category="stage")
+    def post_run(
+        self,
+        compression: NetCDFCompression | None = None,
+        max_workers: int | None = None,
+    ) -> None:
         """Perform post-processing steps after the ROMS simulation run.
 
         This method processes the output files generated by ROMS, including
         joining NetCDF output files that were produced separately
         by each processor.
 
+        Parameters
+        ----------
+        compression: NetCDFCompression, optional
+            If given, the output files are compressed and rechunked as they are
+            joined (see `cstar.roms.tiling.join_netcdf`), rather than joined by
+            `ncjoin` and compressed separately, which would read and write them
+            twice.
+        max_workers: int, optional
+            The number of files compressed in parallel, each in its own process.
+            Defaults to the number of CPUs. Ignored without `compression`.
+
         Raises
         ------
         RuntimeError
             - If `post_run` is called before `run`.
             - If the ROMS execution is not yet completed.
+            - If any file could not be compressed and verified.
 
         Notes
         -----
         - This method searches for NetCDF files with a timestamped pattern
           (`*.??????????????.*.nc`) and merges them into unified files.
         - Partitioned files are moved to a `PARTITIONED` subdirectory
-          within the output directory after merging.
-        - Uses the `ncjoin` command-line tool for file merging.
+          within the output directory after merging. With `compression`, they are
+          instead deleted, but only once the compressed file has been verified
+          against them.
+        - Uses the `ncjoin` command-line tool for file merging, unless
+          `compression` is given.
 
         Examples
         --------
@@ -1454,6 +1959,8 @@ class ROMSSimulation(Simulation):
         Joining netCDF files ocean_his.*.nc...
         Joining netCDF files ocean_rst.*.nc...
 
+        >>> simulation.post_run(compression=NetCDFCompression(method="zstd"))
+
         See Also
         --------
         run : Executes the ROMS simulation.
@@ -1474,6 +1981,8 @@ class ROMSSimulation(Simulation):
         unique_wildcards = {Path(fname.stem).stem + ".*.nc" for fname in files}
         if not files:
             self.log.warning("No suitable output found")
+        elif compression is not None:
+            self._join_compressed(files, compression, max_workers)
         else:
             (output_dir / "PARTITIONED").mkdir(exist_ok=True)
             for wildcard_pattern in unique_wildcards:
@@ -1488,14 +1997,250 @@ class ROMSSimulation(Simulation):
                 for F in output_dir.glob(wildcard_pattern):
                     F.rename(output_dir / "PARTITIONED" / F.name)
 
+        self.output_catalog.update()
         self.persist()
 
-    def restart(self, new_end_date: str | datetime) -> "ROMSSimulation":
+    def _join_compressed(
+        self,
+        files: list[Path],
+        compression: NetCDFCompression,
+        max_workers: int | None = None,
+    ) -> list[JoinResult]:
+        """Join, compress and verify partitioned output files, in parallel.
+
+        The tiles of each file are deleted as soon as it has been verified, so
+        that a failure leaves the tiles of the files it affects in place.
+
+        Parameters
+        ----------
+        files: list of Path
+            The tiles of the partitioned output files
+        compression: NetCDFCompression
+            How to compress and chunk the joined files
+        max_workers: int, optional
+            The number of files joined in parallel. Defaults to the number of CPUs.
+
+        Returns
+        -------
+        list of JoinResult
+            The joined files
+
+        Raises
+        ------
+        RuntimeError
+            If any file could not be joined and verified
+        """
+        groups: dict[Path, list[Path]] = {}
+        for tile in sorted(files, key=lambda f: int(f.stem.rsplit(".", 1)[1])):
+            # e.g. myfile.001.nc joins into myfile.nc
+            groups.setdefault(tile.parent / f"{Path(tile.stem).stem}.nc", []).append(
+                tile
+            )
+        np_xi = self.discretization.n_procs_x
+        np_eta = self.discretization.n_procs_y
+
+        start_time = time.perf_counter()
+        results: list[JoinResult] = []
+        errors: dict[Path, Exception] = {}
+        n_workers = min(max_workers or multiprocessing.cpu_count(), len(groups))
+        # Each file is joined in its own process: the NetCDF library is not
+        # thread-safe. Processes are spawned, so as not to fork a threaded process.
+        executor: Executor = (
+            ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            if n_workers > 1
+            else _InlineExecutor()
+        )
+        with executor:
+            futures = {
+                executor.submit(
+                    join_netcdf,
+                    tiles,
+                    np_xi,
+                    np_eta,
+                    output,
+                    compression,
+                ): output
+                for output, tiles in sorted(groups.items())
+            }
+            for future in as_completed(futures):
+                output = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.log.error(f"Could not join {output.name}: {e}")
+                    errors[output] = e
+                    continue
+                for tile in result.tiles:
+                    tile.unlink()
+                results.append(result)
+
+        input_bytes = sum(r.input_bytes for r in results)
+        output_bytes = sum(r.output_bytes for r in results)
+        seconds = time.perf_counter() - start_time
+        if results:
+            self.log.info(
+                f"Joined and compressed {len(results)} files: "
+                f"{_format_size(input_bytes)} -> {_format_size(output_bytes)} "
+                f"({input_bytes / max(output_bytes, 1):.2f}x) at "
+                f"{_format_size(int(input_bytes / max(seconds, 1e-9)))}/s"
+            )
+        if errors:
+            raise RuntimeError(
+                f"Could not join {', '.join(sorted(p.name for p in errors))}: "
+                "their tiles were kept"
+            )
+        return results
+
+    def export_zarr(
+        self,
+        store: str | Path,
+        stream: str = "his",
+        chunks: dict[str, int] | None = None,
+    ) -> int:
+        """Write an output stream of this simulation to a Zarr store.
+
+        Each output file of the stream is written in turn, whether it has been
+        joined by `post_run` or is still partitioned (in which case its tiles are
+        joined lazily as they are written, see `cstar.roms.zarr_export`). If the
+        store exists, the records are appended along its time axis, so that
+        exporting each restart segment of a long run to the same store builds a
+        single time series.
+
+        Parameters
+        ----------
+        store: str or Path
+            The Zarr store, created if it does not exist
+        stream: str, optional, default = "his"
+            The output stream to export, e.g. "his" or "avg"
+        chunks: dict of str to int, optional
+            The chunk size along each dimension, when the store is created. By
+            default, chunks hold one time record of a variable.
+
+        Returns
+        -------
+        int
+            The number of time records written
+
+        Raises
+        ------
+        FileNotFoundError
+            If the simulation has no output in `stream`
+
+        Examples
+        --------
+        >>> simulation.export_zarr("ocean_his.zarr", chunks={"time": 24})
+        >>> simulation.restart(new_end_date="2013-01-01").export_zarr("ocean_his.zarr")
+        """
+        catalog = self.output_catalog
+        catalog.refresh()
+        dates = catalog.dates(stream)
+        if not dates:
+            raise FileNotFoundError(
+                f"No '{stream}' output in {catalog.directory} to export"
+            )
+
+        n_records = 0
+        for date in dates:
+            joined = catalog.files(stream, date)
+            if joined:
+                groups = [[f.path] for f in joined]
+            else:
+                tiles = catalog.files(stream, date, partitioned=True)
+                groups = [
+                    [f.path for f in tiles if f.prefix == prefix]
+                    for prefix in sorted({f.prefix for f in tiles})
+                ]
+            for paths in groups:
+                n_records += export_zarr(
+                    paths,
+                    store,
+                    np_xi=self.discretization.n_procs_x,
+                    np_eta=self.discretization.n_procs_y,
+                    chunks=chunks,
+                )
+        return n_records
+
+    def extract(
+        self,
+        variables: list[str] | None = None,
+        indexers: dict[str, slice | int] | None = None,
+        stream: str = "his",
+        date: str | datetime | None = None,
+    ) -> xr.Dataset:
+        """Extract variables over a region from an output file of this simulation,
+        without joining it.
+
+        If the file is still partitioned, only the tiles overlapping the region
+        are read (see `cstar.roms.tiling.extract_tiles`), so quick looks at a
+        running or finished simulation need not wait for `post_run`.
+
+        Parameters
+        ----------
+        variables: list of str, optional
+            The variables to extract, e.g. ["zeta", "temp"]. All variables are
+            extracted by default.
+        indexers: dict of str to slice or int, optional
+            The indices to extract along each dimension of the global grid, e.g.
+            `{"eta_rho": slice(0, 100), "s_rho": -1}` for the surface of the first
+            100 rows. u, v and psi points between the rho points selected are
+            selected unless indexed explicitly.
+        stream: str, optional, default = "his"
+            The output stream, e.g. "his" or "avg"
+        date: str or datetime, optional
+            The date of the first record of the output file. Defaults to the
+            latest file of the stream.
+
+        Returns
+        -------
+        xr.Dataset
+            The variables over the region
+
+        Raises
+        ------
+        FileNotFoundError
+            If the stream has no output file starting at `date`
+
+        Examples
+        --------
+        >>> simulation.extract(["zeta"], {"time": -1})
+        """
+        catalog = self.output_catalog
+        catalog.refresh()
+        dates = catalog.dates(stream)
+        date = self._parse_date(date, "date")
+        if date is None:
+            date = dates[-1] if dates else None
+        if (date is None) or (date not in dates):
+            raise FileNotFoundError(
+                f"No '{stream}' output in {catalog.directory}"
+                + (f" starting at {date}" if date is not None else "")
+            )
+
+        joined = catalog.files(stream, date)
+        if joined:
+            return extract_tiles([joined[0].path], 1, 1, variables, indexers)
+        tiles = catalog.files(stream, date, partitioned=True)
+        return extract_tiles(
+            [f.path for f in tiles if f.prefix == tiles[0].prefix],
+            self.discretization.n_procs_x,
+            self.discretization.n_procs_y,
+            variables,
+            indexers,
+        )
+
+    def restart(
+        self,
+        new_end_date: str | datetime,
+        restart_date: str | datetime | None = None,
+    ) -> "ROMSSimulation":
         """Restart the ROMS simulation from the end of the current simulation, if
         possible.
 
         This method creates a new `ROMSSimulation` instance that continues from
-        the date specified by `end_date` in the current ROMSSimulation. The
+        the date specified by `end_date` in the current ROMSSimulation (or by
+        `restart_date`, to continue a run that ended early). The
         method searches for a restart file generated by the simulation corresponding
         to this date, and proceeds if one is found.
         The new instance inherits the configuration of the current simulation but updates the
@@ -1506,6 +2251,9 @@ class ROMSSimulation(Simulation):
         new_end_date : str or datetime
             The new end date for the restarted simulation. If given as a string,
             it will be parsed into a `datetime` object.
+        restart_date : str or datetime, optional
+            The date of the restart file from which to continue. Defaults to
+            `end_date`.
 
         Returns
         -------
@@ -1519,12 +2267,15 @@ class ROMSSimulation(Simulation):
             If no restart file corresponding to the new start date is found in
             the output directory.
         ValueError
-            If multiple distinct restart files match the expected restart pattern.
+            If multiple distinct restart files match the expected restart pattern,
+            or if `restart_date` is not within the current simulation.
 
         Notes
         -----
-        - This method searches the output directory for restart files that
-          match the timestamped pattern `*_rst.YYYYMMDDHHMMSS.nc`.
+        - This method looks up restart files that match the timestamped pattern
+          `*_rst.YYYYMMDDHHMMSS.nc` in the `output_catalog` of the output
+          directory. If none is found, the error names the nearest restart date
+          available.
         - The new simulation instance will have its `initial_conditions`
           set to the detected restart file.
         - Cached dataset information is reset for the new instance.
@@ -1540,18 +2291,35 @@ class ROMSSimulation(Simulation):
         post_run : Handles post-processing of ROMS output files.
         run : Executes the ROMS simulation.
         """
-        new_sim = cast(ROMSSimulation, super().restart(new_end_date=new_end_date))
+        new_sim = cast(
+            ROMSSimulation,
+            super().restart(new_end_date=new_end_date, restart_date=restart_date),
+        )
+        new_sim._runtime_settings_cache = None
+        new_sim._output_catalog_cache = None
+        new_sim.model_grid = copy.copy(self.model_grid)
+        new_sim.tidal_forcing = copy.copy(self.tidal_forcing)
+        new_sim.river_forcing = copy.copy(self.river_forcing)
+        new_sim.surface_forcing = [copy.copy(sf) for sf in self.surface_forcing]
+        new_sim.boundary_forcing = [copy.copy(bf) for bf in self.boundary_forcing]
+        new_sim.forcing_corrections = [copy.copy(fc) for fc in self.forcing_corrections]
 
         restart_dir = self.directory / "output"
 
         new_start_date = new_sim.start_date
         restart_date_string = new_start_date.strftime("%Y%m%d%H%M%S")
-        restart_wildcard = f"*_rst.{restart_date_string}.nc"
-        restart_files = list(restart_dir.glob(restart_wildcard))
+        restart_files = self._restart_files(new_start_date)
         if len(restart_files) == 0:
+            nearest = self.output_catalog.nearest("rst", new_start_date)
             raise FileNotFoundError(
-                f"No files in {restart_dir} match the pattern "
-                + f"'*_rst.{restart_date_string}.nc"
+                f"No restart file in {restart_dir} for {restart_date_string} "
+                + f"(expected '*_rst.{restart_date_string}.nc')"
+                + (
+                    f". The nearest restart is at {nearest}: pass "
+                    f"restart_date='{nearest}' to continue from it"
+                    if nearest is not None
+                    else ""
+                )
             )
 
         unique_restarts = {fname for fname in restart_files}
@@ -1569,10 +2337,119 @@ class ROMSSimulation(Simulation):
         )
         new_sim.initial_conditions = new_ic
 
-        # Reset cached data for input datasets
+        # Reset local state for the (copied) input datasets
         for inp in new_sim.input_datasets:
-            inp._local_file_hash_cache = None
-            inp._local_file_stat_cache = None
+            inp._local_file_hash_cache = {}
+            inp._local_file_stat_cache = {}
             inp.working_path = None
+            inp.partitioning = None
 
         return new_sim
+
+    @property
+    def output_catalog(self) -> OutputCatalog:
+        """The catalogue of the files ROMS wrote to the output directory.
+
+        The catalogue is saved in the output directory, and refreshed by
+        `post_run()`, so that outputs are found without listing the directory.
+
+        Returns
+        -------
+        OutputCatalog
+            The catalogue of the output directory
+        """
+        output_dir = self.directory / "output"
+        if (self._output_catalog_cache is None) or (
+            self._output_catalog_cache.directory != output_dir
+        ):
+            self._output_catalog_cache = OutputCatalog.load(output_dir)
+        return self._output_catalog_cache
+
+    def _restart_files(self, date: datetime) -> list[Path]:
+        """The joined restart files written at `date`, per the output catalogue.
+
+        The catalogue is refreshed once if it lists no existing file for `date`,
+        e.g. because the outputs were changed since it was last refreshed.
+        """
+        catalog = self.output_catalog
+        files = [f.path for f in catalog.files("rst", date) if f.path.exists()]
+        if not files:
+            catalog.update()
+            files = [f.path for f in catalog.files("rst", date)]
+        return files
+
+    def _latest_valid_restart(self) -> datetime | None:
+        """Find the latest restart file from which this simulation can be continued.
+
+        Restart files (`*_rst.YYYYMMDDHHMMSS.nc`) between the start and end dates
+        of the simulation are looked up in the `output_catalog`, refreshed first
+        as the failed run will have written new files. A restart file is valid if
+        it can be read and holds at least one record: files being written when a
+        run failed are skipped.
+
+        If the latest valid restart is still partitioned (one file per rank), it
+        is joined with `ncjoin`, as in `post_run()`, so that `restart()` can find
+        it. Every tile must be present and valid.
+
+        Returns
+        -------
+        datetime or None
+            The date of the latest valid restart file, if any
+        """
+        catalog = self.output_catalog
+        catalog.refresh()
+        output_dir = catalog.directory
+        n_tiles = self.discretization.n_procs_tot
+        dates = [
+            date
+            for date in catalog.between("rst", self.start_date, self.end_date)
+            if self.start_date < date < self.end_date
+        ]
+        for date in reversed(dates):
+            if any(_is_valid_restart_file(f.path) for f in catalog.files("rst", date)):
+                return date
+            tiles: dict[str, dict[int, Path]] = {}
+            for f in catalog.files("rst", date, partitioned=True):
+                if f.path.parent == output_dir:
+                    tiles.setdefault(f.prefix, {})[cast(int, f.tile)] = f.path
+            for prefix, date_tiles in tiles.items():
+                if (set(date_tiles) != set(range(n_tiles))) or not all(
+                    _is_valid_restart_file(p) for p in date_tiles.values()
+                ):
+                    continue
+                date_string = date.strftime("%Y%m%d%H%M%S")
+                wildcard = f"{prefix}_rst.{date_string}.*.nc"
+                self.log.info(f"Joining netCDF files {wildcard}...")
+                _run_cmd(f"ncjoin {wildcard}", cwd=output_dir, raise_on_error=True)
+                (output_dir / "PARTITIONED").mkdir(exist_ok=True)
+                for tile in date_tiles.values():
+                    tile.rename(output_dir / "PARTITIONED" / tile.name)
+                catalog.update()
+                return date
+            self.log.warning(
+                f"Skipping incomplete restart files for {date} in {output_dir}"
+            )
+        return None
+
+
+def _is_valid_restart_file(path: Path) -> bool:
+    """Whether `path` is a readable netCDF file holding at least one record."""
+    try:
+        with netCDF4.Dataset(path) as ds:
+            return all(
+                len(dim) > 0 for dim in ds.dimensions.values() if dim.isunlimited()
+            )
+    except OSError:
+        return False
+
+
+class _InlineExecutor(Executor):
+    """Runs tasks as they are submitted, for when a pool is not worth starting."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
@@ -0,0 +1,1166 @@
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Literal
+
+import netCDF4
+import numpy as np
+import xarray as xr
+from roms_tools.tiling.partition import partition as _roms_tools_partition
+from roms_tools.utils import save_datasets
+
+from cstar.base.log import get_logger
+from cstar.base.utils import _format_size, _parse_size
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+log = get_logger(__name__)
+
+TileIndexers = dict[str, slice]
+"""The slices of each partitioned dimension of a source file that form one tile."""
+
+
+def tile_indexers(
+    sizes: Mapping[Hashable, int],
+    np_xi: int,
+    np_eta: int,
+    include_coarse_dims: bool = True,
+) -> list[TileIndexers]:
+    """Compute the slices of a global ROMS grid that form each tile of a partitioning.
+
+    The geometry (including ghost cells at the domain edges and periodic
+    boundaries) is exactly that of `roms_tools.partition_netcdf`, but it is derived
+    from the dimension sizes alone, without reading any data.
+
+    Parameters
+    ----------
+    sizes: mapping of str to int
+        The sizes of the dimensions of the global file (e.g. `xr.Dataset.sizes`)
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are also partitioned
+
+    Returns
+    -------
+    list of dict
+        For each tile, in ROMS' order (xi varying fastest), the slice of each
+        partitioned dimension. Dimensions that are not partitioned are omitted.
+
+    Raises
+    ------
+    ValueError
+        If the grid cannot be evenly divided into the requested tiles
+    """
+    # Partition a dataset holding only the index along each dimension:
+    index_ds = xr.Dataset(coords={dim: np.arange(size) for dim, size in sizes.items()})
+    _, tiles = _roms_tools_partition(
+        index_ds, np_eta=np_eta, np_xi=np_xi, include_coarse_dims=include_coarse_dims
+    )
+
+    indexers = []
+    for tile in tiles:
+        tile_indexer: TileIndexers = {}
+        for dim, size in sizes.items():
+            index = tile[dim].values
+            if len(index) != size:
+                tile_indexer[str(dim)] = slice(int(index[0]), int(index[-1]) + 1)
+        indexers.append(tile_indexer)
+    return indexers
+
+
+def tile_paths(source: Path, n_tiles: int) -> list[Path]:
+    """The paths of the tiles of `source`, as named by `roms_tools.partition_netcdf`.
+
+    Parameters
+    ----------
+    source: Path
+        The global file, e.g. `grid.nc`
+    n_tiles: int
+        The number of tiles
+
+    Returns
+    -------
+    list of Path
+        e.g. `grid.0.nc`, `grid.1.nc`, ... alongside `source`
+    """
+    ndigits = len(str(n_tiles - 1))
+    stem = Path(source).with_suffix("")
+    return [Path(f"{stem}.{i:0{ndigits}d}.nc") for i in range(n_tiles)]
+
+
+def write_tile(source: Path, target: Path, indexers: TileIndexers) -> Path:
+    """Write one tile of a global NetCDF file, reading only the data it contains.
+
+    The source is opened lazily, so each variable is read and written in turn,
+    and only its slab for this tile is ever in memory.
+
+    Parameters
+    ----------
+    source: Path
+        The global file
+    target: Path
+        The path of the tile to write, ending in `.nc`
+    indexers: dict of str to slice
+        The slices forming the tile, as returned by `tile_indexers`
+
+    Returns
+    -------
+    Path
+        The path of the written tile
+    """
+    with xr.open_dataset(source, decode_timedelta=False) as ds:
+        (saved,) = save_datasets(
+            [ds.isel(indexers)], [Path(target).with_suffix("")], verbose=False
+        )
+    return saved
+
+
+_PARTITIONABLE_DIMS = ("eta_rho", "xi_rho", "eta_v", "xi_u", "eta_psi", "xi_psi")
+"""The dimensions split between tiles by `roms_tools.partition_netcdf`."""
+
+_COARSE_DIMS = ("eta_coarse", "xi_coarse")
+"""Dimensions of the coarse grid, split between tiles if `include_coarse_dims`."""
+
+DEFAULT_MAX_MEMORY = 256 * 1024**2
+"""Default bound, in bytes, on the data held in memory by `partition_netcdf`."""
+
+MAX_OPEN_FILES = 256
+"""The most tiles `partition_netcdf`, `repartition_netcdf` and `join_netcdf` hold
+open at once, or half the limit on open files of the process if that is lower."""
+
+
+@dataclass(frozen=True)
+class PartitionResult:
+    """The outcome of a call to `partition_netcdf`.
+
+    Attributes
+    ----------
+    files: list of Path
+        The tiles written
+    max_memory: int
+        The bound on the data held in memory, in bytes
+    peak_memory: int
+        The most data held in memory at once, in bytes: a slab of one variable,
+        and the chunk caches of the files open. This only exceeds `max_memory` if
+        a single record or chunk of one variable is larger.
+    bytes_read: int
+        The volume of data read from the source
+    """
+
+    files: list[Path]
+    max_memory: int
+    peak_memory: int
+    bytes_read: int
+
+
+@dataclass(frozen=True)
+class NetCDFCompression:
+    """How to compress and chunk the variables of a NetCDF4 file.
+
+    The default chunks hold one record of a variable: a full horizontal field (at
+    every depth) at one time, which is how most analyses and plots read ROMS
+    output, rather than the contiguous layout ROMS writes.
+
+    Attributes
+    ----------
+    method: str, optional, default = "zlib"
+        The HDF5 filter used, "zlib" or "zstd" (if the NetCDF library supports it)
+    level: int, optional, default = 4
+        The compression level
+    shuffle: bool, optional, default = True
+        Whether to apply the HDF5 shuffle filter first, which usually improves
+        the compression of floating-point data (with zlib only)
+    chunks: dict of str to int, optional
+        The chunk size along each dimension. Unlimited dimensions (time) not
+        listed have chunks of 1, and other dimensions not listed are not split.
+    """
+
+    METHODS: ClassVar[tuple[str, ...]] = ("zlib", "zstd")
+    """The compression methods supported."""
+
+    method: str = "zlib"
+    level: int = 4
+    shuffle: bool = True
+    chunks: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.method not in self.METHODS:
+            raise ValueError(
+                f"Unknown compression method '{self.method}': expected one of "
+                f"{', '.join(self.METHODS)}"
+            )
+        if (self.method == "zstd") and not netCDF4.__has_zstandard_support__:
+            raise ValueError(
+                "zstd compression requires a NetCDF library built with the zstd "
+                "filter: use method='zlib' instead"
+            )
+
+    def encoding(
+        self, var: "netCDF4.Variable", sizes: Mapping[Hashable, int]
+    ) -> dict[str, Any]:
+        """The arguments to `netCDF4.Dataset.createVariable` compressing a variable.
+
+        Parameters
+        ----------
+        var: netCDF4.Variable
+            The variable to copy
+        sizes: mapping of str to int
+            The sizes of the dimensions in the new file
+
+        Returns
+        -------
+        dict
+            The compression, shuffle and chunk sizes of the variable. Scalar and
+            string variables are left uncompressed.
+        """
+        if (var.ndim == 0) or (var.dtype == str):
+            return {}
+        chunksizes = []
+        for dim in var.get_dims():
+            if dim.isunlimited():
+                chunksizes.append(max(1, self.chunks.get(dim.name, 1)))
+            else:
+                size = sizes[dim.name]
+                chunksizes.append(max(1, min(self.chunks.get(dim.name, size), size)))
+        return {
+            "compression": self.method,
+            "complevel": self.level,
+            "shuffle": self.shuffle,
+            "chunksizes": chunksizes,
+        }
+
+
+@dataclass(frozen=True)
+class JoinResult:
+    """The outcome of joining the tiles of a partitioned file (see `join_netcdf`).
+
+    Attributes
+    ----------
+    output: Path
+        The joined file
+    tiles: list of Path
+        The tiles joined
+    input_bytes: int
+        The total size of the tiles on disk
+    output_bytes: int
+        The size of the joined file on disk
+    seconds: float
+        The time taken to join and verify the tiles
+    peak_memory: int
+        The most data held in memory at once, in bytes, including chunk caches
+    """
+
+    output: Path
+    tiles: list[Path]
+    input_bytes: int
+    output_bytes: int
+    seconds: float
+    peak_memory: int
+
+    @property
+    def compression_ratio(self) -> float:
+        """The size of the tiles relative to that of the joined file."""
+        return self.input_bytes / max(self.output_bytes, 1)
+
+    @property
+    def throughput(self) -> float:
+        """The number of bytes of tiles joined per second."""
+        return self.input_bytes / max(self.seconds, 1e-9)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.output.name}: {_format_size(self.input_bytes)} in "
+            f"{len(self.tiles)} tiles -> {_format_size(self.output_bytes)} "
+            f"({self.compression_ratio:.2f}x) at {_format_size(int(self.throughput))}/s"
+        )
+
+
+def partition_netcdf(
+    source: str | Path,
+    np_xi: int,
+    np_eta: int,
+    max_memory: int | str = DEFAULT_MAX_MEMORY,
+    include_coarse_dims: bool = True,
+) -> PartitionResult:
+    """Partition a global NetCDF file into tiles, holding little of it in memory.
+
+    Unlike `roms_tools.partition_netcdf`, which loads each variable in full, the
+    source is read one variable at a time, in slabs along its first dimension
+    (usually time) no larger than `max_memory`. Each slab is written to every
+    tile it overlaps before the next is read, so the memory used does not grow
+    with the size of the grid or the number of time records. Reads are hyperslab
+    reads, so only the chunks of the source holding each slab are decompressed.
+    At most `MAX_OPEN_FILES` tiles are open at once, so a file can be partitioned
+    into more tiles than the process may open files.
+
+    The tiles have the same geometry and names as those of
+    `roms_tools.partition_netcdf`, and each variable keeps the type, fill value,
+    attributes and compression of the source.
+
+    Parameters
+    ----------
+    source: str or Path
+        The global NetCDF file
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    max_memory: int or str, optional
+        The bound on the data held in memory, as a number of bytes or a size such
+        as "512M". Defaults to 256 MiB.
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are also partitioned
+
+    Returns
+    -------
+    PartitionResult
+        The tiles written, and the peak memory used
+    """
+    source = Path(source)
+    max_memory = _parse_size(max_memory)
+    paths = tile_paths(source, np_xi * np_eta)
+
+    with netCDF4.Dataset(source) as src:
+        sizes: dict[Hashable, int] = {
+            name: len(dim) for name, dim in src.dimensions.items()
+        }
+    indexers = tile_indexers(sizes, np_xi, np_eta, include_coarse_dims)
+    peak_memory, bytes_read = _write_tiles(
+        [(source, {})], sizes, paths, indexers, max_memory
+    )
+
+    log.info(
+        f"Partitioned {source} into ({np_xi},{np_eta}) with a peak of "
+        f"{_format_size(peak_memory)} in memory (limit: {_format_size(max_memory)})"
+    )
+    return PartitionResult(
+        files=paths,
+        max_memory=max_memory,
+        peak_memory=peak_memory,
+        bytes_read=bytes_read,
+    )
+
+
+def repartition_netcdf(
+    tiles: Sequence[str | Path],
+    source_np_xi: int,
+    source_np_eta: int,
+    np_xi: int,
+    np_eta: int,
+    output: str | Path,
+    max_memory: int | str = DEFAULT_MAX_MEMORY,
+    include_coarse_dims: bool = True,
+) -> PartitionResult:
+    """Repartition the tiles of a (source_np_xi, source_np_eta) partitioning into
+    (np_xi, np_eta) tiles, without reconstructing the global file.
+
+    The position of each existing tile in the global grid is deduced from the tile
+    sizes. Each variable of each existing tile is then read in slabs no larger than
+    `max_memory`, as in `partition_netcdf`, and each slab is written only to the
+    new tiles it overlaps.
+
+    Parameters
+    ----------
+    tiles: sequence of str or Path
+        The existing tiles, in ROMS' order (xi varying fastest)
+    source_np_xi: int
+        The number of existing tiles in the xi direction
+    source_np_eta: int
+        The number of existing tiles in the eta direction
+    np_xi: int
+        The number of new tiles in the xi direction
+    np_eta: int
+        The number of new tiles in the eta direction
+    output: str or Path
+        The path of the (notional) global file after which the new tiles are
+        named, e.g. `rst.nc` for `rst.0.nc`, `rst.1.nc`, ... It must not be in the
+        same directory as `tiles` if their names would clash.
+    max_memory: int or str, optional
+        The bound on the data held in memory, as a number of bytes or a size such
+        as "512M". Defaults to 256 MiB.
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are partitioned
+
+    Returns
+    -------
+    PartitionResult
+        The new tiles, and the peak memory used
+
+    Raises
+    ------
+    ValueError
+        If the number or sizes of `tiles` do not match a (source_np_xi,
+        source_np_eta) partitioning
+    """
+    tile_files = [Path(t) for t in tiles]
+    if len(tile_files) != source_np_xi * source_np_eta:
+        raise ValueError(
+            f"Expected {source_np_xi * source_np_eta} tiles for a "
+            f"({source_np_xi},{source_np_eta}) partitioning, found {len(tile_files)}"
+        )
+    max_memory = _parse_size(max_memory)
+    paths = tile_paths(Path(output), np_xi * np_eta)
+
+    sizes, sources = _place_tiles(
+        tile_files, source_np_xi, source_np_eta, include_coarse_dims
+    )
+    indexers = tile_indexers(sizes, np_xi, np_eta, include_coarse_dims)
+    peak_memory, bytes_read = _write_tiles(sources, sizes, paths, indexers, max_memory)
+
+    log.info(
+        f"Repartitioned {len(tile_files)} tiles from "
+        f"({source_np_xi},{source_np_eta}) to ({np_xi},{np_eta}) with a peak of "
+        f"{_format_size(peak_memory)} in memory (limit: {_format_size(max_memory)})"
+    )
+    return PartitionResult(
+        files=paths,
+        max_memory=max_memory,
+        peak_memory=peak_memory,
+        bytes_read=bytes_read,
+    )
+
+
+def join_netcdf(
+    tiles: Sequence[str | Path],
+    np_xi: int,
+    np_eta: int,
+    output: str | Path,
+    compression: NetCDFCompression | None = None,
+    max_memory: int | str = DEFAULT_MAX_MEMORY,
+    include_coarse_dims: bool = True,
+) -> JoinResult:
+    """Join the tiles of a partitioned file, optionally compressing and rechunking
+    it as it is written.
+
+    Tiles are read in slabs no larger than `max_memory`, as in
+    `repartition_netcdf`, so compression and rechunking cost no I/O beyond the
+    join itself. The sum of every numeric variable is accumulated as the tiles
+    are read, and the joined file is only moved to `output` once it has been read
+    back and found to hold the same sums and dimension sizes.
+
+    Parameters
+    ----------
+    tiles: sequence of str or Path
+        The tiles, in ROMS' order (xi varying fastest)
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    output: str or Path
+        The joined file
+    compression: NetCDFCompression, optional
+        How to compress and chunk the joined file. By default, each variable keeps
+        the compression of the tiles.
+    max_memory: int or str, optional
+        The bound on the data held in memory, as a number of bytes or a size such
+        as "512M". Defaults to 256 MiB.
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are partitioned
+
+    Returns
+    -------
+    JoinResult
+        The joined file, its compression ratio and the throughput of the join
+
+    Raises
+    ------
+    ValueError
+        If the number or sizes of `tiles` do not match a (np_xi, np_eta)
+        partitioning, or if the joined file does not match them
+    """
+    start_time = time.perf_counter()
+    tile_files = [Path(t) for t in tiles]
+    if len(tile_files) != np_xi * np_eta:
+        raise ValueError(
+            f"Expected {np_xi * np_eta} tiles for a ({np_xi},{np_eta}) "
+            f"partitioning, found {len(tile_files)}"
+        )
+    output = Path(output)
+    partial = output.parent / f".{output.name}.partial"
+    max_memory = _parse_size(max_memory)
+    checksums: dict[str, float] = {}
+
+    sizes, sources = _place_tiles(tile_files, np_xi, np_eta, include_coarse_dims)
+    try:
+        peak_memory, _ = _write_tiles(
+            sources,
+            sizes,
+            [partial],
+            [{}],
+            max_memory,
+            compression=compression,
+            checksums=checksums,
+        )
+        _verify_checksums(partial, sizes, checksums, max_memory)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    partial.replace(output)
+
+    result = JoinResult(
+        output=output,
+        tiles=tile_files,
+        input_bytes=sum(t.stat().st_size for t in tile_files),
+        output_bytes=output.stat().st_size,
+        seconds=time.perf_counter() - start_time,
+        peak_memory=peak_memory,
+    )
+    log.info(f"Joined {result}")
+    return result
+
+
+def open_tiles(
+    tiles: Sequence[str | Path],
+    np_xi: int,
+    np_eta: int,
+    include_coarse_dims: bool = True,
+    **kwargs: Any,
+) -> xr.Dataset:
+    """Open the tiles of a partitioned file lazily, as one global dataset.
+
+    Each tile is opened with dask, and each variable is assembled from those of
+    the tiles spanning its partitioned dimensions, so that no data is read until
+    it is computed (e.g. written to a Zarr store, or a region selected).
+
+    Parameters
+    ----------
+    tiles: sequence of str or Path
+        The tiles, in ROMS' order (xi varying fastest)
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are partitioned
+    **kwargs
+        Passed to `xarray.open_dataset` for each tile
+
+    Returns
+    -------
+    xr.Dataset
+        The global dataset, with the attributes and encoding of the first tile.
+        Closing it closes every tile.
+
+    Raises
+    ------
+    ValueError
+        If the number of tiles does not match a (np_xi, np_eta) partitioning
+    """
+    if len(tiles) != np_xi * np_eta:
+        raise ValueError(
+            f"Expected {np_xi * np_eta} tiles for a ({np_xi},{np_eta}) "
+            f"partitioning, found {len(tiles)}"
+        )
+    kwargs.setdefault("chunks", {})
+    datasets = [xr.open_dataset(t, **kwargs) for t in tiles]
+    partitionable = _PARTITIONABLE_DIMS + (_COARSE_DIMS if include_coarse_dims else ())
+
+    variables: dict[Hashable, xr.Variable] = {}
+    for name, var in datasets[0].variables.items():
+        split = [d for d in var.dims if d in partitionable]
+        xi_dim = next((d for d in split if str(d).startswith("xi")), None)
+        eta_dim = next((d for d in split if str(d).startswith("eta")), None)
+        rows = []
+        for j in range(np_eta if eta_dim else 1):
+            row = [
+                datasets[j * np_xi + i].variables[name]
+                for i in range(np_xi if xi_dim else 1)
+            ]
+            rows.append(xr.Variable.concat(row, dim=xi_dim) if xi_dim else row[0])
+        variables[name] = xr.Variable.concat(rows, dim=eta_dim) if eta_dim else rows[0]
+
+    coord_names = set(datasets[0].coords)
+    ds = xr.Dataset(
+        {n: v for n, v in variables.items() if n not in coord_names},
+        coords={n: v for n, v in variables.items() if n in coord_names},
+        attrs=datasets[0].attrs,
+    )
+    ds.encoding = dict(datasets[0].encoding)
+
+    def close() -> None:
+        for tile in datasets:
+            tile.close()
+
+    ds.set_close(close)
+    return ds
+
+
+def extract_tiles(
+    tiles: Sequence[str | Path],
+    np_xi: int,
+    np_eta: int,
+    variables: Sequence[str] | None = None,
+    indexers: Mapping[str, slice | int] | None = None,
+    include_coarse_dims: bool = True,
+) -> xr.Dataset:
+    """Extract variables over a region of a partitioned file, reading only the tiles
+    that overlap it.
+
+    The global grid is deduced from the headers of the first row and column of
+    tiles, and the part of it each tile holds from the layout (see
+    `tile_indexers`). Only the tiles overlapping the region are read, and only
+    the hyperslab of each variable within the region, so a quick look at a few
+    surface fields of a large run takes a fraction of a full join.
+
+    Parameters
+    ----------
+    tiles: sequence of str or Path
+        The tiles, in ROMS' order (xi varying fastest). A joined file is a
+        single (1,1) tile.
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    variables: sequence of str, optional
+        The variables to extract, e.g. ["zeta", "temp"]. Coordinate variables
+        and the times of the records (e.g. `ocean_time`) are always included.
+        All variables are extracted by default.
+    indexers: mapping of str to slice or int, optional
+        The indices to extract along each dimension of the global grid, as for
+        `xarray.Dataset.isel`, e.g. `{"eta_rho": slice(0, 100), "s_rho": -1}`.
+        Partitioned dimensions only take slices with a step of 1. Unless given,
+        u, v and psi points are selected between the rho points selected (e.g.
+        `xi_u` from `xi_rho`). Dimensions not given are extracted in full.
+    include_coarse_dims: bool, optional, default True
+        Whether `eta_coarse` and `xi_coarse` are partitioned
+
+    Returns
+    -------
+    xr.Dataset
+        The variables over the region, decoded as by `xarray.open_dataset`
+
+    Raises
+    ------
+    ValueError
+        If the number of tiles does not match a (np_xi, np_eta) partitioning, a
+        variable is not in the file, or a partitioned dimension is not indexed by
+        a slice with a step of 1
+    """
+    tile_files = [Path(t) for t in tiles]
+    if len(tile_files) != np_xi * np_eta:
+        raise ValueError(
+            f"Expected {np_xi * np_eta} tiles for a ({np_xi},{np_eta}) "
+            f"partitioning, found {len(tile_files)}"
+        )
+    partitionable = _PARTITIONABLE_DIMS + (_COARSE_DIMS if include_coarse_dims else ())
+    opened: dict[int, netCDF4.Dataset] = {}
+
+    def open_tile(k: int) -> "netCDF4.Dataset":
+        if k not in opened:
+            opened[k] = netCDF4.Dataset(tile_files[k])
+            opened[k].set_auto_maskandscale(False)
+            opened[k].set_auto_chartostring(False)
+        return opened[k]
+
+    try:
+        template = open_tile(0)
+        sizes: dict[Hashable, int] = {}
+        for name, dim in template.dimensions.items():
+            if name not in partitionable:
+                sizes[name] = len(dim)
+            elif name.startswith("xi"):
+                sizes[name] = sum(
+                    len(open_tile(i).dimensions[name]) for i in range(np_xi)
+                )
+            else:
+                sizes[name] = sum(
+                    len(open_tile(j * np_xi).dimensions[name]) for j in range(np_eta)
+                )
+        layout = tile_indexers(sizes, np_xi, np_eta, include_coarse_dims)
+        selection = _region_indexers(indexers or {}, sizes, partitionable)
+
+        if variables is None:
+            names = list(template.variables)
+        else:
+            missing = [v for v in variables if v not in template.variables]
+            if missing:
+                raise ValueError(
+                    f"{tile_files[0]} has no variable {', '.join(missing)}"
+                )
+            # Along with the times of the records, and other coordinate variables
+            names = list(variables) + [
+                name
+                for name, var in template.variables.items()
+                if (var.ndim == 1)
+                and (name not in variables)
+                and (
+                    (var.dimensions[0] == name)
+                    or template.dimensions[var.dimensions[0]].isunlimited()
+                )
+            ]
+
+        extracted: dict[str, xr.Variable] = {}
+        tiles_read: set[int] = set()
+        for name in names:
+            var = template.variables[name]
+            split = [d for d in var.dimensions if d in partitionable]
+            out_dims = [
+                d for d in var.dimensions if not isinstance(selection.get(d), int)
+            ]
+            out_shape = [_selected_size(selection.get(d), sizes[d]) for d in out_dims]
+            data = np.empty(out_shape, dtype=var.dtype)
+            for k, tile_indexer in enumerate(layout if split else layout[:1]):
+                tile_key, out_key = [], []
+                for d in var.dimensions:
+                    index = selection.get(d, slice(None))
+                    if d not in split:
+                        tile_key.append(index)
+                        if not isinstance(index, int):
+                            out_key.append(slice(None))
+                        continue
+                    assert isinstance(index, slice)
+                    extent = tile_indexer.get(d, slice(0, sizes[d]))
+                    lo, hi = (
+                        max(index.start, extent.start),
+                        min(index.stop, extent.stop),
+                    )
+                    if lo >= hi:
+                        break  # The tile does not overlap the region
+                    tile_key.append(slice(lo - extent.start, hi - extent.start))
+                    out_key.append(slice(lo - index.start, hi - index.start))
+                else:
+                    data[tuple(out_key)] = open_tile(k).variables[name][tuple(tile_key)]
+                    tiles_read.add(k)
+            extracted[name] = xr.Variable(out_dims, data, attrs=var.__dict__)
+        coord_names = {
+            name for name in names if template.variables[name].dimensions == (name,)
+        }
+        attrs = template.__dict__
+    finally:
+        for ds in opened.values():
+            ds.close()
+
+    log.info(
+        f"Extracted {len(names)} variables from {len(tiles_read)} of "
+        f"{len(tile_files)} tiles"
+    )
+    return xr.decode_cf(
+        xr.Dataset(
+            {n: v for n, v in extracted.items() if n not in coord_names},
+            coords={n: v for n, v in extracted.items() if n in coord_names},
+            attrs=attrs,
+        )
+    )
+
+
+def _region_indexers(
+    indexers: Mapping[str, slice | int],
+    sizes: Mapping[Hashable, int],
+    partitionable: tuple[str, ...],
+) -> dict[Hashable, slice | int]:
+    """Normalize the indexers of a region, deriving those of staggered dimensions.
+
+    Partitioned dimensions are given slices with explicit bounds (the whole
+    dimension, if not indexed), and u, v and psi points between the rho points
+    selected are selected unless indexed explicitly.
+    """
+    selection: dict[Hashable, slice | int] = {d: i for d, i in indexers.items()}
+    for rho_dim, staggered in (
+        ("xi_rho", ("xi_u", "xi_psi")),
+        ("eta_rho", ("eta_v", "eta_psi")),
+    ):
+        index = selection.get(rho_dim)
+        if not isinstance(index, slice):
+            continue
+        for staggered_dim in staggered:
+            if (staggered_dim in sizes) and (staggered_dim not in selection):
+                start, stop, _ = index.indices(sizes[rho_dim])
+                selection[staggered_dim] = slice(start, max(start, stop - 1))
+
+    for name in partitionable:
+        if name in sizes:
+            selection.setdefault(name, slice(None))
+    for dim, index in selection.items():
+        if dim not in sizes:
+            raise ValueError(f"No dimension {dim} to index")
+        if dim not in partitionable:
+            continue
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise ValueError(
+                f"Partitioned dimension {dim} must be indexed by a slice with a step "
+                f"of 1, not {index!r}"
+            )
+        start, stop, _ = index.indices(sizes[dim])
+        selection[dim] = slice(start, max(start, stop))
+    return selection
+
+
+def _selected_size(index: slice | int | None, size: int) -> int:
+    """The number of elements of a dimension of size `size` that `index` selects."""
+    if index is None:
+        return size
+    assert isinstance(index, slice)
+    return len(range(*index.indices(size)))
+
+
+def _verify_checksums(
+    path: Path,
+    sizes: Mapping[Hashable, int],
+    checksums: Mapping[str, float],
+    max_memory: int,
+) -> None:
+    """Check that a file has the expected dimension sizes and variable sums.
+
+    Parameters
+    ----------
+    path: Path
+        The file to check
+    sizes: mapping of str to int
+        The expected size of each dimension
+    checksums: mapping of str to float
+        The expected sum of each numeric variable
+    max_memory: int
+        The bound on the data held in memory, in bytes
+
+    Raises
+    ------
+    ValueError
+        If a dimension or variable sum differs
+    """
+    with netCDF4.Dataset(path) as ds:
+        ds.set_auto_maskandscale(False)
+        for name, dim in ds.dimensions.items():
+            if len(dim) != sizes[name]:
+                raise ValueError(
+                    f"{path} failed verification: dimension {name} has size "
+                    f"{len(dim)}, expected {sizes[name]}"
+                )
+        for name, expected in checksums.items():
+            var = ds.variables[name]
+            record_bytes = var.dtype.itemsize * math.prod(var.shape[1:])
+            records_per_slab = max(max_memory // max(record_bytes, 1), 1)
+            total = 0.0
+            for start in range(0, var.shape[0], records_per_slab):
+                total += float(
+                    np.sum(var[start : start + records_per_slab], dtype=np.float64)
+                )
+            if not np.isclose(total, expected, rtol=1e-9, equal_nan=True):
+                raise ValueError(
+                    f"{path} failed verification: variable {name} sums to {total}, "
+                    f"expected {expected}"
+                )
+
+
+def _place_tiles(
+    tiles: Sequence[Path],
+    np_xi: int,
+    np_eta: int,
+    include_coarse_dims: bool,
+) -> tuple[dict[Hashable, int], list[tuple[Path, dict[str, int]]]]:
+    """Deduce the global grid, and the position in it of each of a set of tiles.
+
+    Parameters
+    ----------
+    tiles: sequence of Path
+        The tiles, in ROMS' order (xi varying fastest)
+    np_xi: int
+        The number of tiles in the xi direction
+    np_eta: int
+        The number of tiles in the eta direction
+    include_coarse_dims: bool
+        Whether `eta_coarse` and `xi_coarse` are partitioned
+
+    Returns
+    -------
+    tuple
+        The global size of each dimension, and each tile with the offset in the
+        global grid of each dimension it only covers part of
+
+    Raises
+    ------
+    ValueError
+        If the sizes of the tiles do not match a (np_xi, np_eta) partitioning
+    """
+    partitionable = _PARTITIONABLE_DIMS + (_COARSE_DIMS if include_coarse_dims else ())
+    tile_sizes = []
+    for tile in tiles:
+        # One at a time, however many tiles there are
+        with netCDF4.Dataset(tile) as src:
+            tile_sizes.append({name: len(dim) for name, dim in src.dimensions.items()})
+
+    # Global size of each dimension: the sum over one row or column of tiles
+    sizes: dict[Hashable, int] = {}
+    for name, size in tile_sizes[0].items():
+        if name not in partitionable:
+            sizes[name] = size
+        elif name.startswith("xi"):
+            sizes[name] = sum(tile_sizes[j][name] for j in range(np_xi))
+        else:
+            sizes[name] = sum(tile_sizes[i * np_xi][name] for i in range(np_eta))
+
+    source_indexers = tile_indexers(sizes, np_xi, np_eta, include_coarse_dims)
+    for tile, tile_size, tile_indexer in zip(tiles, tile_sizes, source_indexers):
+        for name, index in tile_indexer.items():
+            if tile_size[name] != index.stop - index.start:
+                raise ValueError(
+                    f"{tile} does not match a ({np_xi},{np_eta}) "
+                    f"partitioning: its dimension {name} has size "
+                    f"{tile_size[name]}, expected {index.stop - index.start}"
+                )
+    return sizes, [
+        (tile, {dim: index.start for dim, index in tile_indexer.items()})
+        for tile, tile_indexer in zip(tiles, source_indexers)
+    ]
+
+
+def _max_open_files() -> int:
+    """The most files to hold open at once: `MAX_OPEN_FILES`, or half the limit on
+    open files of the process if that is lower.
+    """
+    if resource is None:
+        return MAX_OPEN_FILES
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return MAX_OPEN_FILES
+    return max(min(MAX_OPEN_FILES, soft_limit // 2), 1)
+
+
+class _OpenFiles:
+    """The NetCDF files read or written by `_write_tiles`, opened when first used.
+
+    At most `max_open` files are open at once: the least recently used is closed
+    when another is needed, and reopened if used again. HDF5 gives each variable
+    of an open file its own chunk cache (64 MiB by default), so each file only
+    caches the variable last used in it, and at most one chunk of it, which
+    `cache_bytes` accounts for.
+    """
+
+    def __init__(self, max_open: int):
+        self.max_open = max(max_open, 1)
+        self._files: OrderedDict[Path, netCDF4.Dataset] = OrderedDict()
+        self._cached: dict[Path, tuple[str, int]] = {}
+
+    @property
+    def cache_bytes(self) -> int:
+        """The size of the chunk caches of the files open, in bytes."""
+        return sum(size for _, size in self._cached.values())
+
+    def variable(
+        self, path: Path, name: str, mode: Literal["r", "a"] = "r"
+    ) -> "netCDF4.Variable":
+        """The variable `name` of the file at `path`, opened in `mode` if needed."""
+        if path in self._files:
+            self._files.move_to_end(path)
+            ds = self._files[path]
+        else:
+            while len(self._files) >= self.max_open:
+                self._close(next(iter(self._files)))
+            ds = netCDF4.Dataset(path, mode)
+            ds.set_auto_maskandscale(False)
+            ds.set_auto_chartostring(False)
+            self._files[path] = ds
+
+        var = ds.variables[name]
+        cached, _ = self._cached.get(path, (None, 0))
+        if (cached != name) and ds.data_model.startswith("NETCDF4"):
+            if cached is not None:
+                ds.variables[cached].set_var_chunk_cache(size=0)
+            chunks = var.chunking()
+            cache_size = (
+                0
+                if chunks == "contiguous"
+                else math.prod(chunks)
+                * (var.dtype.itemsize if var.dtype != str else 64)
+            )
+            var.set_var_chunk_cache(size=cache_size)
+            self._cached[path] = (name, cache_size)
+        return var
+
+    def close(self) -> None:
+        """Close every open file."""
+        while self._files:
+            self._close(next(iter(self._files)))
+
+    def _close(self, path: Path) -> None:
+        self._cached.pop(path, None)
+        self._files.pop(path).close()
+
+
+def _write_tiles(
+    sources: list[tuple[Path, dict[str, int]]],
+    sizes: Mapping[Hashable, int],
+    paths: list[Path],
+    indexers: list[TileIndexers],
+    max_memory: int,
+    compression: "NetCDFCompression | None" = None,
+    checksums: dict[str, float] | None = None,
+) -> tuple[int, int]:
+    """Write the tiles at `paths` from one or more sources, a slab at a time.
+
+    Besides the first source, which serves as a template, at most
+    `_max_open_files()` sources and tiles are open at once (see `_OpenFiles`), and
+    a tile is only opened to write slabs that overlap it.
+
+    Parameters
+    ----------
+    sources: list of (Path, dict of str to int)
+        The sources (the global file, or the tiles of another partitioning), each
+        with the offset in the global grid of each dimension it only covers part of
+    sizes: mapping of str to int
+        The global size of each dimension
+    paths: list of Path
+        The tiles to write
+    indexers: list of dict of str to slice
+        The part of the global grid forming each tile
+    max_memory: int
+        The bound on the data held in memory, including chunk caches, in bytes
+    compression: NetCDFCompression, optional
+        How to compress and chunk the tiles. By default, each variable keeps the
+        compression of the sources.
+    checksums: dict of str to float, optional
+        If given, the sum of each numeric variable read is accumulated in it (see
+        `_verify_checksums`)
+
+    Returns
+    -------
+    tuple of int
+        The peak number of bytes held in memory, and the number of bytes read
+    """
+    peak_memory, bytes_read = 0, 0
+    split_dims = {dim for _, offsets in sources for dim in offsets}
+    files = _OpenFiles(_max_open_files())
+
+    with netCDF4.Dataset(sources[0][0]) as template:
+        template.set_auto_maskandscale(False)
+        template.set_auto_chartostring(False)
+        for path, tile_indexer in zip(paths, indexers):
+            tile_sizes = dict(sizes)
+            for dim, index in tile_indexer.items():
+                tile_sizes[dim] = index.stop - index.start
+            _create_tile(template, path, tile_sizes, compression).close()
+
+        try:
+            for name, template_var in template.variables.items():
+                if template_var.ndim == 0:
+                    for path in paths:
+                        files.variable(path, name, "a").assignValue(
+                            template_var.getValue()
+                        )
+                    continue
+
+                # Variables spanning a split dimension are spread over all sources:
+                readers = (
+                    sources
+                    if split_dims.intersection(template_var.dimensions)
+                    else sources[:1]
+                )
+                for source, offsets in readers:
+                    var = files.variable(source, name)
+                    itemsize = var.dtype.itemsize if var.dtype != str else 64
+                    record_bytes = itemsize * math.prod(var.shape[1:])
+                    slab_memory = max_memory - files.cache_bytes
+                    records_per_slab = max(slab_memory // max(record_bytes, 1), 1)
+
+                    for start in range(0, var.shape[0], records_per_slab):
+                        stop = min(start + records_per_slab, var.shape[0])
+                        slab = files.variable(source, name)[start:stop]
+                        bytes_read += slab.nbytes
+                        if (checksums is not None) and (slab.dtype.kind in "biuf"):
+                            checksums[name] = checksums.get(name, 0.0) + float(
+                                np.sum(slab, dtype=np.float64)
+                            )
+                        origin = [offsets.get(dim, 0) for dim in var.dimensions]
+                        origin[0] += start
+                        for path, tile_indexer in zip(paths, indexers):
+                            if _overlap(var.dimensions, slab, origin, tile_indexer):
+                                _write_overlap(
+                                    files.variable(path, name, "a"),
+                                    slab,
+                                    origin,
+                                    tile_indexer,
+                                )
+                        peak_memory = max(peak_memory, slab.nbytes + files.cache_bytes)
+                        del slab
+        finally:
+            files.close()
+
+    return peak_memory, bytes_read
+
+
+def _create_tile(
+    template: "netCDF4.Dataset",
+    path: Path,
+    sizes: Mapping[Hashable, int],
+    compression: "NetCDFCompression | None" = None,
+) -> "netCDF4.Dataset":
+    """Create an empty file with the variables and attributes of `template`, and the
+    dimension sizes `sizes` (unlimited dimensions remain unlimited).
+
+    Variables keep the compression of `template`, unless `compression` is given.
+    """
+    file_format = template.data_model
+    if (compression is not None) and file_format.startswith("NETCDF3"):
+        # HDF5 filters need a NetCDF4 file; the classic model keeps the same API
+        file_format = "NETCDF4_CLASSIC"
+    tile = netCDF4.Dataset(path, "w", format=file_format)
+    tile.set_auto_maskandscale(False)
+    tile.set_auto_chartostring(False)
+    tile.setncatts(template.__dict__)
+    for name, dim in template.dimensions.items():
+        tile.createDimension(name, None if dim.isunlimited() else sizes[name])
+
+    for name, var in template.variables.items():
+        attrs = var.__dict__.copy()
+        fill_value = attrs.pop("_FillValue", None)
+        if compression is not None:
+            encoding = compression.encoding(var, sizes)
+        else:
+            filters = var.filters() or {}
+            encoding = {
+                "zlib": bool(filters.get("zlib")),
+                "complevel": filters.get("complevel") or 4,
+                "shuffle": bool(filters.get("shuffle")),
+            }
+        tile_var = tile.createVariable(
+            name, var.datatype, var.dimensions, fill_value=fill_value, **encoding
+        )
+        tile_var.setncatts(attrs)
+    return tile
+
+
+def _overlap(
+    dimensions: Sequence[str],
+    slab: np.ndarray,
+    origin: list[int],
+    indexers: TileIndexers,
+) -> tuple[tuple[slice, ...], tuple[slice, ...]] | None:
+    """The part of `slab`, whose first element is at `origin` in the global grid,
+    that falls within a tile, as keys into the slab and the tile, or None if none
+    does.
+    """
+    slab_key, tile_key = [], []
+    for axis, dim in enumerate(dimensions):
+        slab_start, slab_stop = origin[axis], origin[axis] + slab.shape[axis]
+        index = indexers.get(dim)
+        tile_start = index.start if index else 0
+        tile_stop = index.stop if index else slab_stop
+        lo, hi = max(slab_start, tile_start), min(slab_stop, tile_stop)
+        if lo >= hi:
+            return None
+        slab_key.append(slice(lo - slab_start, hi - slab_start))
+        tile_key.append(slice(lo - tile_start, hi - tile_start))
+    return tuple(slab_key), tuple(tile_key)
+
+
+def _write_overlap(
+    tile_var: "netCDF4.Variable",
+    slab: np.ndarray,
+    origin: list[int],
+    indexers: TileIndexers,
+) -> None:
+    """Write the part of `slab`, whose first element is at `origin` in the global
+    grid, that falls within a tile.
+    """
+    keys = _overlap(tile_var.dimensions, slab, origin, indexers)
+    if keys is not None:
+        slab_key, tile_key = keys
+        tile_var[tile_key] = slab[slab_key]
@@ -0,0 +1,13 @@
+from cstar.execution.watchdog import FailureSignature, WatchdogRules
+
+ROMS_FAILURE_SIGNATURES = (
+    FailureSignature(name="blow-up", pattern=r"(?i)blow(ing)?[ _-]?up"),
+    FailureSignature(name="abnormal termination", pattern=r"(?i)abnormal termination"),
+    FailureSignature(name="NaN in output", pattern=r"\bNaN\b"),
+    FailureSignature(name="CFL violation", pattern=r"(?i)\bCFL\b.*(violat|exceed)"),
+    FailureSignature(name="MPI abort", pattern=r"(?i)MPI_ABORT|Fatal error in P?MPI"),
+)
+"""Lines of ROMS (or MPI) output showing that a ROMS run has failed."""
+
+ROMS_WATCHDOG_RULES = WatchdogRules(signatures=ROMS_FAILURE_SIGNATURES)
+"""The default conditions under which a ROMS run is cancelled early."""
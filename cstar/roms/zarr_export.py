@@ -0,0 +1,170 @@
+from collections.abc import Hashable, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+from cstar.base.log import get_logger
+from cstar.roms.tiling import open_tiles
+
+log = get_logger(__name__)
+
+ZARR_FORMAT = 2
+"""The version of the Zarr format written, whose consolidated metadata (read with a
+single request however many variables a store holds) any Zarr reader supports."""
+
+_KEPT_ENCODING = (
+    "units",
+    "calendar",
+    "dtype",
+    "_FillValue",
+    "scale_factor",
+    "add_offset",
+)
+"""The encoding of a NetCDF variable that still applies to a Zarr array."""
+
+
+def export_zarr(
+    files: Sequence[str | Path],
+    store: str | Path,
+    np_xi: int = 1,
+    np_eta: int = 1,
+    chunks: Mapping[str, int] | None = None,
+    append_dim: str | None = None,
+) -> int:
+    """Write a ROMS output file, joined or still partitioned, to a Zarr store.
+
+    Partitioned files are joined lazily (see `cstar.roms.tiling.open_tiles`), so
+    the tiles are read once, a chunk at a time, and never joined on disk.
+
+    If the store already exists, the records of the file are appended to it along
+    `append_dim`, so that the outputs of successive runs (e.g. restart segments)
+    form one store. Records no later than the last one in the store, such as the
+    initial record a restarted run repeats, are skipped, and variables without
+    `append_dim` (e.g. the grid) are not written again.
+
+    Parameters
+    ----------
+    files: sequence of str or Path
+        The joined file, or its tiles in ROMS' order (xi varying fastest)
+    store: str or Path
+        The Zarr store, created if it does not exist
+    np_xi: int, optional, default = 1
+        The number of tiles in the xi direction, if `files` are tiles
+    np_eta: int, optional, default = 1
+        The number of tiles in the eta direction, if `files` are tiles
+    chunks: mapping of str to int, optional
+        The chunk size along each dimension, when the store is created. By default,
+        chunks hold one record along `append_dim` and are not split along other
+        dimensions. The chunks of an existing store are kept.
+    append_dim: str, optional
+        The dimension along which records are appended. Defaults to the unlimited
+        dimension of the file, or "time" if it has none.
+
+    Returns
+    -------
+    int
+        The number of records written
+
+    Raises
+    ------
+    ValueError
+        If the number of `files` does not match a (np_xi, np_eta) partitioning
+    """
+    paths = [Path(f) for f in files]
+    store = Path(store)
+    ds = (
+        xr.open_dataset(paths[0], chunks={})
+        if len(paths) == 1
+        else open_tiles(paths, np_xi, np_eta)
+    )
+    source = (
+        paths[0].name if len(paths) == 1 else f"{len(paths)} tiles of {paths[0].name}"
+    )
+    with ds:
+        if append_dim is None:
+            unlimited = sorted(ds.encoding.get("unlimited_dims", ()))
+            append_dim = unlimited[0] if unlimited else "time"
+        for var in ds.variables.values():
+            var.encoding = {
+                k: var.encoding[k] for k in _KEPT_ENCODING if k in var.encoding
+            }
+
+        if not store.exists():
+            ds = _chunk_new_store(ds, chunks or {}, append_dim)
+            ds.to_zarr(store, mode="w-", zarr_format=ZARR_FORMAT, consolidated=True)
+        else:
+            ds = _records_to_append(ds, store, append_dim)
+            if ds.sizes.get(append_dim, 0) == 0:
+                log.info(f"{store} already holds every record of {source}")
+                return 0
+            ds.to_zarr(
+                store,
+                mode="a",
+                append_dim=append_dim,
+                zarr_format=ZARR_FORMAT,
+                consolidated=True,
+            )
+        n_records = ds.sizes.get(append_dim, 0)
+
+    log.info(f"Wrote {n_records} records of {source} to {store}")
+    return n_records
+
+
+def _chunk_new_store(
+    ds: xr.Dataset, chunks: Mapping[str, int], append_dim: str
+) -> xr.Dataset:
+    """Chunk a dataset for a new store, along every dimension."""
+    sizes = {
+        dim: chunks.get(str(dim), 1 if dim == append_dim else size)
+        for dim, size in ds.sizes.items()
+    }
+    for var in ds.variables.values():
+        if var.ndim > 0:
+            # Along append_dim, chunks may be larger than the first file
+            var.encoding["chunks"] = tuple(
+                sizes[d] if d == append_dim else min(sizes[d], var.sizes[d])
+                for d in var.dims
+            )
+    return ds.chunk(sizes)
+
+
+def _records_to_append(ds: xr.Dataset, store: Path, append_dim: str) -> xr.Dataset:
+    """Select the records of a dataset later than those of a store, chunked as the
+    store is, and so as to fill its last, partially filled chunk first.
+    """
+    with xr.open_zarr(store, consolidated=True) as existing:
+        time = _time_variable(existing, append_dim)
+        last = existing[time].values[-1] if time is not None else None
+        n_existing = existing.sizes.get(append_dim, 0)
+        store_chunks: dict[Hashable, int] = {}
+        for var in existing.variables.values():
+            store_chunks.update(zip(var.dims, var.encoding.get("chunks", ())))
+
+    ds = ds.drop_vars(
+        [name for name, var in ds.variables.items() if append_dim not in var.dims]
+    )
+    if (last is not None) and (time in ds.variables):
+        ds = ds.isel({append_dim: np.asarray(ds[time].values > last)})
+
+    n_records = ds.sizes.get(append_dim, 0)
+    chunk = store_chunks.get(append_dim, 1)
+    first = min((chunk - n_existing % chunk) % chunk or chunk, n_records)
+    full, remainder = divmod(n_records - first, chunk)
+    records = [first] * (first > 0) + [chunk] * full + [remainder] * (remainder > 0)
+
+    sizes: dict[Hashable, int | tuple[int, ...]] = {
+        dim: store_chunks.get(dim, -1) for dim in ds.dims if dim != append_dim
+    }
+    sizes[append_dim] = tuple(records) or -1
+    return ds.chunk(sizes)
+
+
+def _time_variable(ds: xr.Dataset, append_dim: str) -> Hashable | None:
+    """The variable holding the time of each record, e.g. ROMS' `ocean_time`."""
+    if append_dim in ds.variables:
+        return append_dim
+    return next(
+        (name for name, var in ds.variables.items() if var.dims == (append_dim,)),
+        None,
+    )
@@ -3,14 +3,28 @@ import pickle
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 import dateutil
 
 from cstar.base import AdditionalCode, Discretization, ExternalCodeBase
 from cstar.base.log import LoggingMixin
+from cstar.base.state_store import (
+    StateStore,
+    decode_value,
+    resolve_state_type,
+    state_type_name,
+)
+from cstar.base.tracing import traced
 from cstar.execution.handler import ExecutionHandler, ExecutionStatus
 from cstar.execution.local_process import LocalProcess
+from cstar.execution.watchdog import Watchdog, WatchdogRules
+
+STATE_FILE_NAME = "simulation_state.db"
+"""Name of the state store written to the simulation directory by `persist()`."""
+
+LEGACY_STATE_FILE_NAME = "simulation_state.pkl"
+"""Name of the pickle file written by `persist()` in earlier versions of C-Star."""
 
 
 class Simulation(ABC, LoggingMixin):
@@ -38,6 +52,10 @@ class Simulation(ABC, LoggingMixin):
         Additional source code modifications and compile-time configuration files.
     discretization : Discretization
         Numerical discretization parameters for this simulation.
+    watchdog_rules : WatchdogRules
+        The conditions under which `watch()` cancels a run of this simulation.
+        Subclasses provide their model's failure signatures; assign new rules
+        to change them for one simulation.
 
     Methods
     -------
@@ -59,6 +77,8 @@ class Simulation(ABC, LoggingMixin):
         Execute the simulation.
     post_run()
         Execute any post-processing actions required after running the simulation.
+    watch(interval=60, background=True)
+        Cancel the simulation's run as soon as it fails or hangs.
     persist()
         Save the state of this Simulation instance to disk.
     restore(directory)
@@ -67,6 +87,16 @@ class Simulation(ABC, LoggingMixin):
         Create a new Simulation instance starting from the end of this one.
     """
 
+    _transient_attributes: ClassVar[frozenset[str]] = frozenset(
+        {"_log", "_pending_state"}
+    )
+    """Attributes that are never written to the state store."""
+
+    watchdog_rules: WatchdogRules = WatchdogRules()
+
+    _execution_handler: ExecutionHandler | None
+    """The handler of the simulation's run, once `run()` has been called."""
+
     def __init__(
         self,
         name: str,
@@ -550,18 +580,52 @@ class Simulation(ABC, LoggingMixin):
         """
         pass
 
+    def __getattr__(self, name: str) -> Any:
+        """Decode attributes of a restored simulation on first access.
+
+        `restore()` only reads the encoded state from disk; each attribute is
+        decoded the first time it is needed.
+        """
+        pending = self.__dict__.get("_pending_state")
+        if pending is not None and name in pending:
+            value = decode_value(*pending[name])
+            setattr(self, name, value)
+            return value
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
+
+    def __getstate__(self) -> dict:
+        """Return the full (decoded) state of this simulation, excluding transient
+        attributes such as the logger.
+        """
+        pending = self.__dict__.get("_pending_state", {})
+        # Keep attributes in the order in which they were originally stored:
+        state = {name: getattr(self, name) for name in pending}
+        state.update(
+            {
+                k: v
+                for k, v in self.__dict__.items()
+                if k not in self._transient_attributes
+            }
+        )
+        return state
+
+    @traced(category="state")
     def persist(self) -> None:
-        """Save the current state of the simulation to a file.
+        """Save the current state of the simulation to disk.
 
-        This method serializes the simulation object and writes it to a file named
-        `simulation_state.pkl` within the simulation directory, allowing the exact state
-        to be restored later.
+        This method writes the state of the simulation to a schema-versioned state
+        store named `simulation_state.db` within the simulation directory, allowing
+        it to be restored later. Each attribute is stored separately, and only
+        attributes that have changed since the last call are rewritten. Updates
+        are atomic, so an interrupted call leaves the previous state intact.
 
         Raises
         ------
         RuntimeError
-            If the simulation is currently running in a local process, as a running
-            LocalProcess instance cannot be serialized.
+            If the simulation is currently running (or queued to run) in a local
+            process, as such a LocalProcess instance cannot be serialized.
 
         See Also
         --------
@@ -570,27 +634,39 @@ class Simulation(ABC, LoggingMixin):
         if (
             (hasattr(self, "_execution_handler"))
             and (isinstance(self._execution_handler, LocalProcess))
-            and (self._execution_handler.status == ExecutionStatus.RUNNING)
+            and (
+                self._execution_handler.status
+                in {ExecutionStatus.RUNNING, ExecutionStatus.PENDING}
+            )
         ):
             raise RuntimeError(
                 "Simulation.persist() was called, but at least one "
-                "local process is currently running in. Await "
+                "local process is currently running or queued. Await "
                 "completion or use LocalProcess.cancel(), then try again"
             )
 
-        # Loggers do not survive roundtrip
-        if hasattr(self, "_log"):
-            del self._log
-
-        with open(f"{self.directory}/simulation_state.pkl", "wb") as state_file:
-            pickle.dump(self, state_file)
+        state = {
+            k: v
+            for k, v in self.__dict__.items()
+            if k not in self._transient_attributes
+        }
+        # Attributes that have not been accessed since restore() are unchanged:
+        unloaded = set(self.__dict__.get("_pending_state", {})) - set(state)
+
+        StateStore(self.directory / STATE_FILE_NAME).write(
+            state,
+            object_type=state_type_name(self.__class__),
+            skip=unloaded,
+        )
 
     @classmethod
     def restore(cls, directory: str | Path) -> "Simulation":
         """Restore a previously saved simulation state.
 
-        This method loads a serialized simulation object from the `simulation_state.pkl`
-        file located in the specified directory and returns the restored instance.
+        This method reads the `simulation_state.db` state store in the specified
+        directory and returns the restored instance. Attributes are decoded lazily,
+        the first time they are accessed. State saved by earlier versions of C-Star
+        (`simulation_state.pkl`) is also supported.
 
         Parameters
         ----------
@@ -605,17 +681,45 @@ class Simulation(ABC, LoggingMixin):
         Raises
         ------
         FileNotFoundError
-            If the `simulation_state.pkl` file is not found in the specified directory.
-        pickle.UnpicklingError
-            If the file cannot be deserialized, indicating possible corruption.
+            If no saved state is found in the specified directory.
+        StateSchemaError
+            If the state was saved by a newer, incompatible version of C-Star.
 
         See Also
         --------
         persist : Saves the current simulation state.
         """
         directory = Path(directory)
-        with open(f"{directory}/simulation_state.pkl", "rb") as state_file:
-            simulation_instance = pickle.load(state_file)
+        store = StateStore(directory / STATE_FILE_NAME)
+
+        if not store.exists:
+            legacy_state_file = directory / LEGACY_STATE_FILE_NAME
+            if not legacy_state_file.exists():
+                raise FileNotFoundError(
+                    f"No saved simulation state found in {directory}"
+                )
+            with open(legacy_state_file, "rb") as state_file:
+                return pickle.load(state_file)
+
+        object_type, fields = store.read()
+        simulation_class = resolve_state_type(object_type)
+        if not issubclass(simulation_class, cls):
+            raise TypeError(
+                f"The simulation saved in {directory} is a "
+                f"{simulation_class.__name__}, "
+                f"which cannot be restored as a {cls.__name__}"
+            )
+
+        simulation_instance = simulation_class.__new__(simulation_class)
+        simulation_instance.__dict__["_pending_state"] = fields
+        # `__getattr__` is never reached for names with a class-level default:
+        simulation_instance.__dict__.update(
+            {
+                name: decode_value(*payload)
+                for name, payload in fields.items()
+                if hasattr(simulation_class, name)
+            }
+        )
         return simulation_instance
 
     @abstractmethod
@@ -700,19 +804,73 @@ class Simulation(ABC, LoggingMixin):
         """
         pass
 
-    def restart(self, new_end_date: str | datetime) -> "Simulation":
+    def watch(self, interval: float = 60, background: bool = True) -> Watchdog:
+        """Cancel the simulation's run as soon as it fails or hangs.
+
+        The run is checked every `interval` seconds against `watchdog_rules`,
+        and cancelled as soon as it breaks one of them, e.g. when the model
+        blows up, rather than when it reaches its walltime (see `Watchdog`).
+
+        Parameters
+        ----------
+        interval : float, optional, default = 60
+            The number of seconds between checks.
+        background : bool, optional, default = True
+            Whether to watch the run in a background thread. If False, this
+            method returns once the run finishes or is cancelled.
+
+        Returns
+        -------
+        Watchdog
+            The watchdog, whose `diagnostic` holds the reason for cancelling the
+            run, once it has been cancelled.
+
+        Raises
+        ------
+        RuntimeError
+            If the simulation has not been run.
+        """
+        handler = getattr(self, "_execution_handler", None)
+        if handler is None:
+            raise RuntimeError(
+                "Cannot watch a simulation that has not been run. "
+                "Call Simulation.run() first."
+            )
+        watchdog = Watchdog(handler, self.watchdog_rules)
+        if background:
+            watchdog.start(interval)
+        else:
+            watchdog.watch(interval)
+        return watchdog
+
+    def restart(
+        self,
+        new_end_date: str | datetime,
+        restart_date: str | datetime | None = None,
+    ) -> "Simulation":
         """Create a new Simulation instance starting from the end date of the current
         simulation.
 
-        This method generates a deep copy of the current simulation and updates its
-        start date to match the current simulation's end date. The new simulation
-        may require additional modifications, such as setting restart files, which
-        should be implemented in subclasses.
+        This method generates a copy of the current simulation and updates its
+        start date to match the current simulation's end date (or `restart_date`,
+        to continue a run that ended early). The new simulation may require
+        additional modifications, such as setting restart files, which should be
+        implemented in subclasses.
+
+        Rather than deep-copying the whole simulation, components describing
+        immutable configuration (e.g. external codebases) are shared between the
+        original and the new simulation, while components holding local state
+        (e.g. additional code and its working path) are shallow-copied, so that the
+        cost of a restart does not grow with the size of the simulation or the
+        length of a chain of restarts.
 
         Parameters
         ----------
         new_end_date : str or datetime
             The end date for the restarted simulation.
+        restart_date : str or datetime, optional
+            The date from which to restart, after the start date of the current
+            simulation and no later than its end date. Defaults to its end date.
 
         Returns
         -------
@@ -723,15 +881,32 @@ class Simulation(ABC, LoggingMixin):
         Raises
         ------
         ValueError
-            If `new_end_date` is not of type str or datetime.
+            If `new_end_date` is not of type str or datetime, or if `restart_date`
+            is not within the current simulation.
 
         See Also
         --------
         persist : Saves the state of the current simulation.
         restore : Restores a saved simulation instance.
         """
-        new_sim = copy.deepcopy(self)
-        new_sim.start_date = self.end_date
+        new_sim = copy.copy(self)
+        # The new simulation has not been run, and must not track the original's run
+        new_sim._execution_handler = None
+        new_sim.discretization = copy.copy(self.discretization)
+        new_sim.runtime_code = copy.copy(self.runtime_code)
+        new_sim.compile_time_code = copy.copy(self.compile_time_code)
+
+        if restart_date is None:
+            new_sim.start_date = self.end_date
+        else:
+            if isinstance(restart_date, str):
+                restart_date = dateutil.parser.parse(restart_date)
+            if not (self.start_date < restart_date <= self.end_date):
+                raise ValueError(
+                    f"restart_date ({restart_date}) must be after start_date "
+                    f"({self.start_date}) and no later than end_date ({self.end_date})"
+                )
+            new_sim.start_date = restart_date
         new_sim.directory = (
             new_sim.directory
             / f"RESTART_{new_sim.start_date.strftime(format='%Y%m%d_%H%M%S')}"
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from collections.abc import Callable
 
 from cstar.base.log import LoggingMixin
+from cstar.base.state_store import register_state_type
 from cstar.base.utils import _run_cmd
 
 
@@ -160,6 +161,7 @@ class SlurmQueue(Queue, ABC):
         )
 
 
+@register_state_type("SlurmQOS")
 class SlurmQOS(SlurmQueue):
     """Represents a SLURM Quality of Service (QOS) queue.
 
@@ -182,6 +184,7 @@ class SlurmQOS(SlurmQueue):
         return query_max_walltime_via_sacctmgr
 
 
+@register_state_type("SlurmPartition")
 class SlurmPartition(SlurmQueue):
     """Represents a SLURM partition queue.
 
@@ -204,6 +207,7 @@ class SlurmPartition(SlurmQueue):
         return query_max_walltime_via_sinfo
 
 
+@register_state_type("PBSQueue")
 class PBSQueue(Queue):
     """Represents a PBS queue.
 
@@ -406,6 +410,7 @@ class Scheduler(ABC, LoggingMixin):
         pass
 
 
+@register_state_type("SlurmScheduler")
 class SlurmScheduler(Scheduler):
     """Represents a SLURM job scheduler.
 
@@ -494,6 +499,7 @@ class SlurmScheduler(Scheduler):
         return None
 
 
+@register_state_type("PBSScheduler")
 class PBSScheduler(Scheduler):
     """Represents a PBS (Portable Batch System) job scheduler.
 
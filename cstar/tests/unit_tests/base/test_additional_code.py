@@ -6,6 +6,7 @@ import pytest
 
 from cstar.base import AdditionalCode
 from cstar.base.datasource import DataSource
+from cstar.base.staging import StagedFile, StagingMethod
 
 
 class TestInit:
@@ -413,7 +414,8 @@ class TestAdditionalCodeGet:
         Mocks initialized:
         - pathlib.Path.mkdir: Mocked to simulate directory creation.
         - pathlib.Path.exists: Mocked to simulate checking file existence.
-        - shutil.copy: Mocked to simulate copying files.
+        - cstar.base.additional_code.stage_file: Mocked to simulate copying files,
+          returning a fixed hash of "mock_hash_value".
         - tempfile.mkdtemp: Mocked to simulate creating temporary directories.
         - shutil.rmtree: Mocked to simulate cleaning up temporary directories.
         - cstar.base.utils._clone_and_checkout: Mocked to simulate cloning a remote repository.
@@ -427,7 +429,12 @@ class TestAdditionalCodeGet:
         self.patch_exists = mock.patch("pathlib.Path.exists", return_value=True)
         self.mock_exists = self.patch_exists.start()
 
-        self.patch_copy = mock.patch("shutil.copy")
+        self.patch_copy = mock.patch(
+            "cstar.base.additional_code.stage_file",
+            side_effect=lambda source, target, **kwargs: StagedFile(
+                path=target, method=StagingMethod.COPY, file_hash="mock_hash_value"
+            ),
+        )
         self.mock_copy = self.patch_copy.start()
 
         self.patch_mkdtemp = mock.patch(
@@ -499,7 +506,12 @@ class TestAdditionalCodeGet:
                 Path(f"/some/local/directory/{fake_additionalcode_local.subdir}") / f
             )
             tgt_file_path = Path("/mock/local/dir") / Path(f).name
-            self.mock_copy.assert_any_call(src_file_path, tgt_file_path)
+            self.mock_copy.assert_any_call(
+                src_file_path,
+                tgt_file_path,
+                methods=AdditionalCode.staging_methods,
+                overwrite=True,
+            )
 
         # Ensure that `_local_file_hash_cache` is updated correctly
         for f in fake_additionalcode_local.files:
@@ -567,7 +579,12 @@ class TestAdditionalCodeGet:
                 Path(f"/mock/tmp/dir/{fake_additionalcode_remote.subdir}") / f
             )
             tgt_file_path = Path("/mock/local/dir") / Path(f).name
-            self.mock_copy.assert_any_call(src_file_path, tgt_file_path)
+            self.mock_copy.assert_any_call(
+                src_file_path,
+                tgt_file_path,
+                methods=AdditionalCode.staging_methods,
+                overwrite=True,
+            )
 
         # Ensure that `_local_file_hash_cache` is updated correctly
         for f in fake_additionalcode_remote.files:
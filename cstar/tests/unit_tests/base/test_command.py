@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from unittest import mock
+
+import pytest
+
+from cstar.base.command import CommandRunner
+from cstar.base.exceptions import CommandTimeoutError
+from cstar.base.utils import _run_cmd
+
+
+class TestCommandRunner:
+    """Tests for `CommandRunner`, which executes shell commands.
+
+    Tests
+    -----
+    - `test_run_captures_output`: Ensures stdout, stderr and the return code of a
+      command are captured.
+    - `test_run_passes_cwd_and_env`: Ensures the working directory and environment
+      are passed to the command.
+    - `test_timeout`: Ensures a command exceeding its timeout is stopped and flagged.
+    - `test_timeout_kills_child_processes`: Ensures processes started by a timed out
+      command are stopped with it.
+    - `test_streaming_timeout`: Ensures a streamed command exceeding its timeout is
+      stopped and flagged.
+    - `test_retries_with_backoff`: Ensures failed commands are retried with
+      exponentially increasing delays.
+    - `test_no_retry_after_success`: Ensures successful commands are not repeated.
+    - `test_streaming_logs_each_line`: Ensures streamed output is logged line by line.
+    - `test_streaming_output_is_bounded`: Ensures only the tail of streamed output
+      is kept in memory.
+    - `test_captured_output_is_bounded`: Ensures only the tail of captured output
+      is kept in memory.
+    - `test_metrics`: Ensures calls, attempts, failures and durations are aggregated
+      per program.
+    - `test_run_many`: Ensures several commands run concurrently, in order.
+    - `test_run_async`: Ensures commands can be awaited.
+    """
+
+    def test_run_captures_output(self):
+        result = CommandRunner().run("echo out; echo err >&2; exit 3")
+        assert result.returncode == 3
+        assert result.stdout == "out"
+        assert result.stderr == "err\n"
+        assert result.attempts == 1
+        assert not result.succeeded
+
+    def test_run_passes_cwd_and_env(self, tmp_path):
+        result = CommandRunner().run(
+            "pwd; echo $CSTAR_TEST_VAR",
+            cwd=tmp_path,
+            env={"CSTAR_TEST_VAR": "value"},
+        )
+        assert result.succeeded
+        assert result.stdout.splitlines() == [str(tmp_path), "value"]
+
+    def test_timeout(self):
+        result = CommandRunner().run("sleep 5", timeout=0.1)
+        assert result.timed_out
+        assert not result.succeeded
+        assert result.duration < 5
+
+    def test_timeout_kills_child_processes(self, tmp_path):
+        marker = tmp_path / "marker"
+        result = CommandRunner().run(f"sleep 1; touch {marker}", timeout=0.1)
+        assert result.timed_out
+        assert result.duration < 1
+
+        # The shell's child would create the marker if it had been orphaned
+        time.sleep(1.5)
+        assert not marker.exists()
+
+    def test_streaming_timeout(self):
+        result = CommandRunner().run("echo started; sleep 5", timeout=0.2, stream=True)
+        assert result.timed_out
+        assert result.stdout == "started"
+        assert result.duration < 5
+
+    def test_retries_with_backoff(self):
+        runner = CommandRunner()
+        with mock.patch("cstar.base.command.time.sleep") as mock_sleep:
+            result = runner.run("exit 1", retries=3, backoff=0.5)
+
+        assert result.attempts == 4
+        assert result.returncode == 1
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0, 2.0]
+
+    def test_no_retry_after_success(self, tmp_path):
+        # Fails the first time only
+        marker = tmp_path / "marker"
+        cmd = f"test -e {marker} || (touch {marker}; exit 1)"
+        with mock.patch("cstar.base.command.time.sleep") as mock_sleep:
+            result = CommandRunner().run(cmd, retries=5)
+
+        assert result.succeeded
+        assert result.attempts == 2
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_streaming_logs_each_line(self, caplog):
+        caplog.set_level(logging.INFO, logger="cstar.base.command")
+        result = CommandRunner().run(
+            "echo one; echo two >&2", stream=True, stream_level=logging.INFO
+        )
+
+        assert result.succeeded
+        assert result.stdout == "one\ntwo"
+        assert result.stderr == ""
+        messages = [r.getMessage() for r in caplog.records]
+        assert messages == ["one", "two"]
+
+    def test_streaming_output_is_bounded(self):
+        result = CommandRunner(max_output_bytes=20).run(
+            "for i in $(seq 1 100); do echo line$i; done", stream=True
+        )
+
+        assert result.truncated
+        assert result.stdout.splitlines()[-1] == "line100"
+        assert len(result.stdout) <= 20
+
+    def test_captured_output_is_bounded(self):
+        result = CommandRunner(max_output_bytes=20).run(
+            "for i in $(seq 1 20000); do echo line$i; echo err$i >&2; done"
+        )
+
+        assert result.succeeded
+        assert result.truncated
+        assert result.stdout.splitlines()[-1] == "line20000"
+        assert result.stderr.splitlines()[-1] == "err20000"
+        assert len(result.stdout) <= 20
+        assert len(result.stderr) <= 20
+
+    def test_metrics(self):
+        runner = CommandRunner()
+        runner.run("true")
+        runner.run("true")
+        with mock.patch("cstar.base.command.time.sleep"):
+            runner.run("false", retries=1)
+
+        metrics = runner.metrics
+        assert metrics["true"].calls == 2
+        assert metrics["true"].failures == 0
+        assert metrics["false"].calls == 1
+        assert metrics["false"].attempts == 2
+        assert metrics["false"].failures == 1
+        assert metrics["true"].max_seconds >= metrics["true"].mean_seconds > 0
+
+        runner.reset_metrics()
+        assert runner.metrics == {}
+
+    def test_run_many(self):
+        runner = CommandRunner(max_workers=4)
+        start = time.perf_counter()
+        results = runner.run_many([f"sleep 0.5; echo {i}" for i in range(4)])
+
+        assert [r.stdout for r in results] == ["0", "1", "2", "3"]
+        # Run concurrently, not one after the other
+        assert time.perf_counter() - start < 1.5
+        assert runner.metrics["sleep"].calls == 4
+
+    def test_run_async(self):
+        async def run_both():
+            return await asyncio.gather(
+                CommandRunner().run_async("echo a"),
+                CommandRunner().run_async("echo b"),
+            )
+
+        assert [r.stdout for r in asyncio.run(run_both())] == ["a", "b"]
+
+
+class TestRunCmd:
+    """Tests for the timeout, retry and streaming options of `_run_cmd`.
+
+    Tests
+    -----
+    - `test_timeout_raises`: Ensures a `CommandTimeoutError` is raised on timeout.
+    - `test_streamed_failure_reports_output`: Ensures the (merged) output of a
+      failing streamed command is included in the error.
+    """
+
+    def test_timeout_raises(self):
+        with pytest.raises(CommandTimeoutError, match="Timed out after 0.1 seconds"):
+            _run_cmd("sleep 5", timeout=0.1, raise_on_error=True)
+
+    def test_streamed_failure_reports_output(self):
+        with pytest.raises(RuntimeError, match="Return Code: `2`. OUTPUT:\nbroken"):
+            _run_cmd(
+                "echo broken >&2; exit 2",
+                msg_err="Build failed.",
+                stream=True,
+                raise_on_error=True,
+            )
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from cstar.base.dataset_store import DatasetStore, get_dataset_store
+from cstar.base.staging import StagingMethod
+from cstar.base.utils import _parse_size
+from cstar.tests.unit_tests.fake_abc_subclasses import FakeInputDataset
+
+CONTENTS = {
+    "a.nc": b"a" * 1000,
+    "b.nc": b"b" * 2000,
+    "c.nc": b"c" * 3000,
+}
+HASHES = {name: hashlib.sha256(data).hexdigest() for name, data in CONTENTS.items()}
+
+
+class FakeDownloader:
+    """A `pooch` downloader serving `CONTENTS` by file name, counting downloads."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.downloads: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, output_file, pooch, check_only=False):
+        time.sleep(self.delay)
+        with self._lock:
+            self.downloads.append(url)
+        Path(output_file).write_bytes(CONTENTS[url.rsplit("/", 1)[-1]])
+
+
+def url(name: str) -> str:
+    return f"https://example.com/data/{name}"
+
+
+@pytest.fixture
+def store(tmp_path) -> DatasetStore:
+    return DatasetStore(tmp_path / "store")
+
+
+class TestDatasetStore:
+    """Tests for `DatasetStore`, the machine-wide content-addressed dataset store.
+
+    Tests
+    -----
+    - `test_fetch_downloads_once`: Ensures a file is only downloaded on first fetch,
+      and stored read-only under its checksum.
+    - `test_fetch_verifies_hash`: Ensures a download with the wrong checksum is
+      rejected and not stored.
+    - `test_concurrent_fetches_download_once`: Ensures simultaneous fetches of the
+      same file wait for a single download.
+    - `test_get_links_into_simulations`: Ensures stored files are linked (not
+      copied) into each simulation directory.
+    - `test_report`: Ensures the space and downloads saved are reported.
+    - `test_evict_least_recently_used`: Ensures unused files are evicted, oldest
+      first, until the store fits its quota.
+    - `test_evict_skips_linked_files`: Ensures files still linked from simulations
+      are not evicted until those links are removed.
+    - `test_quota_enforced_on_fetch`: Ensures a store with a quota evicts after
+      downloading, keeping the file just fetched.
+    - `test_connections_closed_on_error`: Ensures catalog connections are closed
+      even when a query fails.
+    """
+
+    def test_fetch_downloads_once(self, store):
+        downloader = FakeDownloader()
+        first = store.fetch(url("a.nc"), HASHES["a.nc"], downloader=downloader)
+        second = store.fetch(url("a.nc"), HASHES["a.nc"], downloader=downloader)
+
+        assert first == second == store.object_path(HASHES["a.nc"])
+        assert first.read_bytes() == CONTENTS["a.nc"]
+        assert not os.access(first, os.W_OK) or os.geteuid() == 0
+        assert downloader.downloads == [url("a.nc")]
+        assert HASHES["a.nc"] in store
+
+    def test_fetch_verifies_hash(self, store):
+        with pytest.raises(ValueError, match="SHA256 hash of downloaded file"):
+            store.fetch(url("a.nc"), HASHES["b.nc"], downloader=FakeDownloader())
+        assert HASHES["b.nc"] not in store
+
+    def test_concurrent_fetches_download_once(self, store):
+        downloader = FakeDownloader(delay=0.2)
+        threads = [
+            threading.Thread(
+                target=store.fetch,
+                args=(url("a.nc"), HASHES["a.nc"]),
+                kwargs={"downloader": downloader},
+            )
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert downloader.downloads == [url("a.nc")]
+
+    def test_get_links_into_simulations(self, store, tmp_path):
+        targets = [tmp_path / f"sim{i}" / "a.nc" for i in range(3)]
+        for target in targets:
+            target.parent.mkdir()
+            staged = store.get(
+                url("a.nc"), HASHES["a.nc"], target, downloader=FakeDownloader()
+            )
+            assert staged.method is StagingMethod.HARDLINK
+            assert staged.file_hash == HASHES["a.nc"]
+
+        stored = store.object_path(HASHES["a.nc"])
+        assert all(t.samefile(stored) for t in targets)
+
+    def test_report(self, store, tmp_path):
+        downloader = FakeDownloader()
+        for i in range(3):
+            (tmp_path / f"sim{i}").mkdir()
+            store.get(
+                url("a.nc"),
+                HASHES["a.nc"],
+                tmp_path / f"sim{i}" / "a.nc",
+                downloader=downloader,
+            )
+        store.fetch(url("b.nc"), HASHES["b.nc"], downloader=downloader)
+
+        report = store.report()
+        assert report.objects == 2
+        assert report.stored_bytes == 3000
+        assert report.links == 3
+        assert report.linked_bytes == 3000
+        assert report.saved_bytes == 2000
+        assert report.reused_bytes == 2000
+        assert "Disk space saved: 2.0 KiB" in str(report)
+
+        # Removing a simulation directory's file removes its link
+        (tmp_path / "sim0" / "a.nc").unlink()
+        assert store.report().links == 2
+
+    def test_evict_least_recently_used(self, store):
+        downloader = FakeDownloader()
+        for name in ["a.nc", "b.nc", "c.nc"]:
+            store.fetch(url(name), HASHES[name], downloader=downloader)
+        # Use "a.nc" again, so "b.nc" is now the least recently used
+        store.fetch(url("a.nc"), HASHES["a.nc"], downloader=downloader)
+
+        evicted = store.evict(quota_bytes=4500)
+
+        assert evicted == [HASHES["b.nc"]]
+        assert HASHES["b.nc"] not in store
+        assert store.report().stored_bytes == 4000
+
+    def test_evict_skips_linked_files(self, store, tmp_path):
+        target = tmp_path / "sim" / "a.nc"
+        target.parent.mkdir()
+        store.get(url("a.nc"), HASHES["a.nc"], target, downloader=FakeDownloader())
+
+        assert store.evict(quota_bytes=0) == []
+        assert HASHES["a.nc"] in store
+
+        target.unlink()
+        assert store.evict(quota_bytes="0K") == [HASHES["a.nc"]]
+
+    def test_quota_enforced_on_fetch(self, tmp_path):
+        store = DatasetStore(tmp_path / "store", quota_bytes=3500)
+        downloader = FakeDownloader()
+        for name in ["a.nc", "b.nc", "c.nc"]:
+            store.fetch(url(name), HASHES[name], downloader=downloader)
+
+        assert HASHES["a.nc"] not in store
+        assert HASHES["b.nc"] not in store
+        assert HASHES["c.nc"] in store
+
+    def test_connections_closed_on_error(self, store):
+        store.fetch(url("a.nc"), HASHES["a.nc"], downloader=FakeDownloader())
+        connections = []
+        sqlite3_connect = sqlite3.connect
+
+        def connect(*args, **kwargs):
+            connections.append(sqlite3_connect(*args, **kwargs))
+            return connections[-1]
+
+        with (
+            mock.patch("cstar.base.dataset_store.sqlite3.connect", side_effect=connect),
+            mock.patch.object(
+                DatasetStore, "_live_links", side_effect=sqlite3.OperationalError
+            ),
+        ):
+            with pytest.raises(sqlite3.OperationalError):
+                store.report()
+            with pytest.raises(sqlite3.OperationalError):
+                store.evict(quota_bytes=0)
+
+        assert len(connections) == 2
+        for connection in connections:
+            with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+                connection.execute("SELECT 1")
+
+
+class TestConfiguration:
+    """Tests for configuring the machine-wide dataset store.
+
+    Tests
+    -----
+    - `test_parse_size`: Ensures human-readable sizes are converted to bytes.
+    - `test_get_dataset_store`: Ensures the store is configured from the
+      environment, and disabled by default.
+    - `test_input_dataset_uses_store`: Ensures remote input datasets fetched by
+      several simulations are downloaded only once.
+    """
+
+    @pytest.mark.parametrize(
+        "size, expected",
+        [(1024, 1024), ("512", 512), ("2K", 2048), ("1.5G", 1.5 * 1024**3)],
+    )
+    def test_parse_size(self, size, expected):
+        assert _parse_size(size) == expected
+
+    def test_parse_size_invalid(self):
+        with pytest.raises(ValueError, match="Cannot interpret"):
+            _parse_size("lots")
+
+    def test_get_dataset_store(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CSTAR_DATASET_STORE", raising=False)
+        assert get_dataset_store() is None
+
+        monkeypatch.setenv("CSTAR_DATASET_STORE", str(tmp_path))
+        monkeypatch.setenv("CSTAR_DATASET_STORE_QUOTA", "10G")
+        store = get_dataset_store()
+        assert store.root == tmp_path.resolve()
+        assert store.quota_bytes == 10 * 1024**3
+        assert get_dataset_store() is store
+
+    def test_input_dataset_uses_store(self, tmp_path, monkeypatch, http_server):
+        monkeypatch.setenv("CSTAR_DATASET_STORE", str(tmp_path / "store"))
+        http_server.files["a.nc"] = CONTENTS["a.nc"]
+
+        for i in range(2):
+            dataset = FakeInputDataset(
+                location=http_server.url("a.nc"), file_hash=HASHES["a.nc"]
+            )
+            dataset.get(tmp_path / f"sim{i}")
+            assert dataset.exists_locally
+            assert dataset.local_hash == {
+                (tmp_path / f"sim{i}" / "a.nc"): HASHES["a.nc"]
+            }
+
+        assert [r for r in http_server.requests if r[0] == "GET"] == [
+            ("GET", "a.nc", "bytes=0-999")
+        ]
+        assert get_dataset_store().report().links == 2
@@ -1,4 +1,5 @@
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
@@ -109,6 +110,70 @@ def test_source_type_unsupported_extension(tmp_path):
         data_source.source_type
 
 
+# Tests for caching of `location_type` and `source_type`
+def test_types_are_cached(mock_netcdf_file_path):
+    """Test that `location_type` and `source_type` only inspect the filesystem on
+    first access.
+    """
+    data_source = DataSource(mock_netcdf_file_path)
+    with (
+        mock.patch.object(Path, "exists", return_value=True) as mock_exists,
+        mock.patch.object(Path, "is_dir", return_value=False) as mock_is_dir,
+    ):
+        for _ in range(3):
+            assert data_source.location_type == "path"
+            assert data_source.source_type == "netcdf"
+
+    mock_exists.assert_called_once()
+    mock_is_dir.assert_called_once()
+
+
+def test_url_source_type_does_not_probe_filesystem():
+    """Test that `source_type` does not inspect the local filesystem for URLs."""
+    data_source = DataSource("https://example.com/data.nc")
+    with mock.patch.object(Path, "is_dir") as mock_is_dir:
+        assert data_source.source_type == "netcdf"
+    mock_is_dir.assert_not_called()
+
+
+def test_invalidate(tmp_path):
+    """Test that `invalidate` causes the types to be resolved again."""
+    location = tmp_path / "some_dir"
+    location.mkdir()
+    data_source = DataSource(location)
+    assert data_source.source_type == "directory"
+
+    (location / ".git").mkdir()
+    assert data_source.source_type == "directory"
+
+    data_source.invalidate()
+    assert data_source.source_type == "repository"
+
+
+def test_cache_ignored_after_location_change(
+    mock_netcdf_file_path, mock_yaml_file_path
+):
+    """Test that cached types are not reused if `location` is changed."""
+    data_source = DataSource(mock_netcdf_file_path)
+    assert data_source.source_type == "netcdf"
+
+    data_source._location = str(mock_yaml_file_path)
+    assert data_source.source_type == "yaml"
+
+
+def test_errors_are_not_cached(tmp_path):
+    """Test that a location that cannot be resolved is checked again on the next
+    access.
+    """
+    location = tmp_path / "not_yet_created.nc"
+    data_source = DataSource(location)
+    with pytest.raises(ValueError):
+        data_source.location_type
+
+    location.touch()
+    assert data_source.location_type == "path"
+
+
 def test_basename(mock_netcdf_file_path):
     """Test the DataSource.basename property correctly returns the filename and
     extension.
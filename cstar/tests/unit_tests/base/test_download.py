@@ -0,0 +1,231 @@
+import hashlib
+import os
+from unittest import mock
+
+import pooch
+import pytest
+import requests
+
+from cstar.base import download
+from cstar.base.download import RangeDownloader, _OrderedHasher, _PartialDownload
+
+DATA = os.urandom(10_500)
+DATA_HASH = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def server(http_server):
+    http_server.files["data.nc"] = DATA
+    return http_server
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with mock.patch("cstar.base.download.time.sleep"):
+        yield
+
+
+def leftovers(directory):
+    return sorted(p.name for p in directory.iterdir() if p.name.startswith("."))
+
+
+class TestRangeDownloader:
+    """Tests for `RangeDownloader`, which downloads files as parallel HTTP ranges.
+
+    Tests
+    -----
+    - `test_downloads_in_chunks`: Ensures a file is requested as one range per chunk
+      and reassembled correctly, with its checksum computed on the way.
+    - `test_hashes_without_reading_back`: Ensures chunks are hashed as they arrive,
+      without reading the file back from disk.
+    - `test_empty_file`: Ensures an empty file is downloaded without any range
+      request.
+    - `test_retries_dropped_chunk`: Ensures a chunk whose connection drops is
+      requested again.
+    - `test_resumes_interrupted_download`: Ensures a later download only requests
+      the chunks missing from an interrupted one, and reads back only those already
+      downloaded to hash them.
+    - `test_restarts_if_source_changed`: Ensures a partial download is discarded if
+      the remote file has changed since.
+    - `test_hash_mismatch`: Ensures a download not matching the known checksum is
+      rejected and deleted.
+    - `test_without_range_support`: Ensures servers ignoring ranges are downloaded
+      as a single stream.
+    - `test_pooch_downloader`: Ensures the downloader works with `pooch.retrieve`,
+      including availability checks.
+    """
+
+    def test_downloads_in_chunks(self, server, tmp_path):
+        target = tmp_path / "data.nc"
+        downloader = RangeDownloader(chunk_size=1000, max_workers=4)
+        file_hash = downloader.download(server.url("data.nc"), target)
+
+        assert target.read_bytes() == DATA
+        assert file_hash == DATA_HASH
+        assert sorted(server.range_requests) == sorted(
+            f"bytes={i}-{min(i + 999, len(DATA) - 1)}"
+            for i in range(0, len(DATA), 1000)
+        )
+        assert leftovers(tmp_path) == []
+
+    def test_hashes_without_reading_back(self, server, tmp_path):
+        server.drops = {3000: 1}
+        target = tmp_path / "data.nc"
+        downloader = RangeDownloader(chunk_size=1000, max_workers=4)
+        with mock.patch.object(
+            download, "_hash_range", wraps=download._hash_range
+        ) as mock_hash_range:
+            file_hash = downloader.download(server.url("data.nc"), target)
+
+        assert file_hash == DATA_HASH
+        mock_hash_range.assert_not_called()
+
+    def test_empty_file(self, http_server, tmp_path):
+        http_server.files["empty.nc"] = b""
+        target = tmp_path / "empty.nc"
+        file_hash = RangeDownloader(chunk_size=1000).download(
+            http_server.url("empty.nc"), target
+        )
+
+        assert target.read_bytes() == b""
+        assert file_hash == hashlib.sha256(b"").hexdigest()
+        assert http_server.range_requests == []
+        assert leftovers(tmp_path) == []
+
+    def test_retries_dropped_chunk(self, server, tmp_path):
+        server.drops = {3000: 1, 10_000: 2}
+        target = tmp_path / "data.nc"
+        RangeDownloader(chunk_size=1000, retries=2).download(
+            server.url("data.nc"), target
+        )
+
+        assert target.read_bytes() == DATA
+        assert len(server.range_requests) == 11 + 3
+
+    def test_resumes_interrupted_download(self, server, tmp_path):
+        server.drops = {5000: 1}
+        target = tmp_path / "data.nc"
+        downloader = RangeDownloader(chunk_size=1000, max_workers=1, retries=0)
+
+        with pytest.raises(requests.RequestException):
+            downloader.download(server.url("data.nc"), target)
+        assert not target.exists()
+        assert len(leftovers(tmp_path)) == 2  # The partial file and its record
+
+        server.requests.clear()
+        with mock.patch.object(
+            download, "_hash_range", wraps=download._hash_range
+        ) as mock_hash_range:
+            file_hash = downloader.download(server.url("data.nc"), target)
+
+        assert target.read_bytes() == DATA
+        assert file_hash == DATA_HASH
+        # Chunks before the failed one are not requested again, but read back:
+        assert "bytes=0-999" not in server.range_requests
+        read_back = [c.args[2] for c in mock_hash_range.call_args_list]
+        requested = [
+            int(r.removeprefix("bytes=").split("-")[0]) for r in server.range_requests
+        ]
+        assert sorted(read_back + requested) == list(range(0, len(DATA), 1000))
+        assert "bytes=5000-5999" in server.range_requests
+        assert leftovers(tmp_path) == []
+
+    def test_restarts_if_source_changed(self, server, tmp_path):
+        server.drops = {5000: 1}
+        target = tmp_path / "data.nc"
+        downloader = RangeDownloader(chunk_size=1000, max_workers=1, retries=0)
+        with pytest.raises(requests.RequestException):
+            downloader.download(server.url("data.nc"), target)
+
+        server.etag = '"v2"'
+        server.requests.clear()
+        downloader.download(server.url("data.nc"), target)
+
+        assert "bytes=0-999" in server.range_requests
+        assert target.read_bytes() == DATA
+
+    def test_hash_mismatch(self, server, tmp_path):
+        target = tmp_path / "data.nc"
+        downloader = RangeDownloader(chunk_size=1000, known_hash="sha256:" + "0" * 64)
+
+        with pytest.raises(ValueError, match="does not match the known hash"):
+            downloader.download(server.url("data.nc"), target)
+        assert not target.exists()
+        assert leftovers(tmp_path) == []
+
+    def test_without_range_support(self, server, tmp_path):
+        server.accept_ranges = False
+        target = tmp_path / "data.nc"
+        file_hash = RangeDownloader(chunk_size=1000, known_hash=DATA_HASH).download(
+            server.url("data.nc"), target
+        )
+
+        assert file_hash == DATA_HASH
+        assert target.read_bytes() == DATA
+        assert server.range_requests == []
+
+    def test_pooch_downloader(self, server, tmp_path):
+        downloader = RangeDownloader(chunk_size=1000)
+        assert downloader(server.url("data.nc"), None, check_only=True)
+        assert not downloader(server.url("missing.nc"), None, check_only=True)
+
+        path = pooch.retrieve(
+            server.url("data.nc"),
+            known_hash=f"sha256:{DATA_HASH}",
+            path=tmp_path,
+            downloader=downloader,
+        )
+        with open(path, "rb") as f:
+            assert f.read() == DATA
+
+
+class TestOrderedHasher:
+    """Tests for `_OrderedHasher`, which hashes chunks arriving in any order.
+
+    Tests
+    -----
+    - `test_out_of_order_chunks`: Ensures the checksum is that of the chunks in
+      order, and that only chunks that did not fit in memory are read back.
+    - `test_aborted_attempt`: Ensures bytes from a failed attempt at a chunk are
+      not included in the checksum.
+    """
+
+    @pytest.fixture
+    def partial(self, tmp_path):
+        partial = _PartialDownload(
+            tmp_path / "data.nc", url="http://x/data.nc", size=3000, chunk_size=1000
+        )
+        partial.path.write_bytes(DATA[:3000])
+        return partial
+
+    def test_out_of_order_chunks(self, partial):
+        hasher = _OrderedHasher(partial, max_buffer_bytes=1000)
+        with mock.patch.object(
+            download, "_hash_range", wraps=download._hash_range
+        ) as mock_hash_range:
+            hasher.start(2)
+            hasher.update(2, DATA[2000:2500])
+            hasher.start(1)
+            hasher.update(1, DATA[1000:2000])  # Does not fit
+            hasher.finish(1)
+            hasher.update(2, DATA[2500:3000])
+            hasher.finish(2)
+            hasher.start(0)
+            hasher.update(0, DATA[0:1000])
+            hasher.finish(0)
+
+        assert hasher.hexdigest() == hashlib.sha256(DATA[:3000]).hexdigest()
+        mock_hash_range.assert_called_once_with(mock.ANY, partial.path, 1000, 2000)
+
+    def test_aborted_attempt(self, partial):
+        hasher = _OrderedHasher(partial, max_buffer_bytes=1000)
+        for index in range(3):
+            start = index * 1000
+            hasher.start(index)
+            hasher.update(index, DATA[start : start + 300])
+            hasher.abort(index)
+            hasher.start(index)
+            hasher.update(index, DATA[start : start + 1000])
+            hasher.finish(index)
+
+        assert hasher.hexdigest() == hashlib.sha256(DATA[:3000]).hexdigest()
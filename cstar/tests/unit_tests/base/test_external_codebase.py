@@ -6,6 +6,7 @@ import pytest
 
 from cstar.base.external_codebase import ExternalCodeBase
 from cstar.system.manager import cstar_sysmgr
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 ################################################################################
 
@@ -214,8 +215,8 @@ class TestExternalCodeBaseConfigHandling:
         Mocks `cstar.utils._get_repo_head_hash` to control the repository head hash.
     patch_local_config_status : MagicMock
         Mocks `ExternalCodeBase.local_config_status` to simulate different configuration states.
-    patch_subprocess_run : MagicMock
-        Mocks `subprocess.run` to simulate command-line actions for `git checkout`.
+    patch_subprocess_popen : MagicMock
+        Mocks `subprocess.Popen` to simulate command-line actions for `git checkout`.
     patch_environment : MagicMock
         Mocks `cstar_sysmgr.environment.environment_variables` to control the environment variables.
     """
@@ -236,12 +237,14 @@ class TestExternalCodeBaseConfigHandling:
         )
         self.mock_local_config_status = self.patch_local_config_status.start()
 
-        self.patch_subprocess_run = mock.patch("subprocess.run")
-        self.mock_subprocess_run = self.patch_subprocess_run.start()
+        self.patch_subprocess_popen = mock.patch(
+            "subprocess.Popen", side_effect=lambda *args, **kwargs: fake_process()
+        )
+        self.mock_subprocess_popen = self.patch_subprocess_popen.start()
 
     def teardown_method(self):
         self.patch_local_config_status.stop()
-        self.patch_subprocess_run.stop()
+        self.patch_subprocess_popen.stop()
         self.patch_local_config_status.stop()
         self.patch_get_repo_head_hash.stop()
         self.patch_get_repo_remote.stop()
@@ -348,16 +351,11 @@ class TestExternalCodeBaseConfigHandling:
             # Call the method to trigger the flow
             fake_externalcodebase.handle_config_status()
 
-        ## Assert that subprocess.run was called with the correct git checkout command
-        self.mock_subprocess_run.assert_called_with(
-            "git -C /path/to/repo checkout test_target",
-            shell=True,
-            text=True,
-            capture_output=True,
+        ## Assert that subprocess.Popen was called with the correct git checkout command
+        self.mock_subprocess_popen.assert_called_once_with(
+            "git -C /path/to/repo checkout test_target", **CAPTURED_POPEN_KWARGS
         )
 
-        self.mock_subprocess_run.assert_called_once()
-
         # Check that the prompt for user input was shown
         captured = capsys.readouterr().out
 
@@ -532,14 +532,18 @@ class TestInputDatasetGet:
 
         mock_path_resolve.assert_called()
 
-    @mock.patch("cstar.base.input_dataset._get_sha256_hash", return_value="mocked_hash")
+    @mock.patch("cstar.base.input_dataset.stage_file")
+    @mock.patch(
+        "cstar.base.input_dataset._get_cached_sha256_hash", return_value="mocked_hash"
+    )
     def test_get_with_local_source(
-        self, mock_get_hash, fake_inputdataset_local, mock_path_resolve
+        self, mock_get_hash, mock_stage_file, fake_inputdataset_local, mock_path_resolve
     ):
         """Test the InputDataset.get method with a local source file.
 
-        This test verifies that when the source file is local, a symbolic link is
-        created in the target directory and the working_path is updated accordingly.
+        This test verifies that when the source file is local, it is staged in the
+        target directory (carrying its hash across), and the working_path is updated
+        accordingly.
         """
         # Define resolved paths for local_dir and source file
         source_filepath = Path(fake_inputdataset_local.source.location)
@@ -555,18 +559,29 @@ class TestInputDatasetGet:
             # Call the get method
             fake_inputdataset_local.get(self.target_dir)
 
-            # Assert that a symbolic link was created with the resolved path
-            self.mock_symlink_to.assert_called_once_with(source_filepath)
+            # Assert that the file was staged from the resolved path
+            expected_target_path = self.target_dir / "local_file.nc"
+            mock_stage_file.assert_called_once_with(
+                source_filepath,
+                expected_target_path,
+                methods=fake_inputdataset_local.staging_methods,
+                file_hash="mocked_hash",
+            )
+            mock_get_hash.assert_called_once_with(source_filepath)
+            assert fake_inputdataset_local._local_file_hash_cache == {
+                expected_target_path: "mocked_hash"
+            }
 
             # Assert that working_path is updated to the resolved target path
-            expected_target_path = self.target_dir / "local_file.nc"
             assert fake_inputdataset_local.working_path == expected_target_path, (
                 f"Expected working_path to be {expected_target_path}, but got {fake_inputdataset_local.working_path}"
             )
 
         mock_path_resolve.assert_called()
 
-    @mock.patch("cstar.base.input_dataset._get_sha256_hash", return_value="mocked_hash")
+    @mock.patch(
+        "cstar.base.input_dataset._get_cached_sha256_hash", return_value="mocked_hash"
+    )
     def test_get_local_wrong_hash(
         self, mock_get_hash, fake_inputdataset_local, mock_path_resolve
     ):
@@ -590,21 +605,19 @@ class TestInputDatasetGet:
 
         mock_path_resolve.assert_called()
 
-    @mock.patch("pooch.create")
-    @mock.patch("pooch.HTTPDownloader")
+    @mock.patch("cstar.base.input_dataset.RangeDownloader")
     @mock.patch("cstar.base.input_dataset._get_sha256_hash", return_value="mocked_hash")
     def test_get_with_remote_source(
         self,
         mock_get_hash,
         mock_downloader,
-        mock_pooch_create,
         fake_inputdataset_remote,
     ):
         """Test the InputDataset.get method with a remote source file.
 
         This test verifies that when the source file is remote, the file is downloaded
-        correctly using pooch, and the working_path is updated to the downloaded file
-        path.
+        (and verified as it downloads) by a `RangeDownloader`, and the working_path is
+        updated to the downloaded file path.
         """
         # Define resolved paths
         target_filepath_remote = self.target_dir / "remote_file.nc"
@@ -619,26 +632,15 @@ class TestInputDatasetGet:
 
             # Mock Path.resolve to return the correct target directory
             with mock.patch.object(Path, "resolve", return_value=self.target_dir):
-                # Create a mock Pooch instance and mock the fetch method
-                mock_pooch_instance = mock.Mock()
-                mock_pooch_create.return_value = mock_pooch_instance
-                mock_fetch = mock.Mock()
-                mock_pooch_instance.fetch = mock_fetch
-
                 # Call the get method
                 fake_inputdataset_remote.get(self.target_dir)
 
-                # Ensure pooch.create was called correctly
-                mock_pooch_create.assert_called_once_with(
-                    path=self.target_dir,
-                    base_url="http://example.com/",
-                    registry={"remote_file.nc": "abc123"},
-                )
-
-                # Ensure fetch was called with the mocked downloader
-                mock_fetch.assert_called_once_with(
-                    "remote_file.nc", downloader=mock_downloader.return_value
+                # Ensure the file was downloaded, and not hashed again after
+                mock_downloader.assert_called_once_with(known_hash="abc123")
+                mock_downloader.return_value.download.assert_called_once_with(
+                    "http://example.com/remote_file.nc", target_filepath_remote
                 )
+                mock_get_hash.assert_not_called()
 
                 # Assert that working_path is updated to the expected target path
                 assert (
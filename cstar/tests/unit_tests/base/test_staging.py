@@ -0,0 +1,219 @@
+import errno
+import hashlib
+from unittest import mock
+
+import pytest
+
+from cstar.base import staging
+from cstar.base.staging import StagingMethod, stage_file
+from cstar.base.utils import _get_cached_sha256_hash, _sha256_hash_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_staging_state():
+    """Forget filesystem capabilities and memoized hashes between tests."""
+    staging._unsupported.clear()
+    _sha256_hash_cache.clear()
+    yield
+    staging._unsupported.clear()
+    _sha256_hash_cache.clear()
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    """A small file in a 'shared store' directory."""
+    store = tmp_path / "store"
+    store.mkdir()
+    path = store / "data.nc"
+    path.write_bytes(b"some netcdf data")
+    return path
+
+
+@pytest.fixture
+def target_dir(tmp_path):
+    path = tmp_path / "case" / "input"
+    path.mkdir(parents=True)
+    return path
+
+
+def failing_stager(err: int):
+    return mock.Mock(side_effect=OSError(err, "simulated failure"))
+
+
+class TestStageFile:
+    """Tests for `stage_file`, which makes a local file available at a new path.
+
+    Tests
+    -----
+    - `test_hardlink`: Ensures a hard link shares the source's inode.
+    - `test_copy`: Ensures a copy is independent and reports the bytes copied.
+    - `test_symlink`: Ensures a symbolic link points at the resolved source.
+    - `test_falls_back_and_remembers`: Ensures unsupported methods are skipped, and
+      not retried for the same pair of filesystems.
+    - `test_link_limit_not_remembered`: Ensures a per-file hard link limit does not
+      disable hard links for the whole filesystem.
+    - `test_cross_device_skips_links`: Ensures reflinks and hard links are not
+      attempted between devices.
+    - `test_other_errors_propagate`: Ensures unexpected errors are raised.
+    - `test_no_method_works`: Ensures an error is raised if every method fails.
+    - `test_hash_is_carried_across`: Ensures a known hash is used without reading
+      the file.
+    - `test_hash_is_computed_once`: Ensures an unknown hash is computed once per
+      unchanged source, however many times it is staged.
+    - `test_existing_target`: Ensures existing targets are only replaced on request.
+    """
+
+    def test_hardlink(self, source_file, target_dir):
+        staged = stage_file(
+            source_file, target_dir / "data.nc", methods=(StagingMethod.HARDLINK,)
+        )
+        assert staged.method is StagingMethod.HARDLINK
+        assert staged.bytes_copied == 0
+        assert staged.path.stat().st_ino == source_file.stat().st_ino
+
+    def test_copy(self, source_file, target_dir):
+        staged = stage_file(
+            source_file, target_dir / "data.nc", methods=(StagingMethod.COPY,)
+        )
+        assert staged.method is StagingMethod.COPY
+        assert staged.bytes_copied == source_file.stat().st_size
+        assert staged.path.stat().st_ino != source_file.stat().st_ino
+        assert staged.path.read_bytes() == source_file.read_bytes()
+
+    def test_symlink(self, source_file, target_dir):
+        staged = stage_file(
+            source_file, target_dir / "data.nc", methods=(StagingMethod.SYMLINK,)
+        )
+        assert staged.path.is_symlink()
+        assert staged.path.resolve() == source_file.resolve()
+
+    def test_falls_back_and_remembers(self, source_file, target_dir):
+        reflink = failing_stager(errno.EOPNOTSUPP)
+        with mock.patch.dict(staging._STAGERS, {StagingMethod.REFLINK: reflink}):
+            first = stage_file(source_file, target_dir / "a.nc")
+            second = stage_file(source_file, target_dir / "b.nc")
+
+        assert first.method is StagingMethod.HARDLINK
+        assert second.method is StagingMethod.HARDLINK
+        reflink.assert_called_once()
+
+    def test_link_limit_not_remembered(self, source_file, target_dir):
+        hardlink = failing_stager(errno.EMLINK)
+        with mock.patch.dict(
+            staging._STAGERS,
+            {
+                StagingMethod.REFLINK: failing_stager(errno.EOPNOTSUPP),
+                StagingMethod.HARDLINK: hardlink,
+            },
+        ):
+            stage_file(source_file, target_dir / "a.nc")
+            staged = stage_file(source_file, target_dir / "b.nc")
+
+        assert staged.method is StagingMethod.SYMLINK
+        assert hardlink.call_count == 2
+
+    def test_cross_device_skips_links(self, source_file, target_dir):
+        reflink, hardlink = mock.Mock(), mock.Mock()
+        real_stat = type(target_dir).stat
+
+        def fake_stat(path, *args, **kwargs):
+            st = real_stat(path, *args, **kwargs)
+            if path == target_dir:
+                return mock.Mock(st_dev=st.st_dev + 1)
+            return st
+
+        with (
+            mock.patch.dict(
+                staging._STAGERS,
+                {StagingMethod.REFLINK: reflink, StagingMethod.HARDLINK: hardlink},
+            ),
+            mock.patch.object(type(target_dir), "stat", fake_stat),
+        ):
+            staged = stage_file(source_file, target_dir / "data.nc")
+
+        assert staged.method is StagingMethod.SYMLINK
+        reflink.assert_not_called()
+        hardlink.assert_not_called()
+
+    def test_other_errors_propagate(self, source_file, target_dir):
+        with (
+            mock.patch.dict(
+                staging._STAGERS, {StagingMethod.COPY: failing_stager(errno.ENOSPC)}
+            ),
+            pytest.raises(OSError, match="simulated failure"),
+        ):
+            stage_file(
+                source_file, target_dir / "data.nc", methods=(StagingMethod.COPY,)
+            )
+
+    def test_no_method_works(self, source_file, target_dir):
+        with (
+            mock.patch.dict(
+                staging._STAGERS,
+                {StagingMethod.HARDLINK: failing_stager(errno.EPERM)},
+            ),
+            pytest.raises(RuntimeError, match="using any of: hardlink"),
+        ):
+            stage_file(
+                source_file, target_dir / "data.nc", methods=(StagingMethod.HARDLINK,)
+            )
+        assert not (target_dir / "data.nc").exists()
+
+    def test_hash_is_carried_across(self, source_file, target_dir):
+        with mock.patch("cstar.base.staging._get_cached_sha256_hash") as mock_hash:
+            staged = stage_file(
+                source_file, target_dir / "data.nc", file_hash="known_hash"
+            )
+        assert staged.file_hash == "known_hash"
+        mock_hash.assert_not_called()
+
+    def test_hash_is_computed_once(self, source_file, target_dir):
+        expected = hashlib.sha256(source_file.read_bytes()).hexdigest()
+        with mock.patch(
+            "cstar.base.utils._get_sha256_hash", return_value=expected
+        ) as mock_hash:
+            hashes = [
+                stage_file(source_file, target_dir / f"data_{i}.nc").file_hash
+                for i in range(5)
+            ]
+            # Hard links share the source's inode, so are also known:
+            assert _get_cached_sha256_hash(target_dir / "data_0.nc") == expected
+
+        assert hashes == [expected] * 5
+        mock_hash.assert_called_once()
+
+    def test_existing_target(self, source_file, target_dir):
+        target = target_dir / "data.nc"
+        target.write_text("old")
+        with pytest.raises(FileExistsError):
+            stage_file(source_file, target)
+
+        stage_file(source_file, target, overwrite=True)
+        assert target.read_bytes() == source_file.read_bytes()
+
+
+class TestCachedSha256Hash:
+    """Tests for `_get_cached_sha256_hash`.
+
+    Tests
+    -----
+    - `test_matches_uncached_hash`: Ensures the correct checksum is returned.
+    - `test_rehashes_modified_file`: Ensures a modified file is hashed again.
+    - `test_missing_file`: Ensures a missing file raises FileNotFoundError.
+    """
+
+    def test_matches_uncached_hash(self, source_file):
+        expected = hashlib.sha256(source_file.read_bytes()).hexdigest()
+        assert _get_cached_sha256_hash(source_file) == expected
+
+    def test_rehashes_modified_file(self, source_file):
+        before = _get_cached_sha256_hash(source_file)
+        source_file.write_bytes(b"different, longer netcdf data")
+        after = _get_cached_sha256_hash(source_file)
+
+        assert before != after
+        assert after == hashlib.sha256(source_file.read_bytes()).hexdigest()
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _get_cached_sha256_hash(tmp_path / "missing.nc")
@@ -0,0 +1,271 @@
+import json
+import pickle
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from cstar.base import state_store
+from cstar.base.datasource import DataSource
+from cstar.base.state_store import (
+    STATE_SCHEMA_VERSION,
+    StateSchemaError,
+    StateStore,
+    decode_value,
+    encode_value,
+    register_state_type,
+    resolve_state_type,
+    state_type_name,
+)
+from cstar.roms.discretization import ROMSDiscretization
+
+
+class Widget:
+    """Minimal C-Star class used to test the storage of components."""
+
+    def __init__(self, size, parent=None):
+        self.size = size
+        self.parent = parent
+
+
+@pytest.fixture
+def isolated_registry():
+    """Undo any `register_state_type` calls made during a test."""
+    with (
+        mock.patch.dict(state_store._STATE_TYPES),
+        mock.patch.dict(state_store._STATE_NAMES),
+    ):
+        yield
+
+
+@pytest.mark.parametrize(
+    "value, expected_encoding",
+    [
+        ("a string", "json"),
+        (3.5, "json"),
+        (None, "json"),
+        (datetime(2025, 1, 1, 12), "json"),
+        (Path("/some/path.nc"), "json"),
+        ({"files": [Path("a.nc"), Path("b.nc")], "n": 2}, "json"),
+        ({Path("a.nc"): 1}, "json"),
+        ({1, 2, 3}, "json"),
+        ((1, "a"), "json"),
+        (DataSource("http://my.files/grid.nc"), "json"),
+    ],
+)
+def test_encode_decode_roundtrip(value, expected_encoding):
+    """Test that values survive an `encode_value`/`decode_value` roundtrip.
+
+    Asserts
+    -------
+    - Plain data and C-Star components are encoded as JSON
+    - The decoded value equals the original
+    """
+    encoding, payload = encode_value(value)
+    assert encoding == expected_encoding
+    decoded = decode_value(encoding, payload)
+    if isinstance(value, DataSource):
+        assert type(decoded) is DataSource
+        assert vars(decoded) == vars(value)
+    else:
+        assert decoded == value
+
+
+def test_decode_legacy_pickle():
+    """Test that pickled values written by schema version 1 can still be read."""
+    value = {Path("a.nc"): {1, 2}}
+    assert decode_value("pickle", pickle.dumps(value)) == value
+
+
+class TestComponentEncoding:
+    """Tests for the storage of C-Star components by `encode_value`.
+
+    Tests
+    -----
+    - `test_components_stored_under_registered_name`: Ensures components are
+      stored as tagged, versioned plain data under their registered name.
+    - `test_encoding_is_deterministic`: Ensures equal values give equal payloads.
+    - `test_shared_and_cyclic_references`: Ensures shared objects and reference
+      cycles are preserved.
+    - `test_renamed_class_is_restored`: Ensures stored components are restored
+      by the class currently registered under their name.
+    - `test_older_version_is_upgraded`: Ensures the `upgrade` hook is applied to
+      state stored by an older version.
+    - `test_newer_version_raises`: Ensures state from newer versions is refused.
+    - `test_register_conflicting_name_raises`: Ensures a name cannot be reused.
+    - `test_unsupported_value_raises`: Ensures values that cannot be stored as
+      plain data raise a TypeError instead of being pickled.
+    """
+
+    def test_components_stored_under_registered_name(self):
+        discretization = ROMSDiscretization(time_step=60, n_procs_x=2, n_procs_y=3)
+        encoding, payload = encode_value(discretization)
+
+        assert encoding == "json"
+        assert json.loads(payload) == {
+            "__object__": "ROMSDiscretization",
+            "id": 0,
+            "version": 1,
+            "state": {"time_step": 60, "n_procs_x": 2, "n_procs_y": 3},
+        }
+        assert state_type_name(ROMSDiscretization) == "ROMSDiscretization"
+        assert resolve_state_type("ROMSDiscretization") is ROMSDiscretization
+
+        decoded = decode_value(encoding, payload)
+        assert isinstance(decoded, ROMSDiscretization)
+        assert vars(decoded) == vars(discretization)
+
+    def test_encoding_is_deterministic(self):
+        assert encode_value({"b", "a", "c"}) == encode_value({"c", "a", "b"})
+        assert encode_value(Widget({3, 1, 2})) == encode_value(Widget({2, 3, 1}))
+
+    def test_shared_and_cyclic_references(self):
+        parent = Widget(1)
+        parent.parent = parent
+        children = [Widget(2, parent), Widget(3, parent)]
+
+        decoded = decode_value(*encode_value(children))
+
+        assert decoded[0].parent is decoded[1].parent
+        assert decoded[0].parent.parent is decoded[0].parent
+        assert [child.size for child in decoded] == [2, 3]
+
+    def test_renamed_class_is_restored(self, isolated_registry):
+        register_state_type("TestWidget")(Widget)
+        payload = encode_value(Widget(5))[1]
+        assert json.loads(payload)["__object__"] == "TestWidget"
+
+        class RenamedWidget:
+            pass
+
+        state_store._STATE_TYPES["TestWidget"] = (RenamedWidget, 1, None)
+        decoded = decode_value("json", payload)
+        assert isinstance(decoded, RenamedWidget)
+        assert decoded.size == 5
+
+    def test_older_version_is_upgraded(self, isolated_registry):
+        register_state_type("TestWidget")(Widget)
+        payload = encode_value(Widget(5))[1]
+
+        def upgrade(state, version):
+            assert version == 1
+            return {"width": state.pop("size"), **state}
+
+        state_store._STATE_TYPES["TestWidget"] = (Widget, 2, upgrade)
+        decoded = decode_value("json", payload)
+        assert vars(decoded) == {"width": 5, "parent": None}
+
+    def test_newer_version_raises(self, isolated_registry):
+        register_state_type("TestWidget", version=3)(Widget)
+        payload = encode_value(Widget(5))[1]
+
+        state_store._STATE_TYPES["TestWidget"] = (Widget, 2, None)
+        with pytest.raises(StateSchemaError, match="TestWidget state version 3"):
+            decode_value("json", payload)
+
+    def test_register_conflicting_name_raises(self, isolated_registry):
+        register_state_type("TestWidget")(Widget)
+        register_state_type("TestWidget")(Widget)
+
+        with pytest.raises(ValueError, match="already registered"):
+            register_state_type("TestWidget")(DataSource)
+
+    def test_unsupported_value_raises(self, tmp_path):
+        with pytest.raises(TypeError):
+            encode_value(object())
+        with pytest.raises(TypeError):
+            encode_value(lambda: None)
+
+        store = StateStore(tmp_path / "state.db")
+        with pytest.raises(TypeError, match="Cannot store attribute 'handle'"):
+            store.write({"handle": object()}, object_type="m:C")
+
+
+class TestStateStore:
+    """Tests for `StateStore`, the schema-versioned store backing `Simulation.persist`.
+
+    Tests
+    -----
+    - `test_write_and_read`: Ensures written state can be read back in order.
+    - `test_write_only_changed_fields`: Ensures unchanged fields are not rewritten.
+    - `test_write_removes_and_skips_fields`: Ensures removed fields are deleted
+      unless explicitly skipped.
+    - `test_read_missing_store`: Ensures a FileNotFoundError is raised when absent.
+    - `test_read_newer_schema_raises`: Ensures stores from newer schemas are refused.
+    - `test_connections_closed_on_error`: Ensures connections are closed even when
+      reading or writing fails.
+    """
+
+    def test_write_and_read(self, tmp_path):
+        store = StateStore(tmp_path / "state.db")
+        assert not store.exists
+
+        store.write({"b": 1, "a": Path("x.nc")}, object_type="module:Class")
+        object_type, fields = store.read()
+
+        assert store.exists
+        assert object_type == "module:Class"
+        assert list(fields) == ["b", "a"]
+        assert decode_value(*fields["a"]) == Path("x.nc")
+
+    def test_write_only_changed_fields(self, tmp_path):
+        store = StateStore(tmp_path / "state.db")
+
+        assert store.write({"a": 1, "b": [1, 2]}, object_type="m:C") == 2
+        assert store.write({"a": 1, "b": [1, 2]}, object_type="m:C") == 0
+        assert store.write({"a": 1, "b": [1, 2, 3]}, object_type="m:C") == 1
+        assert decode_value(*store.read()[1]["b"]) == [1, 2, 3]
+
+    def test_write_removes_and_skips_fields(self, tmp_path):
+        store = StateStore(tmp_path / "state.db")
+        store.write({"a": 1, "b": 2, "c": 3}, object_type="m:C")
+
+        store.write({"a": 1}, object_type="m:C", skip=["b"])
+
+        assert list(store.read()[1]) == ["a", "b"]
+
+    def test_read_missing_store(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            StateStore(tmp_path / "state.db").read()
+
+    def test_read_newer_schema_raises(self, tmp_path):
+        store = StateStore(tmp_path / "state.db")
+        store.write({"a": 1}, object_type="m:C")
+
+        with sqlite3.connect(store.path) as connection:
+            connection.execute(
+                "UPDATE meta SET value = ? WHERE key = 'schema_version'",
+                (str(STATE_SCHEMA_VERSION + 1),),
+            )
+        connection.close()
+
+        with pytest.raises(StateSchemaError, match="schema version"):
+            store.read()
+
+    def test_connections_closed_on_error(self, tmp_path):
+        store = StateStore(tmp_path / "state.db")
+        store.write({"a": 1}, object_type="m:C")
+        connections = []
+        sqlite3_connect = sqlite3.connect
+
+        def connect(*args, **kwargs):
+            connections.append(sqlite3_connect(*args, **kwargs))
+            return connections[-1]
+
+        with (
+            mock.patch("cstar.base.state_store.sqlite3.connect", side_effect=connect),
+            mock.patch.object(
+                StateStore, "_check_schema_version", side_effect=StateSchemaError
+            ),
+        ):
+            with pytest.raises(StateSchemaError):
+                store.read()
+            with pytest.raises(StateSchemaError):
+                store.write({"a": 2}, object_type="m:C")
+
+        assert len(connections) == 2
+        for connection in connections:
+            with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+                connection.execute("SELECT 1")
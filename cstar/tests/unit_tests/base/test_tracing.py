@@ -0,0 +1,199 @@
+import importlib.util
+import json
+import threading
+
+import pytest
+
+from cstar.base.tracing import Tracer, tracer
+from cstar.base.utils import _get_sha256_hash, _run_cmd
+
+
+class TestTracer:
+    """Tests for `Tracer`, which records nested timing spans.
+
+    Tests
+    -----
+    - `test_span_records_duration_and_attributes`: Ensures a finished span carries
+      its name, category, attributes, bytes and a duration.
+    - `test_spans_nest`: Ensures spans opened inside another record it as parent.
+    - `test_span_records_errors`: Ensures exceptions are recorded and re-raised.
+    - `test_threads_do_not_share_parents`: Ensures spans opened in another thread
+      are not nested under the span open in the current thread.
+    - `test_traced_decorator`: Ensures decorated functions are timed per call.
+    - `test_disabled`: Ensures nothing is recorded while disabled.
+    - `test_enabled_from_environment`: Ensures `CSTAR_TRACE` is read as a
+      truthy or falsy string when the module is loaded.
+    - `test_max_spans`: Ensures only the most recent spans are kept.
+    - `test_export_jsonl`: Ensures spans are exported one per line.
+    - `test_export_chrome_trace`: Ensures spans are exported as complete events.
+    """
+
+    def test_span_records_duration_and_attributes(self):
+        t = Tracer()
+        with t.span("fetch", category="dataset", source="a.nc") as s:
+            s.add_bytes(10)
+            s.add_bytes(5)
+            s.set(method="symlink")
+
+        (finished,) = t.spans
+        assert finished.name == "fetch"
+        assert finished.category == "dataset"
+        assert finished.bytes == 15
+        assert finished.attributes == {"source": "a.nc", "method": "symlink"}
+        assert finished.duration >= 0
+        assert finished.parent_id is None
+
+    def test_spans_nest(self):
+        t = Tracer()
+        with t.span("outer") as outer:
+            with t.span("inner") as inner:
+                assert t.current_span is inner
+            assert t.current_span is outer
+        assert t.current_span is None
+
+        assert [s.name for s in t.spans] == ["inner", "outer"]
+        assert inner.parent_id == outer.span_id
+
+    def test_span_records_errors(self):
+        t = Tracer()
+        with pytest.raises(ValueError):
+            with t.span("failing"):
+                raise ValueError("oops")
+
+        assert t.spans[0].attributes["error"] == "ValueError"
+        assert t.spans[0].duration is not None
+
+    def test_threads_do_not_share_parents(self):
+        t = Tracer()
+
+        def worker():
+            with t.span("worker"):
+                pass
+
+        with t.span("main"):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            with t.span("child"):
+                pass
+
+        spans = {s.name: s for s in t.spans}
+        assert spans["child"].parent_id == spans["main"].span_id
+        assert spans["worker"].parent_id is None
+        assert spans["worker"].thread_id != spans["main"].thread_id
+
+    def test_traced_decorator(self):
+        t = Tracer()
+
+        @t.traced(category="stage")
+        def stage(x):
+            return x * 2
+
+        assert stage(2) == 4
+        assert stage(3) == 6
+        assert [s.name for s in t.spans] == [stage.__qualname__] * 2
+        assert all(s.category == "stage" for s in t.spans)
+
+    def test_disabled(self):
+        t = Tracer(enabled=False)
+        with t.span("ignored") as s:
+            s.add_bytes(10)
+            s.set(a=1)
+        assert t.spans == []
+
+    @pytest.mark.parametrize(
+        "value, enabled",
+        [
+            ("1", True),
+            ("true", True),
+            ("Yes", True),
+            ("0", False),
+            ("false", False),
+            (" OFF ", False),
+            ("no", False),
+            ("", False),
+        ],
+    )
+    def test_enabled_from_environment(self, monkeypatch, value, enabled):
+        monkeypatch.setenv("CSTAR_TRACE", value)
+        # Load a fresh copy, leaving the tracer other modules hold untouched
+        spec = importlib.util.find_spec("cstar.base.tracing")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        assert module.tracer.enabled is enabled
+
+    def test_max_spans(self):
+        t = Tracer(max_spans=2)
+        for name in ["a", "b", "c"]:
+            with t.span(name):
+                pass
+        assert [s.name for s in t.spans] == ["b", "c"]
+
+        t.clear()
+        assert t.spans == []
+
+    def test_export_jsonl(self, tmp_path):
+        t = Tracer()
+        with t.span("outer", path=tmp_path):
+            with t.span("inner") as s:
+                s.add_bytes(3)
+
+        lines = t.export_jsonl(tmp_path / "trace.jsonl").read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+
+        assert [r["name"] for r in records] == ["inner", "outer"]
+        assert records[0]["bytes"] == 3
+        assert records[0]["parent_id"] == records[1]["span_id"]
+        assert records[1]["attributes"]["path"] == str(tmp_path)
+
+    def test_export_chrome_trace(self, tmp_path):
+        t = Tracer()
+        with t.span("make", category="subprocess", cmd="make") as s:
+            s.add_bytes(7)
+
+        with open(t.export_chrome_trace(tmp_path / "trace.json")) as f:
+            trace = json.load(f)
+
+        (event,) = trace["traceEvents"]
+        assert event["name"] == "make"
+        assert event["cat"] == "subprocess"
+        assert event["ph"] == "X"
+        assert event["dur"] >= 0
+        assert event["args"] == {"bytes": 7, "cmd": "make"}
+
+
+class TestInstrumentation:
+    """Tests that C-Star operations are recorded by the global `tracer`.
+
+    Tests
+    -----
+    - `test_hash_records_bytes`: Ensures `_get_sha256_hash` records bytes read.
+    - `test_run_cmd_records_subprocess`: Ensures `_run_cmd` records a span named
+      after the program, with the command, return code and number of attempts.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_tracer(self):
+        tracer.clear()
+        yield
+        tracer.clear()
+
+    def test_hash_records_bytes(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"x" * 10000)
+
+        _get_sha256_hash(path)
+
+        (span,) = tracer.spans
+        assert span.name == "sha256"
+        assert span.bytes == 10000
+        assert span.attributes["path"] == str(path)
+
+    def test_run_cmd_records_subprocess(self):
+        _run_cmd("echo hello")
+
+        (span,) = tracer.spans
+        assert span.name == "echo"
+        assert span.category == "subprocess"
+        assert span.attributes == {"cmd": "echo hello", "returncode": 0, "attempts": 1}
@@ -16,6 +16,7 @@ from cstar.base.utils import (
     _list_to_concise_str,
     _replace_text_in_file,
 )
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 
 def test_get_sha256_hash(tmp_path):
@@ -53,7 +54,7 @@ class TestCloneAndCheckout:
 
     Mocks
     -----
-    subprocess.run : Mock
+    subprocess.Popen : Mock
         Used to simulate success or failure of `git clone` and `git checkout` commands.
     """
 
@@ -63,13 +64,13 @@ class TestCloneAndCheckout:
         self.local_path = "/dummy/path"
         self.checkout_target = "main"
 
-        # Patch subprocess.run for all tests
-        self.patch_subprocess_run = mock.patch("subprocess.run")
-        self.mock_subprocess_run = self.patch_subprocess_run.start()
+        # Patch subprocess.Popen for all tests
+        self.patch_subprocess_popen = mock.patch("subprocess.Popen")
+        self.mock_subprocess_popen = self.patch_subprocess_popen.start()
 
     def teardown_method(self):
         """Stops patching subprocess after each test."""
-        self.patch_subprocess_run.stop()
+        self.patch_subprocess_popen.stop()
 
     def test_clone_and_checkout_success(self):
         """Test that `_clone_and_checkout` runs successfully when both clone and
@@ -77,17 +78,17 @@ class TestCloneAndCheckout:
 
         Asserts
         -------
-        - Ensures `subprocess.run` is called twice with the correct arguments.
+        - Ensures `subprocess.Popen` is called twice with the correct arguments.
         """
         # Set the mock to simulate successful clone and checkout commands
-        self.mock_subprocess_run.return_value = mock.Mock(returncode=0, stderr="")
+        self.mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process()
 
         # Call the function
         _clone_and_checkout(self.source_repo, self.local_path, self.checkout_target)
 
-        # Validate subprocess.run is called twice (clone and checkout)
-        clone_call = self.mock_subprocess_run.call_args_list[0]
-        checkout_call = self.mock_subprocess_run.call_args_list[1]
+        # Validate subprocess.Popen is called twice (clone and checkout)
+        clone_call = self.mock_subprocess_popen.call_args_list[0]
+        checkout_call = self.mock_subprocess_popen.call_args_list[1]
 
         # Check the clone command arguments
         assert clone_call[0][0] == f"git clone {self.source_repo} {self.local_path}"
@@ -105,9 +106,9 @@ class TestCloneAndCheckout:
         - Verifies RuntimeError is raised with an appropriate error message on clone failure.
         """
         # Simulate failure in the clone command
-        self.mock_subprocess_run.side_effect = [
-            mock.Mock(returncode=1, stderr="Error: clone failed."),
-            mock.Mock(returncode=0),  # Checkout won't be reached
+        self.mock_subprocess_popen.side_effect = [
+            fake_process(returncode=1, stderr="Error: clone failed."),
+            fake_process(),  # Checkout won't be reached
         ]
 
         # Check that the function raises a RuntimeError on clone failure
@@ -122,9 +123,9 @@ class TestCloneAndCheckout:
         - Verifies RuntimeError is raised with an appropriate error message on checkout failure.
         """
         # Simulate successful clone and failed checkout
-        self.mock_subprocess_run.side_effect = [
-            mock.Mock(returncode=0, stderr=""),
-            mock.Mock(returncode=1, stderr="Error: checkout failed."),
+        self.mock_subprocess_popen.side_effect = [
+            fake_process(),
+            fake_process(returncode=1, stderr="Error: checkout failed."),
         ]
 
         # Check that the function raises a RuntimeError on checkout failure
@@ -143,20 +144,17 @@ def test_get_repo_remote():
     local_path = "/dummy/path"
     expected_url = "https://example.com/repo.git"
 
-    # Patch subprocess.run to simulate successful git command
-    with mock.patch("subprocess.run") as mock_run:
-        mock_run.return_value = mock.Mock(returncode=0, stdout=expected_url + "\n")
+    # Patch subprocess.Popen to simulate successful git command
+    with mock.patch("subprocess.Popen") as mock_popen:
+        mock_popen.return_value = fake_process(output=expected_url + "\n")
 
         # Call the function
         result = _get_repo_remote(local_path)
 
         # Check the function output and subprocess call arguments
         assert result == expected_url
-        mock_run.assert_called_once_with(
-            f"git -C {local_path} remote get-url origin",
-            shell=True,
-            capture_output=True,
-            text=True,
+        mock_popen.assert_called_once_with(
+            f"git -C {local_path} remote get-url origin", **CAPTURED_POPEN_KWARGS
         )
 
 
@@ -171,20 +169,17 @@ def test_get_repo_head_hash():
     local_path = "/dummy/path"
     expected_hash = "abcdef1234567890abcdef1234567890abcdef12"
 
-    # Patch subprocess.run to simulate successful git command
-    with mock.patch("subprocess.run") as mock_run:
-        mock_run.return_value = mock.Mock(returncode=0, stdout=expected_hash + "\n")
+    # Patch subprocess.Popen to simulate successful git command
+    with mock.patch("subprocess.Popen") as mock_popen:
+        mock_popen.return_value = fake_process(output=expected_hash + "\n")
 
         # Call the function
         result = _get_repo_head_hash(local_path)
 
         # Check the function output and subprocess call arguments
         assert result == expected_hash
-        mock_run.assert_called_once_with(
-            f"git -C {local_path} rev-parse HEAD",
-            shell=True,
-            capture_output=True,
-            text=True,
+        mock_popen.assert_called_once_with(
+            f"git -C {local_path} rev-parse HEAD", **CAPTURED_POPEN_KWARGS
         )
 
 
@@ -204,10 +199,10 @@ class TestGetHashFromCheckoutTarget:
             "1234567890abcdef1234567890abcdef12345678\trefs/heads/develop\n"  # Branch
         )
 
-        # Patch subprocess.run to simulate the `git ls-remote` command
-        self.mock_run = mock.patch("subprocess.run").start()
-        self.mock_run.return_value = mock.Mock(
-            returncode=0, stdout=self.ls_remote_output
+        # Patch subprocess.Popen to simulate the `git ls-remote` command
+        self.mock_popen = mock.patch("subprocess.Popen").start()
+        self.mock_popen.side_effect = lambda *args, **kwargs: fake_process(
+            output=self.ls_remote_output
         )
 
     def teardown_method(self):
@@ -247,11 +242,8 @@ class TestGetHashFromCheckoutTarget:
         assert result == expected_hash
 
         # Verify the subprocess call
-        self.mock_run.assert_called_with(
-            f"git ls-remote {self.repo_url}",
-            capture_output=True,
-            shell=True,
-            text=True,
+        self.mock_popen.assert_called_with(
+            f"git ls-remote {self.repo_url}", **CAPTURED_POPEN_KWARGS
         )
 
     def test_invalid_target(self):
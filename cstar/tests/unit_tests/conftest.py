@@ -1,6 +1,10 @@
+import io
 import logging
 import pathlib
+import subprocess
+import threading
 from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest import mock
 
@@ -322,6 +326,175 @@ def log() -> logging.Logger:
     return get_logger("cstar.tests.unit_tests")
 
 
+################################################################################
+# Subprocesses
+################################################################################
+
+STREAMED_POPEN_KWARGS = {
+    "shell": True,
+    "text": True,
+    "stdout": subprocess.PIPE,
+    "stderr": subprocess.STDOUT,
+    "start_new_session": True,
+}
+"""Keyword arguments with which `subprocess.Popen` is called for streamed commands."""
+
+CAPTURED_POPEN_KWARGS = {
+    "shell": True,
+    "text": True,
+    "stdout": subprocess.PIPE,
+    "stderr": subprocess.PIPE,
+    "start_new_session": True,
+}
+"""Keyword arguments with which `subprocess.Popen` is called for captured commands."""
+
+
+def fake_process(
+    returncode: int = 0, output: str = "", stderr: str = ""
+) -> mock.MagicMock:
+    """Create a stand-in for a `subprocess.Popen` object of a finished command.
+
+    Parameters
+    ----------
+    returncode: int, optional, default 0
+        The exit code returned by `wait`
+    output: str, optional, default ""
+        The stdout of the command (combined with stderr for streamed commands)
+    stderr: str, optional, default ""
+        The stderr of a captured command
+    """
+    process = mock.MagicMock(pid=-1)
+    process.stdout = io.StringIO(output)
+    process.stderr = io.StringIO(stderr)
+    process.wait.return_value = returncode
+    return process
+
+
+@pytest.fixture
+def mock_popen() -> Generator[mock.MagicMock, None, None]:
+    """Patch `subprocess.Popen`, as used for streamed commands such as `make`.
+
+    By default every command succeeds without output; set `side_effect` to a list of
+    `fake_process` results to simulate failures.
+    """
+    with mock.patch("subprocess.Popen") as mock_popen:
+        mock_popen.side_effect = lambda *args, **kwargs: fake_process()
+        yield mock_popen
+
+
+################################################################################
+# HTTP
+################################################################################
+
+
+class FakeHTTPServer:
+    """A local HTTP server standing in for a remote data host.
+
+    Attributes
+    ----------
+    files: dict[str, bytes]
+        The contents served at each path
+    accept_ranges: bool
+        Whether range requests are honoured (otherwise whole files are returned)
+    etag: str
+        The ETag reported for every file
+    drops: dict[int, int]
+        Number of times to drop the connection part-way through a response starting
+        at the given byte offset
+    requests: list[tuple[str, str, str | None]]
+        The method, path and Range header of each request received
+    """
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.accept_ranges = True
+        self.etag = '"v1"'
+        self.drops: dict[int, int] = {}
+        self.requests: list[tuple[str, str, str | None]] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}/{path.lstrip('/')}"
+
+    @property
+    def range_requests(self) -> list[str]:
+        return [r for m, _, r in self.requests if (m == "GET") and (r is not None)]
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, send_body: bool) -> None:
+                path = self.path.lstrip("/")
+                range_header = self.headers.get("Range")
+                with server._lock:
+                    server.requests.append((self.command, path, range_header))
+                if path not in server.files:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                data = server.files[path]
+                start, end = 0, len(data)
+                if server.accept_ranges and (range_header is not None):
+                    first, last = range_header.removeprefix("bytes=").split("-")
+                    start, end = int(first), min(int(last) + 1, len(data))
+                    self.send_response(206)
+                    self.send_header(
+                        "Content-Range", f"bytes {start}-{end - 1}/{len(data)}"
+                    )
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Length", str(end - start))
+                self.send_header("ETag", server.etag)
+                if server.accept_ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if not send_body:
+                    return
+
+                with server._lock:
+                    drop = server.drops.get(start, 0) > 0
+                    if drop:
+                        server.drops[start] -= 1
+                if drop:
+                    self.wfile.write(data[start : start + (end - start) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(data[start:end])
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+        return Handler
+
+
+@pytest.fixture
+def http_server() -> Generator[FakeHTTPServer, None, None]:
+    """A `FakeHTTPServer` running for the duration of a test."""
+    server = FakeHTTPServer()
+    yield server
+    server.close()
+
+
 @pytest.fixture
 def dotenv_path(tmp_path: pathlib.Path) -> pathlib.Path:
     # A path to a temporary user environment configuration file
@@ -71,6 +71,9 @@ class TestLocalProcess:
         self.mock_subprocess = MagicMock()
         self.mock_popen.return_value = self.mock_subprocess
 
+    def teardown_method(self, method):
+        self.patcher.stop()
+
     def test_initialization_defaults(self, tmp_path):
         """Ensures that default attributes are correctly applied during initialization.
 
@@ -0,0 +1,193 @@
+import pickle
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cstar.execution.handler import ExecutionStatus
+from cstar.execution.local_process import LocalProcess
+from cstar.execution.local_queue import (
+    LocalJobQueue,
+    _cancel_queued_at_exit,
+    get_local_queue,
+)
+
+
+class FakePopen:
+    """Stands in for `subprocess.Popen`, recording the processes started.
+
+    Processes run until `finish` is called with their command.
+    """
+
+    def __init__(self):
+        self.started: list[str] = []
+        self._processes: dict[str, MagicMock] = {}
+
+    def __call__(self, args, **kwargs):
+        command = " ".join(args)
+        self.started.append(command)
+        process = MagicMock()
+        process.poll.return_value = None
+        process.returncode = None
+        self._processes[command] = process
+        return process
+
+    def finish(self, command: str, returncode: int = 0) -> None:
+        process = self._processes[command]
+        process.poll.return_value = returncode
+        process.returncode = returncode
+
+
+@pytest.fixture
+def fake_popen():
+    popen = FakePopen()
+    with patch("cstar.execution.local_process.subprocess.Popen", popen):
+        yield popen
+
+
+@pytest.fixture
+def queue():
+    # A long dispatch interval, so tests dispatch explicitly
+    return LocalJobQueue(max_cores=8, dispatch_interval=60)
+
+
+def make_process(tmp_path, name: str, cores: int, queue: LocalJobQueue):
+    return LocalProcess(
+        commands=name,
+        run_path=tmp_path,
+        output_file=tmp_path / f"{name}.out",
+        cores=cores,
+        queue=queue,
+    )
+
+
+class TestLocalJobQueue:
+    """Tests for `LocalJobQueue`, which admits local processes as cores free up.
+
+    Tests
+    -----
+    - `test_starts_processes_that_fit`: Ensures processes start immediately while
+      enough cores are free, and are otherwise queued as `PENDING`.
+    - `test_admits_queued_when_cores_free`: Ensures queued processes start once
+      running ones finish, in submission order, none starting ahead of the first
+      one waiting.
+    - `test_oversized_process_runs_alone`: Ensures a process needing more cores
+      than the queue has runs once nothing else is running.
+    - `test_cancel_queued_process`: Ensures cancelling a queued process removes it
+      from the queue without starting it.
+    - `test_background_dispatch`: Ensures queued processes are started without
+      being polled.
+    - `test_pickle_finished_process`: Ensures a process started from a queue can
+      be pickled (e.g. by `Simulation.persist`) once it has finished.
+    - `test_cancel_queued_at_exit`: Ensures processes still queued as Python
+      exits are cancelled, with a warning.
+    - `test_get_local_queue`: Ensures the shared queue is sized from the
+      environment.
+    - `test_get_local_queue_invalid`: Ensures an invalid number of cores in the
+      environment is rejected.
+    """
+
+    def test_starts_processes_that_fit(self, fake_popen, queue, tmp_path):
+        a, b, c = (make_process(tmp_path, n, 4, queue) for n in ["a", "b", "c"])
+        for process in (a, b, c):
+            process.start()
+
+        assert fake_popen.started == ["a", "b"]
+        assert a.status == b.status == ExecutionStatus.RUNNING
+        assert c.status == ExecutionStatus.PENDING
+        assert queue.used_cores == 8
+        assert queue.queued == [c]
+
+    def test_admits_queued_when_cores_free(self, fake_popen, queue, tmp_path):
+        big = make_process(tmp_path, "big", 6, queue)
+        waiting = [make_process(tmp_path, n, c, queue) for n, c in [("x", 4), ("y", 2)]]
+        big.start()
+        for process in waiting:
+            process.start()
+        # "y" would fit beside "big", but must not start ahead of "x"
+        assert fake_popen.started == ["big"]
+        assert queue.dispatch() == []
+
+        fake_popen.finish("big")
+        assert queue.dispatch() == waiting
+        assert big.status == ExecutionStatus.COMPLETED
+        assert waiting[0].status == waiting[1].status == ExecutionStatus.RUNNING
+        assert queue.free_cores == 2
+
+    def test_oversized_process_runs_alone(self, fake_popen, queue, tmp_path, caplog):
+        small = make_process(tmp_path, "small", 2, queue)
+        huge = make_process(tmp_path, "huge", 16, queue)
+        small.start()
+        huge.start()
+
+        assert "only 8 are available" in caplog.text
+        assert huge.status == ExecutionStatus.PENDING
+
+        fake_popen.finish("small")
+        queue.dispatch()
+        assert fake_popen.started == ["small", "huge"]
+
+    def test_cancel_queued_process(self, fake_popen, queue, tmp_path):
+        running = make_process(tmp_path, "running", 8, queue)
+        queued = make_process(tmp_path, "queued", 1, queue)
+        running.start()
+        queued.start()
+
+        queued.cancel()
+        fake_popen.finish("running")
+        queue.dispatch()
+
+        assert queued.status == ExecutionStatus.CANCELLED
+        assert fake_popen.started == ["running"]
+
+    def test_background_dispatch(self, fake_popen, tmp_path):
+        queue = LocalJobQueue(max_cores=1, dispatch_interval=0.01)
+        first, second = (make_process(tmp_path, n, 1, queue) for n in ["1", "2"])
+        first.start()
+        second.start()
+
+        fake_popen.finish("1")
+        deadline = time.time() + 5
+        while (second.status == ExecutionStatus.PENDING) and time.time() < deadline:
+            time.sleep(0.01)
+        assert second.status == ExecutionStatus.RUNNING
+
+        fake_popen.finish("2")
+        second.wait()
+
+        assert fake_popen.started == ["1", "2"]
+        assert second.status == ExecutionStatus.COMPLETED
+
+    def test_pickle_finished_process(self, fake_popen, queue, tmp_path):
+        process = make_process(tmp_path, "a", 2, queue)
+        process.start()
+        fake_popen.finish("a")
+        assert process.status == ExecutionStatus.COMPLETED
+
+        restored = pickle.loads(pickle.dumps(process))
+        assert restored.status == ExecutionStatus.COMPLETED
+        assert restored.cores == 2
+
+    def test_cancel_queued_at_exit(self, fake_popen, queue, tmp_path, caplog):
+        running = make_process(tmp_path, "running", 8, queue)
+        queued = [make_process(tmp_path, n, 1, queue) for n in ["x", "y"]]
+        for process in (running, *queued):
+            process.start()
+
+        _cancel_queued_at_exit()
+
+        assert "2 queued local runs never started" in caplog.text
+        assert queue.queued == []
+        assert all(p.status == ExecutionStatus.CANCELLED for p in queued)
+        assert running.status == ExecutionStatus.RUNNING
+
+    def test_get_local_queue(self, monkeypatch):
+        monkeypatch.setenv("CSTAR_LOCAL_CORES", "12")
+        assert get_local_queue().max_cores == 12
+        assert get_local_queue() is get_local_queue()
+
+    @pytest.mark.parametrize("setting", ["0", "-2", "four", "2.5"])
+    def test_get_local_queue_invalid(self, monkeypatch, setting):
+        monkeypatch.setenv("CSTAR_LOCAL_CORES", setting)
+        with pytest.raises(ValueError, match="CSTAR_LOCAL_CORES must be a positive"):
+            get_local_queue()
@@ -0,0 +1,157 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from cstar.execution.node_staging import NodeLocalStaging, StagedDataset
+from cstar.execution.scheduler_job import SlurmJob
+from cstar.system.scheduler import SlurmQOS, SlurmScheduler
+
+
+def make_tiles(directory: Path, stem: str, n: int, ndigits: int) -> list[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    tiles = [directory / f"{stem}.{i:0{ndigits}d}.nc" for i in range(n)]
+    for i, tile in enumerate(tiles):
+        tile.write_text(f"{stem} tile {i}")
+    return tiles
+
+
+@pytest.fixture
+def staging(tmp_path) -> NodeLocalStaging:
+    inputs = tmp_path / "inputs"
+    grid_tiles = make_tiles(inputs, "grid", 6, 1)
+    forcing_tiles = make_tiles(inputs, "forcing", 6, 1)
+    template = tmp_path / "sim.node_local.in.template"
+    template.write_text(
+        f"grid: {NodeLocalStaging.PLACEHOLDER}/grid.nc\n"
+        f"forcing: {NodeLocalStaging.PLACEHOLDER}/forcing.nc\n"
+    )
+    return NodeLocalStaging(
+        datasets=(
+            StagedDataset.from_tiles(inputs / "grid.nc", grid_tiles),
+            StagedDataset.from_tiles(inputs / "forcing.nc", forcing_tiles),
+        ),
+        runtime_settings_template=template,
+        runtime_settings_file=tmp_path / "sim.node_local.in",
+        local_dir=str(tmp_path / "node_local"),
+    )
+
+
+class TestStagedDataset:
+    """Tests for `StagedDataset`, describing the tiles of a partitioned dataset.
+
+    Tests
+    -----
+    - `test_from_tiles`: Ensures the number of tiles and width of their numbering
+      are found among other files.
+    - `test_from_tiles_inconsistent`: Ensures missing or inconsistently numbered
+      tiles are rejected.
+    """
+
+    def test_from_tiles(self, tmp_path):
+        tiles = make_tiles(tmp_path, "grid", 12, 2) + make_tiles(tmp_path, "bry", 3, 1)
+        dataset = StagedDataset.from_tiles(tmp_path / "grid.nc", tiles)
+
+        assert (dataset.n_tiles, dataset.ndigits) == (12, 2)
+        assert dataset.tile_format == str(tmp_path / "grid.%02d.nc")
+
+    def test_from_tiles_inconsistent(self, tmp_path):
+        tiles = make_tiles(tmp_path, "grid", 4, 1)
+        with pytest.raises(ValueError, match=r"found 0, 1, 3"):
+            StagedDataset.from_tiles(tmp_path / "grid.nc", tiles[:2] + tiles[3:])
+        with pytest.raises(ValueError, match="found none"):
+            StagedDataset.from_tiles(tmp_path / "ini.nc", tiles)
+
+
+class TestNodeLocalStaging:
+    """Tests for `NodeLocalStaging`, staging inputs to node-local storage in jobs.
+
+    Tests
+    -----
+    - `test_wrap_runs_on_staged_copies`: Runs the staging commands as one node of
+      a job, ensuring only that node's tiles are staged, the runtime settings point
+      to them, outputs are copied back and the staging directory removed.
+    - `test_wrap_without_ranks_per_node`: Ensures every tile is staged on every
+      node if rank placement is unknown.
+    - `test_slurm_job_script`: Ensures SLURM job scripts stage on every node with
+      `srun`.
+    """
+
+    def run_as_node(self, staging, tmp_path, commands, node, ranks_per_node):
+        script = staging.wrap(
+            commands,
+            run_path=tmp_path,
+            job_name="my job",
+            per_node_launcher=f"env FAKE_NODEID={node}",
+            node_id_var="FAKE_NODEID",
+            ranks_per_node=ranks_per_node,
+        )
+        return subprocess.run(["bash", "-c", script], cwd=tmp_path)
+
+    def test_wrap_runs_on_staged_copies(self, staging, tmp_path):
+        commands = (
+            'ls "$CSTAR_NODE_LOCAL_DIR" > staged.txt\n'
+            'echo result > "$CSTAR_NODE_LOCAL_DIR/output/sim_his.1.nc"\n'
+            "exit 3"
+        )
+        result = self.run_as_node(staging, tmp_path, commands, 1, ranks_per_node=4)
+
+        assert result.returncode == 3
+        assert (tmp_path / "staged.txt").read_text().split() == [
+            "forcing.4.nc",
+            "forcing.5.nc",
+            "grid.4.nc",
+            "grid.5.nc",
+            "output",
+        ]
+        local = tmp_path / "node_local" / "cstar_my_job"
+        assert staging.runtime_settings_file.read_text() == (
+            f"grid: {local}/grid.nc\nforcing: {local}/forcing.nc\n"
+        )
+        assert (tmp_path / "sim_his.1.nc").read_text() == "result\n"
+        assert not local.exists()
+
+    def test_wrap_without_ranks_per_node(self, staging, tmp_path):
+        commands = 'ls "$CSTAR_NODE_LOCAL_DIR" > staged.txt'
+        result = self.run_as_node(staging, tmp_path, commands, 1, ranks_per_node=None)
+
+        assert result.returncode == 0
+        assert len((tmp_path / "staged.txt").read_text().split()) == 13
+
+    def test_slurm_job_script(self, staging, tmp_path):
+        scheduler = SlurmScheduler(
+            queues=[SlurmQOS(name="regular")],
+            primary_queue_name="regular",
+            requires_task_distribution=True,
+            max_cpus_per_node=4,
+        )
+        with patch.object(
+            SlurmQOS,
+            "max_walltime",
+            new_callable=PropertyMock,
+            return_value="02:00:00",
+        ):
+            job = SlurmJob(
+                scheduler=scheduler,
+                commands="srun -n 6 roms sim.node_local.in",
+                account_key="ABC123",
+                cpus=6,
+                nodes=2,
+                cpus_per_node=3,
+                walltime="01:00:00",
+                run_path=tmp_path,
+                job_name="staged",
+                node_local_staging=staging,
+            )
+            script = job.script
+
+        assert (
+            'srun --nodes="$SLURM_JOB_NUM_NODES" --ntasks="$SLURM_JOB_NUM_NODES" '
+            f"--ntasks-per-node=1 bash {tmp_path}/.cstar_stage_in.sh || exit 1"
+        ) in script
+        assert "first=$(( ${SLURM_NODEID:-0} * 3 ))" in script
+        assert (
+            "\n(\nsrun -n 6 roms sim.node_local.in\n)\ncstar_exit_status=$?" in script
+        )
+        assert script.endswith("exit $cstar_exit_status")
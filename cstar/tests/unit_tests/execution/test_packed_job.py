@@ -0,0 +1,183 @@
+import pickle
+from pathlib import Path
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from cstar.execution.handler import ExecutionStatus
+from cstar.execution.packed_job import (
+    PackedJob,
+    PackedMember,
+    pack_members,
+)
+from cstar.execution.scheduler_job import PBSJob, SlurmJob
+from cstar.system.scheduler import PBSQueue, PBSScheduler, SlurmQOS, SlurmScheduler
+
+
+def member(name: str, cpus: int, run_path: Path = Path("/runs")) -> PackedMember:
+    return PackedMember(
+        name=name, cpus=cpus, command=f"roms {name}.in", run_path=run_path / name
+    )
+
+
+@pytest.fixture
+def slurm_scheduler():
+    queue = SlurmQOS(name="regular", query_name="regular")
+    with patch.object(
+        SlurmQOS, "max_walltime", new_callable=PropertyMock, return_value="02:00:00"
+    ):
+        yield SlurmScheduler(
+            queues=[queue],
+            primary_queue_name="regular",
+            requires_task_distribution=True,
+            max_cpus_per_node=128,
+        )
+
+
+@pytest.fixture
+def pbs_scheduler():
+    return PBSScheduler(
+        queues=[PBSQueue(name="main", max_walltime="12:00:00")],
+        primary_queue_name="main",
+    )
+
+
+def packed_job(scheduler, members, **kwargs) -> PackedJob:
+    return PackedJob(
+        members=members,
+        account_key="ABC123",
+        mpi_exec_prefix="srun" if isinstance(scheduler, SlurmScheduler) else "mpirun",
+        walltime="01:00:00",
+        job_name="packed",
+        output_file="/runs/packed.out",
+        scheduler=scheduler,
+        **kwargs,
+    )
+
+
+class TestPackMembers:
+    """Tests for `pack_members`, which assigns packed runs to nodes and cores.
+
+    Tests
+    -----
+    - `test_packs_onto_fewest_nodes`: Ensures small runs share nodes, on disjoint
+      cores, largest first.
+    - `test_large_runs_get_whole_nodes`: Ensures runs larger than a node are given
+      whole nodes of their own.
+    """
+
+    def test_packs_onto_fewest_nodes(self):
+        members = [member(n, c) for n, c in [("a", 16), ("b", 96), ("c", 64)]]
+        placements = pack_members(members, cpus_per_node=128)
+
+        assert [p.member.name for p in placements] == ["a", "b", "c"]
+        assert [(p.first_node, p.first_core) for p in placements] == [
+            (0, 96),
+            (0, 0),
+            (1, 0),
+        ]
+        assert all(p.nodes == 1 for p in placements)
+
+    def test_large_runs_get_whole_nodes(self):
+        members = [member("small", 8), member("large", 200)]
+        placements = pack_members(members, cpus_per_node=128)
+
+        small, large = placements
+        assert (large.first_node, large.nodes, large.cpus_per_node) == (0, 2, 100)
+        assert (small.first_node, small.first_core) == (2, 0)
+
+
+class TestPackedJob:
+    """Tests for `PackedJob`, which runs several MPI runs in one scheduler job.
+
+    Tests
+    -----
+    - `test_slurm_script`: Ensures runs are launched concurrently as exclusive job
+      steps on their nodes, each writing its own output and exit code.
+    - `test_pbs_script`: Ensures runs are launched on their hosts, bound to their
+      own cores.
+    - `test_member_status`: Ensures each run reports its own status from its exit
+      code once it ends, and the job's status until then.
+    - `test_submit_clears_exit_codes`: Ensures the exit codes of an earlier
+      submission are not mistaken for those of a new one.
+    - `test_invalid_members`: Ensures empty or ambiguously named member lists are
+      rejected.
+    """
+
+    def test_slurm_script(self, slurm_scheduler):
+        job = packed_job(slurm_scheduler, [member("a", 16), member("b", 32)])
+
+        assert isinstance(job.job, SlurmJob)
+        assert (job.job.nodes, job.job.cpus_per_node, job.job.cpus) == (1, 48, 48)
+        assert "#SBATCH --nodes=1\n#SBATCH --ntasks-per-node=48" in job.script
+        assert (
+            "(cd /runs/a && srun --exact --ntasks=16 --cpu-bind=cores --nodes=1 "
+            "--relative=0 roms a.in > /runs/a/a.out 2>&1; "
+            "echo $? > /runs/a/.a.exitcode) &"
+        ) in job.script
+        assert job.script.endswith(
+            "wait\ncstar_exit_status=0\n"
+            '[ "$(cat /runs/a/.a.exitcode)" = 0 ] || cstar_exit_status=1\n'
+            '[ "$(cat /runs/b/.b.exitcode)" = 0 ] || cstar_exit_status=1\n'
+            "exit $cstar_exit_status"
+        )
+
+    def test_pbs_script(self, pbs_scheduler):
+        job = packed_job(
+            pbs_scheduler,
+            [member("a", 2), member("b", 4), member("c", 6)],
+            cpus_per_node=128,
+        )
+
+        assert isinstance(job.job, PBSJob)
+        assert "select=1:ncpus=12" in job.script
+        assert "mapfile -t CSTAR_NODES" in job.script
+        assert (
+            "mpirun -n 2 --ppn 2 --hosts ${CSTAR_NODES[0]} --cpu-bind list:10:11 "
+            "roms a.in"
+        ) in job.script
+        assert "--cpu-bind list:0:1:2:3:4:5 roms c.in" in job.script
+
+    def test_member_status(self, slurm_scheduler, tmp_path):
+        members = [member(n, 4, tmp_path) for n in ["a", "b", "c"]]
+        for m in members:
+            m.run_path.mkdir()
+        job = packed_job(slurm_scheduler, members)
+
+        with patch.object(SlurmJob, "status", new_callable=PropertyMock) as mock_status:
+            mock_status.return_value = ExecutionStatus.PENDING
+            assert set(job.member_status.values()) == {ExecutionStatus.PENDING}
+
+            mock_status.return_value = ExecutionStatus.RUNNING
+            members[0].exit_code_file.write_text("0\n")
+            members[1].exit_code_file.write_text("137\n")
+            assert job.member_status == {
+                "a": ExecutionStatus.COMPLETED,
+                "b": ExecutionStatus.FAILED,
+                "c": ExecutionStatus.RUNNING,
+            }
+            assert job.handlers["c"].status == ExecutionStatus.RUNNING
+            assert job.handlers["c"].output_file == tmp_path / "c" / "c.out"
+
+            mock_status.return_value = ExecutionStatus.CANCELLED
+            assert job.handlers["c"].status == ExecutionStatus.CANCELLED
+
+        restored = pickle.loads(pickle.dumps(job.handlers["a"]))
+        assert restored.member == members[0]
+
+    def test_submit_clears_exit_codes(self, slurm_scheduler, tmp_path):
+        a = member("a", 4, tmp_path)
+        a.run_path.mkdir()
+        a.exit_code_file.write_text("1\n")
+        job = packed_job(slurm_scheduler, [a])
+
+        with patch.object(SlurmJob, "submit", return_value=42) as mock_submit:
+            assert job.submit() == 42
+        mock_submit.assert_called_once()
+        assert not a.exit_code_file.exists()
+
+    def test_invalid_members(self, slurm_scheduler):
+        with pytest.raises(ValueError, match="at least one member"):
+            packed_job(slurm_scheduler, [])
+        with pytest.raises(ValueError, match="unique names"):
+            packed_job(slurm_scheduler, [member("a", 4), member("a", 8)])
@@ -1,14 +1,16 @@
 import json
 import logging
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 
 from cstar.execution.scheduler_job import (
+    SCHEDULER_QUERY_RETRIES,
     ExecutionStatus,
     PBSJob,
 )
 from cstar.system.scheduler import PBSQueue, PBSScheduler
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 
 class TestPBSJob:
@@ -116,7 +118,7 @@ class TestPBSJob:
             f"Script mismatch!\nExpected:\n{expected_script}\n\nGot:\n{job.script}"
         )
 
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_submit(self, mock_subprocess, tmp_path):
         """Ensures that the `submit` method properly submits a PBS job and extracts the
         job ID.
@@ -128,7 +130,7 @@ class TestPBSJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the execution of the `qsub` command and its output.
 
         Asserts
@@ -137,9 +139,9 @@ class TestPBSJob:
         - That the script file is created in the specified path.
         - That the `qsub` command is executed with the correct arguments.
         """
-        # Mock subprocess.run for qsub
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="12345.mockserver\n", stderr=""
+        # Mock subprocess.Popen for qsub
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="12345.mockserver\n", stderr=""
         )
 
         # Create temporary paths
@@ -163,7 +165,7 @@ class TestPBSJob:
             (0, "InvalidJobIDFormat", "", "Unexpected job ID format from qsub"),
         ],
     )
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_submit_raises(
         self,
         mock_subprocess,
@@ -186,16 +188,16 @@ class TestPBSJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the execution of the `qsub` command.
 
         Asserts
         -------
         - That a `RuntimeError` is raised with the expected error message when submission fails.
         """
-        # Mock subprocess.run for qsub
-        mock_subprocess.return_value = MagicMock(
-            returncode=returncode, stdout=stdout, stderr=stderr
+        # Mock subprocess.Popen for qsub
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=returncode, output=stdout, stderr=stderr
         )
 
         # Create temporary paths
@@ -213,7 +215,7 @@ class TestPBSJob:
         with pytest.raises(RuntimeError, match=match_message):
             job.submit()
 
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     @patch("cstar.execution.scheduler_job.PBSJob.status", new_callable=PropertyMock)
     def test_cancel_running_job(self, mock_status, mock_subprocess, tmp_path):
         """Tests that the `cancel` method successfully cancels a running PBS job.
@@ -225,7 +227,7 @@ class TestPBSJob:
         -----
         PBSJob.status
             Mocked to return `ExecutionStatus.RUNNING`, simulating a running job.
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate successful execution of the `qdel` command.
 
         Asserts
@@ -236,8 +238,10 @@ class TestPBSJob:
         # Mock the status to "running"
         mock_status.return_value = ExecutionStatus.RUNNING
 
-        # Mock subprocess.run for successful cancellation
-        mock_subprocess.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        # Mock subprocess.Popen for successful cancellation
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="", stderr=""
+        )
 
         # Create a PBSJob with a set job ID
         job = PBSJob(
@@ -252,13 +256,11 @@ class TestPBSJob:
         # Verify qdel was called correctly
         mock_subprocess.assert_called_once_with(
             "qdel 12345",
-            shell=True,
             cwd=tmp_path,
-            capture_output=True,
-            text=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     @patch("cstar.execution.scheduler_job.PBSJob.status", new_callable=PropertyMock)
     def test_cancel_completed_job(
         self,
@@ -277,7 +279,7 @@ class TestPBSJob:
         -----
         mock_status (PBSJob.status)
             Mocked to return "completed", simulating a completed job.
-        mock_subprocess (subprocess.run)
+        mock_subprocess (subprocess.Popen)
             Mocked to ensure that the `qdel` command is not executed.
         tmp_path (pathlib.Path)
             Builtin fixture to create a temporary filepath
@@ -313,7 +315,7 @@ class TestPBSJob:
         mock_subprocess.assert_not_called()
 
     ##
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     @patch("cstar.execution.scheduler_job.PBSJob.status", new_callable=PropertyMock)
     def test_cancel_failure(self, mock_status, mock_subprocess, tmp_path):
         """Ensures that a `RuntimeError` is raised if the `qdel` command fails to cancel
@@ -327,7 +329,7 @@ class TestPBSJob:
         -----
         PBSJob.status
             Mocked to return `ExecutionStatus.RUNNING`, simulating a running job.
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate a failed execution of the `qdel` command, returning a non-zero exit code.
 
         Asserts
@@ -338,9 +340,9 @@ class TestPBSJob:
         # Mock the status to "running"
         mock_status.return_value = ExecutionStatus.RUNNING
 
-        # Mock subprocess.run for qdel failure
-        mock_subprocess.return_value = MagicMock(
-            returncode=1, stdout="", stderr="Error cancelling job"
+        # Mock subprocess.Popen for qdel failure
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=1, output="", stderr="Error cancelling job"
         )
 
         # Create a PBSJob with a set job ID
@@ -450,7 +452,7 @@ class TestPBSJob:
             ),  # JSONDecodeError
         ],
     )
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_status(
         self,
         mock_subprocess,
@@ -476,7 +478,7 @@ class TestPBSJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the execution of the `qstat` command and its output.
 
         Asserts
@@ -487,16 +489,16 @@ class TestPBSJob:
         # Mock qstat command output
         if qstat_output is not None:
             if qstat_output == "invalid_json":
-                mock_subprocess.return_value = MagicMock(
-                    returncode=0, stdout="Invalid JSON", stderr=""
+                mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+                    returncode=0, output="Invalid JSON", stderr=""
                 )
             else:
-                mock_subprocess.return_value = MagicMock(
-                    returncode=0, stdout=json.dumps(qstat_output), stderr=""
+                mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+                    returncode=0, output=json.dumps(qstat_output), stderr=""
                 )
         else:
-            mock_subprocess.return_value = MagicMock(
-                returncode=1, stdout="", stderr="Error: qstat command failed"
+            mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+                returncode=1, output="", stderr="Error: qstat command failed"
             )
 
         # Create a PBSJob with a set job ID
@@ -505,15 +507,21 @@ class TestPBSJob:
 
         # Check the expected outcome
         if should_raise:
-            with pytest.raises(expected_exception, match=expected_message):
+            with (
+                patch("cstar.base.command.time.sleep"),
+                pytest.raises(expected_exception, match=expected_message),
+            ):
                 job.status
+            if qstat_output is None:
+                # Failed queries are retried before giving up
+                assert mock_subprocess.call_count == 1 + SCHEDULER_QUERY_RETRIES
         else:
             assert job.status == expected_status, (
                 f"Expected status '{expected_status}' but got '{job.status}'"
             )
 
     @patch("json.loads", side_effect=json.JSONDecodeError("Expecting value", "", 0))
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_status_json_decode_error(self, mock_subprocess, mock_json_loads):
         """Confirms that a `RuntimeError` is raised when the `qstat` output cannot be
         parsed as JSON.
@@ -524,7 +532,7 @@ class TestPBSJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate a successful `qstat` command execution with invalid JSON output.
         json.loads
             Mocked to raise a `JSONDecodeError` when attempting to parse the `qstat` output.
@@ -535,8 +543,8 @@ class TestPBSJob:
           parsing failure.
         """
         # Mock qstat command output
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="Invalid JSON", stderr=""
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="Invalid JSON", stderr=""
         )
 
         # Create a PBSJob with a set job ID
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from cstar.execution.handler import ExecutionStatus
+from cstar.execution.progress import (
+    OutputFollower,
+    Progress,
+    ProgressMonitor,
+    ProgressRecord,
+)
+from cstar.tests.unit_tests.execution.test_handler import MockExecutionHandler
+
+
+class StepMonitor(ProgressMonitor):
+    """Parses lines of the form `step <n>`."""
+
+    def parse_line(self, line):
+        if line.startswith("step "):
+            return ProgressRecord(step=int(line.split()[1]))
+        return None
+
+
+class TestOutputFollower:
+    """Tests for `OutputFollower`, which reads output files incrementally.
+
+    Tests
+    -----
+    - `test_reads_only_new_complete_lines`: Ensures each call returns only the
+      complete lines written since the last one.
+    - `test_rereads_overwritten_file`: Ensures a file that shrank is read again
+      from the start.
+    """
+
+    def test_reads_only_new_complete_lines(self, tmp_path):
+        path = tmp_path / "run.out"
+        follower = OutputFollower()
+        assert follower.read_lines(path) == []
+
+        path.write_text("one\ntw")
+        assert follower.read_lines(path) == ["one"]
+        with open(path, "a") as f:
+            f.write("o\nthree\n")
+        assert follower.read_lines(path) == ["two", "three"]
+        assert follower.read_lines(path) == []
+        assert follower.offset == path.stat().st_size
+
+    def test_rereads_overwritten_file(self, tmp_path):
+        path = tmp_path / "run.out"
+        follower = OutputFollower()
+        path.write_text("a long first line\n")
+        follower.read_lines(path)
+
+        path.write_text("new\n")
+        assert follower.read_lines(path) == ["new"]
+
+
+class TestProgress:
+    """Tests for `Progress` and `ProgressMonitor`, which report a run's progress.
+
+    Tests
+    -----
+    - `test_estimates`: Ensures the percentage complete, time per step and ETA
+      follow from the step, total steps and rate.
+    - `test_monitor_measures_rate`: Ensures the rate of progress is measured from
+      the wall-clock times at which new steps are seen.
+    - `test_handler_progress`: Ensures handlers report progress only if they have
+      a monitor.
+    """
+
+    def test_estimates(self):
+        progress = Progress(step=250, total_steps=1000, steps_per_second=5.0)
+
+        assert progress.percent_complete == 25.0
+        assert progress.seconds_per_step == 0.2
+        assert progress.eta == timedelta(seconds=150)
+        assert str(progress) == "Step 250/1000 (25.0%), 5 steps/s, ETA 0:02:30"
+
+        assert Progress(step=10).eta is None
+        assert str(Progress()) == "No progress reported yet"
+
+    def test_monitor_measures_rate(self, tmp_path):
+        path = tmp_path / "run.out"
+        monitor = StepMonitor(total_steps=100)
+
+        with patch("cstar.execution.progress.time.time") as mock_time:
+            mock_time.return_value = 1000.0
+            assert monitor.update(path) == Progress(total_steps=100)
+
+            path.write_text("starting\nstep 10\n")
+            assert monitor.update(path).steps_per_second is None
+
+            mock_time.return_value = 1010.0
+            with open(path, "a") as f:
+                f.write("step 20\nstep 30\n")
+            progress = monitor.update(path)
+            assert (progress.step, progress.steps_per_second) == (30, 2.0)
+            assert progress.eta == timedelta(seconds=35)
+
+            # A new run restarts the measurement
+            mock_time.return_value = 1020.0
+            path.write_text("step 1\n")
+            assert monitor.update(path).steps_per_second is None
+
+    def test_handler_progress(self, tmp_path):
+        path = tmp_path / "run.out"
+        path.write_text("step 5\n")
+        handler = MockExecutionHandler(ExecutionStatus.RUNNING, path)
+        assert handler.progress is None
+
+        handler.progress_monitor = StepMonitor(total_steps=10)
+        assert handler.progress.percent_complete == 50.0
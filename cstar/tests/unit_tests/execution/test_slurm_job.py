@@ -1,10 +1,15 @@
 import logging
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 
-from cstar.execution.scheduler_job import ExecutionStatus, SlurmJob
+from cstar.execution.scheduler_job import (
+    SCHEDULER_QUERY_RETRIES,
+    ExecutionStatus,
+    SlurmJob,
+)
 from cstar.system.scheduler import SlurmPartition, SlurmQOS, SlurmScheduler
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 
 class TestSlurmJob:
@@ -200,7 +205,7 @@ class TestSlurmJob:
         {"SLURM_JOB_ID": "123", "SLURM_NODELIST": "mock_node", "SOME_ENV_VAR": "value"},
         clear=True,
     )
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_submit(self, mock_subprocess, mock_environment, tmp_path):
         """Ensures that the `submit` method properly submits a SLURM job and sets the
         job ID.
@@ -212,7 +217,7 @@ class TestSlurmJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the `sbatch` command's execution and output.
         CStarSystemManager.environment
             Mocked to provide environment variables and Lmod settings.
@@ -233,9 +238,9 @@ class TestSlurmJob:
         script_path = tmp_path / "test_job.sh"
         run_path = tmp_path
 
-        # Mock the subprocess.run behavior for sbatch
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="Submitted batch job 12345\n", stderr=""
+        # Mock the subprocess.Popen behavior for sbatch
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="Submitted batch job 12345\n", stderr=""
         )
 
         # Initialize the job
@@ -261,11 +266,9 @@ class TestSlurmJob:
         # Check that sbatch was called correctly
         mock_subprocess.assert_called_once_with(
             f"sbatch {script_path}",
-            shell=True,
             cwd=run_path,
             env=expected_env,
-            capture_output=True,
-            text=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
         # Check that the job ID was set
@@ -274,7 +277,7 @@ class TestSlurmJob:
     @pytest.mark.parametrize(
         "subprocess_stdout, subprocess_returncode, expected_exception_message",
         [
-            # Case 1: Non-zero return code from subprocess.run
+            # Case 1: Non-zero return code from subprocess.Popen
             (
                 "",
                 1,
@@ -288,7 +291,7 @@ class TestSlurmJob:
             ),
         ],
     )
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_submit_raises(
         self,
         mock_subprocess,
@@ -309,7 +312,7 @@ class TestSlurmJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate various `sbatch` command responses, including failures
             and invalid output.
 
@@ -317,10 +320,10 @@ class TestSlurmJob:
         -------
         - That a `RuntimeError` is raised with the expected message for each failure scenario.
         """
-        # Mock the subprocess.run behavior
-        mock_subprocess.return_value = MagicMock(
+        # Mock the subprocess.Popen behavior
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
             returncode=subprocess_returncode,
-            stdout=subprocess_stdout,
+            output=subprocess_stdout,
             stderr="Error" if subprocess_returncode != 0 else "",
         )
 
@@ -339,7 +342,7 @@ class TestSlurmJob:
         with pytest.raises(RuntimeError, match=expected_exception_message):
             job.submit()
 
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     @patch("cstar.execution.scheduler_job.SlurmJob.status", new_callable=PropertyMock)
     def test_cancel(self, mock_status, mock_subprocess, tmp_path, log: logging.Logger):
         """Verifies that the `cancel` method cancels a SLURM job and raises an exception
@@ -352,7 +355,7 @@ class TestSlurmJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the `scancel` command, including both successful and
             failed executions.
         SlurmJob.status
@@ -370,8 +373,10 @@ class TestSlurmJob:
         # Mock the status to simulate a running job
         mock_status.return_value = ExecutionStatus.RUNNING
 
-        # Mock the subprocess.run behavior for successful cancellation
-        mock_subprocess.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        # Mock the subprocess.Popen behavior for successful cancellation
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="", stderr=""
+        )
 
         # Initialize the job with a set job ID
         job = SlurmJob(
@@ -389,18 +394,16 @@ class TestSlurmJob:
         # Check that scancel was called correctly
         mock_subprocess.assert_called_once_with(
             "scancel 12345",
-            shell=True,
             cwd=run_path,
-            capture_output=True,
-            text=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
         # Reset the mock for the next scenario
         mock_subprocess.reset_mock()
 
-        # Mock the subprocess.run behavior for failed cancellation
-        mock_subprocess.return_value = MagicMock(
-            returncode=1, stdout="", stderr="Error: Job not found"
+        # Mock the subprocess.Popen behavior for failed cancellation
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=1, output="", stderr="Error: Job not found"
         )
 
         # Call cancel and expect a RuntimeError
@@ -412,10 +415,8 @@ class TestSlurmJob:
         # Verify that scancel was still called
         mock_subprocess.assert_called_once_with(
             "scancel 12345",
-            shell=True,
             cwd=run_path,
-            capture_output=True,
-            text=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
     def test_save_script(self, tmp_path):
@@ -454,7 +455,7 @@ class TestSlurmJob:
             f"Script content mismatch!\nExpected:\n{job.script}\nGot:\n{file_content}"
         )
 
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     @pytest.mark.parametrize(
         "job_id, sacct_output, return_code, expected_status, should_raise",
         [
@@ -476,6 +477,8 @@ class TestSlurmJob:
                 False,
             ),  # Cancelled job
             (12345, "FAILED\n", 0, ExecutionStatus.FAILED, False),  # Failed job
+            (12345, "NODE_FAIL\n", 0, ExecutionStatus.FAILED, False),  # Node failure
+            (12345, "PREEMPTED\n", 0, ExecutionStatus.FAILED, False),  # Preempted job
             (12345, "", 1, None, True),  # sacct command failure
         ],
     )
@@ -501,7 +504,7 @@ class TestSlurmJob:
 
         Mocks
         -----
-        subprocess.run
+        subprocess.Popen
             Mocked to simulate the `sacct` command, returning various outputs and return codes.
 
         Asserts
@@ -516,19 +519,25 @@ class TestSlurmJob:
         if job_id is not None:
             job._id = job_id
 
-        # Mock subprocess.run behavior
-        mock_subprocess.return_value = MagicMock(
+        # Mock subprocess.Popen behavior
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
             returncode=return_code,
-            stdout=sacct_output,
+            output=sacct_output,
             stderr="Error: sacct command failed" if return_code != 0 else "",
         )
 
         # Check the expected outcome
         if should_raise:
-            with pytest.raises(
-                RuntimeError, match="Failed to retrieve job status using sacct"
+            with (
+                patch("cstar.base.command.time.sleep") as mock_sleep,
+                pytest.raises(
+                    RuntimeError, match="Failed to retrieve job status using sacct"
+                ),
             ):
                 job.status
+            # Failed queries are retried before giving up
+            assert mock_subprocess.call_count == 1 + SCHEDULER_QUERY_RETRIES
+            assert mock_sleep.call_count == SCHEDULER_QUERY_RETRIES
         else:
             assert job.status == expected_status, (
                 f"Expected status '{expected_status}' but got '{job.status}'"
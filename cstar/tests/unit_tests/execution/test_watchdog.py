@@ -0,0 +1,179 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cstar.execution.handler import ExecutionStatus
+from cstar.execution.packed_job import PackedMember, PackedMemberHandler
+from cstar.execution.progress import ProgressMonitor, ProgressRecord
+from cstar.execution.watchdog import FailureSignature, Watchdog, WatchdogRules
+from cstar.roms.progress import ROMSProgressMonitor
+from cstar.roms.watchdog import ROMS_WATCHDOG_RULES
+from cstar.tests.unit_tests.execution.test_handler import MockExecutionHandler
+
+
+class CancellableHandler(MockExecutionHandler):
+    """A mock handler recording whether it was cancelled."""
+
+    def __init__(self, status, output_file):
+        super().__init__(status, output_file)
+        self.cancel = MagicMock(side_effect=self._cancel)
+
+    def _cancel(self):
+        self._status = ExecutionStatus.CANCELLED
+
+
+class StepMonitor(ProgressMonitor):
+    """Parses lines of the form `step <n>`."""
+
+    def parse_line(self, line):
+        if line.startswith("step "):
+            return ProgressRecord(step=int(line.split()[1]))
+        return None
+
+
+@pytest.fixture
+def handler(tmp_path):
+    output_file = tmp_path / "job.out"
+    output_file.write_text("")
+    return CancellableHandler(ExecutionStatus.RUNNING, output_file)
+
+
+def append(handler, text):
+    with open(handler.output_file, "a") as f:
+        f.write(text)
+
+
+class TestWatchdog:
+    """Tests for `Watchdog`, which cancels runs that fail or hang.
+
+    Tests
+    -----
+    - `test_cancels_on_signature`: Ensures a run is cancelled once its output
+      reports a failure, and the reason is written next to its output.
+    - `test_cancels_on_nonfinite_diagnostics`: Ensures a run reporting NaN
+      diagnostics is cancelled.
+    - `test_cancels_on_stall`: Ensures a run making no progress for longer than
+      the threshold is cancelled, while one making progress is not.
+    - `test_ignores_runs_not_running`: Ensures pending or finished runs are never
+      cancelled.
+    - `test_watch_until_finished`: Ensures watching stops when the run finishes.
+    - `test_packed_member_not_cancelled`: Ensures a run in a packed job breaking a
+      rule is reported, without cancelling the job it shares with other runs.
+    """
+
+    def test_cancels_on_signature(self, handler):
+        watchdog = Watchdog(handler, ROMS_WATCHDOG_RULES)
+        append(handler, "step 1\n")
+        assert watchdog.check() is None
+
+        append(handler, " MAIN: Abnormal termination: BLOWUP\n")
+        diagnostic = watchdog.check()
+
+        assert diagnostic.reason == "blow-up"
+        assert diagnostic.detail == "MAIN: Abnormal termination: BLOWUP"
+        handler.cancel.assert_called_once()
+        assert watchdog.check() is diagnostic
+        assert (
+            "blow-up: MAIN" in (handler.output_file.parent / "job.watchdog").read_text()
+        )
+
+    def test_cancels_on_nonfinite_diagnostics(self, handler):
+        handler.progress_monitor = ROMSProgressMonitor()
+        watchdog = Watchdog(handler, WatchdogRules())
+        append(handler, " STEP time[DAYS] KINETIC_ENRG\n   10 0.1 ***********\n")
+
+        diagnostic = watchdog.check()
+
+        assert diagnostic.reason == "non-finite diagnostics"
+        assert diagnostic.detail == "KINETIC_ENRG at step 10"
+        handler.cancel.assert_called_once()
+
+    def test_cancels_on_stall(self, handler):
+        handler.progress_monitor = StepMonitor()
+        watchdog = Watchdog(handler, WatchdogRules(stall_seconds=100))
+
+        with patch("cstar.execution.watchdog.time.time") as mock_time:
+            mock_time.return_value = 0
+            append(handler, "step 1\n")
+            assert watchdog.check() is None
+
+            # Output that is not progress does not reset the timer
+            mock_time.return_value = 90
+            append(handler, "step 2\n")
+            assert watchdog.check() is None
+            mock_time.return_value = 150
+            append(handler, "writing history\n")
+            assert watchdog.check() is None
+
+            mock_time.return_value = 191
+            diagnostic = watchdog.check()
+
+        assert diagnostic.reason == "stalled"
+        assert diagnostic.detail == "no progress for 101 seconds since step 2"
+        handler.cancel.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "status", [ExecutionStatus.PENDING, ExecutionStatus.COMPLETED]
+    )
+    def test_ignores_runs_not_running(self, handler, status):
+        handler._status = status
+        append(handler, "Blowing up\n")
+
+        assert Watchdog(handler, ROMS_WATCHDOG_RULES).check() is None
+        handler.cancel.assert_not_called()
+
+    def test_watch_until_finished(self, handler):
+        handler._status = ExecutionStatus.COMPLETED
+        assert Watchdog(handler, ROMS_WATCHDOG_RULES).watch(interval=0) is None
+
+        handler._status = ExecutionStatus.RUNNING
+        append(handler, "Fatal error in PMPI_Waitall: Other MPI error\n")
+        watchdog = Watchdog(handler, ROMS_WATCHDOG_RULES)
+        watchdog.start(interval=0.01)
+        watchdog._thread.join(timeout=5)
+
+        assert watchdog.diagnostic.reason == "MPI abort"
+        assert handler.status == ExecutionStatus.CANCELLED
+
+    def test_packed_member_not_cancelled(self, tmp_path, caplog):
+        packed_job = MagicMock()
+        packed_job._member_status.return_value = ExecutionStatus.RUNNING
+        member = PackedMember(name="a", cpus=4, command="roms a.in", run_path=tmp_path)
+        handler = PackedMemberHandler(packed_job, member)
+        append(handler, " MAIN: Abnormal termination: BLOWUP\n")
+
+        diagnostic = Watchdog(handler, ROMS_WATCHDOG_RULES).check()
+
+        assert diagnostic.reason == "blow-up"
+        packed_job.cancel.assert_not_called()
+        assert "is not cancelled" in caplog.text
+        assert "flagged by C-Star watchdog" in (tmp_path / "a.watchdog").read_text()
+
+
+class TestFailureSignature:
+    """Tests for `FailureSignature`, patterns of failure in a run's output.
+
+    Tests
+    -----
+    - `test_roms_signatures`: Ensures the ROMS signatures match failures only.
+    - `test_custom_signature`: Ensures signatures match their pattern anywhere in
+      a line.
+    """
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("  VERTICAL CFL criterion violated at i=3, j=4", "CFL violation"),
+            ("  12  0.5 NaN 1.0E-03", "NaN in output"),
+            ("application called MPI_Abort(MPI_COMM_WORLD, 1)", "MPI abort"),
+            ("  12  0.5 4.1E-03 1.0E-03 2.3E-01 1.5E-01", None),
+            (" MAX_ADV_CFL     MAX_VERT_CFL", None),
+        ],
+    )
+    def test_roms_signatures(self, line, expected):
+        matched = [s.name for s in ROMS_WATCHDOG_RULES.signatures if s.matches(line)]
+        assert matched == ([expected] if expected else [])
+
+    def test_custom_signature(self):
+        signature = FailureSignature(name="disk full", pattern="No space left")
+        assert signature.matches("write: No space left on device")
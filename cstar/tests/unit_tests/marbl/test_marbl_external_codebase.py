@@ -7,6 +7,7 @@ import pytest
 
 from cstar.marbl.external_codebase import MARBLExternalCodeBase
 from cstar.system.manager import cstar_sysmgr
+from cstar.tests.unit_tests.conftest import STREAMED_POPEN_KWARGS, fake_process
 
 
 class TestMARBLExternalCodeBaseInit:
@@ -56,8 +57,8 @@ class TestMARBLExternalCodeBaseGet:
 
     Mocks
     -----
-    mock_subprocess_run : MagicMock
-        Mocks `subprocess.run` to simulate `make` commands and other shell operations.
+    mock_popen : MagicMock
+        Mocks `subprocess.Popen` to simulate the (streamed) `make` command.
     mock_clone_and_checkout : MagicMock
         Mocks `_clone_and_checkout` to simulate repository cloning and checkout.
     env_patch : MagicMock
@@ -66,8 +67,7 @@ class TestMARBLExternalCodeBaseGet:
 
     def setup_method(self):
         """Common setup before each test method."""
-        # Mock subprocess and _clone_and_checkout
-        self.mock_subprocess_run = mock.patch("subprocess.run").start()
+        # Mock _clone_and_checkout
         self.mock_clone_and_checkout = mock.patch(
             "cstar.marbl.external_codebase._clone_and_checkout"
         ).start()
@@ -84,12 +84,10 @@ class TestMARBLExternalCodeBaseGet:
         self,
         dotenv_path: pathlib.Path,
         marbl_path: pathlib.Path,
+        mock_popen: mock.MagicMock,
     ):
         """Test that the get method succeeds when subprocess calls succeed."""
         # Setup:
-        ## Mock success of calls to subprocess.run:
-        self.mock_subprocess_run.return_value.returncode = 0
-
         key = self.marbl_codebase.expected_env_var
         value = str(marbl_path)
 
@@ -116,21 +114,19 @@ class TestMARBLExternalCodeBaseGet:
             actual_value = dotenv.get_key(dotenv_path, key)
             assert actual_value == value
 
-            self.mock_subprocess_run.assert_called_once_with(
+            mock_popen.assert_called_once_with(
                 f"make {cstar_sysmgr.environment.compiler} USEMPI=TRUE",
                 cwd=marbl_path / "src",
-                capture_output=True,
-                text=True,
-                shell=True,
+                **STREAMED_POPEN_KWARGS,
             )
 
-    def test_make_failure(self, tmp_path):
+    def test_make_failure(self, tmp_path, mock_popen):
         """Test that the get method raises an error when 'make' fails."""
         ## There are two subprocess calls, we'd like one fail, one pass:
         dotenv_path = tmp_path / ".cstar.env"
 
-        self.mock_subprocess_run.side_effect = [
-            mock.Mock(returncode=1, stderr="Mocked MARBL Compilation Failure"),
+        mock_popen.side_effect = [
+            fake_process(returncode=1, output="Mocked MARBL Compilation Failure"),
         ]
 
         # Test
@@ -138,7 +134,7 @@ class TestMARBLExternalCodeBaseGet:
             pytest.raises(
                 RuntimeError,
                 match=(
-                    "Error when compiling MARBL. Return Code: `1`. STDERR:\n"
+                    "Error when compiling MARBL. Return Code: `1`. OUTPUT:\n"
                     "Mocked MARBL Compilation Failure"
                 ),
             ),
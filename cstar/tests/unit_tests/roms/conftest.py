@@ -441,3 +441,29 @@ def fake_romssimulation_dict_no_forcing_lists(
     for k in ["surface_forcing", "boundary_forcing", "forcing_corrections"]:
         sim_dict[k] = sim_dict[k][0]
     return sim_dict
+
+
+@pytest.fixture
+def global_netcdf_file(tmp_path) -> Path:
+    """A small global ROMS-like NetCDF file, with variables on rho, u and v points
+    and a time dimension, that can be partitioned into (2,2) or (3,2) tiles.
+    """
+    import xarray as xr
+
+    rng = np.random.default_rng(seed=0)
+    n_time, n_eta, n_xi = 4, 10, 14
+    ds = xr.Dataset(
+        {
+            "h": (("eta_rho", "xi_rho"), rng.random((n_eta, n_xi))),
+            "zeta": (("time", "eta_rho", "xi_rho"), rng.random((n_time, n_eta, n_xi))),
+            "u": (("time", "eta_rho", "xi_u"), rng.random((n_time, n_eta, n_xi - 1))),
+            "v": (("time", "eta_v", "xi_rho"), rng.random((n_time, n_eta - 1, n_xi))),
+            "mask": (("eta_rho", "xi_rho"), np.ones((n_eta, n_xi), dtype="int32")),
+        },
+        coords={"time": np.arange(n_time, dtype="float64")},
+        attrs={"title": "global test file"},
+    )
+    path = tmp_path / "global" / "grid.nc"
+    path.parent.mkdir()
+    ds.to_netcdf(path)
+    return path
@@ -7,6 +7,7 @@ import pytest
 
 from cstar.roms.external_codebase import ROMSExternalCodeBase
 from cstar.system.manager import cstar_sysmgr
+from cstar.tests.unit_tests.conftest import STREAMED_POPEN_KWARGS, fake_process
 
 
 class TestROMSExternalCodeBaseInit:
@@ -62,8 +63,8 @@ class TestROMSExternalCodeBaseGet:
 
     Mocks
     -----
-    mock_subprocess_run : MagicMock
-        Mocks `subprocess.run` to simulate `make` commands and other shell commands.
+    mock_popen : MagicMock
+        Mocks `subprocess.Popen` to simulate the (streamed) `make` commands.
     mock_clone_and_checkout : MagicMock
         Mocks `_clone_and_checkout` to simulate repository cloning and checkout processes.
     mock_write_to_config_file : MagicMock
@@ -76,8 +77,7 @@ class TestROMSExternalCodeBaseGet:
 
     def setup_method(self):
         """Common setup before each test method."""
-        # Mock subprocess, _clone_and_checkout, and _write_to_config_file
-        self.mock_subprocess_run = mock.patch("subprocess.run").start()
+        # Mock _clone_and_checkout and _write_to_config_file
         self.mock_clone_and_checkout = mock.patch(
             "cstar.roms.external_codebase._clone_and_checkout"
         ).start()
@@ -96,6 +96,7 @@ class TestROMSExternalCodeBaseGet:
         self,
         dotenv_path: pathlib.Path,
         roms_path: pathlib.Path,
+        mock_popen: mock.MagicMock,
     ):
         """Test that the get method succeeds when subprocess calls succeed."""
         # Setup:
@@ -103,9 +104,6 @@ class TestROMSExternalCodeBaseGet:
             "cstar.system.environment.CSTAR_USER_ENV_PATH",
             dotenv_path,
         ):
-            ## Mock success of calls to subprocess.run:
-            self.mock_subprocess_run.return_value.returncode = 0
-
             # Test
             ## Call the get method
             self.roms_codebase.get(target=roms_path)
@@ -139,30 +137,26 @@ class TestROMSExternalCodeBaseGet:
             actual_value = cfg[k1]
             assert v1.split(":")[1] in actual_value
 
-            self.mock_subprocess_run.assert_any_call(
+            mock_popen.assert_any_call(
                 f"make nhmg COMPILER={cstar_sysmgr.environment.compiler}",
                 cwd=roms_path / "Work",
-                capture_output=True,
-                text=True,
-                shell=True,
+                **STREAMED_POPEN_KWARGS,
             )
 
-            self.mock_subprocess_run.assert_any_call(
+            mock_popen.assert_any_call(
                 f"make COMPILER={cstar_sysmgr.environment.compiler}",
                 cwd=roms_path / "Tools-Roms",
-                capture_output=True,
-                text=True,
-                shell=True,
+                **STREAMED_POPEN_KWARGS,
             )
 
-    def test_make_nhmg_failure(self, tmp_path):
+    def test_make_nhmg_failure(self, tmp_path, mock_popen):
         """Test that the get method raises an error when 'make nhmg' fails."""
         ## There are two subprocess calls, we'd like one fail, one pass:
-        self.mock_subprocess_run.side_effect = [
-            mock.Mock(
-                returncode=1, stderr="Compiling NHMG library failed successfully"
+        mock_popen.side_effect = [
+            fake_process(
+                returncode=1, output="Compiling NHMG library failed successfully"
             ),  # Fail nhmg
-            mock.Mock(returncode=0),  # Success for Tools-Roms (won't be reached)
+            fake_process(),  # Success for Tools-Roms (won't be reached)
         ]
         dotenv_path = tmp_path / ".cstar.env"
 
@@ -170,7 +164,7 @@ class TestROMSExternalCodeBaseGet:
         with (
             pytest.raises(
                 RuntimeError,
-                match="Error when compiling ROMS' NHMG library. Return Code: `1`. STDERR:\nCompiling NHMG library failed successfully",
+                match="Error when compiling ROMS' NHMG library. Return Code: `1`. OUTPUT:\nCompiling NHMG library failed successfully",
             ),
             mock.patch(
                 "cstar.system.environment.CSTAR_USER_ENV_PATH",
@@ -180,17 +174,17 @@ class TestROMSExternalCodeBaseGet:
             self.roms_codebase.get(target=tmp_path)
 
         # Assertions:
-        ## Check that subprocess.run was called only once due to failure
-        assert self.mock_subprocess_run.call_count == 1
+        ## Check that make was called only once due to failure
+        assert mock_popen.call_count == 1
 
-    def test_make_tools_roms_failure(self, tmp_path):
+    def test_make_tools_roms_failure(self, tmp_path, mock_popen):
         """Test that the get method raises an error when 'make Tools-Roms' fails."""
         # Simulate success for `make nhmg` and failure for `make Tools-Roms`
-        self.mock_subprocess_run.side_effect = [
-            mock.Mock(returncode=0),  # Success for nhmg
-            mock.Mock(
+        mock_popen.side_effect = [
+            fake_process(),  # Success for nhmg
+            fake_process(
                 returncode=1,
-                stderr="Error when compiling Tools-Roms. Return Code: `1`. STDERR:\nCompiling Tools-Roms failed successfully",
+                output="Compiling Tools-Roms failed successfully",
             ),  # Fail Tools-Roms
         ]
 
@@ -199,5 +193,5 @@ class TestROMSExternalCodeBaseGet:
         ):
             self.roms_codebase.get(target=tmp_path)
 
-        # Check that subprocess.run was called twice
-        assert self.mock_subprocess_run.call_count == 2
+        # Check that make was called twice
+        assert mock_popen.call_count == 2
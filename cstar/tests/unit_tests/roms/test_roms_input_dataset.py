@@ -1,12 +1,16 @@
 import datetime as dt
 import logging
+import os
+import pickle
 from pathlib import Path
 from textwrap import dedent
 from unittest import mock
 
 import pytest
+import xarray as xr
 
 from cstar.roms import ROMSForcingCorrections, ROMSPartitioning
+from cstar.roms.input_dataset import TileIndex
 
 
 class TestStrAndRepr:
@@ -697,7 +701,7 @@ class TestROMSInputDatasetGet:
         mock_path_resolve.assert_called()
 
     @mock.patch(
-        "cstar.roms.input_dataset.ROMSInputDataset._symlink_or_download_from_source",
+        "cstar.roms.input_dataset.ROMSInputDataset._stage_or_download_from_source",
         autospec=False,
     )
     @mock.patch("cstar.roms.input_dataset._get_sha256_hash")
@@ -706,7 +710,7 @@ class TestROMSInputDatasetGet:
         self,
         mock_path_stat,
         mock_get_hash,
-        mock_symlink_or_download,
+        mock_stage_or_download,
         fake_romsinputdataset_netcdf_local,
     ):
         """Tests the _get_from_partitioned_source helper method.
@@ -721,15 +725,15 @@ class TestROMSInputDatasetGet:
             mocks the Path.stat method to set the ROMSPartitioning._local_file_stat_cache attr
         mock_get_hash (MagicMock)
             mocks the _get_sha256_hash method to compute the shasum of the partitioned files
-        mock_symlink_or_download (MagicMock)
-            mocks the InputDataset._symlink_or_download_from_source method to fetch the partitions
+        mock_stage_or_download (MagicMock)
+            mocks the InputDataset._stage_or_download_from_source method to fetch the partitions
         fake_romsinputdataset_netcdf_local (ROMSInputDataset)
             provides an example ROMSInputDataset with a local netcdf source
 
         Asserts
         -------
-        - Asserts _symlink_or_download_from_source was called 12 times (once per partition)
-        - Asserts the calls to _symlink_or_download_from_source have expected arguments
+        - Asserts _stage_or_download_from_source was called 12 times (once per partition)
+        - Asserts the calls to _stage_or_download_from_source have expected arguments
         - Asserts the `ROMSInputDataset.partitioning` attribute is set as expected
         """
         # Set source partitioning attributes
@@ -747,7 +751,7 @@ class TestROMSInputDatasetGet:
 
         mock_get_hash.side_effect = [f"mock_hash_{i}" for i in range(12)]
 
-        assert mock_symlink_or_download.call_count == 12
+        assert mock_stage_or_download.call_count == 12
         expected_calls = [
             mock.call(
                 source_location=f"some/local/source/path/local_file.{i:02d}.nc",
@@ -755,11 +759,12 @@ class TestROMSInputDatasetGet:
                 expected_file_hash=None,
                 target_path=mock.ANY,
                 logger=mock.ANY,
+                staging_methods=fake_romsinputdataset_netcdf_local.staging_methods,
             )
             for i in range(12)
         ]
 
-        mock_symlink_or_download.assert_has_calls(expected_calls, any_order=False)
+        mock_stage_or_download.assert_has_calls(expected_calls, any_order=False)
 
         expected_files = [Path(f"/some/dir/local_file.{i:02d}.nc") for i in range(12)]
 
@@ -1229,6 +1234,222 @@ class TestROMSInputDatasetPartition:
             fake_romsinputdataset_netcdf_local.path_for_roms
 
 
+class TestROMSPartitioning:
+    """Test class for `ROMSPartitioning` and its compact `TileIndex`.
+
+    Tests:
+    ------
+    - test_tile_index_roundtrips_paths:
+        Ensures paths are reproduced exactly and runs of tiles are stored compactly
+    - test_tile_index_indexing:
+        Tests integer, negative and slice indexing, and out-of-range errors
+    - test_exists_locally:
+        Tests that partitioned files are verified against their recorded metadata
+    - test_pickle_roundtrip:
+        Ensures a partitioning survives pickling with its metadata
+    - test_dataset_exists_locally_uses_partitioning:
+        Ensures a dataset fetched from a partitioned source is verified via its
+        partitioning
+    - test_virtual_partitioning_defers_writing:
+        Ensures a virtual partition writes no files until materialized
+    - test_materialize_rewrites_only_stale_tiles:
+        Ensures only missing tiles, or tiles of a changed source, are rewritten
+    """
+
+    def test_tile_index_roundtrips_paths(self):
+        """Ensures paths are reproduced exactly and runs of tiles are stored compactly.
+
+        Asserts
+        -------
+        - Iterating the index yields the original paths, including files from
+          several source files and files not following the tile naming convention
+        - Each run of consecutively numbered tiles is stored as a single group
+        """
+        files = (
+            [Path(f"/dir/bry_2012.{i:03d}.nc") for i in range(120)]
+            + [Path(f"/dir/bry_2013.{i:03d}.nc") for i in range(120)]
+            + [Path("/dir/unconventional_name.nc")]
+            + [Path(f"/dir/grid.{i}.nc") for i in range(8, 12)]
+        )
+        tiles = TileIndex(files)
+
+        assert len(tiles) == len(files)
+        assert list(tiles) == files
+        # 2 x bry runs, unconventional file, grid.8-9 and grid.10-11 (width change)
+        assert len(tiles._stems) == 5
+
+    def test_tile_index_indexing(self):
+        """Tests integer, negative and slice indexing, and out-of-range errors.
+
+        Asserts
+        -------
+        - Integer and negative indices return the corresponding `Path`
+        - Slices return lists of `Path`
+        - An IndexError is raised for out-of-range indices
+        """
+        partitioning = ROMSPartitioning(
+            np_xi=2, np_eta=2, files=[Path(f"grid.{i}.nc") for i in range(4)]
+        )
+
+        assert partitioning[1] == Path("grid.1.nc")
+        assert partitioning[-1] == Path("grid.3.nc")
+        assert partitioning[1:3] == [Path("grid.1.nc"), Path("grid.2.nc")]
+        assert partitioning.files == [Path(f"grid.{i}.nc") for i in range(4)]
+        with pytest.raises(IndexError):
+            partitioning[4]
+
+    def test_exists_locally(self, tmp_path):
+        """Tests that partitioned files are verified against their recorded metadata.
+
+        Asserts
+        -------
+        - `exists_locally` is True after recording metadata
+        - A touched but unmodified file still exists (hash fallback)
+        - A modified or missing file does not
+        - `local_hash` maps each file to its recorded hash
+        """
+        files = [tmp_path / f"grid.{i}.nc" for i in range(4)]
+        for f in files:
+            f.write_text(f"tile {f.name}")
+
+        partitioning = ROMSPartitioning(np_xi=2, np_eta=2, files=files)
+        partitioning.record_metadata()
+        assert partitioning.exists_locally
+        assert set(partitioning.local_hash) == set(files)
+
+        stat = files[0].stat()
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert partitioning.exists_locally
+
+        files[1].write_text("modified tile")
+        assert not partitioning.exists_locally
+
+        partitioning.record_metadata()
+        files[2].unlink()
+        assert not partitioning.exists_locally
+
+    def test_pickle_roundtrip(self, tmp_path):
+        """Ensures a partitioning survives pickling with its metadata.
+
+        Asserts
+        -------
+        - The unpickled partitioning has the same layout, files and hashes
+        """
+        files = [tmp_path / f"grid.{i}.nc" for i in range(6)]
+        for f in files:
+            f.touch()
+        partitioning = ROMSPartitioning(np_xi=3, np_eta=2, files=files)
+        partitioning.record_metadata()
+
+        restored = pickle.loads(pickle.dumps(partitioning))
+
+        assert (restored.np_xi, restored.np_eta) == (3, 2)
+        assert restored.files == files
+        assert restored.local_hash == partitioning.local_hash
+        assert restored.exists_locally
+
+    def test_dataset_exists_locally_uses_partitioning(
+        self, tmp_path, fake_romsinputdataset_netcdf_local
+    ):
+        """Ensures a dataset fetched from a partitioned source is verified via its
+        partitioning, without duplicating file metadata in its own caches.
+
+        Fixtures
+        --------
+        - fake_romsinputdataset_netcdf_local: Provides a dataset with a single NetCDF file.
+
+        Asserts
+        -------
+        - The dataset's own stat cache remains empty
+        - `exists_locally` and `local_hash` reflect the partitioned files
+        """
+        dataset = fake_romsinputdataset_netcdf_local
+        files = [tmp_path / f"local_file.{i}.nc" for i in range(2)]
+        for f in files:
+            f.write_text(f.name)
+
+        dataset._update_partitioning_attribute(
+            new_np_xi=1, new_np_eta=2, parted_files=files
+        )
+        dataset.working_path = files
+
+        assert dataset._local_file_stat_cache == {}
+        assert dataset.exists_locally
+        assert set(dataset.local_hash) == set(files)
+
+        files[0].unlink()
+        assert not dataset.exists_locally
+
+    def test_virtual_partitioning_defers_writing(
+        self, global_netcdf_file, fake_romsinputdataset_netcdf_local
+    ):
+        """Ensures a virtual partition writes no files until materialized.
+
+        Fixtures
+        --------
+        - global_netcdf_file: A small global NetCDF file
+        - fake_romsinputdataset_netcdf_local: Provides a dataset with a single NetCDF file.
+
+        Asserts
+        -------
+        - No tiles exist after `partition(..., virtual=True)`
+        - The expected tiles, with the expected sizes, exist after `materialize()`
+        - The partitioning survives pickling
+        """
+        dataset = fake_romsinputdataset_netcdf_local
+        dataset.working_path = global_netcdf_file
+        with mock.patch.object(
+            type(dataset), "exists_locally", new_callable=mock.PropertyMock
+        ) as mock_exists_locally:
+            mock_exists_locally.return_value = True
+            dataset.partition(np_xi=2, np_eta=2, virtual=True)
+
+        partitioning = dataset.partitioning
+        assert partitioning.is_virtual
+        assert "virtual=True" in repr(partitioning)
+        assert [f.name for f in partitioning] == [f"grid.{i}.nc" for i in range(4)]
+        assert not any(f.exists() for f in partitioning)
+        assert dataset.path_for_roms == [global_netcdf_file]
+
+        partitioning = pickle.loads(pickle.dumps(partitioning))
+        assert partitioning.materialize() == partitioning.files
+        with xr.open_dataset(partitioning[3]) as tile:
+            assert dict(tile.sizes) == {
+                "time": 4,
+                "eta_rho": 5,
+                "xi_rho": 7,
+                "xi_u": 7,
+                "eta_v": 5,
+            }
+
+    def test_materialize_rewrites_only_stale_tiles(self, global_netcdf_file):
+        """Ensures only missing tiles, or tiles of a changed source, are rewritten.
+
+        Fixtures
+        --------
+        - global_netcdf_file: A small global NetCDF file
+
+        Asserts
+        -------
+        - Materializing again writes nothing
+        - A deleted tile is written again, alone
+        - All tiles are written again after the source changes
+        """
+        partitioning = ROMSPartitioning.virtual(
+            np_xi=2, np_eta=2, sources=[global_netcdf_file]
+        )
+        assert len(partitioning.materialize()) == 4
+        assert partitioning.materialize() == []
+
+        partitioning[1].unlink()
+        assert partitioning.materialize() == [partitioning[1]]
+
+        stat = global_netcdf_file.stat()
+        os.utime(global_netcdf_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert partitioning.stale_tiles() == [0, 1, 2, 3]
+        assert len(partitioning.materialize()) == 4
+
+
 def test_correction_cannot_be_yaml():
     """Checks that the `validate()` method correctly raises a TypeError if
     `ROMSForcingCorrections.source.source_type` is `yaml` (unsupported)
@@ -0,0 +1,121 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from cstar.roms.output_catalog import OutputCatalog, OutputFile
+
+
+@pytest.fixture
+def output_dir(tmp_path) -> Path:
+    output_dir = tmp_path / "output"
+    (output_dir / "PARTITIONED").mkdir(parents=True)
+    for name in [
+        "ROMS_MARBL_rst.20120101000000.nc",
+        "ROMS_MARBL_rst.20120102000000.nc",
+        "ROMS_MARBL_rst.20120104000000.0.nc",
+        "ROMS_MARBL_rst.20120104000000.1.nc",
+        "ROMS_MARBL_his.20120101000000.nc",
+        "ROMS_MARBL_bgc.20120103120000.nc",
+        "PARTITIONED/ROMS_MARBL_his.20120101000000.0.nc",
+        "PARTITIONED/ROMS_MARBL_his.20120101000000.1.nc",
+        "roms.in",
+        "ROMS_MARBL_rst.nc",
+    ]:
+        (output_dir / name).touch()
+    return output_dir
+
+
+class TestOutputFile:
+    """Tests for `OutputFile`, identifying ROMS outputs from their names.
+
+    Tests
+    -----
+    - `test_from_path`: Ensures the prefix, stream, date and tile are parsed from
+      joined and partitioned output names, and other files are ignored.
+    """
+
+    def test_from_path(self):
+        tile = OutputFile.from_path(Path("out/ROMS_MARBL_bgc.20120103120000.07.nc"))
+        assert tile == OutputFile(
+            path=Path("out/ROMS_MARBL_bgc.20120103120000.07.nc"),
+            prefix="ROMS_MARBL",
+            stream="bgc",
+            date=datetime(2012, 1, 3, 12),
+            tile=7,
+        )
+        assert tile.partitioned
+
+        joined = OutputFile.from_path(Path("sim_rst.20120101000000.nc"))
+        assert (joined.stream, joined.tile, joined.partitioned) == ("rst", None, False)
+
+        assert OutputFile.from_path(Path("sim_rst.20121301000000.nc")) is None
+        assert OutputFile.from_path(Path("sim_rst.nc")) is None
+
+
+class TestOutputCatalog:
+    """Tests for `OutputCatalog`, indexing the outputs of a ROMS run.
+
+    Tests
+    -----
+    - `test_index`: Ensures outputs are indexed by stream, date and partition,
+      including tiles moved to `PARTITIONED`.
+    - `test_queries`: Ensures dates are found within ranges, nearest to a date,
+      and with the range covered by their files.
+    - `test_load_saved_catalog`: Ensures a saved catalogue is loaded without
+      listing the directory, and the directory is listed if there is none.
+    """
+
+    def test_index(self, output_dir):
+        catalog = OutputCatalog.load(output_dir)
+
+        assert catalog.streams == ["bgc", "his", "rst"]
+        assert catalog.dates("rst") == [
+            datetime(2012, 1, 1),
+            datetime(2012, 1, 2),
+            datetime(2012, 1, 4),
+        ]
+        assert catalog.files("rst", datetime(2012, 1, 4)) == []
+        assert [f.tile for f in catalog.files("rst", datetime(2012, 1, 4), True)] == [
+            0,
+            1,
+        ]
+        (his,) = catalog.files("his", datetime(2012, 1, 1))
+        assert his.path == output_dir / "ROMS_MARBL_his.20120101000000.nc"
+        his_tiles = catalog.files("his", datetime(2012, 1, 1), partitioned=True)
+        assert {f.path.parent.name for f in his_tiles} == {"PARTITIONED"}
+
+    def test_queries(self, output_dir):
+        catalog = OutputCatalog.load(output_dir)
+
+        assert catalog.between("rst", start=datetime(2012, 1, 2)) == [
+            datetime(2012, 1, 2),
+            datetime(2012, 1, 4),
+        ]
+        assert catalog.between("rst", end=datetime(2012, 1, 3)) == [
+            datetime(2012, 1, 1),
+            datetime(2012, 1, 2),
+        ]
+        assert catalog.nearest("rst", datetime(2012, 1, 3, 6)) == datetime(2012, 1, 4)
+        assert catalog.nearest("rst", datetime(2012, 1, 3)) == datetime(2012, 1, 2)
+        assert catalog.nearest("rst", datetime(2013, 1, 1)) == datetime(2012, 1, 4)
+        assert catalog.nearest("avg", datetime(2012, 1, 1)) is None
+        assert catalog.time_range("rst", datetime(2012, 1, 1)) == (
+            datetime(2012, 1, 1),
+            datetime(2012, 1, 2),
+        )
+        assert catalog.time_range("rst", datetime(2012, 1, 4))[1] is None
+
+    def test_load_saved_catalog(self, output_dir):
+        OutputCatalog.load(output_dir)
+        assert (output_dir / OutputCatalog.CATALOG_FILE).exists()
+
+        # Files written since are only found once the catalogue is updated
+        (output_dir / "ROMS_MARBL_rst.20120105000000.nc").touch()
+        catalog = OutputCatalog.load(output_dir)
+        assert datetime(2012, 1, 5) not in catalog.dates("rst")
+
+        catalog.update()
+        assert OutputCatalog.load(output_dir).dates("rst")[-1] == datetime(2012, 1, 5)
+
+        assert OutputCatalog.load(output_dir.parent / "missing").streams == []
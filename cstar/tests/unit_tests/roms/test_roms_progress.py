@@ -0,0 +1,48 @@
+import math
+
+from cstar.roms.progress import ROMSProgressMonitor
+
+ROMS_OUTPUT = """\
+ Process    0  thread  0  cpu time =  0.06 sec
+ STEP  time[DAYS] KINETIC_ENRG     BAROTR_KE        MAX_ADV_CFL     MAX_VERT_CFL
+    0  0.00000000 4.1010291461E-03 1.6543049628E-03 2.3186389616E-01 1.5003245378E-01
+    1  0.00694444 4.1013004735E-03 1.6546054418E-03 2.3129094935E-01 1.4988883106E-01
+         wrt_his :: wrote history, tdays =      0.0069  step =      1
+    2  0.01388889 4.1015637311E-03 ****************  2.3072125421E-01 1.4974574632E-01
+"""
+
+
+class TestROMSProgressMonitor:
+    """Tests for `ROMSProgressMonitor`, which parses ROMS diagnostics.
+
+    Tests
+    -----
+    - `test_parses_diagnostics`: Ensures the step, model time and diagnostics are
+      read from the lines below the header, and other output is ignored.
+    - `test_ignores_numbers_before_header`: Ensures numeric lines are not taken
+      for diagnostics before a header names them.
+    """
+
+    def test_parses_diagnostics(self, tmp_path):
+        path = tmp_path / "roms.out"
+        path.write_text(ROMS_OUTPUT)
+        monitor = ROMSProgressMonitor(total_steps=8)
+
+        progress = monitor.update(path)
+
+        assert (progress.step, progress.model_time) == (2, 0.01388889)
+        assert progress.percent_complete == 25.0
+        assert progress.diagnostics["KINETIC_ENRG"] == 4.1015637311e-03
+        assert math.isnan(progress.diagnostics["BAROTR_KE"])
+        assert list(progress.diagnostics) == [
+            "KINETIC_ENRG",
+            "BAROTR_KE",
+            "MAX_ADV_CFL",
+            "MAX_VERT_CFL",
+        ]
+
+    def test_ignores_numbers_before_header(self):
+        monitor = ROMSProgressMonitor()
+        assert monitor.parse_line("    1  2.0 3.0") is None
+        assert monitor.parse_line(" STEP time[DAYS] KINETIC_ENRG") is None
+        assert monitor.parse_line("    1  2.0 3.0").step == 1
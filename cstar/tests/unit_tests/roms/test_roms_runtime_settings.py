@@ -88,6 +88,9 @@ class TestROMSRuntimeSettingsSection:
     test_from_lines_multiline_flag
        Test that ROMSRuntimeSettingsSection.from_lines correctly handles the case
        where entries are on different lines.
+    test_section_schema_is_compiled_once
+       Test that the parsing/serialization schema of a section class is only
+       computed once
     """
 
     def test_init_with_args(self):
@@ -275,6 +278,31 @@ class TestROMSRuntimeSettingsSection:
         section = MultiLinePaths.from_lines(["a.nc", "b.nc", "c.nc"])
         assert section.paths == [Path("a.nc"), Path("b.nc"), Path("c.nc")]
 
+    def test_section_schema_is_compiled_once(self):
+        """Test that the parsing/serialization schema of a section class is only
+        computed once, however many times the section is parsed or serialized.
+        """
+
+        class CompiledSection(ROMSRuntimeSettingsSection):
+            count: int
+            coef: float
+            items: list[Path] | None
+
+        with patch.object(
+            rrs, "_strip_optional", wraps=rrs._strip_optional
+        ) as mock_strip_optional:
+            for _ in range(3):
+                section = CompiledSection.from_lines(["7 1.0D-3 a.nc b.nc"])
+                section.model_dump()
+
+        assert mock_strip_optional.call_count == 3  # once per field
+        assert section == CompiledSection(
+            count=7, coef=1e-3, items=[Path("a.nc"), Path("b.nc")]
+        )
+        assert rrs._compile_section_schema(CompiledSection).header == (
+            "compiled_section: count coef items\n"
+        )
+
     def test_from_lines_on_initial_conditions_with_nrrec_0(self):
         """Test the bespoke InitialConditions.from_lines() method handles the situation
         where nrrec is 0 and ininame is empty.
@@ -421,6 +449,9 @@ class TestROMSRuntimeSettings:
     test_file_roundtrip
        Tests that the fake_romsruntimesettings instance written to_file is
        functionally identical with the one subsequently read back with from_file
+    test_from_file_uses_cache_keyed_by_hash
+       Tests that `from_file` only parses a file once per distinct content, and
+       returns independent copies
     """
 
     def test_load_raw_sections_parses_multiple_sections(self, tmp_path):
@@ -644,6 +675,43 @@ class TestROMSRuntimeSettings:
         assert tested_settings.tracer_diff2 == expected_settings.tracer_diff2
         assert tested_settings.vertical_mixing == expected_settings.vertical_mixing
 
+    def test_from_file_uses_cache_keyed_by_hash(self, tmp_path):
+        """Tests that `from_file` only parses a file once per distinct content.
+
+        Mocks and Fixtures
+        ------------------
+        - tmp_path: Path
+           Fixture creating and returning a temporary pathlib.Path
+        - `ROMSRuntimeSettings._from_raw_sections` is wrapped to count parses
+
+        Asserts
+        -------
+        - Reading the same content twice (even from different paths) parses it once
+        - Modifying a returned instance does not affect subsequent reads
+        - Changing the file contents causes it to be parsed again
+        """
+        reference = Path(__file__).parent / "fixtures/example_runtime_settings.in"
+        file_a, file_b = tmp_path / "a.in", tmp_path / "b.in"
+        shutil.copy2(reference, file_a)
+        shutil.copy2(reference, file_b)
+        rrs._FROM_FILE_CACHE.clear()
+
+        with patch.object(
+            ROMSRuntimeSettings,
+            "_from_raw_sections",
+            wraps=ROMSRuntimeSettings._from_raw_sections,
+        ) as mock_from_raw_sections:
+            first = ROMSRuntimeSettings.from_file(file_a)
+            first.time_stepping.ntimes = 1
+            second = ROMSRuntimeSettings.from_file(file_b)
+            assert mock_from_raw_sections.call_count == 1
+            assert second.time_stepping.ntimes == 360
+
+            _replace_text_in_file(file_a, "360", "720")
+            third = ROMSRuntimeSettings.from_file(file_a)
+            assert mock_from_raw_sections.call_count == 2
+            assert third.time_stepping.ntimes == 720
+
 
 class TestStrAndRepr:
     """Test that the __str__ and __repr__ functions of the ROMSRuntimeSettings class
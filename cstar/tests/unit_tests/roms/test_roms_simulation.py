@@ -1,3 +1,4 @@
+import copy
 import logging
 import pickle
 import re
@@ -6,12 +7,16 @@ from pathlib import Path
 from typing import Any, cast
 from unittest.mock import MagicMock, PropertyMock, mock_open, patch
 
+import netCDF4
+import numpy as np
 import pytest
+import xarray as xr
 import yaml
 
 from cstar.base.additional_code import AdditionalCode
 from cstar.base.external_codebase import ExternalCodeBase
 from cstar.execution.handler import ExecutionStatus
+from cstar.execution.node_staging import NodeLocalStaging
 from cstar.marbl.external_codebase import MARBLExternalCodeBase
 from cstar.roms import ROMSRuntimeSettings
 from cstar.roms.discretization import ROMSDiscretization
@@ -22,13 +27,23 @@ from cstar.roms.input_dataset import (
     ROMSInitialConditions,
     ROMSInputDataset,
     ROMSModelGrid,
+    ROMSPartitioning,
     ROMSRiverForcing,
     ROMSSurfaceForcing,
     ROMSTidalForcing,
 )
+from cstar.roms.output_catalog import OutputCatalog
+from cstar.roms.progress import ROMSProgressMonitor
+from cstar.roms.runtime_settings import Rho0, TimeStepping
 from cstar.roms.simulation import ROMSSimulation
+from cstar.roms.tiling import NetCDFCompression, partition_netcdf
 from cstar.system.environment import CStarEnvironment
 from cstar.system.manager import cstar_sysmgr
+from cstar.tests.unit_tests.conftest import (
+    CAPTURED_POPEN_KWARGS,
+    STREAMED_POPEN_KWARGS,
+    fake_process,
+)
 
 
 class TestROMSSimulationInitialization:
@@ -60,6 +75,8 @@ class TestROMSSimulationInitialization:
       Test that `_check_inputdataset_dates` warns and overrides mismatched `start_date`
     - `test_check_inputdataset_dates_warns_and_sets_end_date`:
       Test that `_check_inputdataset_dates` warns and overrides mismatched `end_date`
+    - `test_check_inputdataset_partitioning`:
+      Test that a mismatched partitioning at source is logged for repartitioning
     """
 
     def test_init(self, fake_romssimulation):
@@ -731,12 +748,152 @@ class TestROMSSimulationInitialization:
         new_callable=PropertyMock,
     )
     def test_check_inputdataset_partitioning(
-        self, mock_source_partitioning, fake_romssimulation
+        self, mock_source_partitioning, fake_romssimulation, caplog
     ):
+        """Test that a mismatched partitioning at source is accepted, and logged as
+        to be repartitioned.
+        """
+        sim = fake_romssimulation
+        caplog.set_level(logging.INFO, logger=sim.log.name)
+        sim.model_grid.source_np_xi, sim.model_grid.source_np_eta = 120, 360
         mock_source_partitioning.return_value = (120, 360)
-        with pytest.raises(ValueError, match="Cannot instantiate ROMSSimulation"):
-            sim = fake_romssimulation
-            sim._check_inputdataset_partitioning()
+
+        sim._check_inputdataset_partitioning()
+
+        assert "ROMSModelGrid has partitioning (120,360) at source" in caplog.text
+        assert "will be repartitioned to (2,3)" in caplog.text
+
+
+class TestRuntimeSettingsCaching:
+    """Tests for the caching of `ROMSSimulation.roms_runtime_settings`.
+
+    Tests
+    -----
+    - `test_settings_are_cached`: Ensures the `.in` file is only parsed once while
+      nothing changes, and that in-place changes persist between accesses.
+    - `test_rebuild_on_in_file_change`: Ensures the settings are rebuilt once the
+      contents of the `.in` file change.
+    - `test_rebuild_on_configuration_change`: Ensures the settings are rebuilt when
+      the dates or input datasets change.
+    - `test_rebuild_on_time_step_and_partitioning_change`: Ensures the settings are
+      rebuilt when the time step or a dataset's partitioning change.
+    - `test_update_runtime_settings`: Ensures overrides survive rebuilds.
+    - `test_update_runtime_settings_raises_on_unknown_section`: Ensures a ValueError
+      is raised for keywords that are not runtime settings sections.
+    - `test_cache_is_not_persisted`: Ensures the cache is excluded from the state
+      store and from pickles.
+
+    Mocks & Fixtures
+    ----------------
+    - `sim`: The `fake_romssimulation` fixture, with its `.in` file replaced by a
+      copy of `fixtures/example_runtime_settings.in` in a temporary directory.
+    - `mock_path_for_roms`: Mocks `ROMSInputDataset.path_for_roms` so that datasets
+      need not be partitioned.
+    """
+
+    @pytest.fixture
+    def sim(self, fake_romssimulation, tmp_path):
+        in_dir = tmp_path / "runtime_code"
+        in_dir.mkdir()
+        (in_dir / "file2.in").write_text(
+            (Path(__file__).parent / "fixtures/example_runtime_settings.in").read_text()
+        )
+        fake_romssimulation.runtime_code.working_path = in_dir
+        with patch.object(
+            ROMSInputDataset,
+            "path_for_roms",
+            new_callable=PropertyMock,
+            return_value=[Path("dataset.nc")],
+        ):
+            yield fake_romssimulation
+
+    def test_settings_are_cached(self, sim):
+        with patch.object(
+            ROMSRuntimeSettings, "from_file", wraps=ROMSRuntimeSettings.from_file
+        ) as mock_from_file:
+            settings = sim.roms_runtime_settings
+            settings.output_root_name.output_root_name = "modified"
+
+            assert sim.roms_runtime_settings is settings
+            assert sim.roms_runtime_settings.output_root_name.output_root_name == (
+                "modified"
+            )
+        mock_from_file.assert_called_once()
+
+    def test_rebuild_on_in_file_change(self, sim):
+        in_file = sim.runtime_code.working_path / "file2.in"
+        settings = sim.roms_runtime_settings
+        assert sim.roms_runtime_settings is settings
+
+        in_file.write_text(in_file.read_text().replace("ROMS_test", "ROMS_new"))
+
+        assert sim.roms_runtime_settings is not settings
+        assert sim.roms_runtime_settings.output_root_name.output_root_name == (
+            "ROMS_new"
+        )
+
+    @pytest.mark.parametrize(
+        "attribute, value",
+        [
+            ("start_date", datetime(2025, 2, 1)),
+            ("end_date", datetime(2025, 6, 1)),
+            ("model_grid", None),
+            ("surface_forcing", []),
+        ],
+    )
+    def test_rebuild_on_configuration_change(self, sim, attribute, value):
+        settings = sim.roms_runtime_settings
+        setattr(sim, attribute, value)
+        assert sim.roms_runtime_settings is not settings
+
+    def test_rebuild_on_time_step_and_partitioning_change(self, sim):
+        settings = sim.roms_runtime_settings
+
+        sim.discretization.time_step = 30
+        rebuilt = sim.roms_runtime_settings
+        assert rebuilt is not settings
+        assert rebuilt.time_stepping.dt == 30
+
+        sim.model_grid.partitioning = ROMSPartitioning(
+            np_xi=1, np_eta=1, files=[Path("dataset.0.nc")]
+        )
+        assert sim.roms_runtime_settings is not rebuilt
+
+    def test_update_runtime_settings(self, sim):
+        settings = sim.roms_runtime_settings
+        sim.update_runtime_settings(
+            rho0=Rho0(1025.0),
+            time_stepping=TimeStepping(ntimes=1, dt=1, ndtfast=5, ninfo=2),
+        )
+
+        updated = sim.roms_runtime_settings
+        assert updated is not settings
+        assert updated.rho0.rho0 == 1025.0
+        assert updated.time_stepping.ndtfast == 5
+        # Values derived from the simulation take precedence:
+        assert updated.time_stepping.dt == sim.discretization.time_step
+
+        sim.end_date = datetime(2025, 6, 1)
+        assert sim.roms_runtime_settings is not updated
+        assert sim.roms_runtime_settings.rho0.rho0 == 1025.0
+
+    def test_update_runtime_settings_raises_on_unknown_section(self, sim):
+        with pytest.raises(ValueError, match="not_a_section"):
+            sim.update_runtime_settings(not_a_section=1)
+
+    def test_cache_is_not_persisted(self, sim):
+        sim.roms_runtime_settings
+        sim.update_runtime_settings(rho0=Rho0(1025.0))
+        sim.roms_runtime_settings
+        assert sim._runtime_settings_cache is not None
+
+        state = sim.__getstate__()
+        assert "_runtime_settings_cache" not in state
+        assert "_in_file_hash_memo" not in state
+        assert state["_runtime_settings_overrides"]["rho0"].rho0 == 1025.0
+
+        unpickled = pickle.loads(pickle.dumps(sim))
+        assert unpickled._runtime_settings_cache is None
 
 
 class TestStrAndRepr:
@@ -1316,12 +1473,28 @@ class TestProcessingAndExecution:
     - `test_run_local_execution`
         Ensures that `run()` correctly starts a local process when no scheduler is
         available.
+    - `test_run_materializes_virtual_partitions`
+        Ensures that `run()` writes the files of virtually partitioned datasets.
     - `test_run_with_scheduler`
         Tests that `run()` submits a job with scheduler defaults when queue and
         walltime are not specified.
     - `test_run_with_scheduler_raises_if_no_account_key`
         Ensures that `run()` raises an error when executed with a scheduler but no
         account key is provided.
+    - `test_run_with_node_local_staging`
+        Ensures that `run()` stages partitioned inputs to node-local storage in the
+        scheduler job, with a runtime settings template pointing to the copies.
+    - `test_run_packed`
+        Ensures that `run_packed()` submits several simulations as one packed job,
+        giving each a handler tracking its own run.
+    - `test_run_packed_raises_without_scheduler`
+        Ensures that `run_packed()` raises an error when no scheduler is available.
+    - `test_run_resilient`
+        Ensures failed runs are resumed from their latest restart, or resubmitted
+        if they wrote none.
+    - `test_run_resilient_retry_budget`
+        Ensures failed runs are resubmitted at most `max_retries` times, and
+        cancelled runs never.
     - `test_post_run_raises_if_called_before_run`
         Checks that `post_run()` raises an error if called before `run()`.
     - `test_post_run_raises_if_still_running`
@@ -1333,6 +1506,17 @@ class TestProcessingAndExecution:
         are found.
     - `test_post_run_raises_error_if_ncjoin_fails`
         Ensures that `post_run()` raises an error if `ncjoin` fails during merging.
+    - `test_post_run_compresses_netcdf_files`
+        Ensures `post_run(compression=...)` joins and compresses output files without
+        `ncjoin`, in parallel, deleting the tiles once verified.
+    - `test_post_run_keeps_tiles_if_compression_fails`
+        Ensures tiles are kept if their compressed file could not be verified.
+    - `test_export_zarr`
+        Ensures joined and partitioned output files are written to one Zarr store,
+        in time order.
+    - `test_extract`
+        Ensures regions are extracted from the latest or a given output file,
+        whether joined or partitioned.
     """
 
     @patch.object(ROMSInputDataset, "get")
@@ -1582,7 +1766,7 @@ class TestProcessingAndExecution:
                 assert sim.is_setup == expected
 
     @patch("cstar.roms.simulation._get_sha256_hash", return_value="dummy_hash")
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_build(self, mock_subprocess, mock_get_hash, fake_romssimulation):
         """Tests that `build` correctly compiles the ROMS executable.
 
@@ -1608,7 +1792,7 @@ class TestProcessingAndExecution:
         (build_dir / "Compile").mkdir(exist_ok=True, parents=True)
         sim.compile_time_code.working_path = build_dir
 
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process()
         mock_get_hash.return_value = "mockhash123"
 
         sim.build()
@@ -1616,16 +1800,12 @@ class TestProcessingAndExecution:
         mock_subprocess.assert_any_call(
             "make compile_clean",
             cwd=build_dir,
-            shell=True,
-            capture_output=True,
-            text=True,
+            **STREAMED_POPEN_KWARGS,
         )
         mock_subprocess.assert_any_call(
             f"make COMPILER={cstar_sysmgr.environment.compiler}",
             cwd=build_dir,
-            shell=True,
-            capture_output=True,
-            text=True,
+            **STREAMED_POPEN_KWARGS,
         )
 
         assert sim.exe_path == build_dir / "roms"
@@ -1634,7 +1814,7 @@ class TestProcessingAndExecution:
     @patch(
         "cstar.roms.simulation._get_sha256_hash", return_value="dummy_hash"
     )  # Mock hash function
-    @patch("subprocess.run")  # Mock subprocess (should not be called)
+    @patch("subprocess.Popen")  # Mock subprocess (should not be called)
     def test_build_no_rebuild(
         self,
         mock_subprocess,
@@ -1691,11 +1871,11 @@ class TestProcessingAndExecution:
             captured = caplog.text
             assert expected_msg in captured
 
-            # Ensure subprocess.run was *not* called
+            # Ensure make was *not* called
             mock_subprocess.assert_not_called()
 
     @patch("cstar.roms.simulation._get_sha256_hash", return_value="dummy_hash")
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_build_raises_if_make_clean_error(
         self, mock_subprocess, mock_get_hash, fake_romssimulation
     ):
@@ -1720,7 +1900,7 @@ class TestProcessingAndExecution:
         (build_dir / "Compile").mkdir(exist_ok=True, parents=True)
         sim.compile_time_code.working_path = build_dir
 
-        mock_subprocess.return_value = MagicMock(returncode=1, stderr="")
+        mock_subprocess.return_value = fake_process(returncode=1)
         mock_get_hash.return_value = "mockhash123"
 
         with pytest.raises(RuntimeError, match="Error when compiling ROMS"):
@@ -1729,13 +1909,11 @@ class TestProcessingAndExecution:
         mock_subprocess.assert_any_call(
             "make compile_clean",
             cwd=build_dir,
-            shell=True,
-            capture_output=True,
-            text=True,
+            **STREAMED_POPEN_KWARGS,
         )
 
     @patch("cstar.roms.simulation._get_sha256_hash", return_value="dummy_hash")
-    @patch("subprocess.run")
+    @patch("subprocess.Popen")
     def test_build_raises_if_make_error(
         self, mock_subprocess, mock_get_hash, fake_romssimulation
     ):
@@ -1759,7 +1937,7 @@ class TestProcessingAndExecution:
         build_dir = sim.directory / "ROMS/compile_time_code"
         sim.compile_time_code.working_path = build_dir
 
-        mock_subprocess.return_value = MagicMock(returncode=1, stderr="")
+        mock_subprocess.return_value = fake_process(returncode=1)
         mock_get_hash.return_value = "mockhash123"
 
         with pytest.raises(RuntimeError, match="Error when compiling ROMS"):
@@ -1769,9 +1947,7 @@ class TestProcessingAndExecution:
         mock_subprocess.assert_any_call(
             f"make COMPILER={cstar_sysmgr.environment.compiler}",
             cwd=build_dir,
-            shell=True,
-            capture_output=True,
-            text=True,
+            **STREAMED_POPEN_KWARGS,
         )
 
     def test_build_raises_if_no_build_dir(self, fake_romssimulation):
@@ -1827,11 +2003,19 @@ class TestProcessingAndExecution:
 
             # Assert that partition() was called only on datasets that exist locally
             dataset_1.partition.assert_called_once_with(
-                np_xi=2, np_eta=3, overwrite_existing_files=False
+                np_xi=2,
+                np_eta=3,
+                overwrite_existing_files=False,
+                virtual=False,
+                max_memory=None,
             )
             dataset_2.partition.assert_not_called()  # Does not exist → shouldn't be partitioned
             dataset_3.partition.assert_called_once_with(
-                np_xi=2, np_eta=3, overwrite_existing_files=False
+                np_xi=2,
+                np_eta=3,
+                overwrite_existing_files=False,
+                virtual=False,
+                max_memory=None,
             )
 
     def test_run_raises_if_no_runtime_code_working_path(self, fake_romssimulation):
@@ -1914,6 +2098,7 @@ class TestProcessingAndExecution:
         - Ensures `LocalProcess` is instantiated with the correct command and run path.
         - Ensures `LocalProcess.start()` is called.
         - Ensures the returned execution handler matches the mocked `LocalProcess` instance.
+        - Ensures the handler monitors progress towards the simulation's final step.
         """
         sim = fake_romssimulation
 
@@ -1937,6 +2122,7 @@ class TestProcessingAndExecution:
             mock_local_process.assert_called_once_with(
                 commands=f"{cstar_sysmgr.environment.mpi_exec_prefix} -n {sim.discretization.n_procs_tot} {sim.exe_path} {sim.runtime_code.working_path}/ROMSTest.in",
                 run_path=sim.directory / "output",
+                cores=sim.discretization.n_procs_tot,
             )
 
             # Ensure process was started
@@ -1944,9 +2130,41 @@ class TestProcessingAndExecution:
 
             # Ensure execution handler was set correctly
             assert execution_handler == mock_process_instance
+            assert isinstance(execution_handler.progress_monitor, ROMSProgressMonitor)
+            assert execution_handler.progress_monitor.total_steps == sim._n_time_steps
 
             mock_persist.assert_called_once()
 
+    @patch("cstar.roms.ROMSSimulation.persist")
+    @patch.object(ROMSSimulation, "roms_runtime_settings", new_callable=PropertyMock)
+    def test_run_materializes_virtual_partitions(
+        self, mock_runtime_settings, mock_persist, fake_romssimulation
+    ):
+        """Ensures that `run()` writes the files of virtually partitioned datasets,
+        and leaves other partitionings alone.
+        """
+        sim = fake_romssimulation
+        sim.exe_path = sim.directory / "ROMS/compile_time_code/roms"
+        sim.runtime_code.working_path = sim.directory / "ROMS/runtime_code/"
+        virtual = MagicMock(is_virtual=True)
+        virtual.materialize.return_value = [Path("grid.0.nc")]
+        written = MagicMock(is_virtual=False)
+        sim.model_grid.partitioning = virtual
+        sim.initial_conditions.partitioning = written
+
+        with (
+            patch("cstar.roms.simulation.LocalProcess"),
+            patch(
+                "cstar.system.manager.CStarSystemManager.scheduler",
+                new_callable=PropertyMock,
+                return_value=None,
+            ),
+        ):
+            sim.run()
+
+        virtual.materialize.assert_called_once_with()
+        written.materialize.assert_not_called()
+
     @pytest.mark.parametrize(
         "mock_system_name,exp_mpi_prefix",
         [
@@ -2034,6 +2252,7 @@ class TestProcessingAndExecution:
                 run_path=sim.directory / "output",
                 queue_name="default_queue",
                 walltime="12:00:00",
+                node_local_staging=None,
             )
 
             mock_job_instance.submit.assert_called_once()
@@ -2093,6 +2312,236 @@ class TestProcessingAndExecution:
                 sim.run()
             mock_create_job.assert_not_called()
 
+    @patch("cstar.roms.ROMSSimulation.persist")
+    def test_run_with_node_local_staging(
+        self, mock_persist, fake_romssimulation, tmp_path
+    ):
+        """Tests that `run` stages partitioned inputs to node-local storage.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance,
+          given a real `.in` file and six-way partitioning of each input dataset.
+        - `patch("cstar.roms.simulation.create_scheduler_job")` : Mocks job creation.
+        - CStarSystemManager.scheduler: Mocks `cstar_sysmgr.scheduler` to simulate a
+          scheduler environment.
+
+        Assertions
+        ----------
+        - Ensures the job is created with a `NodeLocalStaging` covering each
+          partitioned input.
+        - Ensures ROMS is run with the runtime settings file written by the job.
+        - Ensures the runtime settings template points inputs and outputs to the
+          node-local directory.
+        """
+        sim = fake_romssimulation
+        in_dir = tmp_path / "runtime_code"
+        in_dir.mkdir()
+        (in_dir / "file2.in").write_text(
+            (Path(__file__).parent / "fixtures/example_runtime_settings.in").read_text()
+        )
+        sim.runtime_code.working_path = in_dir
+        sim.exe_path = tmp_path / "roms"
+        inputs = tmp_path / "inputs"
+        inputs.mkdir()
+        for i, dataset in enumerate(sim.input_datasets):
+            tiles = [inputs / f"input{i}.{rank}.nc" for rank in range(6)]
+            for tile in tiles:
+                tile.touch()
+            dataset.partitioning = ROMSPartitioning(np_xi=2, np_eta=3, files=tiles)
+
+        mock_scheduler = MagicMock()
+        mock_scheduler.primary_queue_name = "default_queue"
+        mock_scheduler.get_queue.return_value.max_walltime = "12:00:00"
+        with (
+            patch("cstar.roms.simulation.create_scheduler_job") as mock_create_job,
+            patch(
+                "cstar.system.manager.CStarSystemManager.scheduler",
+                new_callable=PropertyMock,
+                return_value=mock_scheduler,
+            ),
+        ):
+            sim.run(account_key="some_key", node_local_dir="$TMPDIR")
+
+        kwargs = mock_create_job.call_args.kwargs
+        staging = kwargs["node_local_staging"]
+        assert staging.local_dir == "$TMPDIR"
+        assert len(staging.datasets) == len(sim.input_datasets)
+        assert all(d.n_tiles == 6 for d in staging.datasets)
+        assert kwargs["commands"].endswith(
+            str(in_dir.resolve() / "ROMSTest.node_local.in")
+        )
+
+        template = ROMSRuntimeSettings.from_file(staging.runtime_settings_template)
+        local = Path(NodeLocalStaging.PLACEHOLDER)
+        assert template.grid.grid == local / "input0.nc"
+        assert template.initial.ininame == local / "input1.nc"
+        assert all(f.parent == local for f in template.forcing.filenames)
+        assert template.output_root_name.output_root_name.startswith(f"{local}/output/")
+
+    @patch("cstar.roms.ROMSSimulation.persist")
+    @patch.object(ROMSSimulation, "roms_runtime_settings", new_callable=PropertyMock)
+    def test_run_packed(self, mock_runtime_settings, mock_persist, fake_romssimulation):
+        """Tests that `run_packed` submits several simulations in one packed job.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance,
+          copied to make a second simulation.
+        - `patch("cstar.roms.simulation.PackedJob")` : Mocks `PackedJob` to verify
+          the members packed.
+        - CStarSystemManager.scheduler: Mocks `cstar_sysmgr.scheduler` to simulate a
+          scheduler environment.
+
+        Assertions
+        ----------
+        - Ensures `PackedJob` is created with one member per simulation, running its
+          executable and `.in` file in its output directory.
+        - Ensures the packed job is submitted once.
+        - Ensures each simulation's execution handler tracks its own member, and
+          the progress of its own time steps.
+        """
+        sims = [fake_romssimulation, copy.deepcopy(fake_romssimulation)]
+        sims[1].name = "ROMSTest2"
+        for sim in sims:
+            sim.exe_path = sim.directory / "ROMS/compile_time_code/roms"
+            sim.runtime_code.working_path = sim.directory / "ROMS/runtime_code/"
+
+        mock_scheduler = MagicMock()
+        mock_scheduler.primary_queue_name = "default_queue"
+        mock_scheduler.get_queue.return_value.max_walltime = "12:00:00"
+
+        with (
+            patch("cstar.roms.simulation.PackedJob") as mock_packed_job,
+            patch(
+                "cstar.system.manager.CStarSystemManager.scheduler",
+                new_callable=PropertyMock,
+                return_value=mock_scheduler,
+            ),
+        ):
+            handlers = {"ROMSTest": MagicMock(), "ROMSTest2": MagicMock()}
+            mock_packed_job.return_value.handlers = handlers
+            packed_job = ROMSSimulation.run_packed(sims, account_key="some_key")
+
+        members = mock_packed_job.call_args.kwargs["members"]
+        assert [(m.name, m.cpus) for m in members] == [
+            ("ROMSTest", 6),
+            ("ROMSTest2", 6),
+        ]
+        assert members[1].command == (
+            f"{sims[1].exe_path} {sims[1].runtime_code.working_path}/ROMSTest2.in"
+        )
+        assert members[0].run_path == sims[0].directory / "output"
+        assert mock_packed_job.call_args.kwargs["walltime"] == "12:00:00"
+        packed_job.submit.assert_called_once()
+        assert [sim._execution_handler for sim in sims] == list(handlers.values())
+        assert handlers["ROMSTest2"].progress_monitor.total_steps == (
+            sims[1]._n_time_steps
+        )
+        assert mock_persist.call_count == 2
+
+    @patch.object(ROMSSimulation, "pre_run")
+    @patch.object(ROMSSimulation, "build")
+    @patch.object(ROMSSimulation, "setup")
+    @patch.object(ROMSSimulation, "_latest_valid_restart")
+    @patch.object(ROMSSimulation, "run")
+    def test_run_resilient(
+        self,
+        mock_run,
+        mock_latest_restart,
+        mock_setup,
+        mock_build,
+        mock_pre_run,
+        fake_romssimulation,
+    ):
+        """Tests that `run_resilient` resumes failed runs from their latest restart.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `ROMSSimulation.run` : Mocked to return handlers of runs that fail twice,
+          then complete.
+        - `ROMSSimulation._latest_valid_restart` : Mocked to find no restart after
+          the first failure, and one after the second.
+        - `ROMSSimulation.restart`, `setup`, `build` and `pre_run` : Mocked or
+          spied on to check the continuation is prepared.
+
+        Assertions
+        ----------
+        - Ensures a run failing without a restart is resubmitted as is.
+        - Ensures a run failing after a restart is continued from that restart, to
+          the original end date, once the continuation has been set up.
+        - Ensures the simulation of the completed run is returned.
+        """
+        sim = fake_romssimulation
+        continuation = MagicMock()
+        continuation.run.return_value = MagicMock(status=ExecutionStatus.COMPLETED)
+        mock_run.return_value = MagicMock(status=ExecutionStatus.FAILED)
+        mock_latest_restart.side_effect = [None, datetime(2025, 6, 1)]
+
+        with patch.object(
+            ROMSSimulation, "restart", return_value=continuation
+        ) as mock_restart:
+            final = sim.run_resilient(account_key="key", poll_interval=0)
+
+        assert final is continuation
+        assert mock_run.call_count == 2
+        mock_run.assert_called_with(
+            account_key="key", walltime=None, queue_name=None, job_name=None
+        )
+        mock_restart.assert_called_once_with(
+            new_end_date=sim.end_date, restart_date=datetime(2025, 6, 1)
+        )
+        continuation.setup.assert_called_once()
+        continuation.pre_run.assert_called_once()
+
+    @patch.object(ROMSSimulation, "_latest_valid_restart", return_value=None)
+    @patch.object(ROMSSimulation, "run")
+    def test_run_resilient_retry_budget(
+        self, mock_run, mock_latest_restart, fake_romssimulation, caplog
+    ):
+        """Tests that `run_resilient` stops resubmitting after `max_retries`.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `ROMSSimulation.run` : Mocked to return handlers of runs that always fail,
+          then of a cancelled run.
+        - `ROMSSimulation._latest_valid_restart` : Mocked to find no restart.
+
+        Assertions
+        ----------
+        - Ensures a failing run is submitted once, then resubmitted `max_retries`
+          times, and the failure logged.
+        - Ensures a cancelled run is not resubmitted.
+        """
+        sim = fake_romssimulation
+        mock_run.return_value = MagicMock(status=ExecutionStatus.FAILED)
+
+        assert sim.run_resilient(max_retries=2, poll_interval=0) is sim
+        assert mock_run.call_count == 3
+        assert "failed again, after 2 resubmissions" in caplog.text
+
+        mock_run.reset_mock()
+        mock_run.return_value = MagicMock(status=ExecutionStatus.CANCELLED)
+        sim.run_resilient(poll_interval=0)
+        mock_run.assert_called_once()
+
+    def test_run_packed_raises_without_scheduler(self, fake_romssimulation):
+        """Tests that `run_packed` raises a `ValueError` without a job scheduler.
+
+        Assertions
+        ----------
+        - Confirms that the expected `ValueError` is raised.
+        """
+        with patch(
+            "cstar.system.manager.CStarSystemManager.scheduler",
+            new_callable=PropertyMock,
+            return_value=None,
+        ):
+            with pytest.raises(ValueError, match="requires a job scheduler"):
+                ROMSSimulation.run_packed([fake_romssimulation], account_key="key")
+
     def test_post_run_raises_if_called_before_run(self, fake_romssimulation):
         """Tests that `post_run` raises a `RuntimeError` if called before `run`.
 
@@ -2151,7 +2600,7 @@ class TestProcessingAndExecution:
             sim.post_run()
 
     @patch("cstar.roms.ROMSSimulation.persist")
-    @patch("subprocess.run")  # Mock ncjoin execution
+    @patch("subprocess.Popen")  # Mock ncjoin execution
     def test_post_run_merges_netcdf_files(
         self, mock_subprocess, mock_persist, fake_romssimulation
     ):
@@ -2165,7 +2614,7 @@ class TestProcessingAndExecution:
         Mocks & Fixtures
         ----------------
         - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
-        - `mock_subprocess` : Mocks `subprocess.run` to simulate successful `ncjoin` execution.
+        - `mock_subprocess` : Mocks `subprocess.Popen` to simulate successful `ncjoin` execution.
 
         Assertions
         ----------
@@ -2189,7 +2638,9 @@ class TestProcessingAndExecution:
             ExecutionStatus.COMPLETED
         )  # Ensure run is complete
 
-        mock_subprocess.return_value = MagicMock(returncode=0, stderr="")
+        mock_subprocess.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, stderr=""
+        )
         # Call post_run
         sim.post_run()
 
@@ -2197,16 +2648,12 @@ class TestProcessingAndExecution:
         mock_subprocess.assert_any_call(
             "ncjoin ocean_his.20240101000000.*.nc",
             cwd=output_dir,
-            capture_output=True,
-            text=True,
-            shell=True,
+            **CAPTURED_POPEN_KWARGS,
         )
         mock_subprocess.assert_any_call(
             "ncjoin ocean_rst.20240101000000.*.nc",
             cwd=output_dir,
-            capture_output=True,
-            text=True,
-            shell=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
         # Check that files were moved
@@ -2264,7 +2711,7 @@ class TestProcessingAndExecution:
 
         mock_persist.assert_called_once()
 
-    @patch("subprocess.run")  # Mock subprocess.run to simulate a failure
+    @patch("subprocess.Popen")  # Mock subprocess.Popen to simulate a failure
     @patch.object(Path, "glob")  # Mock glob to return fake files
     def test_post_run_raises_error_if_ncjoin_fails(
         self, mock_glob, mock_subprocess, fake_romssimulation
@@ -2280,7 +2727,7 @@ class TestProcessingAndExecution:
         ----------------
         - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
         - `mock_glob` : Mocks `Path.glob` to return a list of fake NetCDF files.
-        - `mock_subprocess` : Mocks `subprocess.run` to simulate a failed `ncjoin` execution.
+        - `mock_subprocess` : Mocks `subprocess.Popen` to simulate a failed `ncjoin` execution.
 
         Assertions
         ----------
@@ -2300,8 +2747,9 @@ class TestProcessingAndExecution:
         mock_glob.return_value = fake_files
 
         # Simulate ncjoin failure
-        mock_subprocess.return_value.returncode = 1  # Non-zero exit code
-        mock_subprocess.return_value.stderr = "ncjoin error message"
+        mock_subprocess.return_value = fake_process(
+            returncode=1, stderr="ncjoin error message"
+        )
 
         # Mock execution handler
         sim._execution_handler = MagicMock()
@@ -2318,11 +2766,178 @@ class TestProcessingAndExecution:
         mock_subprocess.assert_called_once_with(
             "ncjoin ocean_his.20240101000000.*.nc",
             cwd=output_dir,
-            capture_output=True,
-            text=True,
-            shell=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    @patch("cstar.roms.ROMSSimulation.persist")
+    @patch("subprocess.Popen")
+    def test_post_run_compresses_netcdf_files(
+        self,
+        mock_subprocess,
+        mock_persist,
+        fake_romssimulation,
+        global_netcdf_file,
+        max_workers,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        """Tests that `post_run(compression=...)` joins and compresses output files.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `global_netcdf_file` : A global file, partitioned into the output tiles.
+        - `mock_subprocess` : Mocks `subprocess.Popen` to check `ncjoin` is not run.
+
+        Assertions
+        ----------
+        - Each joined file is identical to the file that was partitioned, and
+          compressed.
+        - The tiles are deleted, rather than moved to `PARTITIONED`.
+        - The overall compression ratio and throughput are logged.
+        - The output catalogue lists the joined files.
+        """
+        sim = fake_romssimulation
+        sim.discretization = ROMSDiscretization(time_step=60, n_procs_x=2, n_procs_y=2)
+        sim._execution_handler = MagicMock()
+        sim._execution_handler.status = ExecutionStatus.COMPLETED
+        tiles = write_partitioned_output(
+            sim, global_netcdf_file, "ocean_his.20240101000000"
+        ) + write_partitioned_output(
+            sim, global_netcdf_file, "ocean_rst.20240101000000"
+        )
+        caplog.set_level(logging.INFO, logger=sim.log.name)
+
+        sim.post_run(compression=NetCDFCompression(), max_workers=max_workers)
+
+        mock_subprocess.assert_not_called()
+        output_dir = sim.directory / "output"
+        for stream in ("his", "rst"):
+            joined = output_dir / f"ocean_{stream}.20240101000000.nc"
+            with (
+                xr.open_dataset(joined) as actual,
+                xr.open_dataset(global_netcdf_file) as expected,
+            ):
+                xr.testing.assert_identical(actual, expected)
+            with netCDF4.Dataset(joined) as ds:
+                assert ds.variables["zeta"].filters()["zlib"]
+        assert not any(tile.exists() for tile in tiles)
+        assert not (output_dir / "PARTITIONED").exists()
+        assert "Joined and compressed 2 files" in caplog.text
+        assert sim.output_catalog.dates("rst") == [datetime(2024, 1, 1)]
+        mock_persist.assert_called_once()
+
+    @patch("cstar.roms.ROMSSimulation.persist")
+    def test_post_run_keeps_tiles_if_compression_fails(
+        self, mock_persist, fake_romssimulation, global_netcdf_file
+    ):
+        """Tests that tiles are kept if their compressed file could not be verified.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `global_netcdf_file` : A global file, partitioned into the output tiles.
+        - Mocks `_verify_checksums` to fail for the history file only.
+
+        Assertions
+        ----------
+        - A `RuntimeError` naming the file that failed is raised.
+        - The tiles of the file that failed are kept, and it is not written.
+        - The file that was verified is kept, and its tiles deleted.
+        """
+        sim = fake_romssimulation
+        sim.discretization = ROMSDiscretization(time_step=60, n_procs_x=2, n_procs_y=2)
+        sim._execution_handler = MagicMock()
+        sim._execution_handler.status = ExecutionStatus.COMPLETED
+        his_tiles = write_partitioned_output(
+            sim, global_netcdf_file, "ocean_his.20240101000000"
+        )
+        rst_tiles = write_partitioned_output(
+            sim, global_netcdf_file, "ocean_rst.20240101000000"
+        )
+
+        def fail_for_his(path, *args):
+            if "_his" in path.name:
+                raise ValueError(f"{path} failed verification")
+
+        with (
+            patch("cstar.roms.tiling._verify_checksums", side_effect=fail_for_his),
+            pytest.raises(
+                RuntimeError,
+                match="Could not join ocean_his.20240101000000.nc: their tiles",
+            ),
+        ):
+            sim.post_run(compression=NetCDFCompression(), max_workers=1)
+
+        output_dir = sim.directory / "output"
+        assert all(tile.exists() for tile in his_tiles)
+        assert not (output_dir / "ocean_his.20240101000000.nc").exists()
+        assert not any(tile.exists() for tile in rst_tiles)
+        assert (output_dir / "ocean_rst.20240101000000.nc").exists()
+
+    def test_export_zarr(self, fake_romssimulation, global_netcdf_file, tmp_path):
+        """Tests that `export_zarr` writes every file of a stream to one Zarr store.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `global_netcdf_file` : A global file, partitioned into the first output
+          file, and with later times written as the second, joined output file.
+
+        Assertions
+        ----------
+        - The records of both files are written, in time order.
+        - A stream without output raises a `FileNotFoundError`.
+        """
+        sim = fake_romssimulation
+        sim.discretization = ROMSDiscretization(time_step=60, n_procs_x=2, n_procs_y=2)
+        write_partitioned_output(sim, global_netcdf_file, "ocean_his.20240101000000")
+        with xr.open_dataset(global_netcdf_file) as ds:
+            ds.assign_coords(time=ds["time"] + 4).to_netcdf(
+                sim.directory / "output" / "ocean_his.20240105000000.nc"
+            )
+        store = tmp_path / "ocean_his.zarr"
+
+        assert sim.export_zarr(store) == 8
+
+        with xr.open_zarr(store) as ds:
+            np.testing.assert_array_equal(ds["time"], np.arange(8.0))
+            assert ds["zeta"].encoding["chunks"] == (1, 10, 14)
+        with pytest.raises(FileNotFoundError, match="No 'avg' output"):
+            sim.export_zarr(store, stream="avg")
+
+    def test_extract(self, fake_romssimulation, global_netcdf_file):
+        """Tests that `extract` reads a region from joined or partitioned output.
+
+        Mocks & Fixtures
+        ----------------
+        - `fake_romssimulation` : Provides a pre-configured `ROMSSimulation` instance.
+        - `global_netcdf_file` : A global file, partitioned into the first output
+          file, and with doubled values written as the second, joined output file.
+
+        Assertions
+        ----------
+        - By default, the region is extracted from the latest file.
+        - A file is chosen by the date of its first record, and its tiles read
+          without joining them.
+        - A date without output raises a `FileNotFoundError`.
+        """
+        sim = fake_romssimulation
+        sim.discretization = ROMSDiscretization(time_step=60, n_procs_x=2, n_procs_y=2)
+        write_partitioned_output(sim, global_netcdf_file, "ocean_his.20240101000000")
+        with xr.open_dataset(global_netcdf_file) as ds:
+            expected = ds[["zeta"]].isel(time=-1, eta_rho=slice(2, 7))
+            (2 * ds).to_netcdf(sim.directory / "output" / "ocean_his.20240105000000.nc")
+        indexers = {"time": -1, "eta_rho": slice(2, 7)}
+
+        latest = sim.extract(["zeta"], indexers)
+        first = sim.extract(["zeta"], indexers, date="2024-01-01")
+
+        xr.testing.assert_identical(first, expected)
+        np.testing.assert_array_equal(latest["zeta"], 2 * expected["zeta"])
+        with pytest.raises(FileNotFoundError, match="starting at 2024-01-02"):
+            sim.extract(["zeta"], date="2024-01-02")
+
 
 class TestROMSSimulationRestart:
     """Tests for the `restart` method of `ROMSSimulation`.
@@ -2336,36 +2951,41 @@ class TestROMSSimulationRestart:
     -----
     - `test_restart` : Verifies that `restart` creates a new `ROMSSimulation` instance
       and correctly sets the initial conditions from the restart file.
+    - `test_restart_resets_input_dataset_state` : Ensures the input datasets of the
+      new instance are copies with fresh local state, leaving the original intact.
     - `test_restart_raises_if_no_restart_files` : Ensures `restart` raises a
       `FileNotFoundError` when no restart files matching the expected pattern are found.
     - `test_restart_raises_if_multiple_restarts_found` : Confirms `restart` raises a
       `ValueError` if multiple restart files are found, preventing ambiguity.
+    - `test_restart_from_restart_date` : Ensures a simulation can be continued from a
+      restart file written before its end date.
+    - `test_restart_date_outside_simulation` : Ensures restart dates outside the
+      simulation are rejected.
+    - `test_latest_valid_restart` : Ensures the latest readable restart file is
+      found, skipping files left incomplete by a failed run.
+    - `test_latest_valid_restart_joins_tiles` : Ensures the latest restart is joined
+      if it is still partitioned, and only if every tile is present.
     """
 
-    @patch.object(Path, "glob")  # Mock file search
-    @patch.object(Path, "exists", return_value=True)
-    def test_restart(self, mock_exists, mock_glob, fake_romssimulation):
+    def test_restart(self, fake_romssimulation):
         """Test that `restart` creates a new `ROMSSimulation` instance with updated
         initial conditions.
 
         This test ensures that when calling `restart` with a new end date, the method:
         - Creates a new `ROMSSimulation` instance.
-        - Searches for the appropriate restart file in the output directory.
+        - Searches for the appropriate restart file in the output catalogue.
         - Assigns the found restart file as the new instance’s initial conditions.
 
         Mocks & Fixtures
         ----------------
-        mock_exists : Mock
-            Mocks `Path.exists` to return `True`, ensuring that the output directory is
-            considered present.
-        mock_glob : Mock
-            Mocks `Path.glob` to return a list containing the expected restart file.
         fake_romssimulation : Fixture
             Provides an instance of `ROMSSimulation` and a temporary directory for testing.
 
         Assertions
         ----------
-        - The method searches for a restart file matching the expected timestamp format.
+        - The restart file matching the expected timestamp is used, among other
+          outputs and partitioned restart files.
+        - The output directory is catalogued for later restarts.
         - A new `ROMSSimulation` instance is returned.
         - The new instance's `initial_conditions` attribute is correctly assigned the
           detected restart file.
@@ -2374,23 +2994,63 @@ class TestROMSSimulationRestart:
         sim = fake_romssimulation
         new_end_date = datetime(2026, 6, 1)
 
-        # Mock restart file found
-        restart_file = sim.directory / "output/restart_rst.20251231000000.nc"
-        mock_glob.return_value = [restart_file]
+        restart_file = touch_outputs(
+            sim,
+            "restart_rst.20251231000000.nc",
+            "restart_rst.20251231000000.0.nc",
+            "restart_his.20251231000000.nc",
+            "restart_rst.20251201000000.nc",
+        )[0]
 
         # Call method
         new_sim = sim.restart(new_end_date=new_end_date)
 
         # Verify restart logic
-        mock_glob.assert_called_once_with("*_rst.20251231000000.nc")
+        assert (sim.directory / "output" / OutputCatalog.CATALOG_FILE).exists()
         assert isinstance(new_sim.initial_conditions, ROMSInitialConditions)
         assert new_sim.initial_conditions.source.location == str(restart_file.resolve())
 
-    @patch.object(Path, "glob")  # Mock file search
-    @patch.object(Path, "exists", return_value=True)
-    def test_restart_raises_if_no_restart_files(
-        self, mock_exists, mock_glob, fake_romssimulation
-    ):
+    def test_restart_resets_input_dataset_state(self, fake_romssimulation):
+        """Test that `restart` gives the new instance's input datasets fresh state.
+
+        This test ensures that the input datasets of the restarted simulation share
+        their (immutable) source with the original datasets, but have their working
+        path, caches, and partitioning reset without affecting the original.
+
+        Mocks & Fixtures
+        ----------------
+        fake_romssimulation : Fixture
+            Provides an instance of `ROMSSimulation` and a temporary directory for testing.
+
+        Assertions
+        ----------
+        - The new model grid is a distinct object sharing the original `DataSource`.
+        - The new model grid has no working path, caches, or partitioning.
+        - The original model grid retains its state.
+        - The new simulation has no execution handler.
+        """
+        sim = fake_romssimulation
+        touch_outputs(sim, "restart_rst.20251231000000.nc")
+        grid = sim.model_grid
+        grid.working_path = sim.directory / "input/grid.nc"
+        grid._local_file_stat_cache = {grid.working_path: MagicMock()}
+        grid.partitioning = MagicMock()
+        sim._execution_handler = MagicMock()
+
+        new_sim = sim.restart(new_end_date=datetime(2026, 6, 1))
+        new_grid = new_sim.model_grid
+
+        assert new_grid is not grid
+        assert new_grid.source is grid.source
+        assert new_grid.working_path is None
+        assert new_grid._local_file_stat_cache == {}
+        assert new_grid.partitioning is None
+        assert grid.working_path == sim.directory / "input/grid.nc"
+        assert grid.working_path in grid._local_file_stat_cache
+        assert grid.partitioning is not None
+        assert new_sim._execution_handler is None
+
+    def test_restart_raises_if_no_restart_files(self, fake_romssimulation):
         """Test that `restart` raises a `FileNotFoundError` if no restart files are
         found.
 
@@ -2399,37 +3059,34 @@ class TestROMSSimulationRestart:
 
         Mocks & Fixtures
         ----------------
-        mock_exists : Mock
-            Mocks `Path.exists` to return `True`, ensuring the output directory exists.
-        mock_glob : Mock
-            Mocks `Path.glob` to return an empty list, simulating no restart files found.
         fake_romssimulation : Fixture
             Provides an instance of `ROMSSimulation` and a temporary directory for testing.
 
         Assertions
         ----------
-        - The method searches for restart files with the expected filename pattern.
         - A `FileNotFoundError` is raised if no matching restart files are found.
+        - The error names the nearest restart date available, if any.
         """
         # Setup mock simulation
         sim = fake_romssimulation
         new_end_date = datetime(2026, 6, 1)
 
-        # Mock restart file found
-        mock_glob.return_value = []
-
-        # Call method
         with pytest.raises(
-            FileNotFoundError, match=f"No files in {sim.directory / 'output'} match"
+            FileNotFoundError,
+            match=rf"No restart file in {sim.directory / 'output'} for 20251231000000 \(",
         ):
             sim.restart(new_end_date=new_end_date)
 
-        mock_glob.assert_called_once_with("*_rst.20251231000000.nc")
+        # Files written since the catalogue was last updated are found too
+        touch_outputs(
+            sim, "ROMSTest_rst.20251130000000.nc", "ROMSTest_rst.20251225000000.nc"
+        )
+        with pytest.raises(
+            FileNotFoundError, match="nearest restart is at 2025-12-25 00:00:00"
+        ):
+            sim.restart(new_end_date=new_end_date)
 
-    @patch.object(Path, "glob")
-    def test_restart_raises_if_multiple_restarts_found(
-        self, mock_glob, fake_romssimulation
-    ):
+    def test_restart_raises_if_multiple_restarts_found(self, fake_romssimulation):
         """Test that `restart` raises a `ValueError` if multiple restart files are
         found.
 
@@ -2438,27 +3095,159 @@ class TestROMSSimulationRestart:
 
         Mocks & Fixtures
         ----------------
-        mock_glob : Mock
-            Mocks `Path.glob` to return multiple restart files, simulating an ambiguous case.
         fake_romssimulation : Fixture
             Provides an instance of `ROMSSimulation` and a temporary directory for testing.
 
         Assertions
         ----------
-        - The method searches for restart files with the expected filename pattern.
         - A `ValueError` is raised if multiple restart files are found.
         """
         sim = fake_romssimulation
-        restart_dir = sim.directory / "output"
-        new_end_date = datetime(2025, 6, 1)
+        new_end_date = datetime(2026, 6, 1)
 
-        # Fake multiple unique restart files
-        mock_glob.return_value = [
-            restart_dir / "restart_rst.20250601000000.nc",
-            restart_dir / "ocean_rst.20250601000000.nc",
-        ]
+        # Multiple unique restart files
+        touch_outputs(
+            sim, "restart_rst.20251231000000.nc", "ocean_rst.20251231000000.nc"
+        )
 
         with pytest.raises(
             ValueError, match="Found multiple distinct restart files corresponding to"
         ):
             sim.restart(new_end_date=new_end_date)
+
+    def test_restart_from_restart_date(self, fake_romssimulation):
+        """Test that `restart` continues from `restart_date` if given.
+
+        Mocks & Fixtures
+        ----------------
+        fake_romssimulation : Fixture
+            Provides an instance of `ROMSSimulation` and a temporary directory for testing.
+
+        Assertions
+        ----------
+        - The restart file written at `restart_date` is used.
+        - The new simulation starts at `restart_date` and ends at `new_end_date`.
+        """
+        sim = fake_romssimulation
+        (restart_file,) = touch_outputs(sim, "ROMSTest_rst.20250601000000.nc")
+
+        new_sim = sim.restart(new_end_date=sim.end_date, restart_date="2025-06-01")
+
+        assert new_sim.start_date == datetime(2025, 6, 1)
+        assert new_sim.end_date == sim.end_date
+        assert new_sim.initial_conditions.source.location == str(restart_file.resolve())
+        assert new_sim.directory == sim.directory / "RESTART_20250601_000000"
+
+    @pytest.mark.parametrize("restart_date", ["2025-01-01", "2026-01-01"])
+    def test_restart_date_outside_simulation(self, fake_romssimulation, restart_date):
+        """Test that `restart` rejects restart dates outside the simulation.
+
+        Mocks & Fixtures
+        ----------------
+        fake_romssimulation : Fixture
+            Provides an instance of `ROMSSimulation` and a temporary directory for testing.
+
+        Assertions
+        ----------
+        - A `ValueError` is raised for dates at its start or after its end.
+        """
+        with pytest.raises(ValueError, match="must be after start_date"):
+            fake_romssimulation.restart(
+                new_end_date="2026-06-01", restart_date=restart_date
+            )
+
+    def test_latest_valid_restart(self, fake_romssimulation):
+        """Test that `_latest_valid_restart` finds the latest readable restart file.
+
+        Mocks & Fixtures
+        ----------------
+        fake_romssimulation : Fixture
+            Provides an instance of `ROMSSimulation` and a temporary directory for testing.
+
+        Assertions
+        ----------
+        - A truncated restart file and one without records are skipped.
+        - Restart files at the start or end of the simulation, and other outputs,
+          are ignored.
+        - The latest valid restart date is returned, or None if there is none.
+        """
+        sim = fake_romssimulation
+        output_dir = sim.directory / "output"
+        output_dir.mkdir()
+        assert sim._latest_valid_restart() is None
+
+        write_restart(output_dir / "ROMSTest_rst.20250101000000.nc")
+        write_restart(output_dir / "ROMSTest_rst.20250301000000.nc")
+        write_restart(output_dir / "ROMSTest_rst.20250401000000.nc", n_records=0)
+        write_restart(output_dir / "ROMSTest_his.20250501000000.nc")
+        write_restart(output_dir / "ROMSTest_rst.20251231000000.nc")
+        (output_dir / "ROMSTest_rst.20250601000000.nc").write_bytes(b"CDF\x01")
+
+        assert sim._latest_valid_restart() == datetime(2025, 3, 1)
+
+    @patch("cstar.roms.simulation._run_cmd")
+    def test_latest_valid_restart_joins_tiles(self, mock_run_cmd, fake_romssimulation):
+        """Test that `_latest_valid_restart` joins a partitioned restart.
+
+        Mocks & Fixtures
+        ----------------
+        mock_run_cmd : Mock
+            Mocks `_run_cmd` to check the call to `ncjoin`.
+        fake_romssimulation : Fixture
+            Provides an instance of `ROMSSimulation` and a temporary directory for testing.
+
+        Assertions
+        ----------
+        - A restart missing one of its 6 tiles is skipped.
+        - The tiles of the latest complete restart are joined, then moved to the
+          `PARTITIONED` directory.
+        """
+        sim = fake_romssimulation
+        output_dir = sim.directory / "output"
+        output_dir.mkdir()
+        for i in range(6):
+            write_restart(output_dir / f"ROMSTest_rst.20250201000000.{i}.nc")
+            if i < 5:
+                write_restart(output_dir / f"ROMSTest_rst.20250301000000.{i}.nc")
+
+        assert sim._latest_valid_restart() == datetime(2025, 2, 1)
+
+        mock_run_cmd.assert_called_once_with(
+            "ncjoin ROMSTest_rst.20250201000000.*.nc",
+            cwd=output_dir,
+            raise_on_error=True,
+        )
+        assert len(list((output_dir / "PARTITIONED").glob("*.nc"))) == 6
+        assert len(list(output_dir.glob("ROMSTest_rst.20250301000000.*.nc"))) == 5
+
+
+def touch_outputs(sim: ROMSSimulation, *names: str) -> list[Path]:
+    """Create empty output files in the output directory of `sim`."""
+    output_dir = sim.directory / "output"
+    output_dir.mkdir(exist_ok=True)
+    paths = [output_dir / name for name in names]
+    for path in paths:
+        path.touch()
+    return paths
+
+
+def write_partitioned_output(
+    sim: ROMSSimulation, source: Path, stem: str
+) -> list[Path]:
+    """Partition `source` into tiles named `stem.<tile>.nc` in the output directory of
+    `sim`, as ROMS would write them.
+    """
+    output_dir = sim.directory / "output"
+    output_dir.mkdir(exist_ok=True)
+    tiles = partition_netcdf(
+        source, sim.discretization.n_procs_x, sim.discretization.n_procs_y
+    ).files
+    return [tile.rename(output_dir / f"{stem}.{i}.nc") for i, tile in enumerate(tiles)]
+
+
+def write_restart(path: Path, n_records: int = 1) -> None:
+    """Write a minimal restart file holding `n_records` records."""
+    with netCDF4.Dataset(path, "w") as ds:
+        ds.createDimension("time", None)
+        time = ds.createVariable("ocean_time", "f8", ("time",))
+        time[:] = range(n_records)
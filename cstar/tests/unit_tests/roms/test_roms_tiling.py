@@ -0,0 +1,559 @@
+import logging
+import os
+from unittest import mock
+
+import netCDF4
+import pytest
+import roms_tools
+import xarray as xr
+
+from cstar.roms.tiling import (
+    NetCDFCompression,
+    extract_tiles,
+    join_netcdf,
+    open_tiles,
+    partition_netcdf,
+    repartition_netcdf,
+    tile_indexers,
+    tile_paths,
+    write_tile,
+)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+class TestTiling:
+    """Test class for the tile geometry and writing functions in `cstar.roms.tiling`.
+
+    Tests:
+    ------
+    - test_tile_indexers_match_roms_tools:
+        Ensures the slices computed from dimension sizes alone match the tiles
+        written by `roms_tools.partition_netcdf`
+    - test_tile_indexers_uneven:
+        Ensures a grid that cannot be divided evenly raises a ValueError
+    - test_tile_paths:
+        Ensures tiles are named as by `roms_tools.partition_netcdf`
+    """
+
+    @pytest.mark.parametrize("np_xi, np_eta", [(1, 1), (2, 2), (3, 2)])
+    def test_tile_indexers_match_roms_tools(
+        self, global_netcdf_file, tmp_path, np_xi, np_eta
+    ):
+        """Ensures tiles written from `tile_indexers` are identical to those of
+        `roms_tools.partition_netcdf`.
+
+        Asserts
+        -------
+        - Each tile written by `write_tile` is identical, including attributes
+        """
+        expected = roms_tools.partition_netcdf(
+            global_netcdf_file, np_xi=np_xi, np_eta=np_eta, output_dir=tmp_path / "ref"
+        )
+        with xr.open_dataset(global_netcdf_file) as ds:
+            indexers = tile_indexers(ds.sizes, np_xi=np_xi, np_eta=np_eta)
+
+        paths = tile_paths(tmp_path / "grid.nc", np_xi * np_eta)
+        assert [p.name for p in paths] == [p.name for p in expected]
+        for path, expected_path, tile in zip(paths, expected, indexers):
+            write_tile(global_netcdf_file, path, tile)
+            with xr.open_dataset(path) as actual, xr.open_dataset(expected_path) as ref:
+                xr.testing.assert_identical(actual, ref)
+
+    def test_tile_indexers_uneven(self):
+        """Ensures a ValueError is raised for a grid that cannot be divided evenly."""
+        with pytest.raises(ValueError, match="cannot be evenly divided"):
+            tile_indexers({"eta_rho": 10, "xi_rho": 14}, np_xi=5, np_eta=2)
+
+    def test_tile_paths(self, tmp_path):
+        """Ensures tile numbers are zero-padded to the width of the largest."""
+        paths = tile_paths(tmp_path / "grid.nc", 12)
+        assert paths[0] == tmp_path / "grid.00.nc"
+        assert paths[-1] == tmp_path / "grid.11.nc"
+
+
+class TestPartitionNetcdf:
+    """Test class for `partition_netcdf`, the memory-bounded streaming partitioner.
+
+    Tests:
+    ------
+    - test_matches_roms_tools:
+        Ensures the tiles are identical to those of `roms_tools.partition_netcdf`,
+        whatever the memory bound
+    - test_memory_is_bounded:
+        Ensures the largest slab read respects the memory bound, and is reported
+    - test_preserves_encoding:
+        Ensures the unlimited dimension and compression of the source are kept
+    - test_partition_uses_streaming_partitioner:
+        Ensures `ROMSInputDataset.partition` uses it when given a memory bound
+    """
+
+    @pytest.mark.parametrize("max_memory", ["1G", 1000, 1])
+    def test_matches_roms_tools(self, global_netcdf_file, tmp_path, max_memory):
+        """Ensures the tiles are identical to those of `roms_tools.partition_netcdf`.
+
+        Asserts
+        -------
+        - Each tile is identical, including attributes, for a memory bound larger
+          than the file, smaller than a variable, and smaller than a single record
+        """
+        expected = roms_tools.partition_netcdf(
+            global_netcdf_file, np_xi=3, np_eta=2, output_dir=tmp_path / "ref"
+        )
+        result = partition_netcdf(global_netcdf_file, 3, 2, max_memory=max_memory)
+
+        assert [f.name for f in result.files] == [f.name for f in expected]
+        for path, expected_path in zip(result.files, expected):
+            with xr.open_dataset(path) as actual, xr.open_dataset(expected_path) as ref:
+                xr.testing.assert_identical(actual, ref)
+
+    def test_memory_is_bounded(self, global_netcdf_file):
+        """Ensures the largest slab read respects the memory bound, and is reported.
+
+        Asserts
+        -------
+        - With a bound of two records of the largest variable, no more is read at
+          once, and every value is read exactly once
+        """
+        record_bytes = 10 * 14 * 8  # One time record of "zeta"
+        result = partition_netcdf(global_netcdf_file, 2, 2, max_memory=2 * record_bytes)
+
+        assert result.max_memory == 2 * record_bytes
+        assert result.peak_memory == 2 * record_bytes
+        with xr.open_dataset(global_netcdf_file) as ds:
+            assert result.bytes_read == sum(v.nbytes for v in ds.variables.values())
+
+    def test_preserves_encoding(self, global_netcdf_file, tmp_path):
+        """Ensures the unlimited dimension and compression of the source are kept."""
+        source = tmp_path / "bry.nc"
+        with xr.open_dataset(global_netcdf_file) as ds:
+            ds.to_netcdf(
+                source, unlimited_dims=["time"], encoding={"zeta": {"zlib": True}}
+            )
+
+        result = partition_netcdf(source, 2, 2, max_memory="1K")
+
+        with netCDF4.Dataset(result.files[0]) as tile:
+            assert tile.dimensions["time"].isunlimited()
+            assert tile.variables["zeta"].filters()["zlib"]
+            assert not tile.variables["h"].filters()["zlib"]
+
+    def test_partition_uses_streaming_partitioner(
+        self, global_netcdf_file, fake_romsinputdataset_netcdf_local
+    ):
+        """Ensures `ROMSInputDataset.partition` uses it when given a memory bound."""
+        dataset = fake_romsinputdataset_netcdf_local
+        dataset.working_path = global_netcdf_file
+        with (
+            mock.patch.object(
+                type(dataset),
+                "exists_locally",
+                new_callable=mock.PropertyMock,
+                return_value=True,
+            ),
+            mock.patch(
+                "cstar.roms.input_dataset.roms_tools.partition_netcdf"
+            ) as mock_roms_tools_partition,
+        ):
+            dataset.partition(np_xi=2, np_eta=2, max_memory="1M")
+
+        mock_roms_tools_partition.assert_not_called()
+        assert [f.name for f in dataset.partitioning] == [
+            f"grid.{i}.nc" for i in range(4)
+        ]
+        assert all(f.exists() for f in dataset.partitioning)
+
+
+class TestRepartitionNetcdf:
+    """Test class for `repartition_netcdf`, which repartitions tiles directly.
+
+    Tests:
+    ------
+    - test_matches_partitioning_global_file:
+        Ensures repartitioned tiles are identical to those partitioned from the
+        global file, for finer, coarser and reshaped layouts
+    - test_reads_each_value_once:
+        Ensures each existing tile is read once, within the memory bound
+    - test_raises_on_mismatched_tiles:
+        Ensures tiles not matching the stated layout are rejected
+    - test_partition_repartitions_partitioned_source:
+        Ensures `ROMSInputDataset.partition` repartitions files fetched from a
+        partitioned source in place
+    """
+
+    @pytest.mark.parametrize("np_xi, np_eta", [(6, 4), (1, 1), (3, 2), (2, 1)])
+    def test_matches_partitioning_global_file(
+        self, global_netcdf_file, tmp_path, np_xi, np_eta
+    ):
+        """Ensures repartitioned tiles are identical to those partitioned from the
+        global file.
+
+        Asserts
+        -------
+        - Repartitioning (2,2) tiles gives tiles identical to those of
+          `roms_tools.partition_netcdf` for the new layout
+        """
+        tiles = partition_netcdf(global_netcdf_file, 2, 2).files
+        expected = roms_tools.partition_netcdf(
+            global_netcdf_file, np_xi=np_xi, np_eta=np_eta, output_dir=tmp_path / "ref"
+        )
+
+        result = repartition_netcdf(
+            tiles, 2, 2, np_xi, np_eta, output=tmp_path / "grid.nc", max_memory=200
+        )
+
+        assert [f.name for f in result.files] == [f.name for f in expected]
+        for path, expected_path in zip(result.files, expected):
+            with xr.open_dataset(path) as actual, xr.open_dataset(expected_path) as ref:
+                xr.testing.assert_identical(actual, ref)
+
+    def test_reads_each_value_once(self, global_netcdf_file, tmp_path):
+        """Ensures each existing tile is read once, within the memory bound."""
+        tiles = partition_netcdf(global_netcdf_file, 2, 2).files
+        result = repartition_netcdf(
+            tiles, 2, 2, 3, 2, output=tmp_path / "grid.nc", max_memory=400
+        )
+
+        tile_bytes = 0
+        for i, tile in enumerate(tiles):
+            with xr.open_dataset(tile) as ds:
+                # Variables without split dimensions are only read from one tile
+                tile_bytes += sum(
+                    v.nbytes
+                    for v in ds.variables.values()
+                    if (i == 0) or ({"eta_rho", "eta_v"} & set(v.dims))
+                )
+        assert result.bytes_read == tile_bytes
+        assert result.peak_memory <= 400
+
+    def test_raises_on_mismatched_tiles(self, global_netcdf_file, tmp_path):
+        """Ensures tiles not matching the stated layout are rejected."""
+        tiles = partition_netcdf(global_netcdf_file, 3, 2).files
+        with pytest.raises(ValueError, match="Expected 4 tiles"):
+            repartition_netcdf(tiles, 2, 2, 1, 1, output=tmp_path / "grid.nc")
+        with pytest.raises(ValueError, match="cannot be evenly divided"):
+            repartition_netcdf(tiles, 2, 3, 1, 1, output=tmp_path / "grid.nc")
+        # Tiles out of order: the global sizes add up, but the tiles do not fit
+        swapped = [tiles[1], tiles[0], *tiles[2:]]
+        with pytest.raises(ValueError, match="does not match a \\(3,2\\)"):
+            repartition_netcdf(swapped, 3, 2, 1, 1, output=tmp_path / "grid.nc")
+
+    def test_partition_repartitions_partitioned_source(
+        self, global_netcdf_file, tmp_path, fake_romsinputdataset_netcdf_local, caplog
+    ):
+        """Ensures `ROMSInputDataset.partition` repartitions files fetched from a
+        partitioned source in place.
+
+        Asserts
+        -------
+        - The fetched tiles are not replaced unless `overwrite_existing_files` is set
+        - The old tiles are replaced by the new ones, which are tracked by the
+          dataset's partitioning and working path
+        - A virtual partitioning is not possible, and is replaced with a warning
+        - The global file is not read
+        """
+        local_dir = tmp_path / "input"
+        local_dir.mkdir()
+        tiles = [
+            f.rename(local_dir / f.name)
+            for f in partition_netcdf(global_netcdf_file, 2, 2).files
+        ]
+        dataset = fake_romsinputdataset_netcdf_local
+        dataset.source_np_xi, dataset.source_np_eta = 2, 2
+        dataset._update_partitioning_attribute(
+            new_np_xi=2, new_np_eta=2, parted_files=tiles
+        )
+        dataset.working_path = tiles
+        global_netcdf_file.unlink()
+
+        with pytest.raises(FileExistsError, match="overwrite_existing_files=True"):
+            dataset.partition(np_xi=3, np_eta=2)
+        assert sorted(local_dir.iterdir()) == tiles
+
+        dataset.partition(
+            np_xi=3, np_eta=2, overwrite_existing_files=True, virtual=True
+        )
+
+        expected = [local_dir / f"grid.{i}.nc" for i in range(6)]
+        assert dataset.partitioning.files == expected
+        assert dataset.working_path == expected
+        assert dataset.exists_locally
+        assert sorted(local_dir.iterdir()) == expected
+        with xr.open_dataset(expected[5]) as tile:
+            assert (tile.sizes["eta_rho"], tile.sizes["xi_rho"]) == (5, 5)
+        assert not dataset.partitioning.is_virtual
+        assert "no global file to partition virtually" in caplog.text
+
+
+class TestJoinNetcdf:
+    """Test class for `join_netcdf`, which joins tiles while compressing them.
+
+    Tests:
+    ------
+    - test_matches_global_file:
+        Ensures the joined file is identical to the file that was partitioned,
+        and is compressed as requested
+    - test_chunking:
+        Ensures variables are chunked by record along unlimited dimensions, and as
+        requested along others
+    - test_reports_compression:
+        Ensures the sizes of the tiles and joined file, and the throughput, are
+        reported
+    - test_failed_verification:
+        Ensures a joined file that fails verification is not kept
+    - test_more_tiles_than_open_files:
+        Ensures more tiles than the process may open at once can be written,
+        repartitioned and joined, counting chunk caches in the memory bound
+    - test_invalid_compression:
+        Ensures unknown compression methods are rejected
+    """
+
+    @pytest.mark.parametrize("method", ["zlib", "zstd"])
+    def test_matches_global_file(self, global_netcdf_file, tmp_path, method):
+        """Ensures the joined file is identical to the file that was partitioned.
+
+        Asserts
+        -------
+        - The joined file holds the same data and attributes as the global file
+        - Every non-scalar variable is compressed with the requested filter
+        """
+        if (method == "zstd") and not netCDF4.__has_zstandard_support__:
+            pytest.skip("NetCDF library built without zstd")
+        tiles = partition_netcdf(global_netcdf_file, 2, 2, max_memory=200).files
+
+        result = join_netcdf(
+            tiles,
+            2,
+            2,
+            tmp_path / "joined.nc",
+            compression=NetCDFCompression(method=method, level=3),
+            max_memory=200,
+        )
+
+        assert result.output == tmp_path / "joined.nc"
+        assert result.tiles == tiles
+        with (
+            xr.open_dataset(result.output) as actual,
+            xr.open_dataset(global_netcdf_file) as expected,
+        ):
+            xr.testing.assert_identical(actual, expected)
+        with netCDF4.Dataset(result.output) as ds:
+            filters = ds.variables["zeta"].filters()
+            assert filters[method]
+            assert filters["complevel"] == 3
+            assert filters["shuffle"] == (method == "zlib")
+        assert not (tmp_path / ".joined.nc.partial").exists()
+
+    def test_chunking(self, global_netcdf_file, tmp_path):
+        """Ensures variables are chunked by record along unlimited dimensions, and
+        as requested along others.
+        """
+        source = tmp_path / "his.nc"
+        with xr.open_dataset(global_netcdf_file) as ds:
+            ds.to_netcdf(source, unlimited_dims=["time"])
+        tiles = partition_netcdf(source, 2, 2).files
+
+        result = join_netcdf(
+            tiles,
+            2,
+            2,
+            tmp_path / "joined.nc",
+            compression=NetCDFCompression(chunks={"xi_rho": 7, "eta_rho": 100}),
+        )
+
+        with netCDF4.Dataset(result.output) as ds:
+            assert ds.dimensions["time"].isunlimited()
+            assert ds.variables["zeta"].chunking() == [1, 10, 7]
+            assert ds.variables["u"].chunking() == [1, 10, 13]
+            assert ds.variables["h"].chunking() == [10, 7]
+
+    def test_reports_compression(self, global_netcdf_file, tmp_path):
+        """Ensures the sizes of the tiles and joined file, and the throughput, are
+        reported.
+        """
+        tiles = partition_netcdf(global_netcdf_file, 2, 2).files
+
+        result = join_netcdf(
+            tiles, 2, 2, tmp_path / "joined.nc", compression=NetCDFCompression()
+        )
+
+        assert result.input_bytes == sum(t.stat().st_size for t in tiles)
+        assert result.output_bytes == result.output.stat().st_size
+        assert result.compression_ratio == result.input_bytes / result.output_bytes
+        assert result.throughput > 0
+        assert str(result).startswith("joined.nc: ")
+        assert "in 4 tiles" in str(result)
+
+    def test_failed_verification(self, global_netcdf_file, tmp_path):
+        """Ensures a joined file that fails verification is not kept.
+
+        Asserts
+        -------
+        - A ValueError naming the variable that differs is raised
+        - Neither the joined file nor its partial copy remain
+        """
+        tiles = partition_netcdf(global_netcdf_file, 2, 2).files
+        output = tmp_path / "joined.nc"
+
+        def corrupt(tile_var, slab, origin, indexers):
+            tile_var[...] = 0 if tile_var.name == "zeta" else slab
+
+        with mock.patch("cstar.roms.tiling._write_overlap", side_effect=corrupt):
+            with pytest.raises(ValueError, match="variable zeta sums to 0.0"):
+                join_netcdf(tiles[:1], 1, 1, output)
+
+        assert not output.exists()
+        assert not (tmp_path / ".joined.nc.partial").exists()
+
+    @pytest.mark.skipif(resource is None, reason="Limits open files on Unix only")
+    def test_more_tiles_than_open_files(self, global_netcdf_file, tmp_path):
+        """Ensures more tiles than the process may open at once can be written,
+        repartitioned and joined.
+
+        Asserts
+        -------
+        - With the limit on open files lowered below the number of tiles, the
+          file is partitioned into, repartitioned from and joined from (12,8) tiles
+        - The joined file is identical to the file that was partitioned
+        - The chunk caches of the compressed file count towards the memory bound
+        """
+        (tmp_path / "fine").mkdir()
+        soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        n_open = len(os.listdir("/dev/fd"))
+        resource.setrlimit(
+            resource.RLIMIT_NOFILE, (max(64, 2 * n_open + 16), hard_limit)
+        )
+        try:
+            tiles = partition_netcdf(global_netcdf_file, 12, 8).files
+            repartitioned = repartition_netcdf(
+                tiles, 12, 8, 3, 2, output=tmp_path / "grid.nc"
+            ).files
+            fine = repartition_netcdf(
+                repartitioned, 3, 2, 12, 8, output=tmp_path / "fine" / "grid.nc"
+            ).files
+            result = join_netcdf(
+                fine,
+                12,
+                8,
+                tmp_path / "joined.nc",
+                compression=NetCDFCompression(),
+                max_memory="8K",
+            )
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
+
+        assert len(tiles) == 96
+        with (
+            xr.open_dataset(result.output) as actual,
+            xr.open_dataset(global_netcdf_file) as expected,
+        ):
+            xr.testing.assert_identical(actual, expected)
+        # The joined file caches a chunk of "zeta", which holds all 4 records
+        assert 4 * 10 * 14 * 8 <= result.peak_memory <= 8192
+
+    def test_invalid_compression(self):
+        """Ensures unknown compression methods are rejected."""
+        with pytest.raises(ValueError, match="Unknown compression method 'bzip2'"):
+            NetCDFCompression(method="bzip2")
+
+
+class TestOpenTiles:
+    """Test class for `open_tiles`, which joins tiles lazily.
+
+    Tests:
+    ------
+    - test_matches_global_file:
+        Ensures the dataset assembled from the tiles is identical to the file they
+        partition, and is read lazily
+    """
+
+    @pytest.mark.parametrize("np_xi, np_eta", [(1, 1), (2, 2), (3, 2)])
+    def test_matches_global_file(self, global_netcdf_file, np_xi, np_eta):
+        """Ensures the dataset assembled from the tiles is identical to the file
+        they partition.
+        """
+        tiles = partition_netcdf(global_netcdf_file, np_xi, np_eta).files
+
+        with (
+            open_tiles(tiles, np_xi, np_eta) as actual,
+            xr.open_dataset(global_netcdf_file) as expected,
+        ):
+            assert actual["zeta"].chunks is not None
+            xr.testing.assert_identical(actual.load(), expected)
+
+
+class TestExtractTiles:
+    """Test class for `extract_tiles`, which extracts regions from tiles directly.
+
+    Tests:
+    ------
+    - test_matches_global_file:
+        Ensures extracting everything gives the file the tiles partition
+    - test_region:
+        Ensures a region matches the same selection from the global file, with
+        staggered dimensions derived from rho points, and that only the tiles
+        overlapping it are read
+    - test_invalid_selection:
+        Ensures unknown variables and dimensions, and partitioned dimensions not
+        indexed by contiguous slices, are rejected
+    """
+
+    @pytest.mark.parametrize("np_xi, np_eta", [(1, 1), (3, 2)])
+    def test_matches_global_file(self, global_netcdf_file, np_xi, np_eta):
+        """Ensures extracting everything gives the file the tiles partition."""
+        tiles = partition_netcdf(global_netcdf_file, np_xi, np_eta).files
+
+        with xr.open_dataset(global_netcdf_file) as expected:
+            xr.testing.assert_identical(extract_tiles(tiles, np_xi, np_eta), expected)
+
+    def test_region(self, global_netcdf_file, caplog):
+        """Ensures a region matches the same selection from the global file.
+
+        Asserts
+        -------
+        - Selecting rho points selects the u and v points between them
+        - Integer indices drop their dimension
+        - Tiles neither overlapping the region nor in the first row or column
+          (whose headers give the global grid) are never opened
+        """
+        tiles = partition_netcdf(global_netcdf_file, 3, 2).files
+        # The region lies within tile 0; tiles 4 and 5 hold the rest of the grid
+        tiles[4].unlink()
+        tiles[5].unlink()
+        caplog.set_level(logging.INFO, logger="cstar.roms.tiling")
+
+        actual = extract_tiles(
+            tiles,
+            3,
+            2,
+            variables=["zeta", "u", "v"],
+            indexers={"eta_rho": slice(1, 4), "xi_rho": slice(0, 3), "time": -1},
+        )
+
+        with xr.open_dataset(global_netcdf_file) as ds:
+            expected = ds[["zeta", "u", "v"]].isel(
+                time=-1,
+                eta_rho=slice(1, 4),
+                xi_rho=slice(0, 3),
+                eta_v=slice(1, 3),
+                xi_u=slice(0, 2),
+            )
+        xr.testing.assert_identical(actual, expected)
+        assert "Extracted 4 variables from 1 of 6 tiles" in caplog.text
+
+    def test_invalid_selection(self, global_netcdf_file):
+        """Ensures invalid variables and indexers are rejected."""
+        tiles = partition_netcdf(global_netcdf_file, 2, 2).files
+        with pytest.raises(ValueError, match="has no variable temp"):
+            extract_tiles(tiles, 2, 2, variables=["zeta", "temp"])
+        with pytest.raises(ValueError, match="No dimension s_rho"):
+            extract_tiles(tiles, 2, 2, indexers={"s_rho": -1})
+        with pytest.raises(ValueError, match="xi_rho must be indexed by a slice"):
+            extract_tiles(tiles, 2, 2, indexers={"xi_rho": 3})
+        with pytest.raises(ValueError, match="eta_rho must be indexed by a slice"):
+            extract_tiles(tiles, 2, 2, indexers={"eta_rho": slice(0, 8, 2)})
+        with pytest.raises(ValueError, match="Expected 4 tiles"):
+            extract_tiles(tiles[:3], 2, 2)
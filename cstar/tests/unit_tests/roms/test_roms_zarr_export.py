@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from cstar.roms.tiling import partition_netcdf
+from cstar.roms.zarr_export import export_zarr
+
+
+def write_history(path: Path, first_day: int, n_records: int) -> xr.Dataset:
+    """Write a ROMS-like history file with daily records from `first_day`."""
+    rng = np.random.default_rng(seed=first_day)
+    ds = xr.Dataset(
+        {
+            "h": (("eta_rho", "xi_rho"), np.arange(140.0).reshape(10, 14)),
+            "zeta": (("time", "eta_rho", "xi_rho"), rng.random((n_records, 10, 14))),
+            "u": (("time", "eta_rho", "xi_u"), rng.random((n_records, 10, 13))),
+            "ocean_time": (
+                ("time",),
+                86400.0 * np.arange(first_day, first_day + n_records),
+                {"units": "seconds since 2012-01-01"},
+            ),
+        },
+        attrs={"title": "history"},
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ds.to_netcdf(path, unlimited_dims=["time"])
+    return ds
+
+
+class TestExportZarr:
+    """Tests for `export_zarr`, writing ROMS output to Zarr stores.
+
+    Tests
+    -----
+    - `test_export_partitioned`: Ensures tiles are joined into a store identical
+      to the file they partition, chunked by record by default.
+    - `test_chunks`: Ensures the chunks requested are used, and kept when
+      appending.
+    - `test_append_restart_segments`: Ensures later segments extend the time axis
+      of the store, skipping records it already holds.
+    - `test_tile_count_mismatch`: Ensures tiles not matching the layout are
+      rejected.
+    """
+
+    def test_export_partitioned(self, tmp_path):
+        write_history(tmp_path / "his.nc", 0, 4)
+        tiles = partition_netcdf(tmp_path / "his.nc", 2, 2).files
+        store = tmp_path / "his.zarr"
+
+        assert export_zarr(tiles, store, np_xi=2, np_eta=2) == 4
+
+        with (
+            xr.open_zarr(store) as actual,
+            xr.open_dataset(tmp_path / "his.nc") as expected,
+        ):
+            xr.testing.assert_identical(actual.load(), expected)
+            assert actual["zeta"].encoding["chunks"] == (1, 10, 14)
+            assert actual["h"].encoding["chunks"] == (10, 14)
+
+    def test_chunks(self, tmp_path):
+        write_history(tmp_path / "a/his.nc", 0, 4)
+        write_history(tmp_path / "b/his.nc", 4, 4)
+        store = tmp_path / "his.zarr"
+
+        export_zarr([tmp_path / "a/his.nc"], store, chunks={"time": 3, "xi_rho": 7})
+        export_zarr([tmp_path / "b/his.nc"], store, chunks={"time": 1})
+
+        with xr.open_zarr(store) as ds:
+            assert ds["zeta"].encoding["chunks"] == (3, 10, 7)
+            assert ds["u"].encoding["chunks"] == (3, 10, 13)
+            assert ds.sizes["time"] == 8
+
+    def test_append_restart_segments(self, tmp_path):
+        first = write_history(tmp_path / "a/his.nc", 0, 4)
+        # A restarted run repeats the last record of the previous one
+        second = write_history(tmp_path / "b/his.nc", 3, 5)
+        store = tmp_path / "his.zarr"
+        tiles = partition_netcdf(tmp_path / "b/his.nc", 2, 2).files
+
+        export_zarr([tmp_path / "a/his.nc"], store, chunks={"time": 3})
+        assert export_zarr(tiles, store, np_xi=2, np_eta=2) == 4
+        assert export_zarr([tmp_path / "b/his.nc"], store) == 0
+
+        with xr.open_zarr(store, decode_times=False) as ds:
+            np.testing.assert_array_equal(
+                ds["ocean_time"], 86400.0 * np.arange(8, dtype=float)
+            )
+            np.testing.assert_array_equal(
+                ds["zeta"],
+                np.concatenate([first["zeta"].values, second["zeta"].values[1:]]),
+            )
+
+    def test_tile_count_mismatch(self, tmp_path):
+        write_history(tmp_path / "his.nc", 0, 1)
+        tiles = partition_netcdf(tmp_path / "his.nc", 2, 2).files
+        with pytest.raises(ValueError, match="Expected 6 tiles"):
+            export_zarr(tiles, tmp_path / "his.zarr", np_xi=3, np_eta=2)
+        assert not (tmp_path / "his.zarr").exists()
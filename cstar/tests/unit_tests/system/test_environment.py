@@ -1,5 +1,4 @@
 import os
-import subprocess
 from pathlib import Path
 from unittest.mock import PropertyMock, call, mock_open, patch
 
@@ -7,6 +6,7 @@ import pytest
 
 import cstar
 from cstar.system.environment import CStarEnvironment
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 
 class MockEnvironment(cstar.system.environment.CStarEnvironment):
@@ -38,7 +38,7 @@ class TestSetupEnvironmentFromFiles:
     """
 
     @pytest.mark.parametrize("lmod_syshost", ["perlmutter", "derecho", "expanse"])
-    @patch("cstar.base.utils.subprocess.run")
+    @patch("cstar.base.command.subprocess.Popen")
     @patch.object(
         cstar.system.environment.CStarEnvironment,
         "uses_lmod",
@@ -48,7 +48,7 @@ class TestSetupEnvironmentFromFiles:
     @patch.dict(
         "cstar.system.environment.os.environ", {"LMOD_CMD": "/mock/lmod"}, clear=True
     )
-    def test_load_lmod_modules(self, mock_uses_lmod, mock_run, lmod_syshost):
+    def test_load_lmod_modules(self, mock_uses_lmod, mock_popen, lmod_syshost):
         """Tests that the load_lmod_modules function correctly interacts with Linux
         Envionment Modules.
 
@@ -58,7 +58,7 @@ class TestSetupEnvironmentFromFiles:
 
         Mocks
         -----
-        - mock_run: used to simulate successful calls to subprocess for `module <command> python`
+        - mock_popen: used to simulate successful calls to subprocess for `module <command> python`
         - uses_lmod is mocked to always return True (system uses Linux Environment Modules)
         - the $LMOD_SYSHOST environment variable is mocked to represent the system being tested
         - the $LMOD_CMD environment variable is mocked to represent the system's Lmod command
@@ -71,13 +71,10 @@ class TestSetupEnvironmentFromFiles:
         with patch.dict(
             "cstar.system.environment.os.environ", {"LMOD_SYSHOST": lmod_syshost}
         ):
-            # Simulate subprocess.run returning valid Python code in stdout
-            mock_run.return_value.stdout = (
-                "os.environ['PATH'] = '/mocked/path:' + os.environ.get('PATH', '')"
+            # Simulate each successful subprocess call printing valid Python code
+            mock_popen.side_effect = lambda *args, **kwargs: fake_process(
+                output="os.environ['PATH'] = '/mocked/path:' + os.environ.get('PATH', '')"
             )
-            # # Simulate success for each subprocess call
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stderr = ""
 
             # Instantiate the environment, which should trigger load_lmod_modules
             env = MockEnvironment(system_name=lmod_syshost)
@@ -86,23 +83,13 @@ class TestSetupEnvironmentFromFiles:
 
             # Define expected subprocess calls
             expected_calls = [
-                call(
-                    "/mock/lmod python reset",
-                    capture_output=True,
-                    shell=True,
-                    text=True,
-                ),
+                call("/mock/lmod python reset", **CAPTURED_POPEN_KWARGS),
             ] + [
-                call(
-                    f"/mock/lmod python load {mod}",
-                    capture_output=True,
-                    shell=True,
-                    text=True,
-                )
+                call(f"/mock/lmod python load {mod}", **CAPTURED_POPEN_KWARGS)
                 for mod in expected_modules
             ]
 
-            mock_run.assert_has_calls(expected_calls, any_order=False)
+            mock_popen.assert_has_calls(expected_calls, any_order=False)
 
     def get_expected_lmod_modules(self, env):
         """Retrieves the expected list of Lmod modules for a given system from a .lmod
@@ -365,13 +352,13 @@ class TestExceptions:
 
         Mocks
         -----
-        - subprocess.run: Simulates subprocess calls to avoid real system command execution.
+        - subprocess.Popen: Simulates subprocess calls to avoid real system command execution.
         - CStarEnvironment.uses_lmod: Patched to simulate environments that use or don’t use Lmod.
         - os.environ: Cleared and patched with specific values for test isolation.
         """
         self.subprocess_patcher = patch(
-            "cstar.base.utils.subprocess.run",
-            return_value=subprocess.CompletedProcess(args="module reset", returncode=0),
+            "cstar.base.command.subprocess.Popen",
+            side_effect=lambda *args, **kwargs: fake_process(),
         )
         self.mock_subprocess = self.subprocess_patcher.start()
         self.uses_lmod_patcher = patch.object(
@@ -432,7 +419,7 @@ class TestExceptions:
     @patch.dict(
         "cstar.system.environment.os.environ", {"LMOD_CMD": "/mock/lmod"}, clear=True
     )
-    @patch("cstar.base.utils.subprocess.run")
+    @patch("cstar.base.command.subprocess.Popen")
     def test_load_lmod_modules_raises_runtime_error_on_module_reset_failure(
         self, mock_subprocess
     ):
@@ -446,10 +433,11 @@ class TestExceptions:
         Asserts
         -------
         - Raises RuntimeError with a message indicating failure of the "module reset" command.
-        - subprocess.run is called with the expected command for `module reset`.
+        - subprocess.Popen is called with the expected command for `module reset`.
         """
-        mock_subprocess.return_value.returncode = 1  # Simulate failure
-        mock_subprocess.return_value.stderr = "Module reset error"
+        mock_subprocess.return_value = fake_process(  # Simulate failure
+            returncode=1, stderr="Module reset error"
+        )
 
         with pytest.raises(
             RuntimeError,
@@ -462,7 +450,7 @@ class TestExceptions:
 
         # Verify that subprocess was called with the correct command
         mock_subprocess.assert_called_once_with(
-            "/mock/lmod python reset", shell=True, text=True, capture_output=True
+            "/mock/lmod python reset", **CAPTURED_POPEN_KWARGS
         )
 
     @patch.dict(
@@ -482,17 +470,13 @@ class TestExceptions:
         Asserts
         -------
         - Raises RuntimeError with a message indicating failure of the "module load" command.
-        - subprocess.run is called with the expected commands `reset` and `load`
+        - subprocess.Popen is called with the expected commands `reset` and `load`
         """
-        # Define side effects for subprocess.run
+        # Define side effects for subprocess.Popen
         side_effects = [
-            subprocess.CompletedProcess(
-                args="/mock/lmod python reset", returncode=0, stdout="pass\n"
-            ),  # Successful reset
-            subprocess.CompletedProcess(
-                args="/mock/lmod python load module1",
-                returncode=1,
-                stderr="Module load error",
+            fake_process(output="pass\n"),  # Successful reset
+            fake_process(
+                returncode=1, stderr="Module load error"
             ),  # Failing module1 load
         ]
         self.mock_subprocess.side_effect = side_effects
@@ -1,5 +1,5 @@
 import logging
-from unittest.mock import MagicMock, PropertyMock, patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 
@@ -11,6 +11,7 @@ from cstar.system.scheduler import (
     SlurmQOS,
     SlurmScheduler,
 )
+from cstar.tests.unit_tests.conftest import CAPTURED_POPEN_KWARGS, fake_process
 
 ################################################################################
 
@@ -46,24 +47,24 @@ class TestQueue:
 
     Fixtures
     --------
-    mock_subprocess_run
-        Mocks subprocess.run to simulate system commands without actual execution.
+    mock_subprocess_popen
+        Mocks subprocess.Popen to simulate system commands without actual execution.
     """
 
     @pytest.fixture
-    def mock_subprocess_run(self):
-        """Mock subprocess.run for testing system command execution.
+    def mock_subprocess_popen(self):
+        """Mock subprocess.Popen for testing system command execution.
 
-        This fixture ensures that subprocess.run calls are intercepted,
+        This fixture ensures that subprocess.Popen calls are intercepted,
         allowing tests to simulate their outputs or errors without running
         actual commands.
 
         Yields
         ------
         mock_run : unittest.mock.MagicMock
-            A mock object for subprocess.run.
+            A mock object for subprocess.Popen.
         """
-        with patch("subprocess.run") as mock_run:
+        with patch("subprocess.Popen") as mock_run:
             yield mock_run
 
     def test_queue_initialization(self):
@@ -78,40 +79,36 @@ class TestQueue:
         assert queue.name == "general"
         assert queue.query_name == "specific"
 
-    def test_slurmqos_max_walltime(self, mock_subprocess_run):
+    def test_slurmqos_max_walltime(self, mock_subprocess_popen):
         """Test the max_walltime property of SlurmQOS.
 
         Simulates a successful system command to retrieve the maximum walltime.
         """
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=0, stdout="02:00:00", stderr=""
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="02:00:00", stderr=""
         )
         slurm_qos = SlurmQOS(name="general")
         assert slurm_qos.max_walltime == "02:00:00"
 
-        mock_subprocess_run.assert_called_once_with(
+        mock_subprocess_popen.assert_called_once_with(
             "sacctmgr show qos general format=MaxWall --noheader",
-            shell=True,
-            text=True,
-            capture_output=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
-    def test_slurmpartition_max_walltime(self, mock_subprocess_run):
+    def test_slurmpartition_max_walltime(self, mock_subprocess_popen):
         """Test the max_walltime property of SlurmPartition.
 
         Simulates a successful system command to retrieve the maximum walltime.
         """
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=0, stdout="2-01:00:00", stderr=""
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="2-01:00:00", stderr=""
         )
         slurm_ptn = SlurmPartition(name="general")
         assert slurm_ptn.max_walltime == "49:00:00"
 
-        mock_subprocess_run.assert_called_once_with(
+        mock_subprocess_popen.assert_called_once_with(
             "sinfo -h -o '%l' -p general",
-            shell=True,
-            text=True,
-            capture_output=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
     def test_pbsqueue_initialization(self):
@@ -154,24 +151,24 @@ class TestScheduler:
 
     Fixtures
     --------
-    mock_subprocess_run
-        Mocks subprocess.run to simulate system commands without actual execution.
+    mock_subprocess_popen
+        Mocks subprocess.Popen to simulate system commands without actual execution.
     """
 
     @pytest.fixture
-    def mock_subprocess_run(self):
-        """Mock subprocess.run for testing system command execution.
+    def mock_subprocess_popen(self):
+        """Mock subprocess.Popen for testing system command execution.
 
-        This fixture ensures that subprocess.run calls are intercepted,
+        This fixture ensures that subprocess.Popen calls are intercepted,
         allowing tests to simulate their outputs or errors without running
         actual commands.
 
         Yields
         ------
         mock_run : unittest.mock.MagicMock
-            A mock object for subprocess.run.
+            A mock object for subprocess.Popen.
         """
-        with patch("subprocess.run") as mock_run:
+        with patch("subprocess.Popen") as mock_run:
             yield mock_run
 
     def test_scheduler_initialization(self):
@@ -203,29 +200,29 @@ class TestScheduler:
         with pytest.raises(ValueError, match="not found in list of queues"):
             scheduler.get_queue("nonexistent")
 
-    def test_slurmscheduler_global_max_cpus_per_node_success(self, mock_subprocess_run):
+    def test_slurmscheduler_global_max_cpus_per_node_success(
+        self, mock_subprocess_popen
+    ):
         """Confirm SlurmScheduler queries and sets the maximum CPUs per node
         successfully.
 
-        Uses mock_subprocess_run to simulate a successful system command output.
+        Uses mock_subprocess_popen to simulate a successful system command output.
         """
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=0, stdout="128", stderr=""
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="128", stderr=""
         )
         scheduler = SlurmScheduler(queues=[], primary_queue_name="general")
 
         result = scheduler.global_max_cpus_per_node
         assert result == 128
 
-        mock_subprocess_run.assert_called_once_with(
+        mock_subprocess_popen.assert_called_once_with(
             'scontrol show nodes | grep -o "cpu=[0-9]*" | cut -d= -f2 | sort -nr | head -1',
-            shell=True,
-            text=True,
-            capture_output=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
     def test_slurmscheduler_global_max_cpus_per_node_failure(
-        self, mock_subprocess_run, caplog: pytest.CaptureFixture
+        self, mock_subprocess_popen, caplog: pytest.CaptureFixture
     ):
         """Validate SlurmScheduler handles subprocess failures when querying CPUs.
 
@@ -242,8 +239,8 @@ class TestScheduler:
         """
         caplog.set_level(logging.INFO, logger="cstar.utils.log")
 
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=2, stdout="", stderr="Error querying CPUs"
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=2, output="", stderr="Error querying CPUs"
         )
         scheduler = SlurmScheduler(queues=[], primary_queue_name="general")
 
@@ -255,30 +252,28 @@ class TestScheduler:
         assert "STDERR:\nError querying CPUs" in captured
 
     def test_slurmscheduler_global_max_mem_per_node_gb_success(
-        self, mock_subprocess_run
+        self, mock_subprocess_popen
     ):
         """Confirm SlurmScheduler queries and sets maximum memory per node in GB
         successfully.
 
-        Uses mock_subprocess_run to simulate a successful system command output.
+        Uses mock_subprocess_popen to simulate a successful system command output.
         """
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=0, stdout="131072", stderr=""
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="131072", stderr=""
         )
         scheduler = SlurmScheduler(queues=[], primary_queue_name="general")
 
         result = scheduler.global_max_mem_per_node_gb
         assert result == 128.0  # 131072 MB -> 128 GB
 
-        mock_subprocess_run.assert_called_once_with(
+        mock_subprocess_popen.assert_called_once_with(
             'scontrol show nodes | grep -o "RealMemory=[0-9]*" | cut -d= -f2 | sort -nr | head -1',
-            shell=True,
-            text=True,
-            capture_output=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
     def test_slurmscheduler_global_max_mem_per_node_gb_failure(
-        self, mock_subprocess_run, caplog: pytest.CaptureFixture
+        self, mock_subprocess_popen, caplog: pytest.CaptureFixture
     ):
         """Validate SlurmScheduler handles subprocess failures when querying memory.
 
@@ -295,8 +290,8 @@ class TestScheduler:
         """
         caplog.set_level(logging.DEBUG, logger="cstar.base.utils.log")
 
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=1, stdout="", stderr="Error querying memory"
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=1, output="", stderr="Error querying memory"
         )
         scheduler = SlurmScheduler(queues=[], primary_queue_name="general")
 
@@ -307,28 +302,26 @@ class TestScheduler:
         assert "Error querying node property." in captured
         assert "STDERR:\nError querying memory" in captured
 
-    def test_pbsscheduler_global_max_cpus_per_node_success(self, mock_subprocess_run):
+    def test_pbsscheduler_global_max_cpus_per_node_success(self, mock_subprocess_popen):
         """Confirm PBSScheduler queries and sets the maximum CPUs per node successfully.
 
-        Uses mock_subprocess_run to simulate a successful system command output.
+        Uses mock_subprocess_popen to simulate a successful system command output.
         """
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=0, stdout="128", stderr=""
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=0, output="128", stderr=""
         )
         scheduler = PBSScheduler(queues=[], primary_queue_name="batch")
 
         result = scheduler.global_max_cpus_per_node
         assert result == 128
 
-        mock_subprocess_run.assert_called_once_with(
+        mock_subprocess_popen.assert_called_once_with(
             'pbsnodes -a | grep "resources_available.ncpus" | cut -d= -f2 | sort -nr | head -1',
-            shell=True,
-            text=True,
-            capture_output=True,
+            **CAPTURED_POPEN_KWARGS,
         )
 
     def test_pbsscheduler_global_max_cpus_per_node_failure(
-        self, mock_subprocess_run, caplog: pytest.CaptureFixture
+        self, mock_subprocess_popen, caplog: pytest.CaptureFixture
     ):
         """Validate PBSScheduler handles subprocess failures when querying CPUs.
 
@@ -338,8 +331,8 @@ class TestScheduler:
         ------------------
         caplog (pytest.LogCaptureFixture)
             captures log messages
-        mock_subprocess_run (unittest.mock.MagicMock)
-            Mocks the subprocess.run method
+        mock_subprocess_popen (unittest.mock.MagicMock)
+            Mocks the subprocess.Popen method
 
         Asserts
         -------
@@ -347,8 +340,8 @@ class TestScheduler:
         """
         caplog.set_level(logging.DEBUG, logger="cstar.base.utils.log")
 
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=1, stdout="", stderr="Error querying CPUs"
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=1, output="", stderr="Error querying CPUs"
         )
         scheduler = PBSScheduler(queues=[], primary_queue_name="batch")
 
@@ -360,7 +353,7 @@ class TestScheduler:
         assert "STDERR:\nError querying CPUs" in captured
 
     def test_pbsscheduler_global_max_mem_per_node_gb_failure(
-        self, mock_subprocess_run, caplog: pytest.CaptureFixture
+        self, mock_subprocess_popen, caplog: pytest.CaptureFixture
     ):
         """Validate PBSScheduler handles subprocess failures when querying memory.
 
@@ -370,8 +363,8 @@ class TestScheduler:
         ------------------
         caplog (pytest.LogCaptureFixture)
             captures log messages
-        mock_subprocess_run (unittest.mock.MagicMock)
-            Mocks the subprocess.run method
+        mock_subprocess_popen (unittest.mock.MagicMock)
+            Mocks the subprocess.Popen method
 
         Asserts
         -------
@@ -379,8 +372,8 @@ class TestScheduler:
         """
         caplog.set_level(logging.DEBUG, logger="cstar.base.utils.log")
 
-        mock_subprocess_run.return_value = MagicMock(
-            returncode=1, stdout="", stderr="Error querying memory"
+        mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+            returncode=1, output="", stderr="Error querying memory"
         )
         scheduler = PBSScheduler(queues=[], primary_queue_name="batch")
 
@@ -407,20 +400,18 @@ class TestScheduler:
         Tests various memory formats (kb, mb, gb) and ensures correct conversions or
         handling of invalid formats.
         """
-        with patch("subprocess.run") as mock_subprocess_run:
-            mock_subprocess_run.return_value = MagicMock(
-                returncode=0, stdout=stdout, stderr=""
+        with patch("subprocess.Popen") as mock_subprocess_popen:
+            mock_subprocess_popen.side_effect = lambda *args, **kwargs: fake_process(
+                returncode=0, output=stdout, stderr=""
             )
             scheduler = PBSScheduler(queues=[], primary_queue_name="batch")
 
             result = scheduler.global_max_mem_per_node_gb
             assert result == expected
 
-            mock_subprocess_run.assert_called_once_with(
+            mock_subprocess_popen.assert_called_once_with(
                 'pbsnodes -a | grep "resources_available.mem" | cut -d== -f2 | sort -nr | head -1',
-                shell=True,
-                text=True,
-                capture_output=True,
+                **CAPTURED_POPEN_KWARGS,
             )
 
 
@@ -7,8 +7,10 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from cstar.base import Discretization
+from cstar.base.state_store import StateStore
 from cstar.execution.handler import ExecutionStatus
 from cstar.execution.local_process import LocalProcess
+from cstar.execution.watchdog import FailureSignature, WatchdogRules
 from cstar.tests.unit_tests.fake_abc_subclasses import (
     FakeExternalCodeBase,
     StubSimulation,
@@ -506,6 +508,15 @@ class TestSimulationPersistence:
     - `test_persist_creates_file`: Ensures `persist()` creates the expected state file.
     - `test_persist_and_restore`: Verifies that `persist()` and `restore()` correctly
       save and reload the simulation instance while maintaining its attributes.
+    - `test_persist_stores_plain_data`: Ensures every attribute, including
+      components, is stored as JSON rather than pickled.
+    - `test_restore_is_lazy`: Ensures `restore()` decodes attributes only on access.
+    - `test_restore_overrides_class_defaults`: Ensures stored attributes that have
+      a class-level default are restored.
+    - `test_persist_only_writes_changed_attributes`: Ensures repeat calls to
+      `persist()` only rewrite attributes that have changed.
+    - `test_restore_legacy_pickle`: Ensures state saved as `simulation_state.pkl` by
+      earlier versions of C-Star can still be restored.
     - `test_restore_missing_file`: Ensures `restore()` raises an error when the
       expected persisted file is missing.
     - `test_persist_raises_error_if_simulation_is_running`: Ensures `persist()`
@@ -516,7 +527,7 @@ class TestSimulationPersistence:
         """Test that `persist()` creates the expected simulation state file.
 
         This test verifies that calling `persist()` results in a
-        `simulation_state.pkl` file in the designated directory.
+        `simulation_state.db` file in the designated directory.
 
         Mocks & Fixtures
         ----------------
@@ -524,11 +535,13 @@ class TestSimulationPersistence:
 
         Assertions
         ----------
-        - The `simulation_state.pkl` file is successfully created in the directory.
+        - The `simulation_state.db` file is successfully created in the directory.
         """
         sim = stub_simulation
         sim.persist()
-        assert sim.directory / "simulation_state.pkl", "Persisted file was not created."
+        assert (sim.directory / "simulation_state.db").exists(), (
+            "Persisted file was not created."
+        )
 
     def test_persist_and_restore(self, stub_simulation):
         """Test that `persist()` and `restore()` correctly save and reload a
@@ -544,7 +557,7 @@ class TestSimulationPersistence:
         Assertions
         ----------
         - The restored instance matches the original instance when converted to a dictionary.
-        - The serialized version of the restored instance matches the original.
+        - The serialized version of each restored attribute matches the original.
         """
         sim = stub_simulation
         sim.persist()
@@ -555,10 +568,129 @@ class TestSimulationPersistence:
             "Restored simulation does not match the original"
         )
 
-        # Also compare serialized versions
-        assert pickle.dumps(restored_sim) == pickle.dumps(sim), (
-            "Serialized data mismatch after restore"
+        # Also compare serialized versions of each attribute
+        original_state = sim.__getstate__()
+        restored_state = restored_sim.__getstate__()
+        assert list(restored_state) == list(original_state)
+        for name, value in original_state.items():
+            assert pickle.dumps(restored_state[name]) == pickle.dumps(value), (
+                f"Serialized data mismatch for {name} after restore"
+            )
+
+    def test_persist_stores_plain_data(self, stub_simulation):
+        """Test that `persist()` stores every attribute as JSON.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - The simulation is stored under its class name.
+        - No attribute is pickled.
+        """
+        sim = stub_simulation
+        sim.persist()
+
+        object_type, fields = StateStore(sim.directory / "simulation_state.db").read()
+        assert object_type.endswith(":StubSimulation")
+        assert {encoding for encoding, _ in fields.values()} == {"json"}
+
+    def test_restore_overrides_class_defaults(self, stub_simulation):
+        """Test that `restore()` restores attributes with a class-level default.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - The stored `watchdog_rules` replace the class-level default.
+        """
+        sim = stub_simulation
+        sim.watchdog_rules = WatchdogRules(
+            signatures=(FailureSignature("blow-up", "MAIN: Abnormal termination"),),
+            stall_seconds=10,
         )
+        sim.persist()
+
+        restored_sim = StubSimulation.restore(sim.directory)
+        assert restored_sim.watchdog_rules == sim.watchdog_rules
+
+    def test_restore_is_lazy(self, stub_simulation):
+        """Test that `restore()` only decodes attributes when they are accessed.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - No attributes are decoded by `restore()` itself.
+        - Accessing an attribute decodes only that attribute.
+        - Persisting a partially-decoded instance keeps undecoded attributes.
+        """
+        sim = stub_simulation
+        sim.persist()
+        restored_sim = StubSimulation.restore(sim.directory)
+
+        assert "codebase" not in restored_sim.__dict__
+        assert restored_sim.name == sim.name
+        assert "name" in restored_sim.__dict__
+        assert "codebase" not in restored_sim.__dict__
+
+        restored_sim.persist()
+        assert StubSimulation.restore(sim.directory).codebase.source_repo == (
+            sim.codebase.source_repo
+        )
+
+    def test_persist_only_writes_changed_attributes(self, stub_simulation):
+        """Test that repeat calls to `persist()` only rewrite changed attributes.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+        - `StateStore.write`: Wrapped to record the number of rewritten attributes.
+
+        Assertions
+        ----------
+        - An unchanged simulation rewrites no attributes.
+        - Changing one attribute rewrites only that attribute.
+        """
+        sim = stub_simulation
+        sim.persist()
+
+        n_written = []
+        original_write = StateStore.write
+
+        def recording_write(store, *args, **kwargs):
+            n_written.append(original_write(store, *args, **kwargs))
+
+        with patch.object(StateStore, "write", recording_write):
+            sim.persist()
+            sim.name = "renamed"
+            sim.persist()
+
+        assert n_written == [0, 1]
+        assert StubSimulation.restore(sim.directory).name == "renamed"
+
+    def test_restore_legacy_pickle(self, stub_simulation):
+        """Test that `restore()` reads state saved by earlier versions of C-Star.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - A `simulation_state.pkl` file is restored when no state store exists.
+        """
+        sim = stub_simulation
+        with open(sim.directory / "simulation_state.pkl", "wb") as state_file:
+            pickle.dump(sim, state_file)
+
+        restored_sim = StubSimulation.restore(sim.directory)
+        assert restored_sim.to_dict() == sim.to_dict()
 
     def test_restore_missing_file(self, tmp_path):
         """Test that `restore()` raises an error when the state file is missing.
@@ -608,6 +740,55 @@ class TestSimulationPersistence:
             sim.persist()
 
 
+class TestSimulationWatch:
+    """Tests for `Simulation.watch`, which cancels runs that fail or hang.
+
+    Tests
+    -----
+    - `test_watch_uses_simulation_rules`: Ensures the run is watched with the
+      simulation's own rules.
+    - `test_watch_before_run`: Ensures watching a simulation that has not been run
+      raises an error.
+    """
+
+    def test_watch_uses_simulation_rules(self, stub_simulation):
+        """Test that `watch()` checks the run against `watchdog_rules`.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+        - `MagicMock`: Stands in for a finished execution handler.
+
+        Assertions
+        ----------
+        - The watchdog watches the simulation's handler with its rules.
+        - Watching in the foreground returns once the run has finished.
+        """
+        sim = stub_simulation
+        sim.watchdog_rules = WatchdogRules(stall_seconds=10)
+        sim._execution_handler = MagicMock(status=ExecutionStatus.COMPLETED)
+
+        watchdog = sim.watch(interval=0, background=False)
+
+        assert watchdog.handler is sim._execution_handler
+        assert watchdog.rules == WatchdogRules(stall_seconds=10)
+        assert watchdog.diagnostic is None
+
+    def test_watch_before_run(self, stub_simulation):
+        """Test that `watch()` raises a `RuntimeError` before the simulation is run.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - A `RuntimeError` is raised.
+        """
+        with pytest.raises(RuntimeError, match="has not been run"):
+            stub_simulation.watch()
+
+
 class TestSimulationRestart:
     """Tests for the `restart()` method of `Simulation`.
 
@@ -623,6 +804,10 @@ class TestSimulationRestart:
       `start_date`, `end_date`, and `directory` remain unchanged.
     - `test_restart_updates_directory`: Verifies that the directory is updated to
       include the restart timestamp.
+    - `test_restart_does_not_share_execution_handler`: Ensures the restarted
+      simulation does not track the run of the original.
+    - `test_restart_shares_immutable_components`: Ensures immutable components are
+      shared with, and stateful components copied from, the original simulation.
     - `test_restart_raises_error_on_invalid_new_end_date`: Ensures `restart()` raises
       an error if `new_end_date` is not a valid type.
     - `test_restart_with_string_end_date`: Checks that `restart()` correctly parses
@@ -726,6 +911,69 @@ class TestSimulationRestart:
             "Restart directory does not include correct timestamp"
         )
 
+    def test_restart_does_not_share_execution_handler(self, stub_simulation):
+        """Test that `restart()` does not share the original simulation's run.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+
+        Assertions
+        ----------
+        - The restarted simulation has no execution handler, and cannot be watched.
+        - The original simulation keeps its execution handler.
+        """
+        sim = stub_simulation
+        handler = MagicMock()
+        sim._execution_handler = handler
+
+        new_sim = sim.restart(new_end_date="2026-06-30")
+
+        assert new_sim._execution_handler is None
+        assert sim._execution_handler is handler
+        with pytest.raises(RuntimeError, match="has not been run"):
+            new_sim.watch()
+
+    def test_restart_shares_immutable_components(self, stub_simulation, tmp_path):
+        """Test that `restart()` avoids deep-copying the simulation.
+
+        This test ensures that immutable components are shared between the original
+        and restarted simulations, while components holding local state are copied,
+        such that modifying the restarted simulation leaves the original untouched.
+
+        Mocks & Fixtures
+        ----------------
+        - `stub_simulation`: Provides a mock `Simulation` instance.
+        - `copy.deepcopy` is patched to verify it is never called.
+
+        Assertions
+        ----------
+        - `copy.deepcopy` is not called.
+        - The codebase and the runtime code's `DataSource` are shared.
+        - The runtime code and discretization are distinct copies.
+        - Modifying the restarted simulation's runtime code state does not affect
+          the original.
+        """
+        sim = stub_simulation
+        sim.runtime_code.working_path = tmp_path
+        sim.runtime_code._local_file_hash_cache = {tmp_path / "file1": "abc"}
+
+        with patch("copy.deepcopy") as mock_deepcopy:
+            new_sim = sim.restart(new_end_date="2026-06-30")
+        mock_deepcopy.assert_not_called()
+
+        assert new_sim.codebase is sim.codebase
+        assert new_sim.runtime_code is not sim.runtime_code
+        assert new_sim.runtime_code.source is sim.runtime_code.source
+        assert new_sim.discretization is not sim.discretization
+        assert new_sim.runtime_code.working_path == tmp_path
+
+        new_sim.runtime_code._local_file_hash_cache.clear()
+        new_sim.runtime_code.files.append("file3")
+
+        assert sim.runtime_code._local_file_hash_cache == {tmp_path / "file1": "abc"}
+        assert sim.runtime_code.files == ["file1", "file2"]
+
     def test_restart_raises_error_on_invalid_new_end_date(self, stub_simulation):
         """Test that `restart()` raises an error for an invalid `new_end_date`.
 